@@ -0,0 +1,27 @@
+import streamlit as st
+import hashlib
+
+from ums import jobs
+from ums.importer import IMPORTS, DEFAULT_CHUNK_SIZE, MAX_CHUNK_SIZE, detect_format
+from ums.ui import job_panel, submit_job
+
+# Bulk import page: CSV/Parquet upload imported in batches by a background job
+st.header("Bulk Import")
+entity = st.selectbox("Import", list(IMPORTS), format_func=str.title, key="import_entity")
+st.caption("Columns: " + ", ".join(IMPORTS[entity].columns) + ". Headers are case-insensitive.")
+uploaded = st.file_uploader("CSV or Parquet file", type=["csv", "parquet"], key="import_file")
+chunk_size = st.number_input("Rows per batch", min_value=100, max_value=MAX_CHUNK_SIZE,
+                             value=DEFAULT_CHUNK_SIZE, step=100, key="import_chunk_size")
+
+if uploaded and st.button("Start import", key="start_import"):
+    # The worker reads the upload from the job directory; naming it by content
+    # makes pressing the button twice for the same file one job
+    fmt = detect_format(uploaded.name)
+    digest = hashlib.sha1(uploaded.getvalue()).hexdigest()
+    path = jobs.job_file(f"upload_{digest}_{entity}.{fmt}")
+    with open(path, "wb") as f:
+        f.write(uploaded.getvalue())
+    submit_job("bulk_import", "import",
+               {"entity": entity, "path": path, "format": fmt, "chunk_size": int(chunk_size),
+                "rejected_path": jobs.job_file(f"rejected_{digest}_{entity}.csv")})
+job_panel("bulk_import")
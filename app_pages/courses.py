@@ -0,0 +1,50 @@
+from ums import queries, summaries, transcripts
+from ums.lookups import DEPARTMENTS
+from ums.crud import display_crud_interface
+
+# Courses page (using the original CRUD interface)
+display_crud_interface(
+    entity_name="Course",
+    columns=["course_id", "title", "credits", "description", "department"],
+    key_column="course_id",
+    display_query=queries.COURSE_LIST,
+    insert_query="""
+    INSERT INTO Course (title, credits, description, dept_id)
+    VALUES (%s, %s, %s, %s)
+    """,
+    update_query="""
+    UPDATE Course 
+    SET title = %s, credits = %s, description = %s, dept_id = %s 
+    WHERE course_id = %s
+    """,
+    delete_query="DELETE FROM Course WHERE course_id = %s",
+    form_fields=[
+        {
+            'name': 'title',
+            'label': 'Title',
+            'type': 'text'
+        },
+        {
+            'name': 'credits',
+            'label': 'Credits',
+            'type': 'number',
+            'min_value': 0,
+            'max_value': 10,
+            'step': 0.5
+        },
+        {
+            'name': 'description',
+            'label': 'Description',
+            'type': 'text'
+        },
+        {
+            'name': 'dept_id',
+            'label': 'Department',
+            'type': 'lookup',
+            'lookup': DEPARTMENTS
+        }
+    ],
+    get_record_query=queries.COURSE_RECORD,
+    write_hooks=summaries.chain_hooks(summaries.COURSE_HOOKS, transcripts.COURSE_HOOKS),
+    rows_query=queries.COURSE_ROWS
+)
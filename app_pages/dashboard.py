@@ -0,0 +1,45 @@
+import streamlit as st
+import plotly.express as px
+
+from ums.db import TTL_AGGREGATE
+from ums import queries
+from ums.parallel import Query, fetch_parallel
+
+# Dashboard page
+st.header("University Dashboard")
+
+col1, col2 = st.columns(2)
+
+# The three dashboard reads are independent, so they run side by side. They
+# come back as Arrow tables, which the charts and st.dataframe take directly.
+student_count, faculty_count, recent_enrollments = fetch_parallel([
+    Query(queries.STUDENTS_BY_STATUS_SUMMARY, ttl=TTL_AGGREGATE, columnar=True),
+    Query(queries.FACULTY_BY_DEPARTMENT_SUMMARY, ttl=TTL_AGGREGATE, columnar=True),
+    Query(queries.RECENT_ENROLLMENTS_SUMMARY, ttl=TTL_AGGREGATE, columnar=True),
+])
+
+with col1:
+    # Student count by status
+    if student_count.num_rows:
+        st.subheader("Students by Status")
+        fig = px.pie(student_count, values='count', names='status', hole=0.3)
+        st.plotly_chart(fig)
+    else:
+        st.warning("No student data available")
+
+with col2:
+    # Faculty count by department
+    if faculty_count.num_rows:
+        st.subheader("Faculty by Department")
+        fig = px.bar(faculty_count, x='dept_name', y='count')
+        st.plotly_chart(fig)
+    else:
+        st.warning("No faculty data available")
+
+# Recent enrollments
+st.subheader("Recent Enrollments")
+
+if recent_enrollments.num_rows:
+    st.dataframe(recent_enrollments)
+else:
+    st.info("No recent enrollments to display")
@@ -0,0 +1,48 @@
+from ums import queries
+from ums.lookups import FACULTY
+from ums.crud import display_crud_interface
+
+# Departments page (using the original CRUD interface)
+display_crud_interface(
+    entity_name="Department",
+    columns=["dept_id", "dept_name", "building", "budget", "head_name"],
+    key_column="dept_id",
+    display_query=queries.DEPARTMENT_LIST,
+    insert_query="""
+    INSERT INTO Department (dept_name, building, budget, head_faculty_id)
+    VALUES (%s, %s, %s, %s)
+    """,
+    update_query="""
+    UPDATE Department 
+    SET dept_name = %s, building = %s, budget = %s, head_faculty_id = %s 
+    WHERE dept_id = %s
+    """,
+    delete_query="DELETE FROM Department WHERE dept_id = %s",
+    form_fields=[
+        {
+            'name': 'dept_name',
+            'label': 'Department Name',
+            'type': 'text'
+        },
+        {
+            'name': 'building',
+            'label': 'Building',
+            'type': 'text'
+        },
+        {
+            'name': 'budget',
+            'label': 'Budget',
+            'type': 'number',
+            'min_value': 0,
+            'step': 1000
+        },
+        {
+            'name': 'head_faculty_id',
+            'label': 'Department Head',
+            'type': 'lookup',
+            'lookup': FACULTY
+        }
+    ],
+    get_record_query=queries.DEPARTMENT_RECORD,
+    rows_query=queries.DEPARTMENT_ROWS
+)
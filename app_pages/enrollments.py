@@ -0,0 +1,45 @@
+from ums import queries, summaries, transcripts
+from ums.lookups import STUDENTS, SECTIONS
+from ums.crud import display_crud_interface
+from ums.ui import enrollment_errors
+
+# Enrollments page (using the original CRUD interface)
+display_crud_interface(
+    entity_name="Enrollment",
+    columns=["student_name", "course_title", "semester", "year", "enrollment_date", "grade"],
+    key_column="student_id,section_id",
+    display_query=queries.ENROLLMENT_LIST,
+    insert_query="""
+    INSERT INTO Enrollment (student_id, section_id, enrollment_date)
+    VALUES (%s, %s, %s)
+    """,
+    update_query="""
+    UPDATE Enrollment 
+    SET student_id = %s, section_id = %s, enrollment_date = %s 
+    WHERE student_id = %s AND section_id = %s
+    """,
+    delete_query="DELETE FROM Enrollment WHERE student_id = %s AND section_id = %s",
+    form_fields=[
+        {
+            'name': 'student_id',
+            'label': 'Student',
+            'type': 'lookup',
+            'lookup': STUDENTS
+        },
+        {
+            'name': 'section_id',
+            'label': 'Section',
+            'type': 'lookup',
+            'lookup': SECTIONS
+        },
+        {
+            'name': 'enrollment_date',
+            'label': 'Enrollment Date',
+            'type': 'date'
+        }
+    ],
+    get_record_query=queries.ENROLLMENT_RECORD,
+    write_hooks=summaries.chain_hooks(summaries.ENROLLMENT_HOOKS, transcripts.ENROLLMENT_HOOKS),
+    rows_query=queries.ENROLLMENT_ROWS,
+    validate=enrollment_errors
+)
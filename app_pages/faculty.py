@@ -0,0 +1,284 @@
+import streamlit as st
+import pandas as pd
+
+from ums.db import get_connection, fetch_data, invalidate_tables
+from ums import people, queries, summaries
+from ums.pagination import paginated_fragment
+from ums.lookups import lookup_select, DEPARTMENTS
+from ums.profiler import fragment
+from ums.ui import DatabaseError
+
+# Faculty page - Modified to use text inputs instead of dropdown
+st.header("Faculty Management")
+
+tab1, tab2, tab3, tab4 = st.tabs(["View", "Add", "Update", "Delete"])
+
+with tab1:
+    # View existing faculty, one page at a time
+    records = paginated_fragment(
+        "view_faculty",
+        queries.FACULTY_LIST,
+        ["faculty_id", "first_name", "last_name", "email", "faculty_rank",
+         "specialization", "department"],
+        ["faculty_id"],
+        "No faculty records found")
+
+
+@fragment("Add")
+def add_faculty():
+    # Add new faculty with person details
+    st.subheader("Add New Faculty")
+    # Department search sits outside the form so it can update as you type
+    dept_id = lookup_select("Department", DEPARTMENTS, key="add_faculty_dept")
+
+    with st.form("add_faculty_form"):
+
+        # Person details
+        col1, col2 = st.columns(2)
+        with col1:
+            first_name = st.text_input("First Name", key="add_faculty_first_name")
+            date_of_birth = st.date_input("Date of Birth", key="add_faculty_dob")
+            contact_number = st.text_input("Contact Number", key="add_faculty_contact")
+        with col2:
+            last_name = st.text_input("Last Name", key="add_faculty_last_name")
+            gender = st.selectbox("Gender", ['Male', 'Female', 'Other'], key="add_faculty_gender")
+            email = st.text_input("Email", key="add_faculty_email")
+
+        # Faculty details
+        hire_date = st.date_input("Hire Date", key="add_faculty_hire_date")
+        faculty_rank = st.text_input("Rank", key="add_faculty_rank")
+        specialization = st.text_input("Specialization", key="add_faculty_specialization")
+
+        submitted = st.form_submit_button("Add Faculty")
+        if submitted:
+            if not all([first_name, last_name, email, hire_date, faculty_rank]):
+                st.error("Please fill all required fields")
+            else:
+                try:
+                    # First create the Person record
+                    person_query = """
+                        INSERT INTO Person 
+                        (first_name, last_name, date_of_birth, gender, contact_number, email, person_type)
+                        VALUES (%s, %s, %s, %s, %s, %s, 'Faculty')
+                    """
+                    person_params = (
+                        first_name, last_name, date_of_birth, gender, 
+                        contact_number, email
+                    )
+
+                    # Execute in a transaction
+                    conn = get_connection()
+                    if conn:
+                        cursor = conn.cursor()
+
+                        # Insert Person
+                        cursor.execute(person_query, person_params)
+                        person_id = cursor.lastrowid
+
+                        # Insert Faculty
+                        faculty_query = """
+                            INSERT INTO Faculty 
+                            (person_id, hire_date, faculty_rank, specialization, dept_id)
+                            VALUES (%s, %s, %s, %s, %s)
+                        """
+                        faculty_params = (
+                            person_id, hire_date, faculty_rank, specialization, dept_id
+                        )
+                        cursor.execute(faculty_query, faculty_params)
+                        summaries.faculty_added(cursor, cursor.lastrowid)
+                        people.person_added(cursor, person_id)
+
+                        conn.commit()
+                        invalidate_tables("Person", "Faculty")
+                        st.success("Faculty added successfully!")
+                        st.rerun()
+                except DatabaseError as err:
+                    if conn:
+                        conn.rollback()
+                    st.error(f"Database error: {err}")
+                except Exception as e:
+                    if conn:
+                        conn.rollback()
+                    st.error(f"An error occurred: {str(e)}")
+                finally:
+                    if conn and conn.is_connected():
+                        cursor.close()
+                        conn.close()
+
+
+with tab2:
+    add_faculty()
+
+
+@fragment("Update")
+def update_faculty(records):
+    # Update faculty
+    if records:
+        record_options = [f"{r['faculty_id']} - {r['first_name']} {r['last_name']}" for r in records]
+        selected_record = st.selectbox(
+            "Select Faculty to update",
+            record_options,
+            help="Lists the rows on the current View page; filter or page there to find others",
+            key="update_select_faculty")
+
+        faculty_id = int(selected_record.split('-')[0].strip())
+        current_faculty = fetch_data(queries.FACULTY_DETAIL, (faculty_id,))
+
+        if current_faculty:
+            current = current_faculty[0]
+            st.subheader("Current Faculty Details")
+            st.write(pd.DataFrame([current]))
+            st.markdown("---")
+            st.subheader("Update Faculty")
+            new_dept_id = lookup_select("Department", DEPARTMENTS, key=f"update_faculty_dept_{faculty_id}",
+                                        current_value=current['dept_id'])
+
+            with st.form("update_faculty_form"):
+                # Person details
+                col1, col2 = st.columns(2)
+                with col1:
+                    new_first_name = st.text_input("First Name", value=current['first_name'], key="update_faculty_first_name")
+                    new_dob = st.date_input("Date of Birth", value=current['date_of_birth'], key="update_faculty_dob")
+                    new_contact = st.text_input("Contact Number", value=current['contact_number'], key="update_faculty_contact")
+                with col2:
+                    new_last_name = st.text_input("Last Name", value=current['last_name'], key="update_faculty_last_name")
+                    new_gender = st.selectbox("Gender", ['Male', 'Female', 'Other'], 
+                                            index=['Male', 'Female', 'Other'].index(current['gender']), 
+                                            key="update_faculty_gender")
+                    new_email = st.text_input("Email", value=current['email'], key="update_faculty_email")
+
+                # Faculty details
+                new_hire_date = st.date_input("Hire Date", value=current['hire_date'], key="update_faculty_hire_date")
+                new_faculty_rank = st.text_input("Rank", value=current['faculty_rank'], key="update_faculty_rank")
+                new_specialization = st.text_input("Specialization", value=current['specialization'], key="update_faculty_specialization")
+
+                if st.form_submit_button("Update Faculty"):
+                    try:
+                        # Update Person record
+                        person_update_query = """
+                            UPDATE Person SET
+                            first_name = %s, last_name = %s, date_of_birth = %s,
+                            gender = %s, contact_number = %s, email = %s
+                            WHERE person_id = (SELECT person_id FROM Faculty WHERE faculty_id = %s)
+                        """
+                        person_update_params = (
+                            new_first_name, new_last_name, new_dob,
+                            new_gender, new_contact, new_email, faculty_id
+                        )
+
+                        # Update Faculty record
+                        faculty_update_query = """
+                            UPDATE Faculty SET
+                            hire_date = %s, faculty_rank = %s, specialization = %s, dept_id = %s
+                            WHERE faculty_id = %s
+                        """
+                        faculty_update_params = (
+                            new_hire_date, new_faculty_rank, new_specialization, new_dept_id, faculty_id
+                        )
+
+                        # Execute in transaction
+                        conn = get_connection()
+                        if conn:
+                            cursor = conn.cursor()
+                            summaries.faculty_removed(cursor, faculty_id)
+                            cursor.execute(person_update_query, person_update_params)
+                            cursor.execute(faculty_update_query, faculty_update_params)
+                            summaries.faculty_added(cursor, faculty_id)
+                            cursor.execute("SELECT person_id FROM Faculty WHERE faculty_id = %s", (faculty_id,))
+                            people.person_changed(cursor, cursor.fetchone()[0])
+                            conn.commit()
+                            invalidate_tables("Person", "Faculty")
+                            st.success("Faculty updated successfully!")
+                            st.rerun()
+                    except DatabaseError as err:
+                        if conn:
+                            conn.rollback()
+                        st.error(f"Database error: {err}")
+                    except Exception as e:
+                        if conn:
+                            conn.rollback()
+                        st.error(f"An error occurred: {str(e)}")
+                    finally:
+                        if conn and conn.is_connected():
+                            cursor.close()
+                            conn.close()
+        else:
+            st.warning("Faculty not found")
+    else:
+        st.info("No faculty records to update")
+
+
+with tab3:
+    update_faculty(records)
+
+
+@fragment("Delete")
+def delete_faculty(records):
+    # Delete faculty
+    if records:
+        record_options = [f"{r['faculty_id']} - {r['first_name']} {r['last_name']}" for r in records]
+        selected_record = st.selectbox(
+            "Select Faculty to delete",
+            record_options,
+            help="Lists the rows on the current View page; filter or page there to find others",
+            key="delete_select_faculty")
+
+        faculty_id = int(selected_record.split('-')[0].strip())
+
+        faculty_details = fetch_data(queries.FACULTY_DELETE_PREVIEW, (faculty_id,))
+
+        if faculty_details:
+            st.subheader("Faculty to be Deleted")
+            st.write(pd.DataFrame(faculty_details))
+
+            confirm = st.checkbox("I confirm I want to delete this faculty", key=f"confirm_delete_{faculty_id}")
+
+            if st.button("Delete Faculty", disabled=not confirm, key="delete_faculty"):
+                try:
+                    conn = get_connection()
+                    if conn:
+                        cursor = conn.cursor()
+
+                        # First check if faculty is an advisor to any clubs
+                        cursor.execute(queries.CLUB_ADVISOR_COUNT, (faculty_id,))
+                        advisor_count = cursor.fetchone()[0]
+
+                        if advisor_count > 0:
+                            st.error("Cannot delete faculty member who is advising clubs. Please reassign clubs first.")
+                        else:
+                            # Get person_id first
+                            cursor.execute("SELECT person_id FROM Faculty WHERE faculty_id = %s", (faculty_id,))
+                            person_id = cursor.fetchone()[0]
+
+                            # Delete Faculty
+                            summaries.faculty_removed(cursor, faculty_id)
+                            cursor.execute("DELETE FROM Faculty WHERE faculty_id = %s", (faculty_id,))
+
+                            # Delete Person
+                            people.person_removed(cursor, person_id)
+                            cursor.execute("DELETE FROM Person WHERE person_id = %s", (person_id,))
+
+                            conn.commit()
+                            invalidate_tables("Faculty", "Person")
+                            st.success("Faculty deleted successfully!")
+                            st.rerun()
+                except DatabaseError as err:
+                    if conn:
+                        conn.rollback()
+                    st.error(f"Database error: {err}")
+                except Exception as e:
+                    if conn:
+                        conn.rollback()
+                    st.error(f"An error occurred: {str(e)}")
+                finally:
+                    if conn and conn.is_connected():
+                        cursor.close()
+                        conn.close()
+        else:
+            st.warning("Faculty details not found")
+    else:
+        st.info("No faculty records to delete")
+
+
+with tab4:
+    delete_faculty(records)
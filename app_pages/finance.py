@@ -0,0 +1,82 @@
+import streamlit as st
+from datetime import date
+from decimal import Decimal
+
+from ums.db import fetch_data, TTL_AGGREGATE
+from ums import billing
+from ums.columnar import fetch_table
+from ums.lookups import lookup_select, STUDENTS
+from ums.profiler import fragment
+from ums.ui import job_panel, run_write, submit_job
+
+# Finance page: term billing runs, reconciliation and student ledgers
+st.header("Finance")
+col1, col2 = st.columns(2)
+year = col1.number_input("Year", min_value=2000, max_value=2100, value=date.today().year, step=1,
+                         key="finance_year")
+semester = col2.selectbox("Semester", list(billing.SEMESTER_START), key="finance_semester")
+by_status = fetch_data(billing.TERM_STATUS, (int(year), semester), ttl=TTL_AGGREGATE)
+if by_status:
+    columns = st.columns(len(by_status))
+    for column, row in zip(columns, by_status):
+        column.metric(row['status'], f"{row['bills']:,}", f"{float(row['billed']):,.2f} billed",
+                      delta_color="off")
+else:
+    st.info(f"Nobody has been billed for {semester} {int(year)}")
+
+run_tab, ledger_tab = st.tabs(["Billing run", "Student ledger"])
+
+with run_tab:
+    st.caption("Bills every active student not yet billed for the term, then reconciles all tuition "
+               "against payments, scholarships and approved aid")
+    with st.form("billing_run_form"):
+        per_credit = st.checkbox("Charge per enrolled credit", key="billing_per_credit")
+        rate = st.number_input("Tuition (flat) or rate per credit", min_value=0.0,
+                               value=float(billing.FLAT_TUITION), step=50.0, key="billing_rate")
+        due = st.date_input("Due date", value=billing.due_date_for(int(year), semester), key="billing_due")
+        # Billing and reconciling a whole term runs as a background job
+        if st.form_submit_button(f"Bill {semester} {int(year)}"):
+            submit_job("billing_run", "billing.run_term",
+                       {"year": int(year), "semester": semester, "amount": str(Decimal(str(rate))),
+                        "per_credit": per_credit, "due_date": due.isoformat()})
+    job_panel("billing_run")
+    if st.button("Reconcile all tuition", key="billing_reconcile"):
+        submit_job("billing_reconcile", "billing.reconcile")
+    job_panel("billing_reconcile")
+
+
+@fragment("Student ledger")
+def student_ledger():
+    student_id = lookup_select("Student", STUDENTS, key="ledger_student")
+    if student_id:
+        entries = fetch_table(billing.LEDGER, (student_id,), ttl=TTL_AGGREGATE)
+        balance = entries["balance"][-1].as_py() if entries.num_rows else 0
+        st.metric("Balance", f"{float(balance):,.2f}")
+        if entries.num_rows:
+            st.dataframe(entries, hide_index=True)
+        else:
+            st.info("No charges or credits")
+
+        tuitions = fetch_data(billing.STUDENT_TUITIONS, (student_id,), ttl=0)
+        options = {"Oldest unpaid tuition": None}
+        options.update({f"{t['semester']} {t['year']} ({t['status']}, {float(t['amount']):,.2f})": t['tuition_id']
+                        for t in tuitions})
+        with st.form("record_payment_form"):
+            amount = st.number_input("Amount", min_value=0.01, value=100.0, step=50.0, key="payment_amount")
+            method = st.selectbox("Method", ["Credit Card", "Debit Card", "Bank Transfer", "Cash", "Check"],
+                                  key="payment_method")
+            applies_to = st.selectbox("Applies to", list(options), key="payment_tuition")
+            if st.form_submit_button("Record payment"):
+                payment_id, error = run_write(
+                    lambda c: billing.record_payment(c, student_id, Decimal(str(amount)), method,
+                                                     options[applies_to]),
+                    "Payment", "Student_Tuition")
+                if error:
+                    st.error(error)
+                else:
+                    st.success(f"Recorded payment #{payment_id}")
+                    st.rerun()
+
+
+with ledger_tab:
+    student_ledger()
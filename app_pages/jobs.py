@@ -0,0 +1,66 @@
+import streamlit as st
+
+from ums import jobs
+from ums.db import fetch_data, get_job_workers
+from ums.profiler import fragment
+from ums.ui import JOB_REFRESH_SECONDS, job_panel, load_job, run_write, show_job, submit_job
+
+# Jobs page: the background job queue (ums/jobs.py), its workers, and the
+# maintenance jobs that take no parameters
+MAINTENANCE = {
+    "Reconcile all tuition": "billing.reconcile",
+    "Rebuild student ledgers": "billing.ledgers",
+    "Recompute student records": "transcripts.recompute",
+    "Accrue library fines": "library.overdue",
+    "Rebuild the people search index": "people.reindex",
+}
+
+st.header("Background Jobs")
+workers = get_job_workers().stats()
+if workers["size"]:
+    st.caption(f"{workers['alive']} of {workers['size']} worker processes running "
+               f"({workers['started']} started since the app did)")
+else:
+    st.info("No worker processes are started with the app (UMS_JOB_WORKERS=0); "
+            "run `python -m ums.jobs worker` to work the queue.")
+
+with st.expander("Queue a maintenance job"):
+    label = st.selectbox("Job", list(MAINTENANCE), key="jobs_page_kind")
+    if st.button("Queue", key="jobs_page_queue"):
+        submit_job("jobs_page", MAINTENANCE[label])
+    job_panel("jobs_page")
+
+
+# The 100 latest jobs, refreshed on a timer
+@fragment("Jobs", run_every=JOB_REFRESH_SECONDS)
+def job_list():
+    rows = fetch_data(jobs.RECENT_JOBS, (100,), ttl=0)
+    for row in rows:
+        total = row["progress_total"]
+        row["progress"] = row["progress_done"] / total if total else None
+    st.dataframe(rows, hide_index=True, column_order=[
+        "job_id", "kind", "status", "progress", "attempts", "message", "error", "created_at", "finished_at"],
+                 column_config={"progress": st.column_config.ProgressColumn("Progress", min_value=0, max_value=1)})
+
+
+job_list()
+
+job_id = st.number_input("Job", min_value=1, step=1, value=None, key="jobs_page_job")
+if job_id:
+    job = load_job(int(job_id))
+    if job is None:
+        st.warning(f"No job #{int(job_id)}")
+    else:
+        show_job(job)
+        st.json(job["params"], expanded=False)
+        action = None
+        if job["status"] == "Queued" and st.button("Cancel", key="jobs_page_cancel"):
+            action = jobs.cancel
+        if job["status"] in ("Failed", "Cancelled") and st.button("Retry", key="jobs_page_retry"):
+            action = jobs.retry
+        if action:
+            result, error = run_write(lambda cursor: action(cursor, job["job_id"]), "job")
+            if error:
+                st.error(error)
+            else:
+                st.rerun()
@@ -0,0 +1,142 @@
+import streamlit as st
+from datetime import date
+
+from ums.db import get_backend, TTL_AGGREGATE, TTL_LOOKUP
+from ums import queries, library
+from ums.lookups import lookup_select, STUDENTS, LIBRARY_FACILITIES
+from ums.columnar import fetch_table
+from ums.crud import display_crud_interface
+from ums.profiler import fragment
+from ums.ui import run_check, run_write
+
+# Library page: the catalogue (status is set by circulation, not edited) and the circulation desk
+display_crud_interface(
+    entity_name="Library Book",
+    columns=["book_id", "title", "author", "isbn", "status", "facility"],
+    key_column="book_id",
+    display_query=queries.LIBRARY_BOOK_LIST,
+    insert_query="""
+    INSERT INTO Library_Book (title, author, isbn, status, facility_id)
+    VALUES (%s, %s, %s, 'Available', %s)
+    """,
+    update_query="""
+    UPDATE Library_Book 
+    SET title = %s, author = %s, isbn = %s, facility_id = %s 
+    WHERE book_id = %s
+    """,
+    delete_query="DELETE FROM Library_Book WHERE book_id = %s",
+    form_fields=[
+        {
+            'name': 'title',
+            'label': 'Title',
+            'type': 'text'
+        },
+        {
+            'name': 'author',
+            'label': 'Author',
+            'type': 'text'
+        },
+        {
+            'name': 'isbn',
+            'label': 'ISBN',
+            'type': 'text'
+        },
+        {
+            'name': 'facility_id',
+            'label': 'Facility',
+            'type': 'lookup',
+            'lookup': LIBRARY_FACILITIES
+        }
+    ],
+    get_record_query=queries.LIBRARY_BOOK_RECORD,
+    rows_query=queries.LIBRARY_BOOK_ROWS,
+    write_hooks=library.BOOK_HOOKS
+)
+
+st.markdown("---")
+st.subheader("Circulation")
+CIRCULATION_TABLES = ("Library_Book", "Checkout_Record")
+search_tab, desk_tab, overdue_tab = st.tabs(["Search", "Check out / return", "Overdue"])
+
+
+@fragment("Search")
+def search_books():
+    text = st.text_input("Title or author", key="library_search", placeholder="e.g. data struct")
+    query = library.search_query(text)
+    if query:
+        found = fetch_table(*query, ttl=TTL_LOOKUP)
+        if found.num_rows:
+            st.dataframe(found, hide_index=True)
+        else:
+            st.info("No books match")
+
+
+with search_tab:
+    search_books()
+
+
+@fragment("Check out / return")
+def circulation_desk():
+    isbn = st.text_input("ISBN", key="library_isbn")
+    if isbn.strip():
+        book, error = run_check(lambda c: library.availability(c, isbn), "Availability")
+        if error:
+            st.error(error)
+        elif book is None:
+            st.info("No book with that ISBN")
+        else:
+            book_id, status = book
+            st.metric("Status", status)
+            if status == "Available":
+                student_id = lookup_select("Student", STUDENTS, key="library_student")
+                if st.button("Check out", key="library_checkout") and student_id:
+                    due, error = run_write(lambda c: library.checkout(c, book_id, student_id), *CIRCULATION_TABLES)
+                    if error:
+                        st.error(error)
+                    else:
+                        st.success(f"Checked out; due {due}")
+                        st.rerun()
+            elif status == "Checked Out":
+                current, _ = run_check(lambda c: library.open_checkout(c, book_id), "The checkout")
+                if current:
+                    st.caption(f"Borrowed by student {current[1]}, due {current[2]}; "
+                               f"fine if returned today: {library.fine_for(current[2], date.today()):.2f}")
+                if st.button("Return", key="library_return"):
+                    fine, error = run_write(lambda c: library.return_book(c, book_id), *CIRCULATION_TABLES)
+                    if error:
+                        st.error(error)
+                    else:
+                        st.success(f"Returned; fine {fine:.2f}" if fine else "Returned")
+                        st.rerun()
+            if status != "Lost" and st.button("Mark lost", key="library_lost"):
+                charge, error = run_write(lambda c: library.mark_lost(c, book_id), *CIRCULATION_TABLES)
+                if error:
+                    st.error(error)
+                else:
+                    st.success(f"Marked lost; charged {charge:.2f}" if charge else "Marked lost")
+                    st.rerun()
+
+
+with desk_tab:
+    circulation_desk()
+
+
+@fragment("Overdue")
+def overdue_books():
+    as_of = st.date_input("As of", value=date.today(), key="library_as_of")
+    if st.button("Accrue fines", key="library_accrue"):
+        result, error = run_write(lambda c: library.accrue_fines(c, get_backend().name, as_of),
+                                  *CIRCULATION_TABLES)
+        if error:
+            st.error(error)
+        else:
+            st.success(f"{result[0]:,} overdue checkouts, {result[1]:,.2f} outstanding")
+    late = fetch_table(library.OVERDUE, (as_of, 200), ttl=TTL_AGGREGATE)
+    if late.num_rows:
+        st.dataframe(late, hide_index=True)
+    else:
+        st.info("Nothing is overdue")
+
+
+with overdue_tab:
+    overdue_books()
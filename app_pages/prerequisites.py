@@ -0,0 +1,65 @@
+import streamlit as st
+import pandas as pd
+
+from ums.db import get_read_connection, fetch_data
+from ums import queries, prerequisites
+from ums.lookups import lookup_select, DEPARTMENTS, COURSES
+from ums.crud import display_crud_interface
+from ums.ui import DatabaseError, course_titles, prerequisite_graph, prerequisite_cycle_errors
+
+# Prerequisites page: the course graph, plus eligibility checks for a cohort
+display_crud_interface(
+    entity_name="Prerequisite",
+    columns=["course_id", "title", "prereq_course_id", "prereq_title"],
+    key_column="course_id,prereq_course_id",
+    display_query=queries.PREREQUISITE_LIST,
+    insert_query="INSERT INTO Prerequisite (course_id, prereq_course_id) VALUES (%s, %s)",
+    delete_query="DELETE FROM Prerequisite WHERE course_id = %s AND prereq_course_id = %s",
+    form_fields=[
+        {
+            'name': 'course_id',
+            'label': 'Course',
+            'type': 'lookup',
+            'lookup': COURSES
+        },
+        {
+            'name': 'prereq_course_id',
+            'label': 'Requires',
+            'type': 'lookup',
+            'lookup': COURSES
+        }
+    ],
+    validate=prerequisite_cycle_errors
+)
+
+st.markdown("---")
+st.subheader("Cohort eligibility")
+graph = prerequisite_graph()
+if graph:
+    col1, col2 = st.columns(2)
+    with col1:
+        course_id = lookup_select("Course", COURSES, key="cohort_course")
+    with col2:
+        dept_id = lookup_select("Department (active students)", DEPARTMENTS, key="cohort_dept")
+    if course_id:
+        required = graph.required(course_id)
+        titles = course_titles(required)
+        st.caption("Requires: " + (", ".join(titles.get(c, str(c)) for c in required) or "nothing"))
+    if course_id and dept_id and st.button("Check cohort", key="cohort_check"):
+        students = [r['student_id'] for r in fetch_data(queries.COHORT_STUDENTS, (dept_id,))]
+        conn = get_read_connection()
+        if conn:
+            try:
+                problems = prerequisites.cohort_problems(conn.cursor(), graph, course_id, students)
+                col1, col2 = st.columns(2)
+                col1.metric("Eligible", len(students) - len(problems))
+                col2.metric("Not eligible", len(problems))
+                if problems:
+                    titles = course_titles({c for missing in problems.values() for c in missing})
+                    st.dataframe(pd.DataFrame(
+                        [{"student_id": student_id, "missing": ", ".join(titles.get(c, str(c)) for c in missing)}
+                         for student_id, missing in problems.items()]), hide_index=True)
+            except DatabaseError as err:
+                st.error(f"Database error: {err}")
+            finally:
+                conn.close()
@@ -0,0 +1,4 @@
+from ums.profiler import render_profiler_page
+
+# Admin: statement timings, slow queries and per-rerun counts (UMS_ADMIN=1)
+render_profiler_page()
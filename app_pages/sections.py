@@ -0,0 +1,158 @@
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+
+from ums.db import fetch_data, execute_query, execute_batch, TTL_LOOKUP
+from ums import queries, summaries, transcripts, scheduling
+from ums.lookups import lookup_select, COURSES, FACULTY, SECTIONS
+from ums.crud import display_crud_interface
+from ums.ui import run_check, describe_clash, section_errors
+
+# Sections page (using the original CRUD interface)
+display_crud_interface(
+    entity_name="Section",
+    columns=["section_id", "course_title", "semester", "year", "room_number", "faculty_name"],
+    key_column="section_id",
+    display_query=queries.SECTION_LIST,
+    insert_query="""
+    INSERT INTO Section (course_id, semester, year, room_number, faculty_id)
+    VALUES (%s, %s, %s, %s, %s)
+    """,
+    update_query="""
+    UPDATE Section 
+    SET course_id = %s, semester = %s, year = %s, room_number = %s, faculty_id = %s 
+    WHERE section_id = %s
+    """,
+    delete_query="DELETE FROM Section WHERE section_id = %s",
+    form_fields=[
+        {
+            'name': 'course_id',
+            'label': 'Course',
+            'type': 'lookup',
+            'lookup': COURSES
+        },
+        {
+            'name': 'semester',
+            'label': 'Semester',
+            'type': 'select',
+            'options': ['Fall', 'Spring', 'Summer'],
+            'display_field': '',
+            'value_field': ''
+        },
+        {
+            'name': 'year',
+            'label': 'Year',
+            'type': 'number',
+            'min_value': 2000,
+            'max_value': 2100,
+            'step': 1
+        },
+        {
+            'name': 'room_number',
+            'label': 'Room Number',
+            'type': 'text'
+        },
+        {
+            'name': 'faculty_id',
+            'label': 'Faculty',
+            'type': 'lookup',
+            'lookup': FACULTY
+        }
+    ],
+    get_record_query=queries.SECTION_RECORD,
+    write_hooks=summaries.chain_hooks(summaries.SECTION_HOOKS, transcripts.SECTION_HOOKS),
+    rows_query=queries.SECTION_ROWS,
+    validate=section_errors
+)
+
+st.markdown("---")
+st.subheader("Timetable")
+terms = fetch_data(queries.SECTION_TERMS, ttl=TTL_LOOKUP)
+if terms:
+    term_labels = {f"{t['semester']} {t['year']}": (t['year'], t['semester']) for t in terms}
+    year, semester = term_labels[st.selectbox("Term", list(term_labels), key="timetable_term")]
+    meetings_tab, conflicts_tab, rooms_tab = st.tabs(["Add meeting", "Conflicts", "Assign rooms"])
+
+    with meetings_tab:
+        st.caption("Meetings are checked against the room's, the instructor's and enrolled students' timetables")
+        section_id = lookup_select("Section", SECTIONS, key="meeting_section")
+        with st.form("add_meeting_form"):
+            day = st.selectbox("Day", scheduling.DAYS[:5], key="meeting_day")
+            col1, col2 = st.columns(2)
+            start = col1.time_input("Start", value=datetime.strptime("09:00", "%H:%M").time(), key="meeting_start")
+            end = col2.time_input("End", value=datetime.strptime("10:15", "%H:%M").time(), key="meeting_end")
+            if st.form_submit_button("Add meeting") and section_id:
+                section = fetch_data(queries.SECTION_RECORD, (section_id,), ttl=0)[0]
+                meeting = (day, start.hour * 60 + start.minute, end.hour * 60 + end.minute)
+                conflicts, error = run_check(lambda c: scheduling.section_conflicts(
+                    c, section_id, section['year'], section['semester'], section['room_number'],
+                    section['faculty_id'], [meeting]), "The timetable")
+                if meeting[1] >= meeting[2]:
+                    st.error("The meeting has to end after it starts")
+                elif error:
+                    st.error(error)
+                elif conflicts:
+                    for c in conflicts:
+                        st.error(f"{'Room' if c.kind == 'room' else 'Instructor'} {c.resource} is booked: "
+                                 f"{describe_clash(c)}")
+                else:
+                    success, message = execute_query(
+                        "INSERT INTO Schedule (section_id, day_of_week, start_time, end_time) VALUES (%s, %s, %s, %s)",
+                        (section_id, day, start, end))
+                    if success:
+                        st.success("Meeting added")
+                        # Enrolled students are told about, not blocked by, clashes the meeting creates
+                        enrolled = fetch_data(queries.SECTION_STUDENTS, (section_id,), ttl=0)
+                        clashes, _ = run_check(lambda c: scheduling.enrollment_clashes(
+                            c, [(r['student_id'], section_id) for r in enrolled]), "Student timetables")
+                        students = {c.resource for found in (clashes or {}).values() for c in found
+                                    if (c.day, c.start, c.end) == meeting}
+                        if students:
+                            st.warning(f"{len(students)} enrolled students now have a clash at this time")
+                    else:
+                        st.error(message)
+
+    with conflicts_tab:
+        if st.button("Find conflicts", key="timetable_conflicts"):
+            timetable, error = run_check(lambda c: scheduling.load_term(c, year, semester), "The timetable")
+            if error:
+                st.error(error)
+            else:
+                conflicts = timetable.conflicts()
+                col1, col2, col3 = st.columns(3)
+                for col, kind in zip((col1, col2, col3), ("room", "faculty", "student")):
+                    col.metric(f"{kind.title()} conflicts", sum(1 for c in conflicts if c.kind == kind))
+                if conflicts:
+                    st.dataframe(pd.DataFrame([{
+                        "kind": c.kind, "resource": c.resource, "day": c.day,
+                        "from": scheduling.format_minutes(c.start), "to": scheduling.format_minutes(c.end),
+                        "section": c.first, "clashes_with": c.second} for c in conflicts]), hide_index=True)
+
+    with rooms_tab:
+        st.caption("Places every section of the term in the smallest free room that holds its enrollment")
+        keep = st.checkbox("Keep sections in their current room when it still works", value=True,
+                           key="rooms_keep")
+        plan_key = "room_plan"
+        if st.button("Plan room assignment", key="rooms_plan"):
+            plan, error = run_check(lambda c: scheduling.plan_rooms(c, year, semester, keep), "Rooms")
+            if error:
+                st.error(error)
+            else:
+                st.session_state[plan_key] = ((year, semester), plan)
+        saved = st.session_state.get(plan_key)
+        if saved and saved[0] == (year, semester):
+            changes, unplaced = saved[1]
+            col1, col2 = st.columns(2)
+            col1.metric("Sections moving", len(changes))
+            col2.metric("Could not be placed", len(unplaced))
+            if unplaced:
+                st.dataframe(pd.DataFrame([{"section_id": s, "reason": r} for s, r in unplaced.items()]),
+                             hide_index=True)
+            if changes and st.button(f"Apply {len(changes)} room changes", key="rooms_apply"):
+                success, message = execute_batch([(scheduling.ASSIGN_ROOM, changes)])
+                if success:
+                    st.session_state.pop(plan_key, None)
+                    st.success(f"Moved {len(changes)} sections")
+                    st.rerun()
+                else:
+                    st.error(message)
@@ -0,0 +1,278 @@
+import streamlit as st
+import pandas as pd
+
+from ums.db import get_connection, fetch_data, invalidate_tables
+from ums import people, queries, summaries
+from ums.pagination import paginated_fragment
+from ums.lookups import lookup_select, DEPARTMENTS
+from ums.profiler import fragment
+from ums.ui import DatabaseError
+
+# Students page - Modified to use text inputs instead of dropdown
+st.header("Student Management")
+
+tab1, tab2, tab3, tab4 = st.tabs(["View", "Add", "Update", "Delete"])
+
+with tab1:
+    # View existing students, one page at a time
+    records = paginated_fragment(
+        "view_students",
+        queries.STUDENT_LIST,
+        ["student_id", "first_name", "last_name", "email", "gender",
+         "enrollment_date", "status", "department"],
+        ["student_id"],
+        "No student records found")
+
+
+@fragment("Add")
+def add_student():
+    # Add new student with person details
+    st.subheader("Add New Student")
+    # Department search sits outside the form so it can update as you type
+    dept_id = lookup_select("Department", DEPARTMENTS, key="add_dept")
+
+    with st.form("add_student_form"):
+
+        # Person details
+        col1, col2 = st.columns(2)
+        with col1:
+            first_name = st.text_input("First Name", key="add_first_name")
+            date_of_birth = st.date_input("Date of Birth", key="add_dob")
+            contact_number = st.text_input("Contact Number", key="add_contact")
+        with col2:
+            last_name = st.text_input("Last Name", key="add_last_name")
+            gender = st.selectbox("Gender", ['Male', 'Female', 'Other'], key="add_gender")
+            email = st.text_input("Email", key="add_email")
+
+        # Student details
+        enrollment_date = st.date_input("Enrollment Date", key="add_enrollment_date")
+        status = st.selectbox("Status", ['Active', 'Inactive', 'Graduated', 'Suspended'], key="add_status")
+
+        submitted = st.form_submit_button("Add Student")
+        if submitted:
+            if not all([first_name, last_name, email, enrollment_date]):
+                st.error("Please fill all required fields")
+            else:
+                try:
+                    # First create the Person record
+                    person_query = """
+                        INSERT INTO Person 
+                        (first_name, last_name, date_of_birth, gender, contact_number, email, person_type)
+                        VALUES (%s, %s, %s, %s, %s, %s, 'Student')
+                    """
+                    person_params = (
+                        first_name, last_name, date_of_birth, gender, 
+                        contact_number, email
+                    )
+
+                    # Execute in a transaction
+                    conn = get_connection()
+                    if conn:
+                        cursor = conn.cursor()
+
+                        # Insert Person
+                        cursor.execute(person_query, person_params)
+                        person_id = cursor.lastrowid
+
+                        # Insert Student
+                        student_query = """
+                            INSERT INTO Student 
+                            (person_id, enrollment_date, status, dept_id)
+                            VALUES (%s, %s, %s, %s)
+                        """
+                        student_params = (
+                            person_id, enrollment_date, status, dept_id
+                        )
+                        cursor.execute(student_query, student_params)
+                        summaries.student_added(cursor, cursor.lastrowid)
+                        people.person_added(cursor, person_id)
+
+                        conn.commit()
+                        invalidate_tables("Person", "Student")
+                        st.success("Student added successfully!")
+                        st.rerun()
+                except DatabaseError as err:
+                    if conn:
+                        conn.rollback()
+                    st.error(f"Database error: {err}")
+                except Exception as e:
+                    if conn:
+                        conn.rollback()
+                    st.error(f"An error occurred: {str(e)}")
+                finally:
+                    if conn and conn.is_connected():
+                        cursor.close()
+                        conn.close()
+
+
+with tab2:
+    add_student()
+
+
+@fragment("Update")
+def update_student(records):
+    # Update student
+    if records:
+        record_options = [f"{r['student_id']} - {r['first_name']} {r['last_name']}" for r in records]
+        selected_record = st.selectbox(
+            "Select Student to update",
+            record_options,
+            help="Lists the rows on the current View page; filter or page there to find others",
+            key="update_select_student")
+
+        student_id = int(selected_record.split('-')[0].strip())
+        current_student = fetch_data(queries.STUDENT_DETAIL, (student_id,))
+
+        if current_student:
+            current = current_student[0]
+            st.subheader("Current Student Details")
+            st.write(pd.DataFrame([current]))
+            st.markdown("---")
+            st.subheader("Update Student")
+            new_dept_id = lookup_select("Department", DEPARTMENTS, key=f"update_dept_{student_id}",
+                                        current_value=current['dept_id'])
+
+            with st.form("update_student_form"):
+                # Person details
+                col1, col2 = st.columns(2)
+                with col1:
+                    new_first_name = st.text_input("First Name", value=current['first_name'], key="update_first_name")
+                    new_dob = st.date_input("Date of Birth", value=current['date_of_birth'], key="update_dob")
+                    new_contact = st.text_input("Contact Number", value=current['contact_number'], key="update_contact")
+                with col2:
+                    new_last_name = st.text_input("Last Name", value=current['last_name'], key="update_last_name")
+                    new_gender = st.selectbox("Gender", ['Male', 'Female', 'Other'], 
+                                            index=['Male', 'Female', 'Other'].index(current['gender']), 
+                                            key="update_gender")
+                    new_email = st.text_input("Email", value=current['email'], key="update_email")
+
+                # Student details
+                new_enrollment_date = st.date_input("Enrollment Date", value=current['enrollment_date'], key="update_enrollment_date")
+                new_status = st.selectbox("Status", ['Active', 'Inactive', 'Graduated', 'Suspended'], 
+                                       index=['Active', 'Inactive', 'Graduated', 'Suspended'].index(current['status']), 
+                                       key="update_status")
+
+                if st.form_submit_button("Update Student"):
+                    try:
+                        # Update Person record
+                        person_update_query = """
+                            UPDATE Person SET
+                            first_name = %s, last_name = %s, date_of_birth = %s,
+                            gender = %s, contact_number = %s, email = %s
+                            WHERE person_id = (SELECT person_id FROM Student WHERE student_id = %s)
+                        """
+                        person_update_params = (
+                            new_first_name, new_last_name, new_dob,
+                            new_gender, new_contact, new_email, student_id
+                        )
+
+                        # Update Student record
+                        student_update_query = """
+                            UPDATE Student SET
+                            enrollment_date = %s, status = %s, dept_id = %s
+                            WHERE student_id = %s
+                        """
+                        student_update_params = (
+                            new_enrollment_date, new_status, new_dept_id, student_id
+                        )
+
+                        # Execute in transaction
+                        conn = get_connection()
+                        if conn:
+                            cursor = conn.cursor()
+                            summaries.student_removed(cursor, student_id)
+                            cursor.execute(person_update_query, person_update_params)
+                            cursor.execute(student_update_query, student_update_params)
+                            summaries.student_added(cursor, student_id)
+                            cursor.execute("SELECT person_id FROM Student WHERE student_id = %s", (student_id,))
+                            people.person_changed(cursor, cursor.fetchone()[0])
+                            conn.commit()
+                            invalidate_tables("Person", "Student")
+                            st.success("Student updated successfully!")
+                            st.rerun()
+                    except DatabaseError as err:
+                        if conn:
+                            conn.rollback()
+                        st.error(f"Database error: {err}")
+                    except Exception as e:
+                        if conn:
+                            conn.rollback()
+                        st.error(f"An error occurred: {str(e)}")
+                    finally:
+                        if conn and conn.is_connected():
+                            cursor.close()
+                            conn.close()
+        else:
+            st.warning("Student not found")
+    else:
+        st.info("No student records to update")
+
+
+with tab3:
+    update_student(records)
+
+
+@fragment("Delete")
+def delete_student(records):
+    # Delete student
+    if records:
+        record_options = [f"{r['student_id']} - {r['first_name']} {r['last_name']}" for r in records]
+        selected_record = st.selectbox(
+            "Select Student to delete",
+            record_options,
+            help="Lists the rows on the current View page; filter or page there to find others",
+            key="delete_select_student")
+
+        student_id = int(selected_record.split('-')[0].strip())
+
+        student_details = fetch_data(queries.STUDENT_DELETE_PREVIEW, (student_id,))
+
+        if student_details:
+            st.subheader("Student to be Deleted")
+            st.write(pd.DataFrame(student_details))
+
+            confirm = st.checkbox("I confirm I want to delete this student", key=f"confirm_delete_{student_id}")
+
+            if st.button("Delete Student", disabled=not confirm, key="delete_student"):
+                try:
+                    # Delete in transaction (Student first due to foreign key constraints)
+                    conn = get_connection()
+                    if conn:
+                        cursor = conn.cursor()
+
+                        # Get person_id first
+                        cursor.execute("SELECT person_id FROM Student WHERE student_id = %s", (student_id,))
+                        person_id = cursor.fetchone()[0]
+
+                        # Delete Student
+                        summaries.student_removed(cursor, student_id)
+                        cursor.execute("DELETE FROM Student WHERE student_id = %s", (student_id,))
+
+                        # Delete Person
+                        people.person_removed(cursor, person_id)
+                        cursor.execute("DELETE FROM Person WHERE person_id = %s", (person_id,))
+
+                        conn.commit()
+                        invalidate_tables("Student", "Person")
+                        st.success("Student deleted successfully!")
+                        st.rerun()
+                except DatabaseError as err:
+                    if conn:
+                        conn.rollback()
+                    st.error(f"Database error: {err}")
+                except Exception as e:
+                    if conn:
+                        conn.rollback()
+                    st.error(f"An error occurred: {str(e)}")
+                finally:
+                    if conn and conn.is_connected():
+                        cursor.close()
+                        conn.close()
+        else:
+            st.warning("Student details not found")
+    else:
+        st.info("No student records to delete")
+
+
+with tab4:
+    delete_student(records)
@@ -0,0 +1,71 @@
+import streamlit as st
+import pandas as pd
+
+from ums.db import get_connection, fetch_data, invalidate_tables
+from ums import queries, transcripts
+from ums.lookups import lookup_select, STUDENTS
+from ums.ui import DatabaseError, job_panel, submit_job
+
+# Transcripts page: GPA by term, grade entry and transcript issue
+st.header("Transcripts")
+student_id = lookup_select("Student", STUDENTS, key="transcript_student")
+
+if student_id:
+    record = fetch_data(queries.STUDENT_RECORD, (student_id,))
+    lines = fetch_data(queries.TRANSCRIPT_LINES, (student_id,))
+    col1, col2, col3 = st.columns(3)
+    gpa = record[0]["gpa"] if record else None
+    col1.metric("Cumulative GPA", f"{gpa:.2f}" if gpa is not None else "-")
+    col2.metric("Credits", record[0]["total_credits"] if record else 0)
+    col3.metric("Standing", record[0]["standing"] if record else "-")
+
+    if lines:
+        st.subheader("By term")
+        st.dataframe(transcripts.term_table(lines), hide_index=True)
+        st.subheader("Courses")
+        st.dataframe(pd.DataFrame(lines).drop(columns=["points"]), hide_index=True)
+
+        st.subheader("Record a grade")
+        options = {f"{l['year']} {l['semester']} - {l['title']} (section {l['section_id']})": l["section_id"]
+                   for l in lines}
+        with st.form("record_grade_form"):
+            chosen = st.selectbox("Enrollment", list(options), key="grade_enrollment")
+            letter = st.selectbox("Grade", list(transcripts.GRADE_POINTS), key="grade_letter")
+            if st.form_submit_button("Save grade"):
+                conn = get_connection()
+                if conn:
+                    try:
+                        cursor = conn.cursor()
+                        transcripts.record_grade(cursor, student_id, options[chosen], letter)
+                        conn.commit()
+                        invalidate_tables("Grade", "Enrollment", "Student_Record")
+                        st.success("Grade saved")
+                        st.rerun()
+                    except DatabaseError as err:
+                        conn.rollback()
+                        st.error(f"Database error: {err}")
+                    finally:
+                        conn.close()
+
+        if st.button("Issue transcript", key="issue_transcript"):
+            conn = get_connection()
+            if conn:
+                try:
+                    cursor = conn.cursor()
+                    transcript_id = transcripts.issue_transcript(cursor, student_id)
+                    conn.commit()
+                    invalidate_tables("Transcript", "Transcript_Grade")
+                    st.success(f"Issued transcript #{transcript_id}")
+                except DatabaseError as err:
+                    conn.rollback()
+                    st.error(f"Database error: {err}")
+                finally:
+                    conn.close()
+    else:
+        st.info("No enrollments for this student")
+
+with st.expander("Recompute all student records"):
+    st.caption("Rebuilds GPA, credits and standing for every student from the graded enrollments")
+    if st.button("Recompute", key="recompute_records"):
+        submit_job("recompute_records", "transcripts.recompute")
+    job_panel("recompute_records")
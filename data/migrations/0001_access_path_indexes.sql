@@ -0,0 +1,39 @@
+-- Secondary indexes for the access paths the app uses (see ums/queries.py).
+-- MySQL already indexes foreign key columns implicitly; the FK indexes below
+-- matter for SQLite and replace the implicit ones on MySQL.
+
+-- Dashboard: recent enrollments (ORDER BY enrollment_date DESC LIMIT 10), covering the join keys
+CREATE INDEX idx_enrollment_date ON Enrollment (enrollment_date, student_id, section_id);
+CREATE INDEX idx_enrollment_section ON Enrollment (section_id);
+
+-- Dashboard: students by status (GROUP BY status is answered from the index alone)
+CREATE INDEX idx_student_status ON Student (status);
+CREATE INDEX idx_student_dept ON Student (dept_id);
+
+-- Dashboard: faculty by department
+CREATE INDEX idx_faculty_dept ON Faculty (dept_id);
+
+-- Faculty view order (last_name, first_name) and name lookups
+CREATE INDEX idx_person_name ON Person (last_name, first_name);
+CREATE INDEX idx_person_first_name ON Person (first_name);
+
+-- Sections view order (year DESC, semester) and joins
+CREATE INDEX idx_section_year_semester ON Section (year, semester);
+CREATE INDEX idx_section_course ON Section (course_id);
+CREATE INDEX idx_section_faculty ON Section (faculty_id);
+
+-- Course title lookups/sort and department joins
+CREATE INDEX idx_course_title ON Course (title);
+CREATE INDEX idx_course_dept ON Course (dept_id);
+
+-- Faculty delete check: clubs advised by a faculty member
+CREATE INDEX idx_club_advisor ON Club (faculty_advisor_id);
+
+-- Library view order and facility joins
+CREATE INDEX idx_library_book_title ON Library_Book (title);
+CREATE INDEX idx_library_book_facility ON Library_Book (facility_id);
+CREATE INDEX idx_facility_type ON Facility (facility_type);
+
+-- Enrollment -> Grade and Section -> Schedule joins
+CREATE INDEX idx_grade_section ON Grade (section_id);
+CREATE INDEX idx_schedule_section ON Schedule (section_id);
@@ -0,0 +1,49 @@
+-- Materialized dashboard aggregates, kept current by ums/summaries.py on the
+-- app's Student/Faculty/Enrollment write paths (python -m ums.summaries --rebuild
+-- recomputes them from scratch).
+
+-- Students by status; NULL status is stored as ''
+CREATE TABLE summary_student_status (
+    status_key VARCHAR(20) PRIMARY KEY,
+    total INT NOT NULL
+);
+
+-- Faculty by department; names are joined from Department when read
+CREATE TABLE summary_faculty_department (
+    dept_id INT PRIMARY KEY,
+    total INT NOT NULL
+);
+
+-- Most recent enrollments, denormalized. Always holds every enrollment newer
+-- than its oldest row (between 10 and 50 rows).
+CREATE TABLE summary_recent_enrollment (
+    student_id INT NOT NULL,
+    section_id INT NOT NULL,
+    course_id INT NOT NULL,
+    first_name VARCHAR(50),
+    last_name VARCHAR(50),
+    course VARCHAR(100),
+    semester VARCHAR(10),
+    year INT,
+    enrollment_date DATE NOT NULL,
+    PRIMARY KEY (student_id, section_id)
+);
+CREATE INDEX idx_summary_recent_order ON summary_recent_enrollment (enrollment_date, student_id, section_id);
+CREATE INDEX idx_summary_recent_course ON summary_recent_enrollment (course_id);
+
+INSERT INTO summary_student_status (status_key, total)
+SELECT COALESCE(status, ''), COUNT(*) FROM Student GROUP BY COALESCE(status, '');
+
+INSERT INTO summary_faculty_department (dept_id, total)
+SELECT dept_id, COUNT(*) FROM Faculty WHERE dept_id IS NOT NULL GROUP BY dept_id;
+
+INSERT INTO summary_recent_enrollment
+    (student_id, section_id, course_id, first_name, last_name, course, semester, year, enrollment_date)
+SELECT e.student_id, e.section_id, c.course_id, p.first_name, p.last_name, c.title, s.semester, s.year, e.enrollment_date
+FROM Enrollment e
+JOIN Student st ON e.student_id = st.student_id
+JOIN Person p ON st.person_id = p.person_id
+JOIN Section s ON e.section_id = s.section_id
+JOIN Course c ON s.course_id = c.course_id
+ORDER BY e.enrollment_date DESC, e.student_id DESC, e.section_id DESC
+LIMIT 50;
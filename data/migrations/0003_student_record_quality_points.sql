@@ -0,0 +1,30 @@
+-- Credit-weighted grade points behind Student_Record.gpa, so a grade change
+-- updates the record with a delta instead of rescanning the student's history
+-- (ums/transcripts.py; python -m ums.transcripts --recompute rebuilds them).
+ALTER TABLE Student_Record ADD COLUMN quality_points DECIMAL(10,2) NOT NULL DEFAULT 0;
+
+INSERT IGNORE INTO Student_Record (student_id) SELECT student_id FROM Student;
+
+UPDATE Student_Record SET
+    quality_points = COALESCE((
+        SELECT SUM(g.points * c.credits)
+        FROM Enrollment e
+        JOIN Grade g ON e.grade_id = g.grade_id
+        JOIN Section s ON e.section_id = s.section_id
+        JOIN Course c ON s.course_id = c.course_id
+        WHERE e.student_id = Student_Record.student_id), 0),
+    total_credits = COALESCE((
+        SELECT SUM(c.credits)
+        FROM Enrollment e
+        JOIN Grade g ON e.grade_id = g.grade_id
+        JOIN Section s ON e.section_id = s.section_id
+        JOIN Course c ON s.course_id = c.course_id
+        WHERE e.student_id = Student_Record.student_id), 0);
+
+UPDATE Student_Record SET
+    gpa = CASE WHEN total_credits > 0 THEN ROUND(quality_points * 1.0 / total_credits, 2) END,
+    standing = CASE
+        WHEN total_credits >= 90 THEN 'Senior'
+        WHEN total_credits >= 60 THEN 'Junior'
+        WHEN total_credits >= 30 THEN 'Sophomore'
+        ELSE 'Freshman' END;
@@ -0,0 +1,26 @@
+-- Library circulation (ums/library.py): fines on checkouts, indexes for the
+-- availability and overdue access paths, and an inverted index for
+-- title/author search. The search index is filled by
+-- ums.library.rebuild_search_index right after this migration.
+
+-- Fine on a checkout: recomputed while it is overdue, final once it is returned
+ALTER TABLE Checkout_Record ADD COLUMN fine_amount DECIMAL(10,2) NOT NULL DEFAULT 0;
+
+-- Availability: "is this ISBN on the shelf" is answered from the index alone
+CREATE INDEX idx_library_book_isbn_status ON Library_Book (isbn, status, book_id);
+
+-- Open checkouts (return_date IS NULL) in due order, for the overdue job
+CREATE INDEX idx_checkout_open_due ON Checkout_Record (return_date, due_date);
+
+-- A book's open checkout (returns) and a student's open loans
+CREATE INDEX idx_checkout_book ON Checkout_Record (book_id, return_date);
+CREATE INDEX idx_checkout_student ON Checkout_Record (student_id, return_date);
+
+-- One row per distinct lowercase word of a book's title and author. Terms
+-- are compared byte by byte (utf8mb4_bin) so a word prefix is a key range.
+CREATE TABLE library_search_term (
+    term VARCHAR(64) COLLATE utf8mb4_bin NOT NULL,
+    book_id INT NOT NULL,
+    PRIMARY KEY (term, book_id)
+);
+CREATE INDEX idx_library_search_book ON library_search_term (book_id);
@@ -0,0 +1,28 @@
+-- Tuition billing and reconciliation (ums/billing.py): indexes for the
+-- billing run and per-student reconciliation, and a ledger with running
+-- balances. The ledger is filled by ums.billing.rebuild_ledgers right after
+-- this migration.
+
+-- Billing run: "is this student already billed for the term" is an index probe
+CREATE INDEX idx_tuition_student_term ON Student_Tuition (student_id, year, semester);
+CREATE INDEX idx_tuition_term_status ON Student_Tuition (year, semester, status);
+
+-- Payments by tuition and by student, covering the amounts summed
+CREATE INDEX idx_payment_tuition ON Payment (tuition_id, amount);
+CREATE INDEX idx_payment_student ON Payment (student_id, tuition_id, amount);
+
+CREATE INDEX idx_aid_student ON Financial_Aid (student_id, status);
+
+-- Every charge (+) and credit (-) of a student in date order, with the balance
+-- after it: a statement is one range scan, the current balance one probe
+CREATE TABLE student_ledger (
+    student_id INT NOT NULL,
+    entry_seq INT NOT NULL,
+    entry_date DATE NOT NULL,
+    kind VARCHAR(20) NOT NULL,
+    reference_id INT NOT NULL,
+    description VARCHAR(150),
+    amount DECIMAL(10,2) NOT NULL,
+    balance DECIMAL(12,2) NOT NULL,
+    PRIMARY KEY (student_id, entry_seq)
+);
@@ -0,0 +1,24 @@
+-- People search (ums/people.py): an inverted index over the names, email
+-- and phone number of every Person, and a trigram index over the distinct
+-- words for typo-tolerant lookups. Both are filled by
+-- ums.people.rebuild_search_index right after this migration.
+
+-- One row per distinct search term of a person: lowercase name and email
+-- words, the phone number's digit groups, all its digits and its last four.
+-- A term's postings are a range of the primary key, which also checks a
+-- candidate's other terms; (person_id, term) serves deletes. Terms are
+-- compared byte by byte (utf8mb4_bin), so a prefix's words are the range
+-- [prefix, prefix with its last character incremented).
+CREATE TABLE person_search_term (
+    term VARCHAR(64) COLLATE utf8mb4_bin NOT NULL,
+    person_id INT NOT NULL,
+    PRIMARY KEY (term, person_id)
+);
+CREATE INDEX idx_person_search_person ON person_search_term (person_id, term);
+
+-- Trigrams of each distinct alphabetic term ("$smith$" -> $sm smi mit ith th$)
+CREATE TABLE person_search_gram (
+    gram CHAR(3) COLLATE utf8mb4_bin NOT NULL,
+    term VARCHAR(64) COLLATE utf8mb4_bin NOT NULL,
+    PRIMARY KEY (gram, term)
+);
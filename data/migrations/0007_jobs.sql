@@ -0,0 +1,36 @@
+-- Background jobs (ums/jobs.py): a queue in the database itself, so long
+-- operations run in worker processes with no broker besides the app's own
+-- database.
+
+-- One row per submitted job. `params` and `result` are JSON. A worker claims
+-- a Queued job with a conditional UPDATE to Running, writes progress and a
+-- heartbeat while it runs, and finishes it as Succeeded or Failed; a failed
+-- attempt goes back to Queued with a later run_after until max_attempts.
+-- Submitting with an idempotency_key that already exists returns that job.
+CREATE TABLE job (
+    job_id INT AUTO_INCREMENT PRIMARY KEY,
+    kind VARCHAR(50) NOT NULL,
+    params TEXT NOT NULL,
+    idempotency_key VARCHAR(128) UNIQUE,
+    status VARCHAR(20) NOT NULL,
+    attempts INT NOT NULL DEFAULT 0,
+    max_attempts INT NOT NULL DEFAULT 3,
+    run_after DATETIME NOT NULL,
+    progress_done BIGINT NOT NULL DEFAULT 0,
+    progress_total BIGINT,
+    message VARCHAR(255),
+    result TEXT,
+    error TEXT,
+    worker VARCHAR(64),
+    heartbeat_at DATETIME,
+    created_at DATETIME NOT NULL,
+    started_at DATETIME,
+    finished_at DATETIME
+);
+
+-- Claiming: the oldest due Queued job is the first entry of its range;
+-- stale Running jobs are found the same way
+CREATE INDEX idx_job_queue ON job (status, run_after);
+
+-- Jobs that succeeded since a time, for the app's cache invalidation
+CREATE INDEX idx_job_finished ON job (status, finished_at);
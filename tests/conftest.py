@@ -0,0 +1,31 @@
+import pytest
+
+from ums import migrate
+from ums.backends import SQLiteBackend
+
+
+# A fresh SQLite database per test: the schema and seed data of
+# data/query.sql with every migration applied
+@pytest.fixture
+def backend(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "ums.db"))
+    conn = backend.connect()
+    try:
+        migrate.apply_pending(conn, backend)
+    finally:
+        conn.close()
+    return backend
+
+
+@pytest.fixture
+def conn(backend):
+    conn = backend.connect()
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def cursor(conn):
+    cursor = conn.cursor()
+    yield cursor
+    cursor.close()
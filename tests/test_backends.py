@@ -0,0 +1,64 @@
+import pytest
+
+from ums.backends import translate_ddl_to_sqlite, translate_to_sqlite
+
+
+@pytest.mark.parametrize("mysql, sqlite", [
+    ("SELECT * FROM Person WHERE person_id = %s AND email = %s",
+     "SELECT * FROM Person WHERE person_id = ? AND email = ?"),
+    ("SELECT discount * 100 %% 7 FROM Fee WHERE fee_id = %s", "SELECT discount * 100 % 7 FROM Fee WHERE fee_id = ?"),
+    # Placeholders and escapes inside string literals are left as written
+    ("SELECT '%s', \"100%%\" FROM Course WHERE title LIKE %s", "SELECT '%s', \"100%%\" FROM Course WHERE title LIKE ?"),
+    ("SELECT 'it''s %s', 'a\\'%s' WHERE x = %s", "SELECT 'it''s %s', 'a\\'%s' WHERE x = ?"),
+])
+def test_placeholders(mysql, sqlite):
+    assert translate_to_sqlite(mysql) == sqlite
+
+
+@pytest.mark.parametrize("mysql, sqlite", [
+    ("SELECT CONCAT(first_name, ' ', last_name) FROM Person", "SELECT (first_name || ' ' || last_name) FROM Person"),
+    ("SELECT CONCAT('%', %s, '%')", "SELECT ('%' || ? || '%')"),
+    ("SELECT concat(a, CONCAT(b, ', ', c), UPPER(d)) FROM t", "SELECT (a || (b || ', ' || c) || UPPER(d)) FROM t"),
+    ("SELECT CONCAT(LEFT(name, 1), ')') FROM t", "SELECT (LEFT(name, 1) || ')') FROM t"),
+    # Only the function, not identifiers that end in concat
+    ("SELECT group_concat(name) FROM t", "SELECT group_concat(name) FROM t"),
+    ("SELECT CURDATE(), NOW()", "SELECT DATE('now'), DATETIME('now')"),
+])
+def test_functions(mysql, sqlite):
+    assert translate_to_sqlite(mysql) == sqlite
+
+
+def test_insert_ignore():
+    assert (translate_to_sqlite("insert  ignore INTO Enrollment (student_id) VALUES (%s)")
+            == "INSERT OR IGNORE INTO Enrollment (student_id) VALUES (?)")
+
+
+def test_unbalanced_concat():
+    with pytest.raises(ValueError):
+        translate_to_sqlite("SELECT CONCAT(a, b FROM t")
+
+
+def test_ddl():
+    ddl = translate_ddl_to_sqlite(
+        "CREATE TABLE Person (\n"
+        "    person_id INT AUTO_INCREMENT PRIMARY KEY,\n"
+        "    gender ENUM('Male', 'Female', 'Other'),\n"
+        "    graduation YEAR,\n"
+        "    term VARCHAR(64) COLLATE utf8mb4_bin NOT NULL\n"
+        ");\n"
+        "ALTER TABLE Person ADD CONSTRAINT fk_dept FOREIGN KEY (dept_id) REFERENCES Department(dept_id);\n"
+        "INSERT IGNORE INTO Person (person_id) VALUES (1);")
+    assert ddl == (
+        "CREATE TABLE Person (\n"
+        "    person_id INTEGER PRIMARY KEY AUTOINCREMENT,\n"
+        "    gender TEXT CHECK (gender IN ('Male', 'Female', 'Other')),\n"
+        "    graduation INTEGER,\n"
+        "    term VARCHAR(64) NOT NULL\n"
+        ");\n"
+        "\n"
+        "INSERT OR IGNORE INTO Person (person_id) VALUES (1);")
+
+
+def test_bigint_auto_increment():
+    assert (translate_ddl_to_sqlite("id BIGINT AUTO_INCREMENT PRIMARY KEY")
+            == "id INTEGER PRIMARY KEY AUTOINCREMENT")
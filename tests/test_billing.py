@@ -0,0 +1,71 @@
+from datetime import date
+
+import pytest
+
+from ums.billing import BALANCE, allocate, bill_term, due_date_for, record_payment, run_term, status_for
+
+FALL = (1, 500000, date(2025, 10, 1), "Fall", 2025)
+SPRING = (2, 500000, date(2026, 2, 14), "Spring", 2026)
+
+
+def test_a_payment_covers_the_tuition_it_names():
+    assert allocate([FALL, SPRING], {2: 100000}, {}, [], 0) == {1: 0, 2: 100000}
+
+
+def test_a_scholarship_covers_its_term():
+    assert allocate([FALL, SPRING], {}, {("Spring", 2026): 200000}, [], 0) == {1: 0, 2: 200000}
+
+
+def test_aid_covers_the_first_tuition_due_after_it_was_applied_for():
+    assert allocate([FALL, SPRING], {}, {}, [(date(2025, 12, 1), 50000)], 0) == {1: 0, 2: 50000}
+    # applied after every due date: the last tuition
+    assert allocate([FALL, SPRING], {}, {}, [(date(2026, 5, 1), 50000)], 0) == {1: 0, 2: 50000}
+
+
+def test_unattached_money_goes_to_the_oldest_unpaid_tuition():
+    assert allocate([FALL, SPRING], {1: 400000}, {}, [], 300000) == {1: 500000, 2: 200000}
+
+
+def test_overpayment_on_one_tuition_spills_over_to_the_others():
+    assert allocate([FALL, SPRING], {1: 600000}, {("Fall", 2025): 100000}, [], 0) == {1: 500000, 2: 200000}
+
+
+def test_credit_without_bills_stays_unallocated():
+    assert allocate([], {}, {("Fall", 2025): 100000}, [(date(2025, 1, 1), 100)], 500) == {}
+
+
+@pytest.mark.parametrize("covered, status", [(0, "Unpaid"), (1, "Partial"), (500000, "Paid"), (600000, "Paid")])
+def test_status_for(covered, status):
+    assert status_for(500000, covered) == status
+
+
+def test_due_date_is_thirty_days_into_the_term():
+    assert due_date_for(2026, "Spring") == date(2026, 2, 14)
+    assert due_date_for(2025, "Fall") == date(2025, 10, 1)
+
+
+def test_billing_a_term_twice_bills_each_student_once(backend, conn):
+    billed, checked, _, entries = run_term(conn, backend, 2030, "Fall")
+    assert billed > 0 and checked >= billed and entries > 0
+    assert run_term(conn, backend, 2030, "Fall")[0] == 0
+
+
+def test_paying_a_tuition_in_full_marks_it_paid(cursor):
+    # a new student, so no earlier payments or awards spill over onto the bill
+    cursor.execute("INSERT INTO Person (first_name, last_name, date_of_birth, gender, email, person_type) "
+                   "VALUES ('Pay', 'Er', '2005-01-01', 'Other', 'pay.er@example.edu', 'Student')")
+    cursor.execute("INSERT INTO Student (person_id, enrollment_date, status) VALUES (%s, '2029-09-01', 'Active')",
+                   (cursor.lastrowid,))
+    student_id = cursor.lastrowid
+    bill_term(cursor, 2030, "Spring")
+    cursor.execute("SELECT tuition_id, amount FROM Student_Tuition WHERE student_id = %s", (student_id,))
+    tuition_id, amount = cursor.fetchone()
+
+    record_payment(cursor, student_id, amount / 2, "Cash", tuition_id)
+    cursor.execute("SELECT status FROM Student_Tuition WHERE tuition_id = %s", (tuition_id,))
+    assert cursor.fetchone()[0] == "Partial"
+    record_payment(cursor, student_id, amount / 2, "Cash", tuition_id)
+    cursor.execute("SELECT status FROM Student_Tuition WHERE tuition_id = %s", (tuition_id,))
+    assert cursor.fetchone()[0] == "Paid"
+    cursor.execute(BALANCE, (student_id,))
+    assert cursor.fetchone()[0] == 0
@@ -0,0 +1,52 @@
+from ums.cache import QueryCache, read_tables, with_cascades, written_tables
+
+STUDENTS = "SELECT s.student_id, p.first_name FROM Student s JOIN Person p ON s.person_id = p.person_id"
+SUMMARY = "SELECT status_key, total FROM summary_student_status"
+
+
+def test_tables_read_and_written():
+    assert read_tables(STUDENTS) == {"student", "person"}
+    assert written_tables("INSERT IGNORE INTO Student_Record (student_id) VALUES (%s)") == {"student_record"}
+    assert written_tables("UPDATE `Course` SET credits = 3") == {"course"}
+
+
+def test_cascades_and_derived_tables_follow_transitively():
+    tables = with_cascades(["Person"])
+    assert {"student", "student_record", "faculty", "person_search_term", "summary_recent_enrollment"} <= tables
+
+
+def test_a_write_drops_entries_that_read_the_table():
+    cache = QueryCache()
+    cache.put(STUDENTS, [(1,)])
+    cache.put(SUMMARY, [(2,)])
+    cache.put("SELECT title FROM Course", [(3,)])
+    cache.invalidate_for("DELETE FROM Person WHERE person_id = %s")
+    assert cache.get(STUDENTS) is None
+    assert cache.get(SUMMARY) is None  # Person -> Student -> the status summary
+    assert cache.get("SELECT title FROM Course") == [(3,)]
+
+
+def test_keys_ignore_whitespace_and_include_params():
+    cache = QueryCache()
+    cache.put("SELECT * FROM Course WHERE course_id = %s", [(1,)], params=(1,))
+    assert cache.get("SELECT *\n  FROM Course WHERE course_id = %s", params=(1,)) == [(1,)]
+    assert cache.get("SELECT * FROM Course WHERE course_id = %s", params=(2,)) is None
+
+
+def test_a_result_read_before_a_write_is_not_cached():
+    cache = QueryCache()
+    generation = cache.generation()
+    cache.invalidate_tables("Course")
+    cache.put("SELECT title FROM Course", [(1,)], generation=generation)
+    assert cache.get("SELECT title FROM Course") is None
+
+
+def test_expired_and_evicted_entries():
+    cache = QueryCache(max_bytes=2000)
+    cache.put("SELECT 1 FROM Course", [(1,)], ttl=-1)
+    assert cache.get("SELECT 1 FROM Course") is None
+    for i in range(50):
+        cache.put(f"SELECT {i} FROM Course", [(i,)] * 20)
+    assert cache.get("SELECT 0 FROM Course") is None
+    assert cache.get("SELECT 49 FROM Course") == [(49,)] * 20
+    assert cache.stats()["evictions"] > 0
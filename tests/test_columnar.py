@@ -0,0 +1,59 @@
+from datetime import date
+from decimal import Decimal
+
+import pyarrow as pa
+import pytest
+
+from ums.columnar import read_table, unify_types
+
+
+@pytest.fixture
+def table_of(cursor):
+    def table_of(declared, values, batch_size):
+        cursor.execute(f"CREATE TABLE columnar_test (id INTEGER PRIMARY KEY, value {declared})")
+        cursor.executemany("INSERT INTO columnar_test (value) VALUES (%s)", [(v,) for v in values])
+        cursor.execute("SELECT value FROM columnar_test ORDER BY id")
+        return read_table(cursor, batch_size).column("value")
+    return table_of
+
+
+# SQLite columns are dynamically typed, so one column can hold several types
+@pytest.mark.parametrize("batch_size", [1, 2, 10])
+def test_mixed_type_column_is_read_as_text(table_of, batch_size):
+    column = table_of("", [1, "two", 3.5, None], batch_size)
+    assert column.type == pa.string()
+    assert column.to_pylist() == ["1", "two", "3.5", None]
+
+
+def test_all_null_first_batch_takes_the_later_type(table_of):
+    column = table_of("DATE", [None, None, date(2024, 9, 1)], 2)
+    assert column.type == pa.date32()
+    assert column.to_pylist() == [None, None, date(2024, 9, 1)]
+
+
+def test_decimal_precision_widens_across_batches(table_of):
+    column = table_of("DECIMAL(10,3)", [Decimal("5.5"), Decimal("12000.25"), Decimal("0.125")], 1)
+    assert column.type == pa.decimal128(8, 3)
+    assert column.to_pylist() == [Decimal("5.5"), Decimal("12000.25"), Decimal("0.125")]
+
+
+def test_no_rows(cursor):
+    cursor.execute("SELECT dept_id, dept_name FROM Department WHERE dept_id < 0")
+    table = read_table(cursor)
+    assert table.num_rows == 0
+    assert table.column_names == ["dept_id", "dept_name"]
+
+
+@pytest.mark.parametrize("types, unified", [
+    ([pa.null(), pa.null()], pa.null()),
+    ([pa.null(), pa.int64(), pa.null()], pa.int64()),
+    ([pa.decimal128(2, 1), pa.decimal128(7, 2)], pa.decimal128(7, 2)),
+    ([pa.decimal128(38, 0), pa.decimal128(10, 9)], pa.float64()),
+    ([pa.int32(), pa.int64()], pa.int64()),
+    ([pa.int64(), pa.float64(), pa.decimal128(4, 2)], pa.float64()),
+    ([pa.date32(), pa.timestamp("us")], pa.timestamp("us")),
+    ([pa.int64(), pa.string()], pa.string()),
+])
+def test_unify_types(types, unified):
+    assert unify_types(types) == unified
+
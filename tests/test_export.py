@@ -0,0 +1,66 @@
+import csv
+from decimal import Decimal
+
+import pytest
+
+from ums.export import export_rows
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+SQL = "SELECT payment_id, amount, method FROM export_payment ORDER BY payment_id"
+
+
+@pytest.fixture
+def payments(conn):
+    cursor = conn.cursor()
+    cursor.execute("CREATE TABLE export_payment (payment_id INT PRIMARY KEY, amount DECIMAL(10,2), method VARCHAR(20))")
+    cursor.executemany("INSERT INTO export_payment VALUES (%s, %s, %s)",
+                       [(1, Decimal("5.50"), "Cash"), (2, None, None), (3, Decimal("12000.25"), "Card, debit")])
+    conn.commit()
+    return conn
+
+
+def test_csv_has_a_header_and_every_row(payments, tmp_path):
+    path = tmp_path / "payments.csv"
+    assert export_rows(payments, SQL, (), "csv", str(path), chunk_size=2) == 3
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows == [["payment_id", "amount", "method"], ["1", "5.5", "Cash"], ["2", "", ""],
+                    ["3", "12000.25", "Card, debit"]]
+
+
+# The first chunk's decimal (5.5) is narrower than a later one's (12000.25)
+@pytest.mark.parametrize("chunk_size", [1, 2, 10])
+def test_parquet_widens_decimals_seen_in_later_chunks(payments, tmp_path, chunk_size):
+    path = tmp_path / "payments.parquet"
+    progress = []
+    assert export_rows(payments, SQL, (), "parquet", str(path), chunk_size=chunk_size, progress=progress.append) == 3
+    assert progress[-1] == 3
+    table = pq.read_table(path)
+    assert table.column("amount").to_pylist() == [Decimal("5.50"), None, Decimal("12000.25")]
+    assert table.column("method").to_pylist() == ["Cash", None, "Card, debit"]
+
+
+def test_parquet_column_that_starts_null_is_text(payments, tmp_path):
+    path = tmp_path / "methods.parquet"
+    sql = "SELECT method FROM export_payment ORDER BY payment_id DESC"
+    payments.cursor().execute("UPDATE export_payment SET method = NULL WHERE payment_id = 3")
+    export_rows(payments, sql, (), "parquet", str(path), chunk_size=1)
+    assert pq.read_table(path).column("method").to_pylist() == [None, None, "Cash"]
+
+
+def test_parquet_type_clash_is_an_export_error(conn, tmp_path):
+    cursor = conn.cursor()
+    cursor.execute("CREATE TABLE export_mixed (id INT PRIMARY KEY, value)")
+    cursor.executemany("INSERT INTO export_mixed VALUES (%s, %s)", [(1, 7), (2, "seven")])
+    with pytest.raises(RuntimeError, match="Parquet export failed"):
+        export_rows(conn, "SELECT value FROM export_mixed ORDER BY id", (), "parquet",
+                    str(tmp_path / "mixed.parquet"), chunk_size=1)
+
+
+def test_empty_result_still_writes_the_columns(payments, tmp_path):
+    for fmt in ("csv", "parquet"):
+        path = tmp_path / f"empty.{fmt}"
+        assert export_rows(payments, SQL.replace("ORDER", "WHERE payment_id < 0 ORDER"), (), fmt, str(path)) == 0
+    assert pq.read_table(tmp_path / "empty.parquet").column_names == ["payment_id", "amount", "method"]
+    assert (tmp_path / "empty.csv").read_text().strip() == "payment_id,amount,method"
@@ -0,0 +1,102 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ums import db, summaries, transcripts
+from ums.cache import QueryCache
+from ums.grid import DELETE_COLUMN, diff_rows
+from ums.pool import ConnectionPool
+
+KEYS = ["student_id", "section_id"]
+FIELDS = ["grade", "enrollment_date"]
+
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=[DELETE_COLUMN] + KEYS + FIELDS)
+
+
+def test_unchanged_grid_values_are_not_updates():
+    original = frame([[False, np.int64(1), np.int64(1), np.nan, date(2024, 9, 1)]])
+    # What the editor hands back for the same row: None for NaN, a Timestamp for the date
+    edited = frame([[False, 1, 1, None, pd.Timestamp("2024-09-01")]])
+    assert diff_rows(original, edited, KEYS, FIELDS) == ([], [])
+
+
+def test_changed_and_deleted_rows():
+    original = frame([[False, np.int64(1), np.int64(1), "B", date(2024, 9, 1)],
+                      [False, np.int64(2), np.int64(6), "A", date(2024, 9, 2)]])
+    edited = frame([[False, np.int64(1), np.int64(1), "A-", pd.Timestamp("2024-09-03")],
+                    [True, np.int64(2), np.int64(6), "A", date(2024, 9, 2)]])
+    updates, deletes = diff_rows(original, edited, KEYS, FIELDS)
+    assert updates == [("A-", date(2024, 9, 3), 1, 1)]
+    assert deletes == [(2, 6)]
+    # Bound as plain Python values, not numpy scalars or Timestamps
+    assert [type(v) for v in updates[0]] == [str, date, int, int]
+    assert [type(v) for v in deletes[0]] == [int, int]
+
+
+# The grid has a fixed number of rows; new rows are added through the Add tab
+def test_added_rows_are_ignored():
+    original = frame([[False, 1, 1, "B", date(2024, 9, 1)]])
+    edited = frame([[False, 1, 1, "B", date(2024, 9, 1)], [False, 9, 9, "A", date(2024, 9, 1)]])
+    assert diff_rows(original, edited, KEYS, FIELDS) == ([], [])
+
+
+class Router:
+    def note_write(self):
+        pass
+
+
+@pytest.fixture
+def pool(backend, monkeypatch):
+    pool = ConnectionPool(backend.connect, size=2, validate=backend.validate)
+    cache = QueryCache()
+    router = Router()
+    monkeypatch.setattr(db, "get_pool", lambda: pool)
+    monkeypatch.setattr(db, "get_router", lambda: router)
+    monkeypatch.setattr(db, "get_query_cache", lambda: cache)
+    monkeypatch.setattr(db, "database_error", lambda: backend.Error)
+    yield pool
+    pool.close()
+
+
+DELETE = "DELETE FROM Enrollment WHERE student_id = %s AND section_id = %s"
+UPDATE = "UPDATE Enrollment SET enrollment_date = %s WHERE student_id = %s AND section_id = %s"
+HOOKS = summaries.chain_hooks(summaries.ENROLLMENT_HOOKS, transcripts.ENROLLMENT_HOOKS)
+
+
+def recent(cursor):
+    cursor.execute("SELECT student_id, section_id, enrollment_date FROM summary_recent_enrollment")
+    return {(student_id, section_id): enrolled for student_id, section_id, enrolled in cursor.fetchall()}
+
+
+# The grid's save: the statements and the refresh hook in one transaction
+def test_batch_runs_the_hooks_in_the_same_transaction(pool, cursor):
+    assert (1, 1) in recent(cursor)
+    changed = [(1, 1), (2, 1)]
+    success, _ = db.execute_batch([(UPDATE, [(date(2030, 1, 1), 2, 1)]), (DELETE, [(1, 1)])],
+                                  after=lambda c: HOOKS.refresh(c, changed))
+    assert success
+    # The refresh saw the batch's own, not yet committed, changes
+    assert (1, 1) not in recent(cursor)
+    assert recent(cursor)[(2, 1)] == date(2030, 1, 1)
+
+
+def test_failing_hook_rolls_back_the_batch(pool, cursor, backend):
+    before = recent(cursor)
+
+    def refresh(c, keys):
+        HOOKS.refresh(c, keys)
+        raise backend.Error("refresh failed")
+
+    success, message = db.execute_batch([(UPDATE, [(date(2030, 1, 1), 2, 1)]), (DELETE, [(1, 1)])],
+                                        after=lambda c: refresh(c, [(1, 1), (2, 1)]))
+    assert not success
+    assert message == "Database error: refresh failed"
+    assert recent(cursor) == before
+    cursor.execute("SELECT enrollment_date FROM Enrollment WHERE student_id = 2 AND section_id = 1")
+    assert cursor.fetchall() == [(before[(2, 1)],)]
+    cursor.execute("SELECT COUNT(*) FROM Enrollment WHERE student_id = 1 AND section_id = 1")
+    assert cursor.fetchone() == (1,)
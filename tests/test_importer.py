@@ -0,0 +1,93 @@
+import csv
+import sqlite3
+
+from ums import importer
+
+HEADER = "first_name,last_name,date_of_birth,gender,email,enrollment_date,department\n"
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def rejected_rows(result):
+    with open(result.rejected_path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def count(cursor, sql, params=()):
+    cursor.execute(sql, params)
+    return cursor.fetchone()[0]
+
+
+def test_students_are_imported_and_bad_rows_rejected(conn, backend, cursor, tmp_path):
+    source = write(tmp_path, "students.csv", HEADER
+                   + "Ada,Lovelace,2001-12-10,Female,ada@example.edu,2024-09-01,Mathematics\n"
+                   + "Ada,Again,2001-12-10,Female,ADA@example.edu,2024-09-01,Physics\n"
+                   + "Dup,Existing,2000-01-01,Male,john.smith@university.edu,2024-09-01,Physics\n"
+                   + "No,Dept,2000-01-01,Other,nodept@example.edu,2024-09-01,Astrology\n")
+    result = importer.run_import(conn, backend, "students", source, chunk_size=2,
+                                 rejected_path=str(tmp_path / "rejected.csv"))
+    assert (result.read, result.inserted, result.rejected, result.chunks) == (4, 1, 3, 2)
+
+    cursor.execute("SELECT d.dept_name FROM Student s JOIN Person p ON s.person_id = p.person_id "
+                   "JOIN Department d ON s.dept_id = d.dept_id WHERE p.email = %s", ("ada@example.edu",))
+    assert cursor.fetchall() == [("Mathematics",)]
+
+    rows = rejected_rows(result)
+    assert [r["row"] for r in rows] == ["2", "3", "4"]
+    assert rows[0]["email"] == "ADA@example.edu"
+    assert rows[0]["error"] == "email ADA@example.edu appears twice in the file"
+    assert rows[1]["error"] == "email john.smith@university.edu already exists"
+    assert rows[2]["error"] == "department 'Astrology' does not exist"
+
+
+def test_rejected_file_is_only_kept_when_rows_are_rejected(conn, backend, tmp_path):
+    source = write(tmp_path, "students.csv", HEADER
+                   + "Ada,Lovelace,2001-12-10,Female,ada@example.edu,2024-09-01,Mathematics\n")
+    path = tmp_path / "rejected.csv"
+    result = importer.run_import(conn, backend, "students", source, rejected_path=str(path))
+    assert result.rejected_path is None
+    assert not path.exists()
+
+
+def test_enrollments_resolve_students_by_email(conn, backend, cursor, tmp_path):
+    source = write(tmp_path, "enrollments.csv", "student_email,section_id,enrollment_date\n"
+                   + "sarah.brown@university.edu,9,2024-09-01\n"
+                   + "nobody@university.edu,9,2024-09-01\n"
+                   + "john.smith@university.edu,1,2024-09-01\n")
+    result = importer.run_import(conn, backend, "enrollments", source,
+                                 rejected_path=str(tmp_path / "rejected.csv"))
+    assert (result.inserted, result.rejected) == (1, 2)
+    assert count(cursor, "SELECT COUNT(*) FROM Enrollment WHERE student_id = 4 AND section_id = 9") == 1
+    assert [r["error"] for r in rejected_rows(result)] == [
+        "no student with email nobody@university.edu",
+        "student 1 is already enrolled in section 1"]
+
+
+# A chunk that fails while writing is rolled back whole, including the Person
+# rows written before the failure, and every row in it is rejected
+def test_failing_chunk_is_rolled_back(conn, backend, cursor, tmp_path, monkeypatch):
+    source = write(tmp_path, "students.csv", HEADER
+                   + "Ada,Lovelace,2001-12-10,Female,ada@example.edu,2024-09-01,Mathematics\n"
+                   + "Alan,Turing,2001-06-23,Male,alan@example.edu,2024-09-01,Mathematics\n"
+                   + "Grace,Hopper,2001-12-09,Female,grace@example.edu,2024-09-01,Physics\n")
+    calls = []
+
+    def fail_first_chunk(self, cursor, ids):
+        calls.append(ids)
+        if len(calls) == 1:
+            raise sqlite3.IntegrityError("summary update failed")
+
+    monkeypatch.setattr(importer.StudentImport, "update_summaries", fail_first_chunk)
+    people_before = count(cursor, "SELECT COUNT(*) FROM Person")
+    result = importer.run_import(conn, backend, "students", source, chunk_size=2,
+                                 rejected_path=str(tmp_path / "rejected.csv"))
+    assert (result.inserted, result.rejected) == (1, 2)
+    assert count(cursor, "SELECT COUNT(*) FROM Person") == people_before + 1
+    assert count(cursor, "SELECT COUNT(*) FROM Person WHERE email = %s", ("grace@example.edu",)) == 1
+    rows = rejected_rows(result)
+    assert [r["email"] for r in rows] == ["ada@example.edu", "alan@example.edu"]
+    assert all(r["error"] == "batch failed: summary update failed" for r in rows)
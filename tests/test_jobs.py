@@ -0,0 +1,130 @@
+from datetime import timedelta
+
+import pytest
+
+from ums import jobs
+
+
+@pytest.fixture
+def kinds(monkeypatch):
+    calls = []
+
+    def ok(conn, backend, params, progress):
+        calls.append(params)
+        progress(2, 2, "done")
+        return {"summary": "ok"}
+
+    def flaky(conn, backend, params, progress):
+        raise RuntimeError("boom")
+
+    def invalid(conn, backend, params, progress):
+        raise jobs.JobError("bad parameters")
+
+    monkeypatch.setitem(jobs.KINDS, "test.ok", jobs.JobKind(ok, tables=("Student_Record",)))
+    monkeypatch.setitem(jobs.KINDS, "test.flaky", jobs.JobKind(flaky, max_attempts=2))
+    monkeypatch.setitem(jobs.KINDS, "test.invalid", jobs.JobKind(invalid))
+    return calls
+
+
+def queue(conn, kind, params=None, key=None):
+    cursor = conn.cursor()
+    result = jobs.submit(cursor, kind, params, key)
+    conn.commit()
+    return result
+
+
+def job(conn, job_id):
+    return jobs.get_job(conn.cursor(), job_id)
+
+
+def test_submit_with_the_same_key_returns_the_queued_job(conn, kinds):
+    job_id, created = queue(conn, "test.ok", {"n": 1}, key="k")
+    assert created
+    assert queue(conn, "test.ok", {"n": 1}, key="k") == (job_id, False)
+    assert queue(conn, "test.ok", {"n": 1}, key="other")[0] != job_id
+
+
+def test_submit_without_a_key_always_queues(conn, kinds):
+    first, _ = queue(conn, "test.ok")
+    second, created = queue(conn, "test.ok")
+    assert created and second != first
+
+
+def test_submit_rejects_unknown_kinds_and_long_keys(conn, kinds):
+    with pytest.raises(jobs.JobError):
+        queue(conn, "test.missing")
+    with pytest.raises(jobs.JobError):
+        queue(conn, "test.ok", key="x" * (jobs.KEY_LENGTH + 1))
+
+
+def test_a_job_is_claimed_once(backend, conn, kinds):
+    job_id, _ = queue(conn, "test.ok")
+    other = backend.connect()
+    try:
+        claimed = jobs.claim(conn, "a")
+        assert claimed["job_id"] == job_id and claimed["attempts"] == 1
+        assert jobs.claim(other, "b") is None
+    finally:
+        other.close()
+
+
+def test_success_records_result_and_progress(backend, conn, kinds):
+    job_id, _ = queue(conn, "test.ok", {"n": 1})
+    assert jobs.run_job(backend, conn, jobs.claim(conn, "a"), "a") == "Succeeded"
+    done = job(conn, job_id)
+    assert kinds == [{"n": 1}]
+    assert done["result"] == {"summary": "ok"}
+    assert (done["progress_done"], done["progress_total"]) == (2, 2)
+
+
+def test_failure_is_retried_with_backoff_then_fails(backend, conn, kinds):
+    job_id, _ = queue(conn, "test.flaky")
+    assert jobs.run_job(backend, conn, jobs.claim(conn, "a"), "a") == "Queued"
+    retry = job(conn, job_id)
+    assert retry["run_after"] - jobs._now() >= timedelta(seconds=jobs.RETRY_DELAY - 1)
+    assert jobs.claim(conn, "a") is None  # not due yet
+
+    cursor = conn.cursor()
+    cursor.execute("UPDATE job SET run_after = %s WHERE job_id = %s", (jobs._now(), job_id))
+    conn.commit()
+    assert jobs.run_job(backend, conn, jobs.claim(conn, "a"), "a") == "Failed"
+    failed = job(conn, job_id)
+    assert failed["attempts"] == 2 and "boom" in failed["error"]
+
+
+def test_job_error_fails_at_once(backend, conn, kinds):
+    job_id, _ = queue(conn, "test.invalid")
+    assert jobs.run_job(backend, conn, jobs.claim(conn, "a"), "a") == "Failed"
+    assert job(conn, job_id)["attempts"] == 1
+
+
+def test_cancel_and_retry(conn, kinds):
+    job_id, _ = queue(conn, "test.ok")
+    assert jobs.cancel(conn.cursor(), job_id)
+    assert job(conn, job_id)["status"] == "Cancelled"
+    assert jobs.retry(conn.cursor(), job_id)
+    assert job(conn, job_id)["status"] == "Queued"
+    assert not jobs.retry(conn.cursor(), job_id)
+
+
+def test_stale_running_job_is_requeued(conn, kinds):
+    job_id, _ = queue(conn, "test.ok")
+    jobs.claim(conn, "a")
+    cursor = conn.cursor()
+    cursor.execute("UPDATE job SET heartbeat_at = %s WHERE job_id = %s",
+                   (jobs._now() - timedelta(seconds=jobs.STALE_SECONDS + 1), job_id))
+    conn.commit()
+    assert jobs.requeue_stale(conn) == 1
+    assert job(conn, job_id)["status"] == "Queued"
+
+
+def test_watcher_reports_each_succeeded_job_once(backend, conn, kinds):
+    watcher = jobs.JobWatcher(backend, None)
+    watcher.since = jobs._now() - timedelta(seconds=5)
+    queue(conn, "test.ok")
+    jobs.run_job(backend, conn, jobs.claim(conn, "a"), "a")
+    assert watcher.poll(conn.cursor()) == {"Student_Record"}
+    assert watcher.poll(conn.cursor()) == set()
+    queue(conn, "test.ok")
+    jobs.run_job(backend, conn, jobs.claim(conn, "a"), "a")
+    assert watcher.poll(conn.cursor()) == {"Student_Record"}
@@ -0,0 +1,23 @@
+import pytest
+
+from ums import library
+
+
+def add_book(cursor, title, author):
+    cursor.execute("INSERT INTO Library_Book (title, author, isbn, status, facility_id) "
+                   "VALUES (%s, %s, NULL, 'Available', 1)", (title, author))
+    book_id = cursor.lastrowid
+    library.book_added(cursor, book_id)
+    return book_id
+
+
+@pytest.mark.parametrize("text", ["jaz", "jazz", "fitz", "19", "1989"])
+def test_prefixes_ending_in_9_and_z(cursor, text):
+    book_id = add_book(cursor, "Jazz Standards of 1989", "Fitzgerald")
+    assert book_id in [row[0] for row in library.search(cursor, text)]
+
+
+def test_every_word_must_match(cursor):
+    book_id = add_book(cursor, "Jazz Standards", "Fitzgerald")
+    assert [row[0] for row in library.search(cursor, "jazz fitz")] == [book_id]
+    assert library.search(cursor, "jazz cormen") == []
@@ -0,0 +1,65 @@
+import pytest
+
+from ums.pagination import build_count_query, build_page_query, seek_clause
+
+BASE = "SELECT item_id, label, rank_value FROM paging_item"
+COLUMNS = ["item_id", "label", "rank_value"]
+
+
+@pytest.fixture
+def items(conn):
+    cursor = conn.cursor()
+    cursor.execute("CREATE TABLE paging_item (item_id INT PRIMARY KEY, label VARCHAR(20), rank_value INT)")
+    rows = [(1, "A_1", 3), (2, "AB1", None), (3, "50%", 3), (4, "500", 1), (5, "a!b", None),
+            (6, "x", 2), (7, "y", 3), (8, "z", None), (9, "w", 1)]
+    cursor.executemany("INSERT INTO paging_item VALUES (%s, %s, %s)", rows)
+    conn.commit()
+    return cursor
+
+
+def labels(cursor, operator, value):
+    cursor.execute(*build_count_query(BASE, COLUMNS, [("label", operator, value)]))
+    count = cursor.fetchone()[0]
+    cursor.execute(*build_page_query(BASE, "item_id", False, ["item_id"], COLUMNS,
+                                     [("label", operator, value)], page_size=100))
+    found = sorted(row[1] for row in cursor.fetchall())
+    assert count == len(found)
+    return found
+
+
+@pytest.mark.parametrize("operator, value, expected", [
+    ("contains", "A_1", ["A_1"]),
+    ("starts with", "A_", ["A_1"]),
+    ("contains", "%", ["50%"]),
+    ("starts with", "50", ["50%", "500"]),
+    ("contains", "!", ["a!b"]),
+])
+def test_like_filters_match_text_literally(items, operator, value, expected):
+    assert labels(items, operator, value) == expected
+
+
+# Paging with the seek clause visits every row once, in ORDER BY order,
+# including rows whose sort value is NULL
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("page_size", [1, 2, 4])
+def test_seek_pages_cover_every_row_in_order(items, descending, page_size):
+    direction = "DESC" if descending else "ASC"
+    items.execute(f"SELECT item_id, rank_value FROM paging_item ORDER BY rank_value {direction}, item_id {direction}")
+    expected = [row[0] for row in items.fetchall()]
+
+    seen, after = [], None
+    while True:
+        items.execute(*build_page_query(BASE, "rank_value", descending, ["item_id"], COLUMNS,
+                                        after=after, page_size=page_size))
+        rows = items.fetchall()
+        page = rows[:page_size]
+        seen.extend(row[0] for row in page)
+        if len(rows) <= page_size:
+            break
+        after = (page[-1][2], (page[-1][0],))
+    assert seen == expected
+
+
+def test_seek_on_the_key_alone_is_a_plain_comparison():
+    assert seek_clause("item_id", False, ["item_id"], (5, (5,))) == ("v.item_id > %s", [5])
+    assert seek_clause("item_id", True, ["item_id"], (5, (5,))) == ("v.item_id < %s", [5])
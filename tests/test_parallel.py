@@ -0,0 +1,68 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ums import parallel
+from ums.cache import QueryCache
+from ums.parallel import Query, fetch_parallel
+from ums.pool import ConnectionPool
+
+# Never finishes on its own; only an interrupt stops it
+ENDLESS = "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n) SELECT COUNT(*) AS total FROM n"
+
+
+class PrimaryOnly:
+    def __init__(self, backend):
+        self.pool = ConnectionPool(backend.connect, size=4, validate=backend.validate, cancel=backend.cancel)
+        self.reads = 0
+
+    def reader(self, session_last_write=None):
+        self.reads += 1
+        return self.pool.connection(), True
+
+
+@pytest.fixture
+def router(backend, monkeypatch):
+    router = PrimaryOnly(backend)
+    executor = ThreadPoolExecutor(max_workers=4)
+    cache = QueryCache()
+    monkeypatch.setattr(parallel, "get_router", lambda: router)
+    monkeypatch.setattr(parallel, "get_executor", lambda: executor)
+    monkeypatch.setattr(parallel, "get_query_cache", lambda: cache)
+    monkeypatch.setattr(parallel, "session_last_write", lambda: None)
+    monkeypatch.setattr(parallel, "database_error", lambda: backend.Error)
+    yield router
+    executor.shutdown(wait=True)
+    router.pool.close()
+
+
+def test_results_come_back_in_submission_order(router):
+    ids = [5, 1, 4, 2, 3]
+    results = fetch_parallel([Query("SELECT student_id FROM Student WHERE student_id = %s", (i,)) for i in ids])
+    assert [rows[0]["student_id"] for rows in results] == ids
+    assert router.reads == 5
+
+
+def test_cached_results_skip_the_pool(router):
+    sql = "SELECT dept_name FROM Department ORDER BY dept_name"
+    first = fetch_parallel([Query(sql, ttl=60)])
+    second = fetch_parallel([Query(sql, ttl=60), Query(sql, ttl=60)])
+    assert second == first * 2
+    assert router.reads == 1
+    fetch_parallel([Query(sql, ttl=0)])
+    assert router.reads == 2
+
+
+def test_slow_query_is_cancelled_without_holding_up_the_rest(router):
+    started = time.monotonic()
+    slow, fast = fetch_parallel([Query(ENDLESS, timeout=0.3), Query("SELECT COUNT(*) AS total FROM Department")],
+                                timeout=5)
+    assert time.monotonic() - started < 2
+    assert slow == []
+    assert fast == [{"total": 5}]
+    # The interrupted statement gives its connection back to the pool
+    deadline = time.monotonic() + 2
+    while router.pool.stats()["in_use"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert router.pool.stats()["in_use"] == 0
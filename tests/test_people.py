@@ -0,0 +1,58 @@
+import pytest
+
+from ums import people
+
+
+def add_person(cursor, first_name, last_name, phone):
+    cursor.execute("INSERT INTO Person (first_name, last_name, date_of_birth, gender, contact_number, email, "
+                   "person_type) VALUES (%s, %s, '2000-01-01', 'Other', %s, %s, 'Student')",
+                   (first_name, last_name, phone, f"{first_name}.{last_name}@example.edu".lower()))
+    person_id = cursor.lastrowid
+    people.person_added(cursor, person_id)
+    return person_id
+
+
+def found(cursor, text):
+    return [person_id for person_id, _ in people.rank(cursor, text)]
+
+
+# A prefix's range ends at its last character plus one, which for 9 and z
+# is ':' and '{'; the term columns must sort those after digits and letters
+@pytest.mark.parametrize("text", ["fitz", "liz", "0109", "109", "5550109"])
+def test_prefixes_ending_in_9_and_z(cursor, text):
+    fitz = add_person(cursor, "Fitzgerald", "Lizbeth", "555-01099")
+    assert fitz in found(cursor, text)
+
+
+def test_prefix_end():
+    assert people._prefix_end("fitz") == "fit{"
+    assert people._prefix_end("0109") == "010:"
+
+
+def test_exact_match_ranks_before_prefix_and_typo(cursor):
+    exact = add_person(cursor, "Quinn", "Adler", None)
+    prefix = add_person(cursor, "Quinnley", "Adler", None)
+    typo = add_person(cursor, "Quin", "Adler", None)
+    ranked = found(cursor, "quinn adler")
+    assert ranked.index(exact) < ranked.index(prefix) < ranked.index(typo)
+
+
+def test_removed_person_is_not_found(cursor):
+    person_id = add_person(cursor, "Zebulon", "Pike", None)
+    assert found(cursor, "zebulon") == [person_id]
+    people.person_removed(cursor, person_id)
+    cursor.execute("DELETE FROM Person WHERE person_id = %s", (person_id,))
+    assert found(cursor, "zebulon") == []
+    cursor.execute("SELECT COUNT(*) FROM person_search_gram WHERE term = 'zebulon'")
+    assert cursor.fetchone()[0] == 0
+
+
+@pytest.mark.parametrize("a, b, distance", [
+    ("smith", "smith", 0),
+    ("smith", "smyth", 1),
+    ("jonh", "john", 1),       # a transposition is one edit
+    ("wiliams", "williams", 1),
+    ("abcdef", "uvwxyz", 3),   # capped at limit + 1
+])
+def test_edit_distance(a, b, distance):
+    assert people.edit_distance(a, b, 2) == distance
@@ -0,0 +1,84 @@
+import gc
+
+import pytest
+
+from ums.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.healthy = True
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def made():
+    return []
+
+
+@pytest.fixture
+def pool(made):
+    def connect():
+        made.append(FakeConnection())
+        return made[-1]
+    return ConnectionPool(connect, size=2, validate=lambda raw: raw.healthy, checkout_timeout=0.05)
+
+
+def test_connections_are_reused(pool, made):
+    pool.connection().close()
+    pool.connection().close()
+    assert len(made) == 1
+    assert pool.stats()["checkouts"] == 2
+
+
+def test_checkout_times_out_when_every_connection_is_in_use(pool):
+    first, second = pool.connection(), pool.connection()
+    with pytest.raises(PoolTimeout):
+        pool.connection()
+    first.close()
+    pool.connection().close()
+    second.close()
+
+
+def test_broken_connections_are_replaced(pool, made):
+    conn = pool.connection()
+    conn.raw.healthy = False
+    conn.close()
+    pool.connection().close()
+    assert len(made) == 2 and made[0].closed
+    assert pool.stats()["discarded"]["broken"] == 1
+
+
+def test_a_returned_proxy_is_unusable(pool):
+    conn = pool.connection()
+    conn.close()
+    with pytest.raises(AttributeError):
+        conn.commit()
+
+
+def test_a_leaked_connection_frees_its_slot(pool, made):
+    pool.connection()
+    gc.collect()
+    assert pool.stats()["discarded"]["leaked"] == 1
+    pool.connection().close()
+    pool.connection().close()
+
+
+def test_idle_connections_are_closed(made):
+    pool = ConnectionPool(lambda: made.append(FakeConnection()) or made[-1], size=2, idle_timeout=0, max_lifetime=None)
+    pool.connection().close()
+    pool.evict_idle()
+    assert made[0].closed and pool.stats()["open"] == 0
+    assert pool.stats()["discarded"]["idle"] == 1
+
+
+def test_expired_connections_are_closed(made):
+    pool = ConnectionPool(lambda: made.append(FakeConnection()) or made[-1], size=2, idle_timeout=None, max_lifetime=0)
+    pool.connection().close()
+    assert made[0].closed and pool.stats()["open"] == 0
+    assert pool.stats()["discarded"]["lifetime"] == 1
+    pool.connection().close()
+    assert len(made) == 2
@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+from ums.prerequisites import PrerequisiteCycle, PrerequisiteGraph, PrerequisiteService, enrollment_problems
+
+# 4 needs 3 and 2, 3 needs 1, 2 needs 1; 5 stands alone
+EDGES = [(4, 3), (4, 2), (3, 1), (2, 1)]
+
+
+def test_required_is_the_transitive_closure():
+    graph = PrerequisiteGraph(EDGES)
+    assert sorted(graph.required(4)) == [1, 2, 3]
+    assert graph.required(1) == []
+    assert graph.required(99) == []
+
+
+def test_missing_and_eligible():
+    graph = PrerequisiteGraph(EDGES)
+    assert sorted(graph.missing(4, graph.mask([1, 3]))) == [2]
+    assert not graph.eligible(4, graph.mask([1, 3]))
+    assert graph.eligible(4, graph.mask([1, 2, 3, 99]))
+
+
+def test_would_cycle():
+    graph = PrerequisiteGraph(EDGES)
+    assert graph.would_cycle(1, 4)
+    assert graph.would_cycle(2, 2)
+    assert not graph.would_cycle(4, 1)
+    assert not graph.would_cycle(1, 99)
+
+
+def test_a_cycle_is_reported_with_its_path():
+    with pytest.raises(PrerequisiteCycle) as raised:
+        PrerequisiteGraph(EDGES + [(1, 4)])
+    cycle = raised.value.cycle
+    assert cycle[0] == cycle[-1]
+    assert set(cycle) <= {1, 2, 3, 4}
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_closure_matches_a_search(seed):
+    g = random.Random(seed)
+    edges = {(course, g.randrange(course)) for course in range(1, 80) for _ in range(g.randrange(3))}
+    graph = PrerequisiteGraph(edges)
+    direct = {}
+    for course, prereq in edges:
+        direct.setdefault(course, set()).add(prereq)
+    for course in range(80):
+        seen, stack = set(), list(direct.get(course, ()))
+        while stack:
+            prereq = stack.pop()
+            if prereq not in seen:
+                seen.add(prereq)
+                stack.extend(direct.get(prereq, ()))
+        assert set(graph.required(course)) == seen
+
+
+def test_service_reloads_after_a_write_in_another_process(backend):
+    service = PrerequisiteService(backend.connect, recheck_seconds=0)
+    before = service.graph()
+    assert service.graph() is before
+    conn = backend.connect()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT course_id FROM Course ORDER BY course_id LIMIT 2")
+        (first,), (second,) = cursor.fetchall()
+        cursor.execute("DELETE FROM Prerequisite")
+        cursor.execute("INSERT INTO Prerequisite (course_id, prereq_course_id) VALUES (%s, %s)", (second, first))
+        conn.commit()
+    finally:
+        conn.close()
+    assert service.graph().required(second) == [first]
+    assert service.loads == 2
+
+
+def test_enrollment_problems_lists_missing_courses(cursor):
+    cursor.execute("SELECT e.student_id, s.section_id, s.course_id FROM Enrollment e "
+                   "JOIN Section s ON e.section_id = s.section_id ORDER BY e.student_id LIMIT 1")
+    student_id, section_id, course_id = cursor.fetchone()
+    cursor.execute("SELECT course_id FROM Course WHERE course_id <> %s ORDER BY course_id LIMIT 1", (course_id,))
+    other = cursor.fetchone()[0]
+    cursor.execute("DELETE FROM Enrollment WHERE student_id = %s", (student_id,))
+    graph = PrerequisiteGraph([(course_id, other)])
+    assert enrollment_problems(cursor, graph, [(student_id, section_id)]) == {(student_id, section_id): [other]}
@@ -0,0 +1,26 @@
+import pytest
+
+from ums.backends import SQLiteBackend
+from ums.queries import registered_queries
+
+
+def run_all(conn, queries):
+    cursor = conn.cursor()
+    for name, sql, params in queries:
+        cursor.execute(sql, params)
+        cursor.fetchall()
+
+
+def test_every_registered_query_runs_after_migration(conn):
+    run_all(conn, registered_queries())
+
+
+# ums.index_bench times these on the schema of data/query.sql alone
+def test_unmigrated_queries_run_on_the_bare_schema(tmp_path):
+    conn = SQLiteBackend(str(tmp_path / "bare.db")).connect()
+    try:
+        run_all(conn, registered_queries(migrated=False))
+        with pytest.raises(Exception):
+            run_all(conn, registered_queries())
+    finally:
+        conn.close()
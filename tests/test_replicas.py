@@ -0,0 +1,106 @@
+import sqlite3
+import time
+
+import pytest
+
+from ums.pool import ConnectionPool
+from ums.replicas import ReadRouter, Replica, sync_sqlite_replica
+
+
+def new_pool(backend):
+    return ConnectionPool(backend.connect, size=2, validate=backend.validate)
+
+
+# Pretend the replica was last synced `seconds` ago
+def backdate(path, seconds):
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("UPDATE ums_replica_state SET synced_at = ?", (time.time() - seconds,))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def write_to_primary(conn):
+    cursor = conn.cursor()
+    cursor.execute("UPDATE Department SET dept_name = dept_name")
+    conn.commit()
+    cursor.close()
+
+
+# Only the stand-in copies have ums_replica_state
+def on_replica(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT COUNT(*) FROM ums_replica_state")
+        return True
+    except sqlite3.Error:
+        return False
+    finally:
+        cursor.close()
+
+
+@pytest.fixture
+def replicas(backend, tmp_path):
+    made = []
+    for name in ("a", "b"):
+        path = str(tmp_path / f"replica_{name}.db")
+        sync_sqlite_replica(backend.path, path)
+        replica_backend = backend.replica(path)
+        made.append(Replica(path, replica_backend, new_pool(replica_backend)))
+    yield made
+    for replica in made:
+        replica.pool.close()
+
+
+@pytest.fixture
+def router(backend, replicas):
+    router = ReadRouter(new_pool(backend), replicas, max_lag=30, sticky_seconds=5, lag_check_interval=0)
+    yield router
+    router.primary_pool.close()
+
+
+def test_synced_replica_serves_reads(router):
+    conn, fresh = router.reader()
+    with conn:
+        assert on_replica(conn)
+    assert fresh
+    assert sum(r["reads"] for r in router.stats()["replicas"]) == 1
+
+
+def test_session_that_just_wrote_reads_the_primary(router):
+    conn, fresh = router.reader(session_last_write=time.time())
+    with conn:
+        assert not on_replica(conn)
+    assert fresh
+    assert router.stats()["primary_reads"]["sticky"] == 1
+
+
+def test_replica_over_the_lag_limit_is_skipped(router, replicas, conn):
+    write_to_primary(conn)
+    lagging, current = replicas
+    backdate(lagging.name, 60)
+    for _ in range(4):
+        replica_conn, _ = router.reader()
+        replica_conn.close()
+    assert (lagging.reads, current.reads) == (0, 4)
+
+    backdate(current.name, 60)
+    primary_conn, fresh = router.reader()
+    with primary_conn:
+        assert not on_replica(primary_conn)
+    assert fresh
+    assert router.stats()["primary_reads"]["lagging"] == 1
+
+
+# Another session's write: the replica may still serve the read, but its
+# result is not known to include that write
+def test_replica_read_after_a_write_is_not_fresh(router, replicas, conn):
+    for replica in replicas:
+        backdate(replica.name, 5)
+    write_to_primary(conn)
+    router.note_write()
+    replica_conn, fresh = router.reader()
+    with replica_conn:
+        assert on_replica(replica_conn)
+    assert not fresh
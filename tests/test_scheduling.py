@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from ums.scheduling import IntervalIndex, Timetable, assign_rooms
+
+
+def random_intervals(seed, count=200):
+    g = random.Random(seed)
+    entries = []
+    for item in range(count):
+        start = g.randrange(8 * 60, 20 * 60, 5)
+        entries.append((g.choice("AB"), start, start + g.choice([30, 50, 75, 180]), item))
+    return entries
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_overlapping_matches_a_scan(seed):
+    entries = random_intervals(seed)
+    index = IntervalIndex(entries)
+    g = random.Random(seed + 100)
+    for _ in range(100):
+        key, start = g.choice("AB"), g.randrange(7 * 60, 21 * 60)
+        end = start + g.randrange(1, 120)
+        expected = {item for k, s, e, item in entries if k == key and s < end and e > start}
+        assert set(index.overlapping(key, start, end)) == expected
+
+
+def test_added_intervals_are_found():
+    index = IntervalIndex([("A", 600, 650, 1)])
+    index.add("A", 400, 700, 2)  # longer than anything before it
+    assert set(index.overlapping("A", 680, 690)) == {2}
+    assert set(index.overlapping("A", 640, 660)) == {1, 2}
+    assert index.overlapping("B", 0, 1000) == []
+
+
+def test_touching_intervals_do_not_overlap():
+    index = IntervalIndex([("A", 600, 650, 1), ("A", 650, 700, 2)])
+    assert index.overlapping("A", 650, 660) == [2]
+    assert list(index.conflicts()) == []
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_conflicts_are_every_overlapping_pair(seed):
+    entries = random_intervals(seed, 80)
+    found = {(key, frozenset((a, b))) for key, a, b, _, _ in IntervalIndex(entries).conflicts()}
+    expected = {(k1, frozenset((i1, i2))) for k1, s1, e1, i1 in entries for k2, s2, e2, i2 in entries
+                if k1 == k2 and i1 < i2 and s1 < e2 and s2 < e1}
+    assert found == expected
+
+
+def test_timetable_reports_room_faculty_and_student_clashes():
+    sections = {1: ("R1", 10), 2: ("R1", 11), 3: ("R2", 10)}
+    meetings = [(1, "Mon", 540, 600), (2, "Mon", 570, 630), (3, "Mon", 590, 650), (3, "Tue", 540, 600)]
+    timetable = Timetable(sections, meetings, enrollments=[(7, 2), (7, 3)])
+    kinds = sorted((c.kind, c.resource, c.start, c.end) for c in timetable.conflicts())
+    assert kinds == [("faculty", 10, 590, 600), ("room", "R1", 570, 600), ("student", 7, 590, 630)]
+
+
+def test_assign_rooms_uses_the_smallest_free_room():
+    sections = {1: (None, 10), 2: (None, 11), 3: (None, 12)}
+    meetings = [(1, "Mon", 540, 600), (2, "Mon", 540, 600), (3, "Mon", 540, 600)]
+    rooms = [("big", 100), ("small", 20), ("medium", 40)]
+    assignments, unplaced = assign_rooms(Timetable(sections, meetings), rooms, {1: 15, 2: 15, 3: 150})
+    assert assignments == {1: "small", 2: "medium"}
+    assert set(unplaced) == {3}
+
+
+def test_assign_rooms_keeps_a_room_that_still_works():
+    sections = {1: ("big", 10)}
+    assignments, _ = assign_rooms(Timetable(sections, [(1, "Mon", 540, 600)]), [("big", 100), ("small", 20)], {1: 10})
+    assert assignments == {1: "big"}
@@ -0,0 +1,75 @@
+from datetime import date
+
+from ums import summaries
+
+
+def ids(cursor, sql):
+    cursor.execute(sql)
+    return [row[0] for row in cursor.fetchall()]
+
+
+def test_summaries_match_after_migration(conn):
+    assert summaries.check(conn) == []
+
+
+def test_student_status_change_through_the_hooks(conn):
+    cursor = conn.cursor()
+    student_id = ids(cursor, "SELECT student_id FROM Student WHERE status = 'Active' ORDER BY student_id LIMIT 1")[0]
+    summaries.student_removed(cursor, student_id)
+    cursor.execute("UPDATE Student SET status = 'Suspended' WHERE student_id = %s", (student_id,))
+    summaries.student_added(cursor, student_id)
+    conn.commit()
+    assert summaries.check(conn) == []
+
+
+def test_faculty_moving_department_through_the_hooks(conn):
+    cursor = conn.cursor()
+    faculty_id, dept_id = ids(cursor, "SELECT faculty_id FROM Faculty ORDER BY faculty_id LIMIT 1")[0], None
+    summaries.faculty_removed(cursor, faculty_id)
+    cursor.execute("UPDATE Faculty SET dept_id = %s WHERE faculty_id = %s", (dept_id, faculty_id))
+    summaries.faculty_added(cursor, faculty_id)
+    conn.commit()
+    assert summaries.check(conn) == []
+
+
+def test_recent_enrollments_follow_inserts_and_deletes(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT st.student_id, s.section_id FROM Student st CROSS JOIN Section s "
+                   "WHERE NOT EXISTS (SELECT 1 FROM Enrollment e WHERE e.student_id = st.student_id "
+                   "AND e.section_id = s.section_id) ORDER BY st.student_id, s.section_id LIMIT 3")
+    pairs = cursor.fetchall()
+    for student_id, section_id in pairs:
+        cursor.execute("INSERT INTO Enrollment (student_id, section_id, enrollment_date) VALUES (%s, %s, %s)",
+                       (student_id, section_id, date(2099, 1, 1)))
+        summaries.enrollment_added(cursor, student_id, section_id)
+    conn.commit()
+    assert summaries.check(conn) == []
+
+    for student_id, section_id in pairs:
+        summaries.enrollment_removed(cursor, student_id, section_id)
+        cursor.execute("DELETE FROM Enrollment WHERE student_id = %s AND section_id = %s", (student_id, section_id))
+    conn.commit()
+    assert summaries.check(conn) == []
+
+
+def test_deleting_most_recent_rows_refills_the_list(conn):
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT student_id, section_id FROM summary_recent_enrollment "
+                   f"ORDER BY {summaries._RECENT_ORDER} LIMIT %s", (summaries.RECENT_LIMIT,))
+    for student_id, section_id in cursor.fetchall():
+        summaries.enrollment_removed(cursor, student_id, section_id)
+        cursor.execute("DELETE FROM Transcript_Grade WHERE grade_id IN (SELECT grade_id FROM Enrollment "
+                       "WHERE student_id = %s AND section_id = %s)", (student_id, section_id))
+        cursor.execute("DELETE FROM Enrollment WHERE student_id = %s AND section_id = %s", (student_id, section_id))
+    conn.commit()
+    assert summaries.check(conn) == []
+
+
+def test_rebuild_repairs_drifted_summaries(conn):
+    cursor = conn.cursor()
+    cursor.execute("UPDATE summary_student_status SET total = total + 3")
+    cursor.execute("DELETE FROM summary_recent_enrollment")
+    conn.commit()
+    assert len(summaries.check(conn)) == 2
+    summaries.rebuild(conn)
+    assert summaries.check(conn) == []
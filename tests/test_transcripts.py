@@ -0,0 +1,73 @@
+import math
+
+import pytest
+
+from ums import transcripts
+from ums.transcripts import gpa_of, standing_of, term_table
+
+
+def test_gpa_rounds_half_up():
+    # 17.40 / 8 = 2.175, which float division puts just below the tie
+    assert gpa_of([17.40], [8])[0] == 2.18
+    assert gpa_of([12.0], [3])[0] == 4.0
+    assert math.isnan(gpa_of([0.0], [0])[0])
+
+
+@pytest.mark.parametrize("credits, standing", [(0, "Freshman"), (29, "Freshman"), (30, "Sophomore"),
+                                               (60, "Junior"), (89, "Junior"), (90, "Senior")])
+def test_standing(credits, standing):
+    assert standing_of([credits])[0] == standing
+
+
+def test_term_table_accumulates_in_term_order():
+    lines = [
+        {"year": 2025, "semester": "Fall", "points": 2.0, "credits": 3},
+        {"year": 2025, "semester": "Spring", "points": 4.0, "credits": 3},
+        {"year": 2025, "semester": "Spring", "points": 3.0, "credits": 1},
+        {"year": 2025, "semester": "Fall", "points": None, "credits": 4},  # not graded yet
+    ]
+    table = term_table(lines)
+    assert list(table["semester"]) == ["Spring", "Fall"]
+    assert list(table["term_gpa"]) == [3.75, 2.0]
+    assert list(table["cumulative_credits"]) == [4, 7]
+    assert list(table["cumulative_gpa"]) == [3.75, 3.0]
+
+
+def first_enrollment(cursor):
+    cursor.execute("SELECT e.student_id, e.section_id, s.course_id FROM Enrollment e "
+                   "JOIN Section s ON e.section_id = s.section_id ORDER BY e.student_id, e.section_id LIMIT 1")
+    return cursor.fetchone()
+
+
+def test_records_match_after_migration(conn):
+    assert transcripts.check(conn) == []
+
+
+def test_grading_updates_the_record_incrementally(conn):
+    cursor = conn.cursor()
+    student_id, section_id, _ = first_enrollment(cursor)
+    for letter in ("C", "A", "B+"):
+        transcripts.record_grade(cursor, student_id, section_id, letter)
+        conn.commit()
+        assert transcripts.check(conn) == []
+
+
+def test_changing_course_credits_updates_graded_students(conn):
+    cursor = conn.cursor()
+    student_id, section_id, course_id = first_enrollment(cursor)
+    transcripts.record_grade(cursor, student_id, section_id, "A")
+    transcripts.course_removed(cursor, course_id)
+    cursor.execute("UPDATE Course SET credits = credits + 2 WHERE course_id = %s", (course_id,))
+    transcripts.course_added(cursor, course_id)
+    conn.commit()
+    assert transcripts.check(conn) == []
+
+
+def test_recompute_all_repairs_drifted_records(backend, conn):
+    cursor = conn.cursor()
+    cursor.execute("UPDATE Student_Record SET quality_points = quality_points + 5, total_credits = total_credits + 1")
+    conn.commit()
+    assert transcripts.check(conn) != []
+    count, written = transcripts.recompute_all(conn, backend)
+    assert written > 0
+    assert transcripts.check(conn) == []
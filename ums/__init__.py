@@ -0,0 +1 @@
+# Shared data-access and service modules for the University Management System app
@@ -0,0 +1,473 @@
+import os
+import re
+import sqlite3
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from functools import lru_cache
+
+# All SQL in the app is written in the MySQL dialect (%s placeholders, CONCAT ...).
+# Each backend translates it to what its driver understands.
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "query.sql")
+
+
+class MySQLBackend:
+    name = "mysql"
+
+    def __init__(self, host="localhost", user="root", password="", database=None,
+                 port=3306, connect_timeout=5, read_only=False):
+        import mysql.connector
+        self._driver = mysql.connector
+        self.Error = mysql.connector.Error
+        self.params = dict(host=host, user=user, password=password, database=database,
+                           port=port, connect_timeout=connect_timeout)
+        self.read_only = read_only
+
+    def connect(self, **options):
+        raw = self._driver.connect(autocommit=False, **self.params, **options)
+        if self.read_only:
+            cursor = raw.cursor()
+            cursor.execute("SET SESSION TRANSACTION READ ONLY")
+            cursor.close()
+        return raw
+
+    # A read replica given as "host" or "host:port", with the same credentials
+    def replica(self, spec):
+        host, _, port = spec.partition(":")
+        params = dict(self.params, host=host, port=int(port) if port else self.params["port"])
+        return MySQLBackend(read_only=True, **params)
+
+    # Seconds the replica is behind its source; 0 for a standalone server and
+    # None when replication is stopped
+    def replica_lag(self, raw):
+        cursor = raw.cursor(dictionary=True)
+        try:
+            try:
+                cursor.execute("SHOW REPLICA STATUS")
+            except self.Error:
+                cursor.execute("SHOW SLAVE STATUS")  # servers before 8.0.22
+            row = cursor.fetchone()
+        finally:
+            cursor.close()
+        if not row:
+            return 0.0
+        lag = row.get("Seconds_Behind_Source", row.get("Seconds_Behind_Master"))
+        return None if lag is None else float(lag)
+
+    def validate(self, raw):
+        return raw.is_connected()
+
+    def reset(self, raw):
+        raw.rollback()
+
+    # Stop the statement running on `raw`; called from another thread
+    def cancel(self, raw):
+        killer = self.connect()
+        try:
+            cursor = killer.cursor()
+            cursor.execute(f"KILL QUERY {int(raw.connection_id)}")
+            cursor.close()
+        finally:
+            killer.close()
+
+    def translate(self, sql):
+        return sql
+
+    def translate_ddl(self, sql):
+        return sql
+
+    # Normalized EXPLAIN rows: table, access, index, rows, detail, full_scan, sort
+    def explain(self, conn, sql, params=()):
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute("EXPLAIN " + sql, params)
+            return [{
+                "table": r.get("table"),
+                "access": r.get("type"),
+                "index": r.get("key"),
+                "rows": r.get("rows"),
+                "detail": r.get("Extra") or "",
+                "full_scan": r.get("type") == "ALL",
+                "sort": "filesort" in (r.get("Extra") or "") or "temporary" in (r.get("Extra") or ""),
+            } for r in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+
+class SQLiteBackend:
+    name = "sqlite"
+    Error = sqlite3.Error
+
+    # Applied to every new connection. journal_mode=WAL is persistent but cheap to repeat.
+    PRAGMAS = (
+        "PRAGMA journal_mode = WAL",
+        "PRAGMA synchronous = NORMAL",
+        "PRAGMA foreign_keys = ON",
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA cache_size = -20000",
+        "PRAGMA mmap_size = 268435456",
+        "PRAGMA busy_timeout = 5000",
+    )
+
+    # Replica copies are opened read-only and never change journal settings
+    REPLICA_PRAGMAS = (
+        "PRAGMA query_only = ON",
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA cache_size = -20000",
+        "PRAGMA mmap_size = 268435456",
+        "PRAGMA busy_timeout = 5000",
+    )
+
+    # `primary_path` is set for stand-in replicas: file copies of the primary
+    # made by `python -m ums.replicas sync`
+    def __init__(self, path, schema_path=SCHEMA_PATH, statement_cache_size=256, primary_path=None):
+        self.path = path
+        self.schema_path = schema_path
+        self.statement_cache_size = statement_cache_size
+        self.primary_path = primary_path
+        _register_sqlite_types()
+        if primary_path is None:
+            self._ensure_schema()
+
+    def connect(self):
+        raw = sqlite3.connect(
+            f"file:{os.path.abspath(self.path)}?mode=ro" if self.primary_path else self.path,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            cached_statements=self.statement_cache_size,
+            check_same_thread=False,  # pooled connections move between script threads
+            timeout=5,
+            uri=self.primary_path is not None,
+        )
+        for pragma in self.REPLICA_PRAGMAS if self.primary_path else self.PRAGMAS:
+            raw.execute(pragma)
+        return SQLiteConnection(raw)
+
+    def replica(self, spec):
+        return SQLiteBackend(spec, schema_path=None, statement_cache_size=self.statement_cache_size,
+                             primary_path=self.path)
+
+    # The copy holds every write up to its sync time, so it is current until the
+    # primary (main file or WAL) changes, and behind by the time since the sync after that
+    def replica_lag(self, raw):
+        cursor = raw.cursor()
+        try:
+            cursor.execute("SELECT synced_at FROM ums_replica_state")
+            row = cursor.fetchone()
+        except sqlite3.Error:
+            return None
+        finally:
+            cursor.close()
+        if not row:
+            return None
+        files = [self.primary_path, self.primary_path + "-wal"]
+        modified = max(os.path.getmtime(f) for f in files if os.path.exists(f))
+        synced_at = float(row[0])
+        return 0.0 if modified <= synced_at else max(0.0, datetime.now().timestamp() - synced_at)
+
+    def validate(self, raw):
+        return raw.is_connected()
+
+    def reset(self, raw):
+        raw.rollback()
+
+    # The running statement fails with "interrupted"; the connection stays usable
+    def cancel(self, raw):
+        raw.interrupt()
+
+    def translate(self, sql):
+        return translate_to_sqlite(sql)
+
+    def translate_ddl(self, sql):
+        return translate_ddl_to_sqlite(sql)
+
+    def explain(self, conn, sql, params=()):
+        cursor = conn.cursor()
+        try:
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            plan = []
+            for _, _, _, detail in cursor.fetchall():
+                words = detail.split()
+                is_scan = words[0] == "SCAN"
+                plan.append({
+                    "table": words[1] if is_scan or words[0] == "SEARCH" else None,
+                    "access": words[0],
+                    "index": detail.split(" INDEX ")[1].split()[0] if " INDEX " in detail else None,
+                    "rows": None,
+                    "detail": detail,
+                    # "SCAN x USING (COVERING) INDEX" walks an index, not the table
+                    "full_scan": is_scan and "USING" not in detail and "SUBQUERY" not in detail,
+                    "sort": "TEMP B-TREE" in detail,
+                })
+            return plan
+        finally:
+            cursor.close()
+
+    def _ensure_schema(self):
+        if self.path != ":memory:":
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+        raw = sqlite3.connect(self.path)
+        try:
+            exists = raw.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Person'").fetchone()
+            if not exists and self.schema_path and os.path.exists(self.schema_path):
+                with open(self.schema_path, encoding="utf-8") as f:
+                    raw.executescript(mysql_script_to_sqlite(f.read()))
+                raw.commit()
+        finally:
+            raw.close()
+
+
+# Mirrors the parts of the mysql.connector connection API the app uses
+class SQLiteConnection:
+    def __init__(self, raw):
+        self._raw = raw
+        self._open = True
+
+    def cursor(self, dictionary=False):
+        cursor = self._raw.cursor()
+        if dictionary:
+            cursor.row_factory = _dict_row
+        return SQLiteCursor(cursor)
+
+    def commit(self):
+        self._raw.commit()
+
+    def rollback(self):
+        self._raw.rollback()
+
+    def interrupt(self):
+        self._raw.interrupt()
+
+    def is_connected(self):
+        if not self._open:
+            return False
+        try:
+            self._raw.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def close(self):
+        self._open = False
+        self._raw.close()
+
+
+class SQLiteCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, query, params=None):
+        self._cursor.execute(translate_to_sqlite(query), params or ())
+        return self
+
+    def executemany(self, query, seq_of_params):
+        self._cursor.executemany(translate_to_sqlite(query), seq_of_params)
+        return self
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size=None):
+        return self._cursor.fetchmany(size or self._cursor.arraysize)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._cursor.close()
+
+
+def _dict_row(cursor, row):
+    return {col[0]: value for col, value in zip(cursor.description, row)}
+
+
+# Build a backend from UMS_* environment variables (UMS_BACKEND=mysql|sqlite)
+def create_backend(name=None):
+    name = (name or os.environ.get("UMS_BACKEND", "mysql")).lower()
+    if name == "mysql":
+        return MySQLBackend(
+            host=os.environ.get("UMS_MYSQL_HOST", "localhost"),
+            port=int(os.environ.get("UMS_MYSQL_PORT", "3306")),
+            user=os.environ.get("UMS_MYSQL_USER", "root"),
+            password=os.environ.get("UMS_MYSQL_PASSWORD", "Aditya@2003"),
+            database=os.environ.get("UMS_MYSQL_DATABASE", "student_management_system_new"),
+        )
+    if name == "sqlite":
+        # data/university.db holds an older, unrelated schema (users/students/faculty),
+        # so the app schema from data/query.sql lives in its own file by default
+        default_path = os.path.join(os.path.dirname(SCHEMA_PATH), "ums.db")
+        return SQLiteBackend(os.environ.get("UMS_SQLITE_PATH", default_path))
+    raise ValueError(f"Unknown database backend: {name}")
+
+
+# ---------------------------------------------------------------------------
+# MySQL -> SQLite dialect translation
+
+_SIMPLE_FUNCTIONS = {
+    "CURDATE()": "DATE('now')",
+    "CURRENT_DATE()": "DATE('now')",
+    "NOW()": "DATETIME('now')",
+}
+
+
+@lru_cache(maxsize=1024)
+def translate_to_sqlite(sql):
+    out = []
+    i = 0
+    n = len(sql)
+    while i < n:
+        ch = sql[i]
+        if ch in ("'", '"'):
+            end = _skip_string(sql, i)
+            out.append(sql[i:end])
+            i = end
+        elif ch == "%" and sql.startswith("%s", i):
+            out.append("?")
+            i += 2
+        elif ch == "%" and sql.startswith("%%", i):
+            out.append("%")
+            i += 2
+        elif ch in "Cc" and sql[i:i + 7].upper() == "CONCAT(" and not _is_identifier_char(sql, i - 1):
+            close = _matching_paren(sql, i + 6)
+            args = _split_args(sql[i + 7:close])
+            out.append("(" + " || ".join(translate_to_sqlite(a.strip()) for a in args) + ")")
+            i = close + 1
+        else:
+            for mysql_fn, sqlite_fn in _SIMPLE_FUNCTIONS.items():
+                if sql[i:i + len(mysql_fn)].upper() == mysql_fn and not _is_identifier_char(sql, i - 1):
+                    out.append(sqlite_fn)
+                    i += len(mysql_fn)
+                    break
+            else:
+                out.append(ch)
+                i += 1
+    translated = "".join(out)
+    return re.sub(r"\bINSERT\s+IGNORE\b", "INSERT OR IGNORE", translated, flags=re.IGNORECASE)
+
+
+def _is_identifier_char(sql, i):
+    return i >= 0 and (sql[i].isalnum() or sql[i] == "_")
+
+
+def _skip_string(sql, start):
+    quote = sql[start]
+    i = start + 1
+    while i < len(sql):
+        if sql[i] == "\\":
+            i += 2
+            continue
+        if sql[i] == quote:
+            if i + 1 < len(sql) and sql[i + 1] == quote:
+                i += 2
+                continue
+            return i + 1
+        i += 1
+    return len(sql)
+
+
+def _matching_paren(sql, open_index):
+    depth = 0
+    i = open_index
+    while i < len(sql):
+        ch = sql[i]
+        if ch in ("'", '"'):
+            i = _skip_string(sql, i)
+            continue
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    raise ValueError("Unbalanced parentheses in SQL")
+
+
+def _split_args(text):
+    args, depth, start, i = [], 0, 0, 0
+    while i < len(text):
+        ch = text[i]
+        if ch in ("'", '"'):
+            i = _skip_string(text, i)
+            continue
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            args.append(text[start:i])
+            start = i + 1
+        i += 1
+    args.append(text[start:])
+    return args
+
+
+# Turn the MySQL DDL/seed script in data/query.sql into something SQLite accepts
+def mysql_script_to_sqlite(script):
+    lines = []
+    for line in script.splitlines():
+        stripped = line.strip().upper()
+        if stripped.startswith(("DROP DATABASE", "CREATE DATABASE", "USE ", "SET FOREIGN_KEY_CHECKS")):
+            continue
+        lines.append(line)
+    return "PRAGMA foreign_keys = OFF;\n" + translate_ddl_to_sqlite("\n".join(lines))
+
+
+# Column types and constraints that differ between MySQL and SQLite DDL
+def translate_ddl_to_sqlite(script):
+    # SQLite can't add constraints after the fact; these FKs are declared inline already
+    script = re.sub(r"ALTER\s+TABLE\s+\w+\s+ADD\s+CONSTRAINT[^;]*;", "", script, flags=re.IGNORECASE)
+    script = re.sub(r"\b(?:BIG)?INT\s+AUTO_INCREMENT\s+PRIMARY\s+KEY\b", "INTEGER PRIMARY KEY AUTOINCREMENT", script)
+    script = re.sub(r"(\w+)\s+ENUM\(([^)]*)\)", r"\1 TEXT CHECK (\1 IN (\2))", script)
+    script = re.sub(r"\bYEAR\b", "INTEGER", script)
+    # SQLite's default BINARY collation already compares byte by byte
+    script = re.sub(r"\s+COLLATE\s+utf8mb4_bin\b", "", script, flags=re.IGNORECASE)
+    # Data migrations may backfill with INSERT IGNORE
+    return re.sub(r"\bINSERT\s+IGNORE\b", "INSERT OR IGNORE", script, flags=re.IGNORECASE)
+
+
+# Map declared column types back to the Python types mysql.connector returns
+_types_registered = False
+
+
+def _register_sqlite_types():
+    global _types_registered
+    if _types_registered:
+        return
+    sqlite3.register_adapter(date, lambda v: v.isoformat())
+    sqlite3.register_adapter(datetime, lambda v: v.isoformat(" "))
+    sqlite3.register_adapter(time, lambda v: v.isoformat())
+    sqlite3.register_adapter(timedelta, _timedelta_to_text)
+    sqlite3.register_adapter(Decimal, str)
+    sqlite3.register_converter("DATE", lambda b: date.fromisoformat(b.decode()[:10]))
+    sqlite3.register_converter("DATETIME", lambda b: datetime.fromisoformat(b.decode()))
+    sqlite3.register_converter("TIME", _text_to_timedelta)
+    sqlite3.register_converter("DECIMAL", lambda b: Decimal(b.decode()))
+    _types_registered = True
+
+
+# mysql.connector returns TIME columns as timedelta
+def _text_to_timedelta(b):
+    hours, minutes, seconds = b.decode().split(":")
+    return timedelta(hours=int(hours), minutes=int(minutes), seconds=float(seconds))
+
+
+def _timedelta_to_text(value):
+    total = int(value.total_seconds())
+    return f"{total // 3600:02d}:{total % 3600 // 60:02d}:{total % 60:02d}"
@@ -0,0 +1,324 @@
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from ums.backends import SQLiteBackend
+from ums.migrate import apply_pending
+from ums.queries import EXPORT_VIEWS, registered_queries
+
+# Benchmark suite: renders every page of the app headlessly with Streamlit's
+# AppTest, times a cold start of test2.py in a fresh process, runs every
+# registered query directly, and compares the dict-row and columnar (Arrow)
+# paths from cursor to st.dataframe on the full export views, at several
+# data scales.
+# Each scale runs in its own process (the app's backend, pool and caches are
+# per process) against a generated SQLite database. Results are appended to
+# a JSON history file and compared with the previous run at the same scale.
+#
+#   python -m ums.bench --scales 1,10,50
+#   python -m ums.bench --scales 10 --only sql --fail-on-regression
+#   python -m ums.bench --scales 1 --only startup --app /tmp/old_test2.py
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "test2.py")
+HISTORY_PATH = os.path.join(ROOT, "data", "bench_history.json")
+PAGES = ["dashboard", "students", "courses", "faculty", "departments", "enrollments", "sections",
+         "prerequisites", "library", "finance", "transcripts"]
+# Modules a cold start should not have to import
+HEAVY_MODULES = ["plotly.express", "pandas", "numpy", "pyarrow"]
+
+# A metric regresses when its p50 grows by more than this fraction and this many ms
+REGRESSION_THRESHOLD = 0.25
+REGRESSION_MIN_MS = 1.0
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def summarize(samples_ms, rows):
+    mean_s = sum(samples_ms) / len(samples_ms) / 1000
+    return {
+        "p50_ms": round(percentile(samples_ms, 50), 3),
+        "p95_ms": round(percentile(samples_ms, 95), 3),
+        "rows": rows,
+        "rows_per_sec": round(rows / mean_s) if mean_s else None,
+    }
+
+
+# Peak traced allocation of one call, in KiB
+def peak_memory(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    finally:
+        tracemalloc.stop()
+
+
+# Time `run` (which returns a row count) after one warm-up call
+def time_calls(run, repeat):
+    rows = run()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - started) * 1000)
+    return dict(summarize(samples, rows), peak_kib=peak_memory(run))
+
+
+def bench_queries(conn, repeat):
+    results = {}
+    for name, sql, params in registered_queries():
+        def run():
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            fetched = cursor.fetchall()
+            cursor.close()
+            return len(fetched)
+
+        results[name] = time_calls(run, repeat)
+    return results
+
+
+# A whole view on its way to st.dataframe, which sends Arrow to the browser:
+# dict rows -> DataFrame -> Arrow (fetch_data) against cursor batches -> Arrow
+# (ums.columnar)
+def bench_frames(conn, repeat):
+    import pandas as pd
+    import pyarrow as pa
+    from ums.columnar import read_table
+
+    def via_rows(sql):
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(sql)
+        table = pa.Table.from_pandas(pd.DataFrame(cursor.fetchall()), preserve_index=False)
+        cursor.close()
+        return table.num_rows
+
+    def via_columns(sql):
+        cursor = conn.cursor()
+        cursor.execute(sql)
+        table = read_table(cursor)
+        cursor.close()
+        return table.num_rows
+
+    results = {}
+    for view, (sql, _, _) in EXPORT_VIEWS.items():
+        for label, fetch in (("rows", via_rows), ("columnar", via_columns)):
+            results[f"{view}.{label}"] = time_calls(lambda: fetch(sql), repeat)
+    return results
+
+
+def bench_pages(app_path, repeat):
+    from streamlit.testing.v1 import AppTest
+    from ums.db import get_query_cache
+
+    app = AppTest.from_file(app_path, default_timeout=600)
+    app.run()
+    results = {}
+    for page in PAGES:
+        def render(cold):
+            if cold:
+                get_query_cache().clear()
+            app.switch_page(f"app_pages/{page}.py").run()
+
+        render(cold=True)
+        if app.exception:
+            results[f"{page}.cold"] = {"error": str(app.exception[0].value)}
+            continue
+        rows = sum(len(frame.value) for frame in app.dataframe)
+        for label, cold in (("cold", True), ("warm", False)):
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                render(cold)
+                samples.append((time.perf_counter() - started) * 1000)
+            results[f"{page}.{label}"] = dict(summarize(samples, rows), peak_kib=peak_memory(lambda: render(cold)))
+    return results
+
+
+# Runs in a fresh process: import Streamlit's test harness, then time the
+# app's first run and the heavy modules it pulled in
+def probe_startup(app_path):
+    from streamlit.testing.v1 import AppTest
+
+    before = set(sys.modules)
+    started = time.perf_counter()
+    app = AppTest.from_file(app_path, default_timeout=600)
+    app.run()
+    elapsed = (time.perf_counter() - started) * 1000
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules and name not in before]
+    print(json.dumps({"first_run_ms": elapsed, "error": bool(app.exception), "loaded": loaded}))
+
+
+# Cold start of the app: one fresh process per sample, since a process only
+# starts cold once
+def bench_startup(db, app_path, repeat):
+    samples, loaded = [], []
+    for _ in range(repeat):
+        command = [sys.executable, "-m", "ums.bench", "--probe", "--db", db, "--app", app_path]
+        output = subprocess.run(command, cwd=ROOT, check=True, capture_output=True, text=True).stdout
+        probe = json.loads(output.strip().splitlines()[-1])
+        if probe["error"]:
+            return {"first_run": {"error": "the app raised on its first run"}}
+        samples.append(probe["first_run_ms"])
+        loaded = probe["loaded"]
+    return {"first_run": dict(summarize(samples, 0), loaded=loaded)}
+
+
+# Runs inside the per-scale child process and prints its results as JSON
+def worker(args):
+    results = {}
+    if args.only in (None, "sql"):
+        backend = SQLiteBackend(args.db)
+        conn = backend.connect()
+        try:
+            results["sql"] = bench_queries(conn, args.repeat)
+        finally:
+            conn.close()
+    if args.only in (None, "frames"):
+        backend = SQLiteBackend(args.db)
+        conn = backend.connect()
+        try:
+            results["frames"] = bench_frames(conn, args.repeat)
+        finally:
+            conn.close()
+    if args.only in (None, "startup"):
+        results["startup"] = bench_startup(args.db, args.app, args.repeat)
+    if args.only in (None, "pages"):
+        results["pages"] = bench_pages(args.app, args.repeat)
+    print(json.dumps(results))
+
+
+# Generated databases are kept in data_dir and reused by later runs
+def prepare_database(data_dir, scale, seed):
+    from ums.datagen import generate  # pulls in pandas, which the startup probe must not have loaded
+
+    path = os.path.join(data_dir, f"bench_scale{scale:g}_seed{seed}.db")
+    if os.path.exists(path):
+        return path
+    backend = SQLiteBackend(path)
+    conn = backend.connect()
+    try:
+        apply_pending(conn, backend)
+        started = time.perf_counter()
+        loaded = generate(backend, conn, scale=scale, seed=seed)
+        conn.cursor().execute("ANALYZE")
+        conn.commit()
+        print(f"  generated {sum(loaded.values()):,} rows in {time.perf_counter() - started:.1f}s")
+    finally:
+        conn.close()
+    return path
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def previous_run(history, scale):
+    for run in reversed(history):
+        if str(scale) in run["scales"]:
+            return run["scales"][str(scale)]
+    return None
+
+
+def find_regressions(current, previous, threshold=REGRESSION_THRESHOLD, min_ms=REGRESSION_MIN_MS):
+    regressions = []
+    for group, metrics in current.items():
+        for name, now in metrics.items():
+            before = (previous or {}).get(group, {}).get(name)
+            if not before or "p50_ms" not in before or "p50_ms" not in now:
+                continue
+            delta = now["p50_ms"] - before["p50_ms"]
+            if delta > min_ms and now["p50_ms"] > before["p50_ms"] * (1 + threshold):
+                regressions.append((f"{group}:{name}", before["p50_ms"], now["p50_ms"]))
+    return regressions
+
+
+def print_report(scale, results):
+    print(f"\nscale {scale:g}")
+    print(f"  {'metric':48} {'p50 ms':>9} {'p95 ms':>9} {'rows':>8} {'rows/s':>11} {'peak KiB':>9}")
+    for group, metrics in results.items():
+        for name, m in metrics.items():
+            if "error" in m:
+                print(f"  {group + ':' + name:48} ERROR {m['error']}")
+                continue
+            rate = f"{m['rows_per_sec']:,}" if m["rows_per_sec"] else "-"
+            peak = f"{m['peak_kib']:.1f}" if "peak_kib" in m else "-"
+            print(f"  {group + ':' + name:48} {m['p50_ms']:9.2f} {m['p95_ms']:9.2f} {m['rows']:8,} "
+                  f"{rate:>11} {peak:>9}")
+            if "loaded" in m:
+                print(f"  {'':48} loaded: {', '.join(m['loaded']) or 'none of ' + ', '.join(HEAVY_MODULES)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every page and registered query at several scales")
+    parser.add_argument("--scales", default="1,10", help="comma-separated datagen scales (1 = 1,000 students)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", choices=["sql", "frames", "startup", "pages"], help="run only one part of the suite")
+    parser.add_argument("--app", default=APP_PATH, help="app entry point to benchmark (default test2.py)")
+    parser.add_argument("--data-dir", default=tempfile.gettempdir(), help="where generated databases are kept")
+    parser.add_argument("--history", default=HISTORY_PATH, help="JSON file the results are appended to")
+    parser.add_argument("--label", default="", help="free-form note stored with the run (branch, commit)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit with status 1 on a regression")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--probe", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker or args.probe:
+        os.environ["UMS_BACKEND"] = "sqlite"
+        os.environ["UMS_SQLITE_PATH"] = args.db
+        if args.probe:
+            probe_startup(os.path.abspath(args.app))
+        else:
+            worker(args)
+        return
+
+    history = load_history(args.history)
+    run = {"timestamp": datetime.now().isoformat(timespec="seconds"), "label": args.label,
+           "repeat": args.repeat, "seed": args.seed, "scales": {}}
+    regressions = []
+    for scale in (float(s) for s in args.scales.split(",")):
+        print(f"Preparing scale {scale:g} ...")
+        db = prepare_database(args.data_dir, scale, args.seed)
+        command = [sys.executable, "-m", "ums.bench", "--worker", "--db", db, "--repeat", str(args.repeat),
+                   "--app", os.path.abspath(args.app)]
+        if args.only:
+            command += ["--only", args.only]
+        output = subprocess.run(command, cwd=ROOT, check=True, capture_output=True, text=True).stdout
+        results = json.loads(output.strip().splitlines()[-1])
+        print_report(scale, results)
+        regressions += [(scale, *r) for r in find_regressions(results, previous_run(history, f"{scale:g}"))]
+        run["scales"][f"{scale:g}"] = results
+
+    history.append(run)
+    with open(args.history, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=1)
+    print(f"\nAppended run to {args.history}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against the previous run:")
+        for scale, name, before, now in regressions:
+            print(f"  scale {scale:g} {name}: {before:.2f} ms -> {now:.2f} ms")
+        if args.fail_on_regression:
+            raise SystemExit(1)
+    else:
+        print("No regressions against the previous run")
+
+
+if __name__ == "__main__":
+    main()
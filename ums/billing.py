@@ -0,0 +1,375 @@
+import argparse
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from ums.backends import create_backend
+
+# Tuition billing, payment reconciliation and student ledgers.
+#
+# A billing run creates the term's Student_Tuition rows for every active
+# student in one INSERT ... SELECT. Students already billed for the term are
+# skipped through idx_tuition_student_term (data/migrations/0005), so a run
+# can be repeated safely.
+#
+# Reconciliation reads five grouped scans (tuition, payments against a
+# tuition, unattached payments, scholarships by term, approved aid) and
+# allocates the credits in memory in integer cents:
+#   - a payment covers the tuition it names;
+#   - a scholarship covers the tuition of its term;
+#   - approved aid covers the first tuition due on or after it was applied for;
+#   - unattached payments and any excess go to the oldest unpaid tuition first.
+# Only the tuitions whose status changes are written, one UPDATE ... IN per
+# status and chunk.
+#
+# student_ledger holds every charge and credit of a student with the balance
+# after it, keyed (student_id, entry_seq). The Finance page's writes repost
+# the students they touch; billing runs and bulk loads rebuild it.
+#
+#   python -m ums.billing bill --year 2025 --semester Fall
+#   python -m ums.billing reconcile
+#   python -m ums.billing ledger --student 42
+
+SEMESTER_START = {"Spring": (1, 15), "Summer": (6, 1), "Fall": (9, 1)}
+DUE_DAYS = 30            # tuition is due this many days after the term starts
+FLAT_TUITION = Decimal("5000.00")
+ID_CHUNK = 500
+WRITE_CHUNK = 5000
+
+# Same-day entries: charges before credits
+KIND_ORDER = {"Tuition": 0, "Scholarship": 1, "Aid": 2, "Payment": 3}
+
+_NOT_BILLED = ("NOT EXISTS (SELECT 1 FROM Student_Tuition t "
+               "WHERE t.student_id = s.student_id AND t.year = %s AND t.semester = %s)")
+
+# params (amount, due_date, semester, year, year, semester)
+BILL_FLAT = f"""
+INSERT INTO Student_Tuition (student_id, amount, due_date, status, semester, year)
+SELECT s.student_id, %s, %s, 'Unpaid', %s, %s
+FROM Student s
+WHERE s.status = 'Active' AND {_NOT_BILLED}
+"""
+
+# Enrolled credits that term x rate; params (rate, due_date, semester, year, year, semester, year, semester)
+BILL_PER_CREDIT = f"""
+INSERT INTO Student_Tuition (student_id, amount, due_date, status, semester, year)
+SELECT s.student_id, SUM(c.credits) * %s, %s, 'Unpaid', %s, %s
+FROM Student s
+JOIN Enrollment e ON e.student_id = s.student_id
+JOIN Section sec ON e.section_id = sec.section_id
+JOIN Course c ON sec.course_id = c.course_id
+WHERE s.status = 'Active' AND {_NOT_BILLED} AND sec.year = %s AND sec.semester = %s
+GROUP BY s.student_id
+"""
+
+_TUITION = "SELECT student_id, tuition_id, amount, due_date, semester, year, status FROM Student_Tuition"
+_ATTACHED = "SELECT student_id, tuition_id, SUM(amount) FROM Payment WHERE tuition_id IS NOT NULL"
+_UNATTACHED = "SELECT student_id, SUM(amount) FROM Payment WHERE tuition_id IS NULL"
+_AWARDS = "SELECT student_id, semester, year, SUM(amount_awarded) FROM Student_Scholarship"
+_AID = "SELECT student_id, application_date, amount FROM Financial_Aid WHERE status = 'Approved'"
+
+# (query, its student column, sign): charges are positive, credits negative
+_LEDGER_SOURCES = [
+    ("SELECT student_id, due_date, 'Tuition', tuition_id, CONCAT(semester, ' ', year, ' tuition'), amount "
+     "FROM Student_Tuition", "student_id", 1),
+    ("SELECT ss.student_id, ss.award_date, 'Scholarship', ss.scholarship_id, sc.name, ss.amount_awarded "
+     "FROM Student_Scholarship ss JOIN Scholarship sc ON ss.scholarship_id = sc.scholarship_id",
+     "ss.student_id", -1),
+    ("SELECT student_id, application_date, 'Aid', aid_id, aid_type, amount FROM Financial_Aid "
+     "WHERE status = 'Approved'", "student_id", -1),
+    ("SELECT student_id, payment_date, 'Payment', payment_id, method, amount FROM Payment", "student_id", -1),
+]
+
+LEDGER = """
+SELECT entry_seq, entry_date, kind, reference_id, description, amount, balance
+FROM student_ledger
+WHERE student_id = %s
+ORDER BY entry_seq
+"""
+
+STUDENT_TUITIONS = """
+SELECT tuition_id, semester, year, amount, due_date, status
+FROM Student_Tuition
+WHERE student_id = %s
+ORDER BY due_date, tuition_id
+"""
+
+BALANCE = "SELECT balance FROM student_ledger WHERE student_id = %s ORDER BY entry_seq DESC LIMIT 1"
+
+TERM_STATUS = """
+SELECT status, COUNT(*) as bills, SUM(amount) as billed
+FROM Student_Tuition
+WHERE year = %s AND semester = %s
+GROUP BY status
+"""
+
+
+def due_date_for(year, semester):
+    month, day = SEMESTER_START[semester]
+    return date(year, month, day) + timedelta(days=DUE_DAYS)
+
+
+def _cents(value):
+    return int((Decimal(str(value or 0)) * 100).to_integral_value())
+
+
+def _day(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+# Rows of `sql` for the given students (all students when None); `tail`
+# (GROUP BY ...) goes after the student filter
+def _for_students(cursor, sql, student_ids, column="student_id", tail=""):
+    if student_ids is None:
+        cursor.execute(f"{sql} {tail}")
+        return cursor.fetchall()
+    joiner = "AND" if " WHERE " in sql else "WHERE"
+    student_ids = sorted(set(student_ids))
+    rows = []
+    for start in range(0, len(student_ids), ID_CHUNK):
+        chunk = student_ids[start:start + ID_CHUNK]
+        cursor.execute(f"{sql} {joiner} {column} IN ({', '.join(['%s'] * len(chunk))}) {tail}", tuple(chunk))
+        rows.extend(cursor.fetchall())
+    return rows
+
+
+# --- billing run -------------------------------------------------------------
+
+# Bill every active student not yet billed for the term; returns the number of
+# bills created. With `per_credit` the amount is the student's enrolled credits
+# that term times the rate, and students with no enrollments aren't billed.
+def bill_term(cursor, year, semester, amount=FLAT_TUITION, due_date=None, per_credit=None):
+    due_date = due_date or due_date_for(year, semester)
+    if per_credit is None:
+        cursor.execute(BILL_FLAT, (amount, due_date, semester, year, year, semester))
+    else:
+        cursor.execute(BILL_PER_CREDIT, (per_credit, due_date, semester, year, year, semester, year, semester))
+    return cursor.rowcount
+
+
+# --- reconciliation ----------------------------------------------------------
+
+def status_for(amount, covered):
+    if covered >= amount:
+        return "Paid"
+    return "Partial" if covered > 0 else "Unpaid"
+
+
+# Cents covered on each of one student's bills. `bills` are (tuition_id, cents,
+# due_date, semester, year) in due order; `attached` {tuition_id: cents};
+# `awards` {(semester, year): cents}; `aid` [(application_date, cents)];
+# `pool` unattached payments in cents.
+def allocate(bills, attached, awards, aid, pool):
+    covered = {bill[0]: attached.get(bill[0], 0) for bill in bills}
+    first_of_term = {}
+    for tuition_id, _, _, semester, year in bills:
+        first_of_term.setdefault((semester, year), tuition_id)
+    for term, cents in awards.items():
+        if term in first_of_term:
+            covered[first_of_term[term]] += cents
+        else:
+            pool += cents
+    for applied, cents in aid:
+        target = next((b[0] for b in bills if b[2] >= applied), bills[-1][0] if bills else None)
+        if target is None:
+            pool += cents
+        else:
+            covered[target] += cents
+    for tuition_id, cents, _, _, _ in bills:
+        if covered[tuition_id] > cents:
+            pool += covered[tuition_id] - cents
+            covered[tuition_id] = cents
+    for tuition_id, cents, _, _, _ in bills:
+        if pool <= 0:
+            break
+        take = min(pool, cents - covered[tuition_id])
+        covered[tuition_id] += take
+        pool -= take
+    return covered
+
+
+# Set Paid/Partial/Unpaid on the tuitions of `student_ids` (everyone when None)
+# from their payments, scholarships and approved aid. Returns (tuitions checked,
+# {new status: tuitions changed to it}).
+def reconcile(cursor, student_ids=None):
+    bills, current = {}, {}
+    for student_id, tuition_id, amount, due, semester, year, status in _for_students(cursor, _TUITION, student_ids):
+        bills.setdefault(student_id, []).append((tuition_id, _cents(amount), _day(due), semester, year))
+        current[tuition_id] = status
+    attached = {tuition_id: _cents(total) for _, tuition_id, total in
+                _for_students(cursor, _ATTACHED, student_ids, tail="GROUP BY student_id, tuition_id")}
+    unattached = {student_id: _cents(total) for student_id, total in
+                  _for_students(cursor, _UNATTACHED, student_ids, tail="GROUP BY student_id")}
+    awards = {}
+    for student_id, semester, year, total in _for_students(cursor, _AWARDS, student_ids,
+                                                           tail="GROUP BY student_id, semester, year"):
+        awards.setdefault(student_id, {})[(semester, year)] = _cents(total)
+    aid = {}
+    for student_id, applied, amount in _for_students(cursor, _AID, student_ids):
+        aid.setdefault(student_id, []).append((_day(applied), _cents(amount)))
+
+    changes = {}
+    for student_id, student_bills in bills.items():
+        student_bills.sort(key=lambda b: (b[2], b[0]))
+        covered = allocate(student_bills, attached, awards.get(student_id, {}),
+                           sorted(aid.get(student_id, [])), unattached.get(student_id, 0))
+        for tuition_id, cents, _, _, _ in student_bills:
+            status = status_for(cents, covered[tuition_id])
+            if status != current[tuition_id]:
+                changes.setdefault(status, []).append(tuition_id)
+    for status, tuition_ids in changes.items():
+        for start in range(0, len(tuition_ids), ID_CHUNK):
+            chunk = tuition_ids[start:start + ID_CHUNK]
+            cursor.execute(f"UPDATE Student_Tuition SET status = %s WHERE tuition_id IN "
+                           f"({', '.join(['%s'] * len(chunk))})", (status,) + tuple(chunk))
+    return len(current), {status: len(ids) for status, ids in changes.items()}
+
+
+# --- ledger ------------------------------------------------------------------
+
+# Ledger rows (student_id, entry_seq, entry_date, kind, reference_id, description,
+# amount, balance) for `student_ids` (everyone when None)
+def ledger_entries(cursor, student_ids=None):
+    entries = []
+    for sql, column, sign in _LEDGER_SOURCES:
+        for student_id, day, kind, reference_id, description, amount in _for_students(
+                cursor, sql, student_ids, column):
+            entries.append((student_id, _day(day), KIND_ORDER[kind], reference_id, kind, description,
+                            sign * _cents(amount)))
+    entries.sort(key=lambda e: e[:4])
+    rows, student, seq, balance = [], None, 0, 0
+    for student_id, day, _, reference_id, kind, description, cents in entries:
+        if student_id != student:
+            student, seq, balance = student_id, 0, 0
+        seq += 1
+        balance += cents
+        rows.append((student_id, seq, day, kind, reference_id, description,
+                     Decimal(cents) / 100, Decimal(balance) / 100))
+    return rows
+
+
+def _write_ledger(cursor, rows):
+    for start in range(0, len(rows), WRITE_CHUNK):
+        cursor.executemany("INSERT INTO student_ledger (student_id, entry_seq, entry_date, kind, reference_id, "
+                           "description, amount, balance) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+                           rows[start:start + WRITE_CHUNK])
+
+
+# Rewrite the ledgers of some students, on the caller's transaction
+def post_ledgers(cursor, student_ids):
+    student_ids = sorted(set(student_ids))
+    for start in range(0, len(student_ids), ID_CHUNK):
+        chunk = student_ids[start:start + ID_CHUNK]
+        cursor.execute(f"DELETE FROM student_ledger WHERE student_id IN ({', '.join(['%s'] * len(chunk))})",
+                       tuple(chunk))
+    _write_ledger(cursor, ledger_entries(cursor, student_ids))
+
+
+# Refill student_ledger for everyone; returns the number of entries
+def rebuild_ledgers(conn, backend=None):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM student_ledger")
+        rows = ledger_entries(cursor)
+        _write_ledger(cursor, rows)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return len(rows)
+
+
+def ledgers_kept(conn, backend):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT entry_seq FROM student_ledger LIMIT 1")
+        cursor.fetchall()
+        return True
+    except backend.Error:
+        conn.rollback()
+        return False
+    finally:
+        cursor.close()
+
+
+# Record a payment and bring the student's statuses and ledger up to date;
+# returns the payment id
+def record_payment(cursor, student_id, amount, method, tuition_id=None, paid_at=None):
+    cursor.execute("INSERT INTO Payment (student_id, amount, payment_date, method, tuition_id) "
+                   "VALUES (%s, %s, %s, %s, %s)",
+                   (student_id, amount, paid_at or datetime.now().replace(microsecond=0), method, tuition_id))
+    payment_id = cursor.lastrowid
+    reconcile(cursor, [student_id])
+    post_ledgers(cursor, [student_id])
+    return payment_id
+
+
+# A term's billing run, reconciliation and ledger rebuild, each step committed
+# on its own; returns (bills created, tuitions checked, status changes, ledger entries).
+# `progress(step, 3, message)` is called before each step.
+def run_term(conn, backend, year, semester, amount=FLAT_TUITION, due_date=None, per_credit=None,
+             progress=None):
+    progress = progress or (lambda step, steps, message: None)
+    cursor = conn.cursor()
+    try:
+        progress(0, 3, f"Billing {semester} {year}")
+        billed = bill_term(cursor, year, semester, amount, due_date, per_credit)
+        conn.commit()
+        progress(1, 3, "Reconciling tuition")
+        checked, changes = reconcile(cursor)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    progress(2, 3, "Rebuilding ledgers")
+    entries = rebuild_ledgers(conn, backend)
+    return billed, checked, changes, entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tuition billing runs, reconciliation and ledgers")
+    parser.add_argument("command", choices=["bill", "reconcile", "ledger"])
+    parser.add_argument("--year", type=int, help="bill: term year")
+    parser.add_argument("--semester", choices=list(SEMESTER_START), help="bill: term semester")
+    parser.add_argument("--amount", type=Decimal, default=FLAT_TUITION, help="bill: flat tuition per student")
+    parser.add_argument("--per-credit", type=Decimal, help="bill: charge this per enrolled credit instead")
+    parser.add_argument("--student", type=int, help="ledger: print one student's ledger (default rebuild all)")
+    parser.add_argument("--backend", help="mysql or sqlite (defaults to UMS_BACKEND)")
+    args = parser.parse_args(argv)
+    if args.command == "bill" and (args.year is None or args.semester is None):
+        parser.error("bill needs --year and --semester")
+
+    backend = create_backend(args.backend)
+    conn = backend.connect()
+    started = time.perf_counter()
+    try:
+        if args.command == "bill":
+            billed, checked, changes, entries = run_term(conn, backend, args.year, args.semester,
+                                                         args.amount, per_credit=args.per_credit)
+            print(f"Billed {billed:,} students for {args.semester} {args.year}; reconciled {checked:,} tuitions "
+                  f"({changes or 'no changes'}); {entries:,} ledger entries "
+                  f"in {time.perf_counter() - started:.2f}s")
+        elif args.command == "reconcile":
+            cursor = conn.cursor()
+            checked, changes = reconcile(cursor)
+            conn.commit()
+            print(f"Reconciled {checked:,} tuitions ({changes or 'no changes'}) "
+                  f"in {time.perf_counter() - started:.2f}s")
+        elif args.student is not None:
+            cursor = conn.cursor()
+            cursor.execute(LEDGER, (args.student,))
+            for row in cursor.fetchall():
+                print(row)
+        else:
+            entries = rebuild_ledgers(conn, backend)
+            print(f"Rebuilt {entries:,} ledger entries in {time.perf_counter() - started:.2f}s")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
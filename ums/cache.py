@@ -0,0 +1,193 @@
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Tables whose rows disappear with a parent row (ON DELETE CASCADE in data/query.sql)
+CASCADES = {
+    "person": ("student", "faculty", "staff"),
+    "student": ("student_record",),
+    "section": ("schedule",),
+    "transcript": ("transcript_grade",),
+    "grade": ("transcript_grade",),
+    "degree_program": ("requirement",),
+}
+
+# Tables maintained from a base table's write paths: the dashboard summaries
+# (data/migrations/0002, ums/summaries.py), Student_Record (ums/transcripts.py),
+# the library and people search indexes (ums/library.py, ums/people.py) and
+# student ledgers (ums/billing.py)
+DERIVED = {
+    "student": ("summary_student_status", "summary_recent_enrollment"),
+    "faculty": ("summary_faculty_department",),
+    "enrollment": ("summary_recent_enrollment", "student_record"),
+    "person": ("summary_recent_enrollment", "person_search_term", "person_search_gram"),
+    "course": ("summary_recent_enrollment", "student_record"),
+    "section": ("summary_recent_enrollment", "student_record"),
+    "grade": ("student_record",),
+    "library_book": ("library_search_term",),
+    "student_tuition": ("student_ledger",),
+    "payment": ("student_ledger",),
+    "student_scholarship": ("student_ledger",),
+    "financial_aid": ("student_ledger",),
+}
+
+_READ_TABLES = re.compile(r"\b(?:FROM|JOIN)\s+`?([A-Za-z_]\w*)", re.IGNORECASE)
+_WRITE_TABLES = re.compile(
+    r"\b(?:INSERT\s+(?:IGNORE\s+)?INTO|REPLACE\s+INTO|UPDATE|DELETE\s+FROM)\s+`?([A-Za-z_]\w*)",
+    re.IGNORECASE)
+
+
+def normalize_sql(query):
+    return " ".join(query.split())
+
+
+def read_tables(query):
+    return frozenset(t.lower() for t in _READ_TABLES.findall(query))
+
+
+def written_tables(query):
+    return frozenset(t.lower() for t in _WRITE_TABLES.findall(query))
+
+
+def with_cascades(tables):
+    result = set()
+    pending = [t.lower() for t in tables]
+    while pending:
+        table = pending.pop()
+        if table not in result:
+            result.add(table)
+            pending.extend(CASCADES.get(table, ()))
+            pending.extend(DERIVED.get(table, ()))
+    return result
+
+
+def _estimate_size(rows):
+    if hasattr(rows, "nbytes"):  # columnar results (pyarrow.Table) know their buffer size
+        return rows.nbytes
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row)
+        values = row.values() if isinstance(row, dict) else row
+        for value in values:
+            size += sys.getsizeof(value)
+    return size
+
+
+# Result cache for read queries, keyed by normalized SQL + params (and whether
+# the result is columnar, see ums/columnar.py).
+# Entries expire after their TTL, the least recently used ones are evicted
+# once `max_bytes` is exceeded, and a write to a table drops every entry
+# that read from it.
+class QueryCache:
+    def __init__(self, max_bytes=64 * 1024 * 1024, default_ttl=60):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()  # key -> (rows, expires_at, tables, size)
+        self._by_table = {}  # table -> set of keys
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+        self._generation = 0
+        self._table_versions = {}  # table -> number of invalidations that covered it
+
+    # Bumped on every invalidation; lets a reader detect a write that raced its query
+    def generation(self):
+        return self._generation
+
+    # Bumped whenever `table` is invalidated; lets state built from a table
+    # (e.g. the prerequisite graph) notice writes to it
+    def table_version(self, table):
+        return self._table_versions.get(table.lower(), 0)
+
+    @staticmethod
+    def key(query, params=None, columnar=False):
+        key = (normalize_sql(query), tuple(params) if params else ())
+        return key + ("columnar",) if columnar else key
+
+    def get(self, query, params=None, columnar=False):
+        key = self.key(query, params, columnar)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            if entry[1] <= time.monotonic():
+                self._remove_locked(key)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, query, rows, params=None, ttl=None, generation=None, columnar=False):
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        key = self.key(query, params, columnar)
+        size = _estimate_size(rows)
+        if size > self.max_bytes:
+            return
+        tables = read_tables(query)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            if key in self._entries:
+                self._remove_locked(key)
+            self._entries[key] = (rows, time.monotonic() + ttl, tables, size)
+            self._bytes += size
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+            while self._bytes > self.max_bytes and self._entries:
+                self._remove_locked(next(iter(self._entries)))
+                self._evictions += 1
+
+    def invalidate_tables(self, *tables):
+        with self._lock:
+            self._generation += 1
+            for table in with_cascades(tables):
+                self._table_versions[table] = self._table_versions.get(table, 0) + 1
+                for key in list(self._by_table.get(table, ())):
+                    self._remove_locked(key)
+                    self._invalidations += 1
+
+    # Drop cached reads affected by a write statement
+    def invalidate_for(self, query):
+        tables = written_tables(query)
+        if tables:
+            self.invalidate_tables(*tables)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._by_table.clear()
+            self._bytes = 0
+
+    def _remove_locked(self, key):
+        rows, _, tables, size = self._entries.pop(key)
+        self._bytes -= size
+        for table in tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
@@ -0,0 +1,102 @@
+import pyarrow as pa
+import streamlit as st
+
+from ums.db import database_error, get_query_cache, get_router, session_last_write
+from ums.pool import PoolTimeout
+from ums.profiler import get_profiler
+
+# Columnar reads. Rows come off a plain (tuple) cursor with fetchmany(); each
+# batch is transposed and becomes one Arrow array per column, so no dict is
+# built per row and no DataFrame copy is made. The result is a pyarrow Table:
+# st.dataframe takes it as is (Arrow is what it sends to the browser anyway)
+# and Plotly Express reads it directly. Dates, datetimes and DECIMALs keep
+# their types (date32, timestamp, decimal128).
+#
+#   late = fetch_table(library.OVERDUE, (date.today(), 200), ttl=TTL_AGGREGATE)
+#   st.dataframe(late, hide_index=True)
+
+BATCH_ROWS = 10000
+
+EMPTY = pa.table({})
+
+
+# Arrow array for one column of a batch; a column holding mixed Python types
+# (SQLite columns are dynamically typed) is kept as strings
+def _array(values):
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([None if v is None else str(v) for v in values], pa.string())
+
+
+# One type for a column whose batches were typed separately: a batch of NULLs
+# is typed null, and DECIMAL precision and scale follow the batch's values
+def unify_types(types):
+    kinds = {t for t in types if not pa.types.is_null(t)}
+    if len(kinds) <= 1:
+        return kinds.pop() if kinds else pa.null()
+    if all(pa.types.is_decimal(t) for t in kinds):
+        scale = max(t.scale for t in kinds)
+        digits = max(t.precision - t.scale for t in kinds)
+        return pa.decimal128(digits + scale, scale) if digits + scale <= 38 else pa.float64()
+    if all(pa.types.is_integer(t) for t in kinds):
+        return pa.int64()
+    if all(pa.types.is_integer(t) or pa.types.is_floating(t) or pa.types.is_decimal(t) for t in kinds):
+        return pa.float64()
+    if all(pa.types.is_date(t) or pa.types.is_timestamp(t) for t in kinds):
+        return pa.timestamp("us")
+    return pa.string()
+
+
+# Read the rest of an executed cursor's result into a pyarrow Table
+def read_table(cursor, batch_size=BATCH_ROWS):
+    if cursor.description is None:
+        return EMPTY
+    names = [d[0] for d in cursor.description]
+    chunks = [[] for _ in names]
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        for chunk, values in zip(chunks, zip(*rows)):
+            chunk.append(_array(values))
+    columns = []
+    for chunk in chunks:
+        kind = unify_types([array.type for array in chunk])
+        columns.append(pa.chunked_array([a if a.type == kind else a.cast(kind) for a in chunk], type=kind))
+    return pa.Table.from_arrays(columns, names=names)
+
+
+# fetch_data for results that are shown rather than iterated: same routing,
+# caching (`ttl`) and error reporting, but returns a pyarrow Table (EMPTY on
+# failure). Cached tables are shared, which is safe because they are immutable.
+def fetch_table(query, params=None, ttl=None, batch_size=BATCH_ROWS):
+    cache = get_query_cache()
+    if ttl != 0:
+        cached = cache.get(query, params, columnar=True)
+        if cached is not None:
+            get_profiler().record_cache_hit(query)
+            return cached
+    generation = cache.generation()
+
+    try:
+        conn, fresh = get_router().reader(session_last_write())
+    except (database_error(), PoolTimeout) as err:
+        st.error(f"Database connection failed: {err}")
+        return EMPTY
+
+    try:
+        cursor = conn.cursor()
+        if params:
+            cursor.execute(query, params)
+        else:
+            cursor.execute(query)
+        table = read_table(cursor, batch_size)
+        if fresh:
+            cache.put(query, table, params, ttl, generation, columnar=True)
+        return table
+    except database_error() as err:
+        st.error(f"Database query error: {err}")
+        return EMPTY
+    finally:
+        conn.close()
@@ -0,0 +1,307 @@
+from datetime import date
+
+import pandas as pd
+import streamlit as st
+
+from ums.db import execute_query, fetch_data
+from ums.grid import bulk_edit_grid
+from ums.lookups import lookup_select
+from ums.pagination import paginated_fragment
+from ums.parallel import Query, fetch_parallel
+from ums.profiler import fragment
+
+# The View/Add/Update/Delete/Bulk Edit tabs the entity pages in app_pages/ are
+# built from. Each tab, and the Update tab's record panel, is an st.fragment:
+# using a widget reruns only the fragment it sits in, with the records and
+# select options it was given by the last full run. A successful write reruns
+# the page, since the View and the record lists show the changed rows.
+
+
+# Key values of the row a form writes, when the form sets every key column
+def form_key(key_column, inputs, default=None):
+    names = [k.strip() for k in key_column.split(',')]
+    if all(name in inputs for name in names):
+        return tuple(inputs[name] for name in names)
+    return default
+
+
+# Options for the 'select' fields; query-backed lists are fetched in parallel
+def load_field_options(form_fields):
+    fields = [f for f in form_fields or [] if f.get('type') == 'select']
+    backed = [f for f in fields if 'query' in f]
+    options = {f['name']: f.get('options', []) for f in fields}
+    if backed:
+        results = fetch_parallel([Query(f['query']) for f in backed])
+        options.update({f['name']: rows for f, rows in zip(backed, results)})
+    return options
+
+
+# Helper function for CRUD operations (modified for Courses, Departments, etc.)
+# write_hooks (ums.summaries.WriteHooks) keep summary tables current on writes;
+# rows_query (queries.*_ROWS) enables the Bulk Edit grid;
+# validate(row, current) returns error messages that block a write; row holds
+# the form's field values and current the existing record (with its key
+# columns) for updates, None for adds
+def display_crud_interface(entity_name, columns, key_column, display_query, 
+                         insert_query=None, update_query=None, delete_query=None,
+                         form_fields=None, get_record_query=None, write_hooks=None, rows_query=None,
+                         validate=None):
+    st.header(f"{entity_name} Management")
+    
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["View", "Add", "Update", "Delete", "Bulk Edit"])
+    field_options = load_field_options(form_fields)
+    
+    with tab1:
+        # Only the current page is fetched; Update/Delete choose from these rows
+        records = paginated_fragment(
+            f"view_{entity_name.lower().replace(' ', '_')}", display_query, columns,
+            key_column.split(','), f"No {entity_name.lower()} records found")
+    
+    if insert_query and form_fields:
+        with tab2:
+            add_tab(entity_name, key_column, insert_query, form_fields, field_options, write_hooks, validate)
+
+    if update_query and form_fields and get_record_query:
+        with tab3:
+            update_tab(entity_name, key_column, records, get_record_query, update_query, form_fields,
+                       field_options, write_hooks, validate)
+
+    if delete_query:
+        with tab4:
+            delete_tab(entity_name, key_column, records, delete_query, write_hooks)
+
+    if rows_query and form_fields and (update_query or delete_query):
+        with tab5:
+            bulk_edit_tab(entity_name, key_column, records, rows_query, form_fields, update_query,
+                          delete_query, write_hooks, field_options, validate)
+
+
+# Selectbox over the View page's rows; returns the chosen row's key values
+def select_record(entity_name, key_column, records, action):
+    # Handle composite keys
+    if ',' in key_column:
+        key_parts = [k.strip() for k in key_column.split(',')]
+        record_options = []
+        for r in records:
+            key_values = [str(r[k]) for k in key_parts]
+            display_values = [r.get('name', r.get('title', '')) for k in key_parts]
+            record_options.append(" - ".join(key_values + display_values))
+    else:
+        record_options = [f"{r[key_column]} - {r.get('name', r.get('title', ''))}" for r in records]
+    
+    selected_record = st.selectbox(
+        f"Select {entity_name} to {action}",
+        record_options,
+        help="Lists the rows on the current View page; filter or page there to find others",
+        key=f"{action}_select_{entity_name}")
+    
+    # Get the record ID(s)
+    if ',' in key_column:
+        selected_index = record_options.index(selected_record)
+        selected_keys = records[selected_index]
+        return tuple(selected_keys[k.strip()] for k in key_column.split(','))
+    record_id = int(selected_record.split('-')[0].strip())
+    return (record_id,)
+
+
+@fragment("Add")
+def add_tab(entity_name, key_column, insert_query, form_fields, field_options, write_hooks, validate):
+    st.subheader(f"Add New {entity_name}")
+    inputs = {}
+    # Lookup fields search as you type, so they sit above the form
+    for field in form_fields:
+        if field.get('type') == 'lookup':
+            inputs[field['name']] = lookup_select(
+                field['label'], field['lookup'], key=f"add_{field['name']}")
+
+    with st.form(f"add_{entity_name.lower()}_form"):
+        for field in form_fields:
+            field_name = field.get('name', 'unknown')
+            field_label = field.get('label', 'Unnamed Field')
+            field_type = field.get('type', 'text')
+            
+            if field_type == 'text':
+                inputs[field_name] = st.text_input(field_label, key=f"add_{field_name}")
+            elif field_type == 'select':
+                options = field_options[field_name]
+                display_field = field.get('display_field', 'name')
+                value_field = field.get('value_field', 'id')
+                
+                if options and isinstance(options[0], dict):
+                    option_dict = {str(o[display_field]): o[value_field] for o in options}
+                else:
+                    option_dict = {str(o): o for o in options}
+                
+                selected_display = st.selectbox(
+                    field_label,
+                    list(option_dict.keys()),
+                    key=f"add_{field_name}")
+                
+                inputs[field_name] = option_dict[selected_display]
+            elif field_type == 'date':
+                inputs[field_name] = st.date_input(field_label, key=f"add_{field_name}")
+            elif field_type == 'number':
+                min_val = float(field.get('min_value', 0))
+                max_val = float(field.get('max_value', 1000000))
+                value = float(field.get('value', min_val))
+                step = float(field.get('step', 1))
+                
+                inputs[field_name] = st.number_input(
+                    field_label,
+                    min_value=min_val,
+                    max_value=max_val,
+                    value=value,
+                    step=step,
+                    key=f"add_{field_name}"
+                )
+        
+        submitted = st.form_submit_button(f"Add {entity_name}")
+        if submitted:
+            try:
+                errors = validate(inputs) if validate else []
+                for error in errors:
+                    st.error(error)
+                if not errors:
+                    params = tuple(inputs[field['name']] for field in form_fields)
+                    new_key = form_key(key_column, inputs)
+                    after = None
+                    if write_hooks and new_key:
+                        after = lambda c: write_hooks.added(c, *new_key)
+                    elif write_hooks and ',' not in key_column:
+                        # Generated key: the hooks get the id the insert assigned
+                        after = lambda c: write_hooks.added(c, c.lastrowid)
+                    success, message = execute_query(insert_query, params, after=after)
+                    if success:
+                        st.success(f"{entity_name} added successfully!")
+                        st.rerun()
+                    else:
+                        st.error(message)
+            except Exception as e:
+                st.error(f"An error occurred: {str(e)}")
+
+
+@fragment("Update")
+def update_tab(entity_name, key_column, records, get_record_query, update_query, form_fields,
+               field_options, write_hooks, validate):
+    if records:
+        key_params = select_record(entity_name, key_column, records, "update")
+        record_panel(entity_name, key_column, key_params, get_record_query, update_query, form_fields,
+                     field_options, write_hooks, validate)
+    else:
+        st.info(f"No {entity_name.lower()} records to update")
+
+
+# The selected record and its update form; typing in a lookup reruns only this
+@fragment("Update")
+def record_panel(entity_name, key_column, key_params, get_record_query, update_query, form_fields,
+                 field_options, write_hooks, validate):
+    current_record = fetch_data(get_record_query, key_params)
+    if not current_record:
+        st.warning("Record not found")
+        return
+
+    st.subheader("Current Record Details")
+    st.write(pd.DataFrame(current_record))
+    st.markdown("---")
+    st.subheader("Update Record")
+
+    inputs = {}
+    record_suffix = "_".join(str(k) for k in key_params)
+    for field in form_fields:
+        if field.get('type') == 'lookup':
+            inputs[field['name']] = lookup_select(
+                field['label'], field['lookup'],
+                key=f"update_{field['name']}_{record_suffix}",
+                current_value=current_record[0].get(field['name']))
+    
+    with st.form(f"update_{entity_name.lower()}_form"):
+        for field in form_fields:
+            field_name = field.get('name', 'unknown')
+            field_label = field.get('label', 'Unnamed Field')
+            field_type = field.get('type', 'text')
+            current_value = current_record[0].get(field_name)
+            
+            if field_type == 'text':
+                inputs[field_name] = st.text_input(
+                    field_label,
+                    value=current_value,
+                    key=f"update_{field_name}")
+            elif field_type == 'select':
+                options = field_options[field_name]
+                display_field = field.get('display_field', 'name')
+                value_field = field.get('value_field', 'id')
+                
+                if options and isinstance(options[0], dict):
+                    option_dict = {str(o[display_field]): o[value_field] for o in options}
+                else:
+                    option_dict = {str(o): o for o in options}
+                
+                current_option = next((k for k, v in option_dict.items() if v == current_value), None)
+                selected = st.selectbox(
+                    field_label,
+                    list(option_dict.keys()),
+                    index=list(option_dict.keys()).index(current_option) if current_option in option_dict else 0,
+                    key=f"update_{field_name}")
+                inputs[field_name] = option_dict.get(selected)
+            elif field_type == 'date':
+                inputs[field_name] = st.date_input(
+                    field_label,
+                    value=current_value if current_value else date.today(),
+                    key=f"update_{field_name}")
+            elif field_type == 'number':
+                min_val = float(field.get('min_value', 0))
+                max_val = float(field.get('max_value', 1000000))
+                step = float(field.get('step', 1))
+                current_val = float(current_value) if current_value is not None else min_val
+                
+                inputs[field_name] = st.number_input(
+                    field_label,
+                    value=current_val,
+                    min_value=min_val,
+                    max_value=max_val,
+                    step=step,
+                    key=f"update_{field_name}"
+                )
+        
+        if st.form_submit_button(f"Update {entity_name}"):
+            current = dict(current_record[0], **dict(zip(
+                [k.strip() for k in key_column.split(',')], key_params)))
+            errors = validate(inputs, current) if validate else []
+            for error in errors:
+                st.error(error)
+            if not errors:
+                params = tuple(inputs[field['name']] for field in form_fields) + tuple(key_params)
+                hooks = {}
+                if write_hooks:
+                    new_key = form_key(key_column, inputs, default=key_params)
+                    hooks = {'before': lambda c: write_hooks.removed(c, *key_params),
+                             'after': lambda c: write_hooks.added(c, *new_key)}
+                success, message = execute_query(update_query, params, **hooks)
+                if success:
+                    st.success(message)
+                    st.rerun()
+                else:
+                    st.error(message)
+
+
+@fragment("Delete")
+def delete_tab(entity_name, key_column, records, delete_query, write_hooks):
+    if not records:
+        st.info(f"No {entity_name.lower()} records to delete")
+        return
+    key_params = select_record(entity_name, key_column, records, "delete")
+    if st.button(f"Delete {entity_name}", key=f"delete_{entity_name}"):
+        before = (lambda c: write_hooks.removed(c, *key_params)) if write_hooks else None
+        success, message = execute_query(delete_query, key_params, before=before)
+        if success:
+            st.success(message)
+            st.rerun()
+        else:
+            st.error(message)
+
+
+@fragment("Bulk Edit")
+def bulk_edit_tab(entity_name, key_column, records, rows_query, form_fields, update_query, delete_query,
+                  write_hooks, field_options, validate):
+    bulk_edit_grid(entity_name, [k.strip() for k in key_column.split(',')], records, rows_query,
+                   form_fields, update_query, delete_query, write_hooks, field_options, validate)
@@ -0,0 +1,586 @@
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from ums.backends import SQLiteBackend, create_backend
+from ums.billing import ledgers_kept, rebuild_ledgers
+from ums import library, people
+from ums.migrate import apply_pending
+from ums.summaries import rebuild, summaries_exist
+from ums.transcripts import records_tracked, recompute_all
+
+# Deterministic synthetic data for every table in data/query.sql.
+#
+# Row counts scale with `scale` (1.0 = 1,000 students) and the ratios in
+# RATIOS; ids are assigned up front after the current MAX(id) of each table,
+# so rows reference each other without reading generated ids back. Rows are
+# streamed into per-table writers, so memory stays bounded at any scale.
+#
+#   python -m ums.datagen --scale 100 --backend sqlite --path data/bench.db
+#   python -m ums.datagen --scale 1000 --fast        # MySQL via LOAD DATA LOCAL INFILE
+
+RATIOS = {
+    "students": 1000,                  # per unit of scale
+    "students_per_faculty": 20,
+    "students_per_staff": 50,
+    "students_per_department": 2000,
+    "students_per_course": 100,
+    "sections_per_course": 6,
+    "enrollments_per_student": 8,
+    "graded_fraction": 0.85,
+    "students_per_book": 5,
+    "checkouts_per_book": 2.5,
+    "terms_billed": 2,
+    "students_per_club": 200,
+    "club_membership_fraction": 0.3,
+    "scholarship_fraction": 0.1,
+    "aid_fraction": 0.2,
+}
+
+FIRST_NAMES = [
+    "James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "William", "Elizabeth",
+    "David", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen",
+    "Ahmed", "Fatima", "Wei", "Mei", "Priya", "Arjun", "Olga", "Ivan", "Carlos", "Sofia",
+    "Aisha", "Omar", "Yuki", "Hiroshi", "Amara", "Kwame", "Lucas", "Emma", "Noah", "Olivia",
+    "Liam", "Ava", "Mateo", "Isabella", "Elena", "Diego", "Chen", "Anika", "Tariq", "Zara",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+    "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+    "Khan", "Chen", "Patel", "Singh", "Kim", "Nguyen", "Novak", "Ivanova", "Okafor", "Mensah",
+    "Silva", "Santos", "Tanaka", "Sato", "Muller", "Schmidt", "Rossi", "Russo", "Dubois", "Laurent",
+    "Haddad", "Nasser", "Kowalski", "Nowak", "Eriksson", "Larsen", "Murphy", "Kelly", "Reyes", "Cruz",
+]
+SUBJECTS = [
+    "Computer Science", "Mathematics", "Physics", "Biology", "Chemistry", "Economics", "History",
+    "Philosophy", "Psychology", "Sociology", "Linguistics", "Statistics", "Engineering", "Music",
+    "Literature", "Geology", "Astronomy", "Political Science", "Anthropology", "Business",
+]
+COURSE_TOPICS = [
+    "Introduction to", "Foundations of", "Topics in", "Advanced", "Seminar in", "Methods of",
+    "Principles of", "Applied", "Theory of", "Research in",
+]
+GRADES = [("A", 4.0), ("A-", 3.7), ("B+", 3.3), ("B", 3.0), ("B-", 2.7), ("C+", 2.3), ("C", 2.0),
+          ("C-", 1.7), ("D", 1.0), ("F", 0.0)]
+GRADE_WEIGHTS = [18, 14, 14, 14, 10, 8, 8, 5, 5, 4]
+SEMESTERS = ["Spring", "Summer", "Fall"]
+SEMESTER_START = {"Spring": (1, 15), "Summer": (6, 1), "Fall": (9, 1)}
+FIRST_YEAR, CURRENT_YEAR, CURRENT_SEMESTER = 2018, 2025, "Fall"
+TERMS = [(year, semester) for year in range(FIRST_YEAR, CURRENT_YEAR + 1) for semester in SEMESTERS]
+DAY_PAIRS = [("Monday", "Wednesday"), ("Tuesday", "Thursday"), ("Wednesday", "Friday"), ("Monday", "Thursday")]
+SLOTS = [(8, 0), (9, 30), (11, 0), (12, 30), (14, 0), (15, 30), (17, 0)]
+
+
+def term_start(year, semester):
+    month, day = SEMESTER_START[semester]
+    return date(year, month, day)
+
+
+def counts_for(scale, overrides=None):
+    r = dict(RATIOS, **(overrides or {}))
+    students = max(10, int(r["students"] * scale))
+    departments = max(5, students // int(r["students_per_department"]))
+    courses = max(10, students // int(r["students_per_course"]))
+    clubs = max(5, students // int(r["students_per_club"]))
+    return {
+        "students": students,
+        "faculty": max(5, students // int(r["students_per_faculty"])),
+        "staff": max(5, students // int(r["students_per_staff"])),
+        "departments": departments,
+        "buildings": max(3, departments // 2 + 2),
+        "courses": courses,
+        "sections": courses * int(r["sections_per_course"]),
+        "books": max(10, students // int(r["students_per_book"])),
+        "clubs": clubs,
+        "scholarships": 25,
+        "ratios": r,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Bulk writers
+
+class RowsWriter:
+    def __init__(self, cursor, table, columns, batch_size, multirow):
+        self.cursor = cursor
+        self.table = table
+        self.columns = columns
+        self.batch_size = batch_size
+        self.multirow = multirow
+        self.count = 0
+        self._rows = []
+        self._insert = f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+        self._tuple = "(" + ", ".join(["%s"] * len(columns)) + ")"
+
+    def add(self, row):
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        if self.multirow:
+            # One round trip per batch: INSERT ... VALUES (...), (...), ...
+            sql = self._insert + ", ".join([self._tuple] * len(self._rows))
+            self.cursor.execute(sql, [value for row in self._rows for value in row])
+        else:
+            self.cursor.executemany(self._insert + self._tuple, self._rows)
+        self.count += len(self._rows)
+        self._rows = []
+
+    def close(self):
+        self.flush()
+
+
+# MySQL fast path: spool to CSV and LOAD DATA LOCAL INFILE on close
+class LoadDataWriter:
+    def __init__(self, cursor, table, columns):
+        self.cursor = cursor
+        self.table = table
+        self.columns = columns
+        self.count = 0
+        self._file = tempfile.NamedTemporaryFile("w", suffix=f"_{table}.csv", delete=False, newline="")
+        self._csv = csv.writer(self._file, lineterminator="\n")
+
+    def add(self, row):
+        self._csv.writerow(["\\N" if value is None else value for value in row])
+        self.count += 1
+
+    def close(self):
+        self._file.close()
+        try:
+            self.cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {self.table} "
+                "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+                f"LINES TERMINATED BY '\\n' ({', '.join(self.columns)})",
+                (self._file.name,))
+        finally:
+            os.unlink(self._file.name)
+
+
+class Loader:
+    def __init__(self, backend, conn, batch_size=1000, fast=False):
+        self.backend = backend
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.batch_size = batch_size
+        self.fast = fast and backend.name == "mysql"
+        self.loaded = {}
+
+    def __enter__(self):
+        # Rows are generated consistent, so skip per-row FK checks during the load
+        if self.backend.name == "mysql":
+            self.cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+            self.cursor.execute("SET UNIQUE_CHECKS = 0")
+        else:
+            self.conn.commit()
+            self.cursor.execute("PRAGMA foreign_keys = OFF")
+            self.cursor.execute("PRAGMA synchronous = OFF")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.commit()
+        else:
+            self.conn.rollback()
+        if self.backend.name == "mysql":
+            self.cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+            self.cursor.execute("SET UNIQUE_CHECKS = 1")
+        else:
+            self.cursor.execute("PRAGMA foreign_keys = ON")
+            self.cursor.execute("PRAGMA synchronous = NORMAL")
+        self.cursor.close()
+
+    def table(self, name, columns):
+        if self.fast:
+            return LoadDataWriter(self.cursor, name, columns)
+        return RowsWriter(self.cursor, name, columns, self.batch_size, multirow=self.backend.name == "mysql")
+
+    # Write every row from an iterable into one table
+    def load(self, name, columns, rows):
+        writer = self.table(name, columns)
+        for row in rows:
+            writer.add(row)
+        self.done(writer)
+
+    def done(self, *writers):
+        for writer in writers:
+            writer.close()
+            self.loaded[writer.table] = self.loaded.get(writer.table, 0) + writer.count
+
+
+def _next_id(cursor, table, column):
+    cursor.execute(f"SELECT COALESCE(MAX({column}), 0) FROM {table}")
+    return cursor.fetchone()[0] + 1
+
+
+# ---------------------------------------------------------------------------
+# Generation
+
+def generate(backend, conn, scale=1.0, seed=42, overrides=None, batch_size=1000, fast=False):
+    n = counts_for(scale, overrides)
+    r = n["ratios"]
+    cursor = conn.cursor()
+    ids = {table: _next_id(cursor, table, column) for table, column in [
+        ("Building", "building_id"), ("Room", "room_id"), ("Department", "dept_id"),
+        ("Person", "person_id"), ("Faculty", "faculty_id"), ("Staff", "staff_id"),
+        ("Student", "student_id"), ("Course", "course_id"), ("Section", "section_id"),
+        ("Schedule", "schedule_id"), ("Grade", "grade_id"), ("Student_Record", "record_id"),
+        ("Transcript", "transcript_id"), ("Degree_Program", "program_id"), ("Requirement", "req_id"),
+        ("Facility", "facility_id"), ("Library_Book", "book_id"), ("Checkout_Record", "checkout_id"),
+        ("Student_Tuition", "tuition_id"), ("Scholarship", "scholarship_id"), ("Payment", "payment_id"),
+        ("Financial_Aid", "aid_id"), ("Club", "club_id"), ("Event", "event_id"),
+    ]}
+    cursor.close()
+
+    def rng(name):
+        return random.Random(f"{seed}:{name}")
+
+    dept_ids = range(ids["Department"], ids["Department"] + n["departments"])
+    building_ids = range(ids["Building"], ids["Building"] + n["buildings"])
+    faculty_ids = range(ids["Faculty"], ids["Faculty"] + n["faculty"])
+    staff_ids = range(ids["Staff"], ids["Staff"] + n["staff"])
+    student_ids = range(ids["Student"], ids["Student"] + n["students"])
+    course_ids = range(ids["Course"], ids["Course"] + n["courses"])
+    faculty_person = ids["Person"]
+    staff_person = faculty_person + n["faculty"]
+    student_person = staff_person + n["staff"]
+
+    with Loader(backend, conn, batch_size, fast) as loader:
+        # Buildings and rooms
+        g = rng("building")
+        loader.load("Building", ["building_id", "building_name", "location", "floors"], (
+            (b, f"{SUBJECTS[i % len(SUBJECTS)]} Hall {b}", g.choice(["North", "South", "East", "West", "Central"]) + " Campus",
+             g.randint(2, 8)) for i, b in enumerate(building_ids)))
+        rooms = []  # (building_id, room_number) used for section rooms
+        room_rows = []
+        room_id = ids["Room"]
+        for b in building_ids:
+            for k in range(30):
+                number = f"{k // 10 + 1}{k % 10:02d}"
+                rooms.append(f"B{b}-{number}")
+                room_rows.append((room_id, b, number, g.choice([20, 30, 40, 60, 120]),
+                                  g.choice(["Classroom", "Classroom", "Lab", "Office", "Auditorium"])))
+                room_id += 1
+        loader.load("Room", ["room_id", "building_id", "room_number", "capacity", "room_type"], room_rows)
+
+        # Departments (heads are faculty generated below)
+        g = rng("department")
+        loader.load("Department", ["dept_id", "dept_name", "building", "budget", "head_faculty_id"], (
+            (d, f"{SUBJECTS[i % len(SUBJECTS)]} {i // len(SUBJECTS) + 1} ({seed}-{d})",
+             f"{SUBJECTS[i % len(SUBJECTS)]} Hall", round(g.uniform(2e5, 2e6), 2),
+             faculty_ids[i % n["faculty"]]) for i, d in enumerate(dept_ids)))
+
+        # People: faculty, then staff, then students, in contiguous person_id blocks
+        g = rng("person")
+        person = loader.table("Person", ["person_id", "first_name", "last_name", "date_of_birth", "gender",
+                                         "contact_number", "email", "person_type"])
+
+        def add_person(person_id, kind, oldest, youngest):
+            first, last = g.choice(FIRST_NAMES), g.choice(LAST_NAMES)
+            born = date(oldest, 1, 1) + timedelta(days=g.randint(0, (youngest - oldest) * 365))
+            person.add((person_id, first, last, born, g.choice(["Male", "Female", "Other"]),
+                        f"555-{person_id:07d}", f"{first}.{last}.{person_id}@gen.university.edu".lower(), kind))
+
+        for i in range(n["faculty"]):
+            add_person(faculty_person + i, "Faculty", 1950, 1990)
+        for i in range(n["staff"]):
+            add_person(staff_person + i, "Staff", 1960, 2000)
+        for i in range(n["students"]):
+            add_person(student_person + i, "Student", 1995, 2007)
+        loader.done(person)
+
+        g = rng("faculty")
+        loader.load("Faculty", ["faculty_id", "person_id", "hire_date", "faculty_rank", "specialization", "dept_id"], (
+            (f, faculty_person + i, date(1995, 1, 1) + timedelta(days=g.randint(0, 30 * 365)),
+             g.choice(["Professor", "Associate Professor", "Assistant Professor", "Lecturer"]),
+             g.choice(SUBJECTS), dept_ids[i % n["departments"]]) for i, f in enumerate(faculty_ids)))
+        g = rng("staff")
+        loader.load("Staff", ["staff_id", "person_id", "position", "department"], (
+            (s, staff_person + i, g.choice(["Administrative Assistant", "Librarian", "Lab Technician",
+                                             "Financial Officer", "IT Support Specialist"]),
+             g.choice(["Registrar Office", "University Library", "Finance Department", "Information Technology"]))
+            for i, s in enumerate(staff_ids)))
+
+        g = rng("student")
+        student_dept = {}
+        student_start = {}
+        student_status = {}
+        student_rows = loader.table("Student", ["student_id", "person_id", "enrollment_date", "graduation_date",
+                                                "status", "dept_id"])
+        for i, s in enumerate(student_ids):
+            start_year = g.randint(FIRST_YEAR, CURRENT_YEAR)
+            started = term_start(start_year, g.choice(["Spring", "Fall"]))
+            status = "Graduated" if start_year <= CURRENT_YEAR - 4 and g.random() < 0.7 else \
+                g.choices(["Active", "Inactive", "Suspended"], [90, 7, 3])[0]
+            graduated = date(start_year + 4, 5, 15) if status == "Graduated" else None
+            dept = dept_ids[g.randrange(n["departments"])]
+            student_dept[s], student_start[s], student_status[s] = dept, started, status
+            student_rows.add((s, student_person + i, started, graduated, status, dept))
+        loader.done(student_rows)
+
+        # Courses and an acyclic prerequisite graph (prereqs always have smaller ids)
+        g = rng("course")
+        course_credits = {}
+        course_rows = loader.table("Course", ["course_id", "title", "credits", "description", "dept_id"])
+        prereq_rows = loader.table("Prerequisite", ["course_id", "prereq_course_id"])
+        for i, c in enumerate(course_ids):
+            dept_index = i % n["departments"]
+            subject = SUBJECTS[dept_index % len(SUBJECTS)]
+            course_credits[c] = g.choice([3, 3, 4, 4, 2])
+            course_rows.add((c, f"{g.choice(COURSE_TOPICS)} {subject} {100 + i // n['departments']}",
+                             course_credits[c], f"Synthetic course {c}", dept_ids[dept_index]))
+            earlier = list(range(course_ids[0] + dept_index, c, n["departments"]))[-6:]
+            for prereq in g.sample(earlier, min(len(earlier), g.choice([0, 1, 1, 2]))):
+                prereq_rows.add((c, prereq))
+        loader.done(course_rows, prereq_rows)
+
+        # Sections spread over every term, each meeting twice a week
+        g = rng("section")
+        sections_by_term = {term: [] for term in TERMS}
+        section_course = {}
+        section_rows = loader.table("Section", ["section_id", "course_id", "semester", "year", "room_number", "faculty_id"])
+        schedule_rows = loader.table("Schedule", ["schedule_id", "section_id", "day_of_week", "start_time", "end_time"])
+        schedule_id = ids["Schedule"]
+        for k in range(n["sections"]):
+            section_id = ids["Section"] + k
+            course = course_ids[k % n["courses"]]
+            year, semester = TERMS[g.randrange(len(TERMS))]
+            sections_by_term[(year, semester)].append(section_id)
+            section_course[section_id] = course
+            section_rows.add((section_id, course, semester, year, g.choice(rooms), g.choice(faculty_ids)))
+            hour, minute = g.choice(SLOTS)
+            for day in g.choice(DAY_PAIRS):
+                schedule_rows.add((schedule_id, section_id, day, timedelta(hours=hour, minutes=minute),
+                                   timedelta(hours=hour + 1, minutes=minute + 15)))
+                schedule_id += 1
+        loader.done(section_rows, schedule_rows)
+
+        # Enrollments with grades, plus the student records and transcripts derived from them
+        g = rng("enrollment")
+        grade_rows = loader.table("Grade", ["grade_id", "letter_grade", "points", "date_recorded", "section_id"])
+        enrollment_rows = loader.table("Enrollment", ["student_id", "section_id", "enrollment_date", "grade_id"])
+        record_rows = loader.table("Student_Record", ["record_id", "student_id", "gpa", "total_credits", "standing"])
+        transcript_rows = loader.table("Transcript", ["transcript_id", "student_id", "issue_date"])
+        transcript_grade_rows = loader.table("Transcript_Grade", ["transcript_id", "grade_id"])
+        grade_id, transcript_id = ids["Grade"], ids["Transcript"]
+        current_index = TERMS.index((CURRENT_YEAR, CURRENT_SEMESTER))
+        per_student = int(r["enrollments_per_student"])
+        for k, s in enumerate(student_ids):
+            first_term = next(i for i, (y, sem) in enumerate(TERMS) if term_start(y, sem) >= student_start[s])
+            open_terms = [t for t in TERMS[first_term:current_index + 1] if sections_by_term[t]]
+            chosen = set()
+            graded = []
+            for _ in range(per_student if open_terms else 0):
+                term = g.choice(open_terms)
+                section_id = g.choice(sections_by_term[term])
+                if section_id in chosen:
+                    continue
+                chosen.add(section_id)
+                started = term_start(*term)
+                enrolled = started - timedelta(days=g.randint(3, 40))
+                this_grade = None
+                if term != (CURRENT_YEAR, CURRENT_SEMESTER) and g.random() < r["graded_fraction"]:
+                    letter, points = g.choices(GRADES, GRADE_WEIGHTS)[0]
+                    grade_rows.add((grade_id, letter, points, started + timedelta(days=110), section_id))
+                    this_grade = grade_id
+                    graded.append((grade_id, points, course_credits[section_course[section_id]]))
+                    grade_id += 1
+                enrollment_rows.add((s, section_id, enrolled, this_grade))
+            credits = sum(c for _, _, c in graded)
+            gpa = round(sum(p * c for _, p, c in graded) / credits, 2) if credits else None
+            standing = ["Freshman", "Sophomore", "Junior", "Senior"][min(3, credits // 30)]
+            record_rows.add((ids["Student_Record"] + k, s, gpa, credits, standing))
+            if student_status[s] == "Graduated" and graded:
+                transcript_rows.add((transcript_id, s, date(CURRENT_YEAR, 1, 10)))
+                for gid, _, _ in graded:
+                    transcript_grade_rows.add((transcript_id, gid))
+                transcript_id += 1
+        loader.done(grade_rows, enrollment_rows, record_rows, transcript_rows, transcript_grade_rows)
+
+        # Degree programs, requirements and program enrollment
+        g = rng("program")
+        programs_by_dept = {}
+        program_rows = loader.table("Degree_Program", ["program_id", "program_name", "total_credits_required", "dept_id"])
+        requirement_rows = loader.table("Requirement", ["req_id", "program_id", "req_type", "credits_required", "description"])
+        program_id, req_id = ids["Degree_Program"], ids["Requirement"]
+        for i, d in enumerate(dept_ids):
+            for degree in ("Bachelor of Science", "Bachelor of Arts"):
+                program_rows.add((program_id, f"{degree} in {SUBJECTS[i % len(SUBJECTS)]} ({d})",
+                                  g.choice([110, 120, 130]), d))
+                programs_by_dept.setdefault(d, []).append(program_id)
+                for req_type, credits in (("Core", 60), ("Elective", 30), ("General", 30)):
+                    requirement_rows.add((req_id, program_id, req_type, credits, f"{req_type} requirement"))
+                    req_id += 1
+                program_id += 1
+        loader.done(program_rows, requirement_rows)
+        loader.load("Program_Enrollment", ["student_id", "program_id", "enrollment_date", "expected_graduation"], (
+            (s, g.choice(programs_by_dept[student_dept[s]]), student_start[s],
+             student_start[s].replace(year=student_start[s].year + 4, month=5, day=15)) for s in student_ids))
+
+        # Facilities, library books and checkout history (at most one open checkout per book)
+        g = rng("library")
+        facility_rows = [(ids["Facility"] + i, kind, f"{kind} Building {i}", g.choice(staff_ids))
+                         for i, kind in enumerate(["Library", "Library", "Gym", "Cafeteria", "Lab", "Lab"])]
+        library_ids = [row[0] for row in facility_rows if row[1] == "Library"]
+        loader.load("Facility", ["facility_id", "facility_type", "location", "manager_staff_id"], facility_rows)
+        book_rows = loader.table("Library_Book", ["book_id", "title", "author", "isbn", "status", "facility_id"])
+        checkout_rows = loader.table("Checkout_Record", ["checkout_id", "book_id", "student_id", "checkout_date",
+                                                         "due_date", "return_date"])
+        checkout_id = ids["Checkout_Record"]
+        today = term_start(CURRENT_YEAR, CURRENT_SEMESTER) + timedelta(days=30)
+        for k in range(n["books"]):
+            book_id = ids["Library_Book"] + k
+            history = int(g.expovariate(1 / r["checkouts_per_book"]))
+            day = today - timedelta(days=365 * 3)
+            status = "Lost" if g.random() < 0.01 else "Available"
+            for h in range(history):
+                day += timedelta(days=g.randint(1, 120))
+                if day >= today:
+                    break
+                is_open = h == history - 1 and status == "Available" and g.random() < 0.3
+                due = day + timedelta(days=21)
+                returned = None if is_open else min(today, due + timedelta(days=g.randint(-14, 20)))
+                checkout_rows.add((checkout_id, book_id, g.choice(student_ids), day, due, returned))
+                checkout_id += 1
+                if is_open:
+                    status = "Checked Out"
+                else:
+                    day = returned
+            book_rows.add((book_id, f"{g.choice(COURSE_TOPICS)} {g.choice(SUBJECTS)} Vol. {k % 7 + 1}",
+                           f"{g.choice(FIRST_NAMES)} {g.choice(LAST_NAMES)}", f"979{book_id:010d}", status,
+                           g.choice(library_ids)))
+        loader.done(book_rows, checkout_rows)
+
+        # Tuition, payments, scholarships and aid
+        g = rng("finance")
+        scholarship_ids = range(ids["Scholarship"], ids["Scholarship"] + n["scholarships"])
+        loader.load("Scholarship", ["scholarship_id", "name", "amount", "criteria", "donor"], (
+            (sid, f"{g.choice(SUBJECTS)} Scholarship {sid}", g.choice([1000, 2500, 5000, 10000]),
+             g.choice(["GPA 3.5+", "Demonstrated financial need", "STEM majors", "Research"]),
+             f"{g.choice(LAST_NAMES)} Foundation") for sid in scholarship_ids))
+        billed_terms = TERMS[current_index - int(r["terms_billed"]) + 1:current_index + 1]
+        tuition_rows = loader.table("Student_Tuition", ["tuition_id", "student_id", "amount", "due_date", "status",
+                                                        "semester", "year"])
+        payment_rows = loader.table("Payment", ["payment_id", "student_id", "amount", "payment_date", "method", "tuition_id"])
+        award_rows = loader.table("Student_Scholarship", ["student_id", "scholarship_id", "award_date", "amount_awarded",
+                                                          "semester", "year"])
+        aid_rows = loader.table("Financial_Aid", ["aid_id", "student_id", "aid_type", "amount", "terms",
+                                                  "application_date", "status"])
+        tuition_id, payment_id, aid_id = ids["Student_Tuition"], ids["Payment"], ids["Financial_Aid"]
+        for s in student_ids:
+            if student_status[s] != "Active":
+                continue
+            for year, semester in billed_terms:
+                amount = 5000.00
+                due = term_start(year, semester) + timedelta(days=30)
+                status = g.choices(["Paid", "Partial", "Unpaid"], [70, 15, 15])[0]
+                tuition_rows.add((tuition_id, s, amount, due, status, semester, year))
+                if status != "Unpaid":
+                    paid = amount if status == "Paid" else round(amount * g.uniform(0.2, 0.8), 2)
+                    payment_rows.add((payment_id, s, paid, f"{due - timedelta(days=g.randint(0, 25))} 10:00:00",
+                                      g.choice(["Credit Card", "Debit Card", "Bank Transfer", "Cash", "Check"]),
+                                      tuition_id))
+                    payment_id += 1
+                tuition_id += 1
+            if g.random() < r["scholarship_fraction"]:
+                year, semester = billed_terms[-1]
+                award_rows.add((s, g.choice(scholarship_ids), term_start(year, semester) - timedelta(days=30),
+                                g.choice([500, 1000, 2500]), semester, year))
+            if g.random() < r["aid_fraction"]:
+                aid_rows.add((aid_id, s, g.choice(["Loan", "Grant", "Work Study"]), g.choice([1000, 2000, 4000]),
+                              "Synthetic terms", term_start(*billed_terms[0]) - timedelta(days=60),
+                              g.choices(["Approved", "Pending", "Denied"], [75, 15, 10])[0]))
+                aid_id += 1
+        loader.done(tuition_rows, payment_rows, award_rows, aid_rows)
+
+        # Clubs, memberships and events
+        g = rng("club")
+        club_ids = range(ids["Club"], ids["Club"] + n["clubs"])
+        loader.load("Club", ["club_id", "club_name", "description", "meeting_schedule", "faculty_advisor_id"], (
+            (c, f"{g.choice(SUBJECTS)} Society {c}", "Synthetic club",
+             f"Every {g.choice(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday'])} {g.randint(3, 7)}pm",
+             g.choice(faculty_ids)) for c in club_ids))
+        membership_rows = loader.table("Club_Membership", ["student_id", "club_id", "join_date", "role"])
+        for s in student_ids:
+            if g.random() < r["club_membership_fraction"]:
+                for c in g.sample(club_ids, min(len(club_ids), g.randint(1, 3))):
+                    membership_rows.add((s, c, student_start[s] + timedelta(days=g.randint(10, 300)),
+                                         g.choices(["Member", "Officer", "President"], [90, 8, 2])[0]))
+        loader.done(membership_rows)
+        event_rows = loader.table("Event", ["event_id", "event_name", "event_date", "location", "description",
+                                            "organizer_type", "organizer_club_id", "organizer_dept_id"])
+        event_id = ids["Event"]
+        for c in club_ids:
+            for _ in range(2):
+                event_rows.add((event_id, f"Club Meetup {event_id}", term_start(*g.choice(TERMS)),
+                                "Student Center", "Synthetic event", "Club", c, None))
+                event_id += 1
+        for d in dept_ids:
+            event_rows.add((event_id, f"Department Colloquium {event_id}", term_start(*g.choice(TERMS)),
+                            "Main Auditorium", "Synthetic event", "Department", None, d))
+            event_id += 1
+        loader.done(event_rows)
+
+    # Bulk loads bypass the write-path hooks, so recompute the dashboard summaries,
+    # the student records' grade points, the library and people search indexes and the ledgers
+    if summaries_exist(conn, backend):
+        rebuild(conn)
+    if records_tracked(conn, backend):
+        recompute_all(conn, backend)
+    if library.search_indexed(conn, backend):
+        library.rebuild_search_index(conn, backend)
+    if people.search_indexed(conn, backend):
+        people.rebuild_search_index(conn, backend)
+    if ledgers_kept(conn, backend):
+        rebuild_ledgers(conn, backend)
+    return loader.loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fill every table with deterministic synthetic data")
+    parser.add_argument("--scale", type=float, default=1.0, help="1.0 = 1,000 students; counts scale linearly")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--backend", help="mysql or sqlite (defaults to UMS_BACKEND)")
+    parser.add_argument("--path", help="SQLite database file (created from data/query.sql if missing)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="rows per multi-row INSERT / executemany")
+    parser.add_argument("--fast", action="store_true", help="MySQL only: bulk load through LOAD DATA LOCAL INFILE")
+    parser.add_argument("--set", action="append", default=[], metavar="RATIO=VALUE",
+                        help=f"override a ratio ({', '.join(RATIOS)})")
+    args = parser.parse_args(argv)
+
+    overrides = {}
+    for item in args.set:
+        key, _, value = item.partition("=")
+        if key not in RATIOS:
+            parser.error(f"unknown ratio {key}")
+        overrides[key] = float(value)
+
+    if args.path:
+        backend = SQLiteBackend(args.path)
+    else:
+        backend = create_backend(args.backend)
+    conn = backend.connect(allow_local_infile=True) if args.fast and backend.name == "mysql" else backend.connect()
+    # Bring the schema up to date first, so the summaries, grade points, search
+    # indexes and ledgers exist and are rebuilt over the generated rows
+    for name in apply_pending(conn, backend):
+        print(f"applied {name}")
+    started = time.perf_counter()
+    try:
+        loaded = generate(backend, conn, args.scale, args.seed, overrides, args.batch_size, args.fast)
+    finally:
+        conn.close()
+    elapsed = time.perf_counter() - started
+    total = sum(loaded.values())
+    for table, count in loaded.items():
+        print(f"{table:22} {count:>12,}")
+    print(f"\n{total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+import os
+import threading
+import time
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from ums.backends import create_backend
+from ums.cache import QueryCache, written_tables
+from ums.jobs import WORKERS, JobWatcher, WorkerPool
+from ums.migrate import apply_pending
+from ums.pool import ConnectionPool, PoolTimeout
+from ums.prerequisites import PrerequisiteService
+from ums.profiler import get_profiler, wrap_cursor
+from ums.replicas import REPLICAS, ReadRouter, Replica
+
+# Connection pool settings (override through the environment)
+POOL_SIZE = int(os.environ.get("UMS_POOL_SIZE", "5"))
+POOL_IDLE_TIMEOUT = float(os.environ.get("UMS_POOL_IDLE_TIMEOUT", "300"))
+POOL_MAX_LIFETIME = float(os.environ.get("UMS_POOL_MAX_LIFETIME", "3600"))
+POOL_CHECKOUT_TIMEOUT = float(os.environ.get("UMS_POOL_CHECKOUT_TIMEOUT", "10"))
+
+# Query result cache settings
+CACHE_TTL = float(os.environ.get("UMS_CACHE_TTL", "60"))
+CACHE_MAX_MB = float(os.environ.get("UMS_CACHE_MAX_MB", "64"))
+
+# Common TTLs for fetch_data(ttl=...)
+TTL_LOOKUP = 300      # dropdown sources such as the department list
+TTL_AGGREGATE = 30    # dashboard counts
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+# The configured storage backend (UMS_BACKEND=mysql|sqlite), created once per process
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                backend = create_backend()
+                if backend.name == "sqlite":
+                    # Embedded databases are owned by the app, so keep them migrated
+                    conn = backend.connect()
+                    try:
+                        apply_pending(conn, backend)
+                    finally:
+                        conn.close()
+                _backend = backend
+    return _backend
+
+
+# Driver exception class(es) for the active backend, for use in except clauses
+def database_error():
+    return get_backend().Error
+
+
+def _new_pool(backend):
+    return ConnectionPool(
+        backend.connect,
+        size=POOL_SIZE,
+        validate=backend.validate,
+        # End any open transaction so the next borrower doesn't see a stale snapshot
+        reset=backend.reset,
+        idle_timeout=POOL_IDLE_TIMEOUT,
+        max_lifetime=POOL_MAX_LIFETIME,
+        checkout_timeout=POOL_CHECKOUT_TIMEOUT,
+        # Times every statement for the query profiler
+        wrap_cursor=wrap_cursor,
+        cancel=backend.cancel
+    )
+
+
+# One pool per server process, shared by every session and kept across reruns.
+# This is the primary: all writes and transactions use it.
+@st.cache_resource(show_spinner=False)
+def get_pool():
+    return _new_pool(get_backend())
+
+
+# Routes fetch_data reads to the replicas in UMS_REPLICAS (see ums/replicas.py)
+@st.cache_resource(show_spinner=False)
+def get_router():
+    backend = get_backend()
+    replicas = []
+    for spec in REPLICAS:
+        replica_backend = backend.replica(spec)
+        replicas.append(Replica(spec, replica_backend, _new_pool(replica_backend)))
+    return ReadRouter(get_pool(), replicas)
+
+
+# Result cache shared by all sessions; writes made through this module invalidate it
+@st.cache_resource(show_spinner=False)
+def get_query_cache():
+    return QueryCache(max_bytes=int(CACHE_MAX_MB * 1024 * 1024), default_ttl=CACHE_TTL)
+
+
+# Prerequisite graph shared by all sessions (see ums/prerequisites.py). It is
+# read from the primary and rebuilt after writes to Prerequisite.
+@st.cache_resource(show_spinner=False)
+def get_prerequisites():
+    return PrerequisiteService(lambda: get_pool().connection(),
+                               lambda: get_query_cache().table_version("prerequisite"))
+
+
+# Background job workers for this server (UMS_JOB_WORKERS processes, see
+# ums/jobs.py). Call ensure() on the result to restart any that died.
+@st.cache_resource(show_spinner=False)
+def get_job_workers():
+    get_backend()  # migrate an embedded database before the workers open it
+    return WorkerPool(WORKERS)
+
+
+# Drops the cached reads of the tables a job wrote once it succeeds, for
+# every session (jobs run in other processes, so no write here invalidates)
+@st.cache_resource(show_spinner=False)
+def get_job_watcher():
+    cache = get_query_cache()
+    watcher = JobWatcher(get_backend(), lambda tables: cache.invalidate_tables(*tables))
+    watcher.start()
+    return watcher
+
+
+# Record a committed write, so this session reads its own writes from the
+# primary until the replicas have caught up
+def note_write():
+    get_router().note_write()
+    if get_script_run_ctx() is not None:
+        st.session_state["db_last_write"] = time.time()
+
+
+def session_last_write():
+    if get_script_run_ctx() is None:
+        return None
+    return st.session_state.get("db_last_write")
+
+
+# Drop cached reads of the given tables. Call after committing writes made
+# on a connection from get_connection() rather than through execute_query.
+def invalidate_tables(*tables):
+    note_write()
+    get_query_cache().invalidate_tables(*tables)
+
+
+# Database Connection Function with improved error handling
+# Borrows from the pool; conn.close() hands the connection back
+def get_connection():
+    try:
+        return get_pool().connection()
+    except (database_error(), PoolTimeout) as err:
+        st.error(f"Database connection failed: {err}")
+        return None
+
+
+# A connection for read-only work (reports, exports): a replica when one is
+# usable for this session, otherwise the primary
+def get_read_connection():
+    try:
+        return get_router().reader(session_last_write())[0]
+    except (database_error(), PoolTimeout) as err:
+        st.error(f"Database connection failed: {err}")
+        return None
+
+
+# Enhanced fetch_data function with transaction management
+# Results are served from the query cache for `ttl` seconds (None = default, 0 = bypass)
+def fetch_data(query, params=None, ttl=None):
+    cache = get_query_cache()
+    if ttl != 0:
+        cached = cache.get(query, params)
+        if cached is not None:
+            get_profiler().record_cache_hit(query)
+            return list(cached)
+    generation = cache.generation()
+
+    try:
+        conn, fresh = get_router().reader(session_last_write())
+    except (database_error(), PoolTimeout) as err:
+        st.error(f"Database connection failed: {err}")
+        return []
+
+    try:
+        cursor = conn.cursor(dictionary=True)
+        if params:
+            cursor.execute(query, params)
+        else:
+            cursor.execute(query)
+        result = cursor.fetchall()
+        # A replica that may be behind this process's writes must not refill the shared cache
+        if fresh:
+            cache.put(query, result, params, ttl, generation)
+        return list(result)
+    except database_error() as err:
+        st.error(f"Database query error: {err}")
+        return []
+    finally:
+        conn.close()
+
+
+# Enhanced execute_query function with transaction management
+# `before`/`after` (optional) are called with the cursor around the statement,
+# inside the same transaction (e.g. summary-table maintenance)
+def execute_query(query, params=None, many=False, before=None, after=None):
+    conn = get_connection()
+    if not conn:
+        return False, "Connection failed"
+
+    try:
+        cursor = conn.cursor()
+
+        if before:
+            before(cursor)
+        if many and isinstance(params, list):
+            cursor.executemany(query, params)
+        else:
+            cursor.execute(query, params)
+        if after:
+            after(cursor)
+
+        conn.commit()
+        note_write()
+        get_query_cache().invalidate_for(query)
+        return True, "Operation completed successfully"
+    except database_error() as err:
+        conn.rollback()
+        return False, f"Database error: {err}"
+    finally:
+        conn.close()
+
+
+# Several statements in one transaction, each run once with executemany over
+# its parameter list, followed by one cache invalidation covering every table
+# written. `batches` is a list of (query, params_list); empty lists are skipped.
+def execute_batch(batches, after=None):
+    batches = [(query, rows) for query, rows in batches if rows]
+    conn = get_connection()
+    if not conn:
+        return False, "Connection failed"
+
+    try:
+        cursor = conn.cursor()
+        for query, rows in batches:
+            cursor.executemany(query, rows)
+        if after:
+            after(cursor)
+
+        conn.commit()
+        note_write()
+        tables = set()
+        for query, _ in batches:
+            tables |= written_tables(query)
+        if tables:
+            get_query_cache().invalidate_tables(*tables)
+        return True, "Operation completed successfully"
+    except database_error() as err:
+        conn.rollback()
+        return False, f"Database error: {err}"
+    finally:
+        conn.close()
@@ -0,0 +1,64 @@
+import argparse
+
+from ums.backends import create_backend
+from ums.queries import registered_queries
+
+# Runs EXPLAIN on every registered query and flags full table scans and
+# sorts that spill to a temporary structure.
+#
+#   python -m ums.explain [--backend sqlite] [--verbose] [--fail-on-scan]
+
+
+def explain_all(backend, conn):
+    report = []
+    for name, sql, params in registered_queries():
+        try:
+            plan = backend.explain(conn, sql, params)
+        except backend.Error as err:
+            report.append({"name": name, "error": str(err), "plan": [], "scans": [], "sorts": []})
+            continue
+        report.append({
+            "name": name,
+            "plan": plan,
+            "scans": [step["table"] for step in plan if step["full_scan"]],
+            "sorts": [step["detail"] for step in plan if step["sort"]],
+        })
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EXPLAIN every registered query and flag full scans")
+    parser.add_argument("--backend", help="mysql or sqlite (defaults to UMS_BACKEND)")
+    parser.add_argument("--verbose", action="store_true", help="print the full plan for every query")
+    parser.add_argument("--fail-on-scan", action="store_true", help="exit with status 1 if any query scans a table")
+    args = parser.parse_args(argv)
+
+    backend = create_backend(args.backend)
+    conn = backend.connect()
+    try:
+        report = explain_all(backend, conn)
+    finally:
+        conn.close()
+
+    flagged = 0
+    for entry in report:
+        if "error" in entry:
+            status = f"ERROR {entry['error']}"
+        elif entry["scans"]:
+            status = "FULL SCAN " + ", ".join(str(t) for t in entry["scans"])
+            flagged += 1
+        else:
+            status = "ok"
+        if entry.get("sorts"):
+            status += " (temp sort)"
+        print(f"{entry['name']:45} {status}")
+        if args.verbose:
+            for step in entry["plan"]:
+                print(f"    {step['detail'] or step}")
+    print(f"\n{flagged} of {len(report)} queries scan a full table")
+    if args.fail_on_scan and flagged:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
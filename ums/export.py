@@ -0,0 +1,227 @@
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+import streamlit as st
+
+from ums.db import get_read_connection, database_error
+
+# Streaming export of a view to CSV, Parquet or Excel. Rows come off an
+# unbuffered cursor with fetchmany() and go straight to a chunked writer on
+# disk, so memory stays at one chunk whatever the table size. Column choice,
+# filters and sort order are part of the SQL (see build_export_query).
+#
+#   python -m ums.export enrollments --format parquet --out enrollments.parquet
+#   python -m ums.export payments --columns payment_id,amount --filter "method=Cash"
+
+CHUNK_SIZE = 5000
+FORMATS = {"CSV": "csv", "Parquet": "parquet", "Excel": "xlsx"}
+EXCEL_MAX_ROWS = 1048575  # per sheet, leaving room for the header
+DECIMAL_SCALE = 2         # every DECIMAL column in the schema has two places
+
+
+def _csv_writer(path, columns):
+    f = open(path, "w", newline="", encoding="utf-8")
+    writer = csv.writer(f)
+    writer.writerow(columns)
+    return writer.writerows, f.close
+
+
+def _parquet_writer(path, columns):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+    state = {"writer": None, "schema": None}
+
+    # Column type from the first chunk. All-NULL columns fall back to strings;
+    # DECIMALs are widened to the largest precision (and at least DECIMAL_SCALE
+    # places), since the chunk only shows the digits its own values have.
+    def field_for(name, values):
+        kind = pa.array(values).type
+        if pa.types.is_null(kind):
+            kind = pa.string()
+        elif pa.types.is_decimal(kind):
+            kind = pa.decimal128(38, max(kind.scale, DECIMAL_SCALE))
+        return pa.field(name, kind)
+
+    def write(rows):
+        arrays = list(zip(*rows))
+        try:
+            if state["writer"] is None:
+                state["schema"] = pa.schema([field_for(name, values) for name, values in zip(columns, arrays)])
+                state["writer"] = pq.ParquetWriter(path, state["schema"])
+            schema = state["schema"]
+            batch = []
+            for field, values in zip(schema, arrays):
+                if pa.types.is_string(field.type):
+                    values = [None if v is None else str(v) for v in values]
+                batch.append(pa.array(values, type=field.type))
+            state["writer"].write_batch(pa.RecordBatch.from_arrays(batch, schema=schema))
+        except pa.ArrowException as err:
+            raise RuntimeError(f"Parquet export failed: {err}")
+
+    def close():
+        if state["writer"] is None:
+            pq.write_table(pa.table({name: pa.array([], pa.string()) for name in columns}), path)
+        else:
+            state["writer"].close()
+
+    return write, close
+
+
+def _excel_writer(path, columns):
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise RuntimeError("Excel export needs openpyxl (pip install openpyxl)")
+    # Write-only workbooks stream rows to disk instead of building the sheet in memory
+    workbook = Workbook(write_only=True)
+    state = {"sheet": None, "rows": EXCEL_MAX_ROWS}
+
+    def write(rows):
+        for row in rows:
+            if state["rows"] >= EXCEL_MAX_ROWS:
+                state["sheet"] = workbook.create_sheet(f"Sheet{len(workbook.worksheets) + 1}")
+                state["sheet"].append(columns)
+                state["rows"] = 0
+            state["sheet"].append(list(row))
+            state["rows"] += 1
+
+    def close():
+        if state["sheet"] is None:
+            workbook.create_sheet("Sheet1").append(columns)
+        workbook.save(path)
+
+    return write, close
+
+
+WRITERS = {"csv": _csv_writer, "parquet": _parquet_writer, "xlsx": _excel_writer}
+
+
+# Run `sql` and stream every row into `path`; returns the number of rows written
+def export_rows(conn, sql, params, fmt, path, chunk_size=CHUNK_SIZE, progress=None):
+    cursor = conn.cursor()
+    close = None
+    written = 0
+    try:
+        cursor.execute(sql, params)
+        columns = [d[0] for d in cursor.description]
+        write, close = WRITERS[fmt](path, columns)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            write(rows)
+            written += len(rows)
+            if progress:
+                progress(written)
+    finally:
+        if close:
+            close()
+        cursor.close()
+    return written
+
+
+# Export controls under a paged view. `build_query(columns)` returns the
+# (sql, params) for every row matching the view's current filter and sort.
+def export_panel(view_key, columns, total, build_query):
+    # Imported here so the CLI and the job worker don't load the page helpers
+    from ums import jobs
+    from ums.ui import job_panel, submit_job
+
+    with st.expander("Export"):
+        selected = st.multiselect("Columns", columns, default=columns, key=f"{view_key}_export_columns")
+        label = st.radio("Format", list(FORMATS), horizontal=True, key=f"{view_key}_export_format")
+        fmt = FORMATS[label]
+        st.caption(f"Exports all {total} rows matching the current filter, in the current sort order")
+        ready_key = f"{view_key}_export_file"
+
+        if st.button("Prepare export", key=f"{view_key}_export", disabled=not selected):
+            previous = st.session_state.pop(ready_key, None)
+            if previous and os.path.exists(previous[0]):
+                os.remove(previous[0])
+            sql, params = build_query(selected)
+            fd, path = tempfile.mkstemp(prefix=f"ums_{view_key}_", suffix=f".{fmt}")
+            os.close(fd)
+            # Large exports are the reads that benefit most from a replica
+            conn = get_read_connection()
+            if conn:
+                bar = st.progress(0.0)
+                try:
+                    count = export_rows(conn, sql, params, fmt, path,
+                                        progress=lambda n: bar.progress(min(1.0, n / total) if total else 1.0))
+                    st.session_state[ready_key] = (path, fmt, count)
+                except (database_error(), RuntimeError) as err:
+                    os.remove(path)
+                    st.error(f"Export failed: {err}")
+                finally:
+                    conn.close()
+
+        # A large export can run in a worker instead; the file is kept in the
+        # job directory until it is downloaded from the job's panel
+        if st.button("Export in background", key=f"{view_key}_export_job", disabled=not selected):
+            sql, params = build_query(selected)
+            job_params = {"sql": sql, "params": list(params or ()), "format": fmt, "total": total}
+            job_params["path"] = jobs.job_file(f"{view_key}_{jobs.params_key(job_params)[:12]}.{fmt}")
+            submit_job(f"export_{view_key}", "export", job_params)
+        job_panel(f"export_{view_key}")
+
+        ready = st.session_state.get(ready_key)
+        if ready and os.path.exists(ready[0]):
+            path, fmt, count = ready
+            # Streamlit reads the file when it registers the download; building it never
+            # held more than one chunk of rows
+            with open(path, "rb") as f:
+                st.download_button(f"Download {count} rows (.{fmt})", f, file_name=f"{view_key}.{fmt}",
+                                   key=f"{view_key}_export_download")
+
+
+def _parse_filter(text):
+    for operator in (">=", "<=", "^=", "~=", "="):
+        if operator in text:
+            column, value = text.split(operator, 1)
+            name = {">=": ">=", "<=": "<=", "^=": "starts with", "~=": "contains", "=": "equals"}[operator]
+            return column.strip(), name, value.strip()
+    raise argparse.ArgumentTypeError(f"bad filter {text!r}; use column=value, ~= contains, ^= starts with, >=, <=")
+
+
+def main(argv=None):
+    from ums.backends import create_backend
+    from ums.pagination import build_export_query, split_order_by
+    from ums.queries import EXPORT_VIEWS
+
+    parser = argparse.ArgumentParser(description="Stream a view to CSV, Parquet or Excel")
+    parser.add_argument("view", choices=sorted(EXPORT_VIEWS))
+    parser.add_argument("--format", choices=sorted(WRITERS), default="csv")
+    parser.add_argument("--out", help="output file (default <view>.<format>)")
+    parser.add_argument("--columns", help="comma-separated columns (default all)")
+    parser.add_argument("--filter", action="append", type=_parse_filter, default=[],
+                        help="column=value, column~=text (contains), column^=text (starts with), >=, <=")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--backend", help="mysql or sqlite (defaults to UMS_BACKEND)")
+    args = parser.parse_args(argv)
+
+    query, columns, keys = EXPORT_VIEWS[args.view]
+    base, sort, descending = split_order_by(query)
+    selected = args.columns.split(",") if args.columns else columns
+    sql, params = build_export_query(base, selected, columns, sort or keys[0], descending, keys, args.filter)
+    out = args.out or f"{args.view}.{args.format}"
+
+    backend = create_backend(args.backend)
+    conn = backend.connect()
+    started = time.perf_counter()
+    try:
+        count = export_rows(conn, sql, params, args.format, out, args.chunk_size,
+                            progress=lambda n: print(f"\r  {n:,} rows", end="", flush=True))
+    finally:
+        conn.close()
+    elapsed = time.perf_counter() - started
+    print(f"\nWrote {count:,} rows to {out} in {elapsed:.1f}s ({count / elapsed if elapsed else 0:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
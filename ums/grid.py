@@ -0,0 +1,151 @@
+import pandas as pd
+import streamlit as st
+
+from ums.db import execute_batch, fetch_data
+
+# Bulk edit tab for display_crud_interface. The rows on the current View page
+# are loaded into an editable grid inside a form, so cell edits and delete
+# ticks stay in the browser until the user submits. The submitted grid is
+# diffed against what was loaded, and the changed rows go to the database as
+# one executemany per statement in a single transaction, with a single cache
+# invalidation and a single rerun afterwards.
+
+DELETE_COLUMN = "Delete"
+
+
+# Fresh copies of the rows with the given keys. `rows_query` selects the key
+# columns and every form field from the entity's table, without a WHERE.
+def rows_for_keys(rows_query, key_columns, keys):
+    if not keys:
+        return []
+    if len(key_columns) == 1:
+        where = f"{key_columns[0]} IN ({', '.join(['%s'] * len(keys))})"
+        params = tuple(key[0] for key in keys)
+    else:
+        match = "(" + " AND ".join(f"{k} = %s" for k in key_columns) + ")"
+        where = " OR ".join([match] * len(keys))
+        params = tuple(value for key in keys for value in key)
+    rows = fetch_data(f"{rows_query.strip()} WHERE {where}", params, ttl=0)
+    # Keep the View page's order
+    by_key = {tuple(row[k] for k in key_columns): row for row in rows}
+    return [by_key[key] for key in keys if key in by_key]
+
+
+# Grid values come back as numpy scalars, NaN and Timestamps; compare and bind plain Python values
+def _plain(value):
+    if value is None or (not isinstance(value, (list, tuple)) and pd.isna(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.date()
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def _option_values(field, options):
+    if options and isinstance(options[0], dict):
+        return [o[field.get('value_field', 'id')] for o in options]
+    return list(options)
+
+
+def _column_config(field, read_only, options):
+    label = field.get('label', field['name'])
+    field_type = field.get('type', 'text')
+    if field_type == 'select':
+        return st.column_config.SelectboxColumn(label, options=_option_values(field, options), disabled=read_only)
+    if field_type == 'date':
+        return st.column_config.DateColumn(label, disabled=read_only)
+    if field_type == 'number':
+        return st.column_config.NumberColumn(
+            label, min_value=float(field.get('min_value', 0)), max_value=float(field.get('max_value', 1000000)),
+            step=float(field.get('step', 1)), disabled=read_only)
+    if field_type == 'lookup':
+        # Type-ahead pickers don't fit in a cell, so foreign keys are edited as ids
+        return st.column_config.NumberColumn(f"{label} (id)", step=1, format="%d", disabled=read_only)
+    return st.column_config.TextColumn(label, disabled=read_only)
+
+
+def _frame(rows, key_columns, form_fields):
+    names = list(dict.fromkeys(key_columns + [f['name'] for f in form_fields]))
+    frame = pd.DataFrame(rows, columns=names)
+    for field in form_fields:
+        if field.get('type') == 'date':
+            frame[field['name']] = pd.to_datetime(frame[field['name']], errors="coerce").dt.date
+        elif field.get('type') in ('number', 'lookup'):
+            frame[field['name']] = pd.to_numeric(frame[field['name']], errors="coerce")
+    frame.insert(0, DELETE_COLUMN, False)
+    return frame
+
+
+# Compare the submitted grid with the loaded one. Returns (updates, deletes) as
+# parameter tuples for update_query (field values, then key) and delete_query (key).
+def diff_rows(original, edited, key_columns, field_names):
+    updates, deletes = [], []
+    for before, after in zip(original.to_dict("records"), edited.to_dict("records")):
+        key = tuple(_plain(before[k]) for k in key_columns)
+        if after.get(DELETE_COLUMN):
+            deletes.append(key)
+            continue
+        values = tuple(_plain(after[name]) for name in field_names)
+        if values != tuple(_plain(before[name]) for name in field_names):
+            updates.append(values + key)
+    return updates, deletes
+
+
+# Render the grid for `records` (the View page rows) and apply a submitted diff.
+# field_options holds the loaded 'select' option lists by field name;
+# validate(row, current) is called for each updated row as in display_crud_interface.
+# Key columns are read-only; changing a key is a delete plus an add.
+def bulk_edit_grid(entity_name, key_columns, records, rows_query, form_fields,
+                   update_query=None, delete_query=None, write_hooks=None, field_options=None, validate=None):
+    keys = [tuple(r[k] for k in key_columns) for r in records]
+    rows = rows_for_keys(rows_query, key_columns, keys)
+    if not rows:
+        st.info(f"No {entity_name.lower()} records to edit")
+        return
+
+    form_id = f"bulk_{entity_name.lower().replace(' ', '_')}"
+    original = _frame(rows, key_columns, form_fields)
+    column_config = {DELETE_COLUMN: st.column_config.CheckboxColumn(
+        DELETE_COLUMN, disabled=delete_query is None, help="Delete this row on save")}
+    for name in key_columns:
+        column_config[name] = st.column_config.Column(name, disabled=True)
+    for field in form_fields:
+        read_only = update_query is None or field['name'] in key_columns
+        options = (field_options or {}).get(field['name'], field.get('options', []))
+        column_config[field['name']] = _column_config(field, read_only, options)
+
+    st.caption("Rows on the current View page. Edits are sent together when you save.")
+    with st.form(f"{form_id}_form"):
+        edited = st.data_editor(original, column_config=column_config, hide_index=True,
+                                num_rows="fixed", width="stretch", key=f"{form_id}_editor")
+        submitted = st.form_submit_button("Save changes")
+
+    if not submitted:
+        return
+    field_names = [f['name'] for f in form_fields]
+    updates, deletes = diff_rows(original, edited, key_columns, field_names)
+    if not updates and not deletes:
+        st.info("No changes to save")
+        return
+    if validate and updates:
+        # Each row is checked against the database as it is now, not against the rest of the batch
+        loaded = {tuple(_plain(row[k]) for k in key_columns): {name: _plain(value) for name, value in row.items()}
+                  for row in original.to_dict("records")}
+        errors = [error for row in updates
+                  for error in validate(dict(zip(field_names, row)), loaded[tuple(row[-len(key_columns):])])]
+        if errors:
+            for error in errors:
+                st.error(error)
+            return
+
+    # Summary tables are refreshed once for the whole batch rather than per row
+    changed = [row[-len(key_columns):] for row in updates] + deletes
+    after = (lambda cursor: write_hooks.refresh(cursor, changed)) if write_hooks and write_hooks.refresh else None
+    success, message = execute_batch([(update_query, updates), (delete_query, deletes)], after=after)
+    if success:
+        st.session_state.pop(f"{form_id}_editor", None)
+        st.success(f"Saved {len(updates)} updated and {len(deletes)} deleted {entity_name.lower()} rows")
+        st.rerun()
+    else:
+        st.error(message)
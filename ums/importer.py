@@ -0,0 +1,473 @@
+import argparse
+import csv
+import io
+import os
+import re
+import time
+from datetime import date, datetime
+
+from ums import people, summaries
+from ums.backends import create_backend
+
+# Streaming bulk import of students, faculty and enrollments from CSV or
+# Parquet. Rows are read and validated a chunk at a time; each valid chunk is
+# written with executemany in its own transaction, with foreign keys and
+# generated ids resolved by one IN query per chunk instead of per row.
+# Rows that fail validation (or whose chunk fails to commit) are written to a
+# rejected-rows CSV with an `error` column.
+#
+#   python -m ums.importer students intake.csv
+#   python -m ums.importer enrollments fall.parquet --chunk-size 5000 --rejected bad.csv
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_CHUNK_SIZE = 5000   # also bounds the IN lists used for lookups
+
+GENDERS = ["Male", "Female", "Other"]
+STUDENT_STATUSES = ["Active", "Inactive", "Graduated", "Suspended"]
+_EMAIL = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+class RowError(ValueError):
+    pass
+
+
+# --- reading ---------------------------------------------------------------
+
+def _normalize_header(name):
+    return re.sub(r"\W+", "_", str(name).strip().lower()).strip("_")
+
+
+# Yields lists of dicts of at most chunk_size rows; `source` is a path or a binary file object
+def read_chunks(source, fmt, chunk_size=DEFAULT_CHUNK_SIZE):
+    row_number = 0
+    if fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet import needs pyarrow (pip install pyarrow)")
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_size):
+            chunk = []
+            for row in batch.to_pylist():
+                row_number += 1
+                chunk.append(dict({_normalize_header(k): v for k, v in row.items()}, _row=row_number))
+            yield chunk
+        return
+
+    if isinstance(source, str):
+        text = open(source, newline="", encoding="utf-8-sig")
+    else:
+        text = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+    with text:
+        reader = csv.reader(text)
+        header = [_normalize_header(h) for h in next(reader, [])]
+        chunk = []
+        for values in reader:
+            if not any(v.strip() for v in values):
+                continue
+            row_number += 1
+            row = {name: (value.strip() or None) for name, value in zip(header, values)}
+            row["_row"] = row_number
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+# Rows in a file, for progress: Parquet keeps the count in its footer; for CSV
+# it is the number of lines after the header (an estimate if fields span lines)
+def count_rows(path, fmt):
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+    with open(path, "rb") as f:
+        return max(0, sum(block.count(b"\n") for block in iter(lambda: f.read(1 << 20), b"")) - 1)
+
+
+def detect_format(filename):
+    return "parquet" if filename.lower().endswith((".parquet", ".pq")) else "csv"
+
+
+# --- field validation --------------------------------------------------------
+
+def _text(row, name, required=False, max_length=None):
+    value = row.get(name)
+    if value is None or str(value).strip() == "":
+        if required:
+            raise RowError(f"{name} is required")
+        return None
+    value = str(value).strip()
+    if max_length and len(value) > max_length:
+        raise RowError(f"{name} is longer than {max_length} characters")
+    return value
+
+
+def _date(row, name, required=False):
+    value = row.get(name)
+    if value is None or value == "":
+        if required:
+            raise RowError(f"{name} is required")
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value).strip()[:10])
+    except ValueError:
+        raise RowError(f"{name} must be a date (YYYY-MM-DD), got {value!r}")
+
+
+def _choice(row, name, choices, default=None):
+    value = _text(row, name)
+    if value is None:
+        if default is None:
+            raise RowError(f"{name} is required")
+        return default
+    for choice in choices:
+        if choice.lower() == value.lower():
+            return choice
+    raise RowError(f"{name} must be one of {', '.join(choices)}, got {value!r}")
+
+
+def _int(row, name, required=False):
+    value = row.get(name)
+    if value is None or value == "":
+        if required:
+            raise RowError(f"{name} is required")
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        raise RowError(f"{name} must be a whole number, got {value!r}")
+
+
+def _marks(values):
+    return ", ".join(["%s"] * len(values))
+
+
+def _select_set(cursor, sql, values):
+    values = list(values)
+    if not values:
+        return {}
+    cursor.execute(sql.format(marks=_marks(values)), tuple(values))
+    return dict(cursor.fetchall())
+
+
+# --- entities --------------------------------------------------------------
+
+# Person columns shared by students and faculty
+class PersonImport:
+    person_type = None
+    tables = ("Person",)
+
+    def __init__(self):
+        self.departments = {}   # dept_name.lower() -> dept_id, kept across chunks (small)
+        self.known_dept_ids = set()
+
+    def prepare(self, cursor, chunk):
+        emails = {str(r["email"]).strip() for r in chunk if r.get("email")}
+        self.existing_emails = {e.lower() for e in _select_set(
+            cursor, "SELECT email, person_id FROM Person WHERE email IN ({marks})", emails)}
+        self.seen_emails = set()
+
+        names = {str(r["department"]).strip() for r in chunk if r.get("department")}
+        missing = [n for n in names if n.lower() not in self.departments]
+        for name, dept_id in _select_set(
+                cursor, "SELECT dept_name, dept_id FROM Department WHERE dept_name IN ({marks})", missing).items():
+            self.departments[name.lower()] = dept_id
+        ids = set()
+        for r in chunk:
+            try:
+                ids.add(_int(r, "dept_id"))
+            except RowError:
+                pass
+        ids = {i for i in ids if i is not None} - self.known_dept_ids
+        self.known_dept_ids |= set(_select_set(
+            cursor, "SELECT dept_id, dept_name FROM Department WHERE dept_id IN ({marks})", ids))
+
+    def _person(self, row):
+        email = _text(row, "email", required=True, max_length=100)
+        if not _EMAIL.match(email):
+            raise RowError(f"email {email!r} is not a valid address")
+        if email.lower() in self.existing_emails:
+            raise RowError(f"email {email} already exists")
+        if email.lower() in self.seen_emails:
+            raise RowError(f"email {email} appears twice in the file")
+        person = (
+            _text(row, "first_name", required=True, max_length=50),
+            _text(row, "last_name", required=True, max_length=50),
+            _date(row, "date_of_birth", required=True),
+            _choice(row, "gender", GENDERS),
+            _text(row, "contact_number", max_length=20),
+            email,
+        )
+        return person
+
+    def _department(self, row):
+        dept_id = _int(row, "dept_id")
+        if dept_id is not None:
+            if dept_id not in self.known_dept_ids:
+                raise RowError(f"dept_id {dept_id} does not exist")
+            return dept_id
+        name = _text(row, "department")
+        if name is None:
+            return None
+        if name.lower() not in self.departments:
+            raise RowError(f"department {name!r} does not exist")
+        return self.departments[name.lower()]
+
+    # Insert the Person rows, then look their generated ids up by (unique) email
+    def _insert_people(self, cursor, records):
+        cursor.executemany(
+            "INSERT INTO Person (first_name, last_name, date_of_birth, gender, contact_number, email, person_type) "
+            f"VALUES (%s, %s, %s, %s, %s, %s, '{self.person_type}')",
+            [person for person, _ in records])
+        ids = _select_set(cursor, "SELECT email, person_id FROM Person WHERE email IN ({marks})",
+                          [person[5] for person, _ in records])
+        people.index_people(cursor, ids.values())
+        return [(ids[person[5]], detail) for person, detail in records]
+
+
+class StudentImport(PersonImport):
+    name = "students"
+    person_type = "Student"
+    tables = ("Person", "Student")
+    columns = ["first_name", "last_name", "date_of_birth", "gender", "contact_number", "email",
+               "enrollment_date", "status", "department | dept_id"]
+
+    def validate(self, row):
+        person = self._person(row)
+        detail = (_date(row, "enrollment_date", required=True),
+                  _choice(row, "status", STUDENT_STATUSES, default="Active"),
+                  self._department(row))
+        self.seen_emails.add(person[5].lower())
+        return person, detail
+
+    def insert(self, cursor, records):
+        rows = self._insert_people(cursor, records)
+        cursor.executemany(
+            "INSERT INTO Student (person_id, enrollment_date, status, dept_id) VALUES (%s, %s, %s, %s)",
+            [(person_id, *detail) for person_id, detail in rows])
+        return list(_select_set(cursor, "SELECT student_id, person_id FROM Student WHERE person_id IN ({marks})",
+                                [person_id for person_id, _ in rows]))
+
+    def update_summaries(self, cursor, ids):
+        summaries.students_inserted(cursor, ids)
+
+
+class FacultyImport(PersonImport):
+    name = "faculty"
+    person_type = "Faculty"
+    tables = ("Person", "Faculty")
+    columns = ["first_name", "last_name", "date_of_birth", "gender", "contact_number", "email",
+               "hire_date", "faculty_rank", "specialization", "department | dept_id"]
+
+    def validate(self, row):
+        person = self._person(row)
+        detail = (_date(row, "hire_date", required=True),
+                  _text(row, "faculty_rank", max_length=50),
+                  _text(row, "specialization", max_length=100),
+                  self._department(row))
+        self.seen_emails.add(person[5].lower())
+        return person, detail
+
+    def insert(self, cursor, records):
+        rows = self._insert_people(cursor, records)
+        cursor.executemany(
+            "INSERT INTO Faculty (person_id, hire_date, faculty_rank, specialization, dept_id) "
+            "VALUES (%s, %s, %s, %s, %s)",
+            [(person_id, *detail) for person_id, detail in rows])
+        return list(_select_set(cursor, "SELECT faculty_id, person_id FROM Faculty WHERE person_id IN ({marks})",
+                                [person_id for person_id, _ in rows]))
+
+    def update_summaries(self, cursor, ids):
+        summaries.faculty_inserted(cursor, ids)
+
+
+class EnrollmentImport:
+    name = "enrollments"
+    tables = ("Enrollment",)
+    columns = ["student_id | student_email", "section_id", "enrollment_date"]
+
+    def prepare(self, cursor, chunk):
+        ids, emails, sections = set(), set(), set()
+        for r in chunk:
+            try:
+                ids.add(_int(r, "student_id"))
+                sections.add(_int(r, "section_id"))
+            except RowError:
+                pass
+            if r.get("student_email"):
+                emails.add(str(r["student_email"]).strip())
+        ids.discard(None)
+        sections.discard(None)
+        self.student_ids = set(_select_set(
+            cursor, "SELECT student_id, person_id FROM Student WHERE student_id IN ({marks})", ids))
+        self.students_by_email = {e.lower(): s for e, s in _select_set(
+            cursor, "SELECT p.email, s.student_id FROM Student s JOIN Person p ON s.person_id = p.person_id "
+                    "WHERE p.email IN ({marks})", emails).items()}
+        self.section_ids = set(_select_set(
+            cursor, "SELECT section_id, course_id FROM Section WHERE section_id IN ({marks})", sections))
+        students = self.student_ids | set(self.students_by_email.values())
+        self.existing = set()
+        if students and self.section_ids:
+            cursor.execute(
+                f"SELECT student_id, section_id FROM Enrollment WHERE student_id IN ({_marks(students)}) "
+                f"AND section_id IN ({_marks(self.section_ids)})", tuple(students) + tuple(self.section_ids))
+            self.existing = {tuple(r) for r in cursor.fetchall()}
+
+    def validate(self, row):
+        student_id = _int(row, "student_id")
+        if student_id is None:
+            email = _text(row, "student_email")
+            if email is None:
+                raise RowError("student_id or student_email is required")
+            student_id = self.students_by_email.get(email.lower())
+            if student_id is None:
+                raise RowError(f"no student with email {email}")
+        elif student_id not in self.student_ids:
+            raise RowError(f"student_id {student_id} does not exist")
+        section_id = _int(row, "section_id", required=True)
+        if section_id not in self.section_ids:
+            raise RowError(f"section_id {section_id} does not exist")
+        if (student_id, section_id) in self.existing:
+            raise RowError(f"student {student_id} is already enrolled in section {section_id}")
+        enrolled = _date(row, "enrollment_date", required=True)
+        self.existing.add((student_id, section_id))
+        return student_id, section_id, enrolled
+
+    def insert(self, cursor, records):
+        cursor.executemany(
+            "INSERT INTO Enrollment (student_id, section_id, enrollment_date) VALUES (%s, %s, %s)", records)
+        return records
+
+    def update_summaries(self, cursor, ids):
+        summaries.enrollments_inserted(cursor)
+
+
+IMPORTS = {"students": StudentImport, "faculty": FacultyImport, "enrollments": EnrollmentImport}
+
+
+# --- running ---------------------------------------------------------------
+
+class ImportResult:
+    def __init__(self):
+        self.read = 0
+        self.inserted = 0
+        self.rejected = 0
+        self.chunks = 0
+        self.seconds = 0.0
+        self.rejected_path = None
+
+    @property
+    def rows_per_sec(self):
+        return self.inserted / self.seconds if self.seconds else 0.0
+
+    def summary(self):
+        return (f"{self.read:,} rows read, {self.inserted:,} imported, {self.rejected:,} rejected "
+                f"in {self.seconds:.1f}s ({self.rows_per_sec:,.0f} rows/s)")
+
+
+# Rejected rows are written as they occur; the file is only created if needed
+class RejectedRows:
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._writer = None
+
+    def add(self, row, error):
+        if self._writer is None:
+            self._file = open(self.path, "w", newline="", encoding="utf-8")
+            fields = ["row"] + [k for k in row if k != "_row"] + ["error"]
+            self._writer = csv.DictWriter(self._file, fields, extrasaction="ignore")
+            self._writer.writeheader()
+        self._writer.writerow(dict({k: v for k, v in row.items() if k != "_row"}, row=row.get("_row"), error=error))
+
+    def close(self):
+        if self._file:
+            self._file.close()
+
+
+def run_import(conn, backend, entity, source, fmt="csv", chunk_size=DEFAULT_CHUNK_SIZE,
+               rejected_path=None, progress=None):
+    spec = IMPORTS[entity]()
+    chunk_size = max(1, min(chunk_size, MAX_CHUNK_SIZE))
+    result = ImportResult()
+    result.rejected_path = rejected_path or f"rejected_{entity}_{datetime.now():%Y%m%d_%H%M%S}.csv"
+    rejected = RejectedRows(result.rejected_path)
+    maintain_summaries = summaries.summaries_exist(conn, backend)
+    started = time.perf_counter()
+    cursor = conn.cursor()
+    try:
+        for chunk in read_chunks(source, fmt, chunk_size):
+            result.read += len(chunk)
+            result.chunks += 1
+            spec.prepare(cursor, chunk)
+            valid, records = [], []
+            for row in chunk:
+                try:
+                    records.append(spec.validate(row))
+                    valid.append(row)
+                except RowError as err:
+                    rejected.add(row, str(err))
+                    result.rejected += 1
+            if records:
+                try:
+                    ids = spec.insert(cursor, records)
+                    if maintain_summaries:
+                        spec.update_summaries(cursor, ids)
+                    conn.commit()
+                    result.inserted += len(records)
+                except backend.Error as err:
+                    # The whole chunk is rolled back, so all of its rows are reported
+                    conn.rollback()
+                    for row in valid:
+                        rejected.add(row, f"batch failed: {err}")
+                    result.rejected += len(valid)
+            result.seconds = time.perf_counter() - started
+            if progress:
+                progress(result)
+    finally:
+        cursor.close()
+        rejected.close()
+    result.seconds = time.perf_counter() - started
+    if not result.rejected:
+        result.rejected_path = None
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import students, faculty or enrollments from CSV/Parquet")
+    parser.add_argument("entity", choices=sorted(IMPORTS))
+    parser.add_argument("path", help="CSV or Parquet file")
+    parser.add_argument("--format", choices=["csv", "parquet"], help="defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"rows per batch/transaction (max {MAX_CHUNK_SIZE})")
+    parser.add_argument("--rejected", help="where to write rejected rows (default rejected_<entity>_<time>.csv)")
+    parser.add_argument("--backend", help="mysql or sqlite (defaults to UMS_BACKEND)")
+    args = parser.parse_args(argv)
+
+    backend = create_backend(args.backend)
+    conn = backend.connect()
+
+    def report(result):
+        print(f"\r  chunk {result.chunks}: {result.inserted:,} imported, {result.rejected:,} rejected, "
+              f"{result.rows_per_sec:,.0f} rows/s", end="", flush=True)
+
+    try:
+        result = run_import(conn, backend, args.entity, args.path, args.format or detect_format(args.path),
+                            args.chunk_size, args.rejected, progress=report)
+    finally:
+        conn.close()
+    print(f"\n{result.summary()}")
+    if result.rejected_path:
+        print(f"Rejected rows written to {os.path.abspath(result.rejected_path)}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
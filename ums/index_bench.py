@@ -0,0 +1,69 @@
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from ums.backends import SQLiteBackend
+from ums.datagen import generate
+from ums.migrate import apply_pending
+from ums.queries import registered_queries
+
+# Before/after benchmark for the index migrations: builds a synthetic SQLite
+# database, times every registered query on the bare schema, applies the
+# migrations and times them again.
+#
+#   python -m ums.index_bench --students 100000
+
+
+def time_queries(conn, repeat, migrated=True):
+    timings = {}
+    for name, sql, params in registered_queries(migrated):
+        samples = []
+        for _ in range(repeat):
+            cursor = conn.cursor()
+            started = time.perf_counter()
+            cursor.execute(sql, params)
+            cursor.fetchall()
+            samples.append((time.perf_counter() - started) * 1000)
+            cursor.close()
+        timings[name] = statistics.median(samples)
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark registered queries before and after the index migrations")
+    parser.add_argument("--students", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", help="write the database to this path instead of a temp file")
+    args = parser.parse_args(argv)
+
+    path = args.keep or os.path.join(tempfile.mkdtemp(prefix="ums_bench_"), "bench.db")
+    backend = SQLiteBackend(path)
+    conn = backend.connect()
+    try:
+        print(f"Generating {args.students} students into {path} ...")
+        generate(backend, conn, scale=args.students / 1000, seed=args.seed)
+        conn.cursor().execute("ANALYZE")
+        before = time_queries(conn, args.repeat, migrated=False)
+
+        apply_pending(conn, backend)
+        conn.cursor().execute("ANALYZE")
+        conn.commit()
+        after = time_queries(conn, args.repeat)
+    finally:
+        conn.close()
+
+    print(f"\n{'query':45} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+    for name in after:
+        if name not in before:
+            # reads a table the migrations created
+            print(f"{name:45} {'-':>10} {after[name]:10.2f} {'-':>8}")
+            continue
+        speedup = before[name] / after[name] if after[name] else float("inf")
+        print(f"{name:45} {before[name]:10.2f} {after[name]:10.2f} {speedup:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,603 @@
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from datetime import date, datetime, timedelta
+
+# Background jobs: long operations (term billing, GPA recompute, imports,
+# exports, ...) are queued in the `job` table (data/migrations/0007) and run
+# by worker processes, so they don't hold up a Streamlit session and carry on
+# when the user navigates away. The queue is the app's own database; there is
+# no broker.
+#
+# - submit() queues a job. Submitting again with the same idempotency key (a
+#   double click, a rerun) returns the job already queued for it.
+# - A worker claims the oldest due job with a conditional UPDATE from Queued
+#   to Running, so no two workers run the same job.
+# - While a job runs, a thread of its worker writes the progress the handler
+#   reports and a heartbeat every HEARTBEAT_SECONDS. A Running job whose
+#   heartbeat is older than STALE_SECONDS (its worker died) is requeued.
+# - A failed attempt is retried after RETRY_DELAY seconds, doubling each
+#   time, up to the job's max_attempts; JobError fails it at once. Handlers
+#   are safe to run again: billing skips students already billed, the
+#   rebuilds converge, and an import is not retried automatically.
+#
+# The app starts UMS_JOB_WORKERS worker processes (default 2; see
+# ums.db.get_job_workers). With UMS_JOB_WORKERS=0 run them yourself:
+#
+#   python -m ums.jobs worker --processes 2
+#   python -m ums.jobs submit billing.run_term --param year=2026 --param semester=Spring --param amount=5000
+#   python -m ums.jobs list
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKERS = int(os.environ.get("UMS_JOB_WORKERS", "2"))
+JOB_DIR = os.environ.get("UMS_JOB_DIR", os.path.join(ROOT, "data", "jobs"))  # uploads and job output
+STALE_SECONDS = float(os.environ.get("UMS_JOB_STALE_SECONDS", "300"))
+STALE_CHECK_SECONDS = 30
+HEARTBEAT_SECONDS = 1.0
+POLL_SECONDS = 1.0
+RETRY_DELAY = 10
+MAX_ATTEMPTS = 3
+CLAIM_CANDIDATES = 5
+KEY_LENGTH = 128      # job.idempotency_key
+
+ACTIVE = ("Queued", "Running")
+FINISHED = ("Succeeded", "Failed", "Cancelled")
+
+JOB_COLUMNS = ["job_id", "kind", "params", "status", "attempts", "max_attempts", "run_after", "progress_done",
+               "progress_total", "message", "result", "error", "worker", "created_at", "started_at", "finished_at"]
+
+RECENT_JOBS = """
+SELECT job_id, kind, status, attempts, progress_done, progress_total, message, error,
+       created_at, started_at, finished_at
+FROM job
+ORDER BY job_id DESC
+LIMIT %s
+"""
+
+
+class JobError(Exception):
+    pass
+
+
+# A kind of job: its handler, the tables it writes (for cache invalidation in
+# the app) and how many attempts a job gets by default.
+# handler(conn, backend, params, progress) returns a JSON-able dict with a
+# "summary"; progress(done, total=None, message=None) reports how far it is.
+class JobKind:
+    def __init__(self, handler, tables=(), max_attempts=MAX_ATTEMPTS):
+        self.handler = handler
+        self.tables = tables
+        self.max_attempts = max_attempts
+
+
+# --- job kinds ---------------------------------------------------------------
+# Imports are inside the handlers so a worker loads only what it runs
+
+def _bill_term(conn, backend, params, progress):
+    from decimal import Decimal
+    from ums import billing
+    amount = Decimal(str(params["amount"]))
+    due = date.fromisoformat(params["due_date"]) if params.get("due_date") else None
+    billed, checked, changes, entries = billing.run_term(
+        conn, backend, int(params["year"]), params["semester"], amount, due,
+        amount if params.get("per_credit") else None, progress=progress)
+    return {"summary": f"Billed {billed:,} students; reconciled {checked:,} tuitions, "
+                       f"{sum(changes.values()):,} changed status; {entries:,} ledger entries",
+            "billed": billed, "changes": changes}
+
+
+def _reconcile(conn, backend, params, progress):
+    from ums import billing
+    cursor = conn.cursor()
+    try:
+        checked, changes = billing.reconcile(cursor)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return {"summary": f"Reconciled {checked:,} tuitions; "
+                       + (", ".join(f"{n:,} now {status}" for status, n in changes.items()) or "no changes"),
+            "changes": changes}
+
+
+def _rebuild_ledgers(conn, backend, params, progress):
+    from ums import billing
+    entries = billing.rebuild_ledgers(conn, backend)
+    return {"summary": f"Rebuilt {entries:,} ledger entries"}
+
+
+def _recompute_records(conn, backend, params, progress):
+    from ums import transcripts
+    progress(0, None, "Computing records")
+    count, written = transcripts.recompute_all(
+        conn, backend, progress=lambda done, total: progress(done, total, "Writing changed records"))
+    return {"summary": f"Recomputed {count:,} student records; {written:,} had changed"}
+
+
+def _import(conn, backend, params, progress):
+    from ums import importer
+    path, fmt = params["path"], params["format"]
+    if not os.path.exists(path):
+        raise JobError(f"{path} no longer exists")
+    total = importer.count_rows(path, fmt)
+    result = importer.run_import(
+        conn, backend, params["entity"], path, fmt, int(params.get("chunk_size", importer.DEFAULT_CHUNK_SIZE)),
+        params.get("rejected_path"),
+        progress=lambda r: progress(r.read, max(total, r.read), f"{r.inserted:,} imported, {r.rejected:,} rejected"))
+    os.remove(path)
+    return {"summary": result.summary(), "inserted": result.inserted, "rejected": result.rejected,
+            "path": result.rejected_path}
+
+
+def _export(conn, backend, params, progress):
+    from ums.export import export_rows
+    total = params.get("total")
+    count = export_rows(conn, params["sql"], tuple(params["params"]), params["format"], params["path"],
+                        progress=lambda n: progress(n, total, f"{n:,} rows written"))
+    return {"summary": f"Exported {count:,} rows", "rows": count, "path": params["path"]}
+
+
+def _accrue_fines(conn, backend, params, progress):
+    from ums import library
+    as_of = date.fromisoformat(params["as_of"]) if params.get("as_of") else None
+    cursor = conn.cursor()
+    try:
+        count, total = library.accrue_fines(cursor, backend.name, as_of)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return {"summary": f"{count:,} overdue checkouts, {total:,.2f} in fines"}
+
+
+def _reindex_people(conn, backend, params, progress):
+    from ums import people
+    count = people.rebuild_search_index(conn, backend)
+    return {"summary": f"Indexed {count:,} search terms"}
+
+
+KINDS = {
+    "billing.run_term": JobKind(_bill_term, ("Student_Tuition", "student_ledger")),
+    "billing.reconcile": JobKind(_reconcile, ("Student_Tuition",)),
+    "billing.ledgers": JobKind(_rebuild_ledgers, ("student_ledger",)),
+    "transcripts.recompute": JobKind(_recompute_records, ("Student_Record",)),
+    # Chunks are committed as they are read, so a failed import is left for a person to look at
+    "import": JobKind(_import, ("Person", "Student", "Faculty", "Enrollment"), max_attempts=1),
+    "export": JobKind(_export),
+    "library.overdue": JobKind(_accrue_fines, ("Checkout_Record",)),
+    "people.reindex": JobKind(_reindex_people, ("person_search_term", "person_search_gram")),
+}
+
+
+# --- queue -------------------------------------------------------------------
+
+def _now():
+    return datetime.now().replace(microsecond=0)
+
+
+# A path under JOB_DIR for an upload or a job's output
+def job_file(name):
+    os.makedirs(JOB_DIR, exist_ok=True)
+    return os.path.join(JOB_DIR, name)
+
+
+# Stable digest of a job's parameters, for building idempotency keys
+def params_key(params):
+    return hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+
+
+# Queue a job; returns (job_id, created). If `key` was used before nothing is
+# queued and the job submitted with it is returned.
+def submit(cursor, kind, params=None, key=None, max_attempts=None):
+    if kind not in KINDS:
+        raise JobError(f"Unknown job kind {kind!r}")
+    if key is not None and len(key) > KEY_LENGTH:
+        raise JobError(f"Idempotency key longer than {KEY_LENGTH} characters")
+    now = _now()
+    # IGNORE only when there is a key to fall back on: MySQL also downgrades
+    # other errors to warnings with it, which the lookup below then reports
+    cursor.execute(f"INSERT {'IGNORE ' if key is not None else ''}INTO job (kind, params, idempotency_key, "
+                   f"status, max_attempts, run_after, created_at) VALUES (%s, %s, %s, 'Queued', %s, %s, %s)",
+                   (kind, json.dumps(params or {}, default=str), key,
+                    max_attempts or KINDS[kind].max_attempts, now, now))
+    if cursor.rowcount == 1:
+        return cursor.lastrowid, True
+    cursor.execute("SELECT job_id FROM job WHERE idempotency_key = %s", (key,))
+    row = cursor.fetchone()
+    if row is None:
+        raise JobError(f"The {kind} job was not queued")
+    return row[0], False
+
+
+def _job(row):
+    job = dict(zip(JOB_COLUMNS, row))
+    job["params"] = json.loads(job["params"])
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+# A job as a dict (params and result decoded), or None
+def get_job(cursor, job_id):
+    cursor.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM job WHERE job_id = %s", (job_id,))
+    row = cursor.fetchone()
+    return _job(row) if row else None
+
+
+def recent_jobs(cursor, limit=50):
+    cursor.execute(RECENT_JOBS, (limit,))
+    names = [d[0] for d in cursor.description]
+    return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+# Withdraw a job that hasn't started; returns whether it was still queued
+def cancel(cursor, job_id):
+    cursor.execute("UPDATE job SET status = 'Cancelled', finished_at = %s WHERE job_id = %s AND status = 'Queued'",
+                   (_now(), job_id))
+    return cursor.rowcount == 1
+
+
+# Queue a failed or cancelled job again with a fresh set of attempts
+def retry(cursor, job_id):
+    cursor.execute("UPDATE job SET status = 'Queued', attempts = 0, run_after = %s, progress_done = 0, "
+                   "error = NULL, finished_at = NULL WHERE job_id = %s AND status IN ('Failed', 'Cancelled')",
+                   (_now(), job_id))
+    return cursor.rowcount == 1
+
+
+# Claim the oldest due job for `worker`; returns it (see get_job) or None
+def claim(conn, worker):
+    cursor = conn.cursor()
+    try:
+        now = _now()
+        cursor.execute("SELECT job_id FROM job WHERE status = 'Queued' AND run_after <= %s "
+                       "ORDER BY run_after, job_id LIMIT %s", (now, CLAIM_CANDIDATES))
+        for (job_id,) in cursor.fetchall():
+            # Another worker may have taken it since the SELECT
+            cursor.execute("UPDATE job SET status = 'Running', worker = %s, attempts = attempts + 1, "
+                           "started_at = %s, heartbeat_at = %s WHERE job_id = %s AND status = 'Queued'",
+                           (worker, now, now, job_id))
+            if cursor.rowcount == 1:
+                job = get_job(cursor, job_id)
+                conn.commit()
+                return job
+        conn.commit()
+        return None
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+# Requeue (or fail, when out of attempts) Running jobs whose worker stopped
+# sending heartbeats; returns how many there were
+def requeue_stale(conn, stale_seconds=STALE_SECONDS):
+    now = _now()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("UPDATE job SET status = CASE WHEN attempts < max_attempts THEN 'Queued' ELSE 'Failed' END, "
+                       "finished_at = CASE WHEN attempts < max_attempts THEN NULL ELSE %s END, "
+                       "error = 'Worker stopped responding', run_after = %s "
+                       "WHERE status = 'Running' AND heartbeat_at < %s",
+                       (now, now, now - timedelta(seconds=stale_seconds)))
+        count = cursor.rowcount
+        conn.commit()
+        return count
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+# --- running -----------------------------------------------------------------
+
+# Progress a handler reports; Heartbeat writes it to the job row
+class Progress:
+    def __init__(self):
+        self.done = 0
+        self.total = None
+        self.message = None
+
+    def __call__(self, done, total=None, message=None):
+        self.done = done
+        if total is not None:
+            self.total = total
+        if message is not None:
+            self.message = message[:255]
+
+
+# Writes a running job's heartbeat and latest progress every HEARTBEAT_SECONDS
+# from a thread of its own, so the handler never waits on these writes (on
+# SQLite they wait for the handler's own transactions to commit)
+class Heartbeat(threading.Thread):
+    def __init__(self, conn, job_id, worker, progress):
+        super().__init__(name=f"job-{job_id}-heartbeat", daemon=True)
+        self.conn = conn
+        self.job_id = job_id
+        self.worker = worker
+        self.progress = progress
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(HEARTBEAT_SECONDS):
+            self.beat()
+
+    def beat(self):
+        progress = self.progress
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("UPDATE job SET heartbeat_at = %s, progress_done = %s, progress_total = %s, message = %s "
+                           "WHERE job_id = %s AND worker = %s AND status = 'Running'",
+                           (_now(), progress.done, progress.total, progress.message, self.job_id, self.worker))
+            self.conn.commit()
+        except Exception:
+            # A busy database only delays the next beat
+            self.conn.rollback()
+        finally:
+            cursor.close()
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+# Run a claimed job on a connection of its own and record how it went.
+# `conn` is the worker's queue connection.
+def run_job(backend, conn, job, worker):
+    progress = Progress()
+    heartbeat = Heartbeat(conn, job["job_id"], worker, progress)
+    heartbeat.start()
+    started = time.perf_counter()
+    result, error, permanent = None, None, False
+    job_conn = None
+    try:
+        kind = KINDS.get(job["kind"])
+        if kind is None:
+            raise JobError(f"Unknown job kind {job['kind']!r}")
+        job_conn = backend.connect()
+        result = kind.handler(job_conn, backend, job["params"], progress)
+    except Exception as err:
+        error = f"{type(err).__name__}: {err}"
+        permanent = isinstance(err, JobError)
+        traceback.print_exc()
+    finally:
+        heartbeat.stop()
+        if job_conn is not None:
+            job_conn.close()
+
+    now = _now()
+    cursor = conn.cursor()
+    try:
+        if error is None:
+            status = "Succeeded"
+            total = progress.total or progress.done
+            cursor.execute("UPDATE job SET status = %s, result = %s, message = %s, error = NULL, "
+                           "progress_done = %s, progress_total = %s, finished_at = %s, heartbeat_at = %s "
+                           "WHERE job_id = %s AND worker = %s AND status = 'Running'",
+                           (status, json.dumps(result, default=str), str(result.get("summary", ""))[:255],
+                            total, total, now, now, job["job_id"], worker))
+        else:
+            retrying = not permanent and job["attempts"] < job["max_attempts"]
+            status = "Queued" if retrying else "Failed"
+            run_after = now + timedelta(seconds=RETRY_DELAY * 2 ** (job["attempts"] - 1))
+            cursor.execute("UPDATE job SET status = %s, error = %s, run_after = %s, finished_at = %s, "
+                           "heartbeat_at = %s WHERE job_id = %s AND worker = %s AND status = 'Running'",
+                           (status, error, run_after if retrying else now, None if retrying else now, now,
+                            job["job_id"], worker))
+        conn.commit()
+    except Exception:
+        # Left Running: once its heartbeat is stale the job is requeued
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    print(f"[{worker}] job {job['job_id']} {job['kind']} (attempt {job['attempts']}): {status} "
+          f"in {time.perf_counter() - started:.1f}s" + (f" - {error}" if error else ""), flush=True)
+    return status
+
+
+# Claim and run jobs until `stop` is set, or with once=True until none is due.
+# With `parent`, stop once that process has gone (workers started by the app).
+def work(backend, worker=None, stop=None, once=False, parent=None):
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    stop = stop or threading.Event()
+    conn = backend.connect()
+    checked = 0
+    try:
+        while not stop.is_set():
+            if parent and os.getppid() != parent:
+                break
+            try:
+                if time.monotonic() - checked > STALE_CHECK_SECONDS:
+                    requeue_stale(conn)
+                    checked = time.monotonic()
+                job = claim(conn, worker)
+                if job is not None:
+                    run_job(backend, conn, job, worker)
+                    continue
+            except backend.Error as err:
+                print(f"[{worker}] queue error: {err}", flush=True)
+            if once:
+                break
+            stop.wait(POLL_SECONDS)
+    finally:
+        conn.close()
+
+
+# Worker processes, each `python -m ums.jobs worker`. ensure() starts any
+# missing (including ones that died); they exit with the process that
+# started them.
+class WorkerPool:
+    def __init__(self, size, args=()):
+        self.size = size
+        self.args = list(args)
+        self.started = 0
+        self._processes = []
+        self._lock = threading.Lock()
+        atexit.register(self.stop)
+
+    def ensure(self):
+        with self._lock:
+            self._processes = [p for p in self._processes if p.poll() is None]
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+            while len(self._processes) < self.size:
+                self._processes.append(subprocess.Popen(
+                    [sys.executable, "-m", "ums.jobs", "worker", "--parent", str(os.getpid()), *self.args], env=env))
+                self.started += 1
+        return self
+
+    def stop(self):
+        with self._lock:
+            for process in self._processes:
+                process.terminate()
+            for process in self._processes:
+                try:
+                    process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+            self._processes = []
+
+    def stats(self):
+        with self._lock:
+            alive = sum(1 for p in self._processes if p.poll() is None)
+        return {"size": self.size, "alive": alive, "started": self.started}
+
+
+# Follows jobs succeeding in any worker and calls on_finished(tables) with
+# the tables they wrote, so a process with a result cache (the app) can drop
+# what it cached of them whichever session submitted the job, or none is
+# watching it any more. Polls every POLL_SECONDS on a connection of its own.
+class JobWatcher(threading.Thread):
+    def __init__(self, backend, on_finished, interval=POLL_SECONDS):
+        super().__init__(name="job-watcher", daemon=True)
+        self.backend = backend
+        self.on_finished = on_finished
+        self.interval = interval
+        self.since = _now()  # jobs that finished before the app started are already in the data it reads
+        self._seen = set()   # job ids already reported that finished in the second `since`
+        self._done = threading.Event()
+
+    def run(self):
+        conn = None
+        while not self._done.wait(self.interval):
+            try:
+                conn = conn or self.backend.connect()
+                tables = self.poll(conn.cursor())
+                conn.commit()
+                if tables:
+                    self.on_finished(tables)
+            except self.backend.Error:
+                # Reconnect on the next poll; nothing is lost, `since` didn't move
+                if conn is not None:
+                    conn.close()
+                conn = None
+
+    # Tables written by the jobs that succeeded since the last poll.
+    # finished_at has whole seconds, so the ids seen in the latest second are
+    # kept to pick up a job finishing later within it
+    def poll(self, cursor):
+        cursor.execute("SELECT job_id, kind, finished_at FROM job WHERE status = 'Succeeded' AND finished_at >= %s",
+                       (self.since,))
+        rows = cursor.fetchall()
+        tables = set()
+        for job_id, kind, _ in rows:
+            if job_id not in self._seen and kind in KINDS:
+                tables.update(KINDS[kind].tables)
+        if rows:
+            latest = max(row[2] for row in rows)
+            self._seen = {job_id for job_id, _, finished_at in rows if finished_at == latest}
+            self.since = latest
+        return tables
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+def _param(text):
+    name, sep, value = text.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"bad parameter {text!r}; use name=value")
+    return name.strip(), value.strip()
+
+
+def main(argv=None):
+    from ums.backends import create_backend
+
+    parser = argparse.ArgumentParser(description="Background job queue and workers")
+    parser.add_argument("command", choices=["worker", "submit", "list", "cancel", "retry"])
+    parser.add_argument("target", nargs="?", help="submit: job kind; cancel/retry: job id")
+    parser.add_argument("--param", action="append", type=_param, default=[], metavar="NAME=VALUE",
+                        help="submit: job parameter")
+    parser.add_argument("--key", help="submit: idempotency key")
+    parser.add_argument("--processes", type=int, default=1, help="worker: number of worker processes")
+    parser.add_argument("--once", action="store_true", help="worker: exit when no job is due")
+    parser.add_argument("--parent", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--backend", help="mysql or sqlite (defaults to UMS_BACKEND)")
+    args = parser.parse_args(argv)
+    if args.command == "submit" and args.target not in KINDS:
+        parser.error(f"submit needs a job kind: {', '.join(KINDS)}")
+    if args.command in ("cancel", "retry") and not (args.target or "").isdigit():
+        parser.error(f"{args.command} needs a job id")
+
+    backend = create_backend(args.backend)
+    if args.command == "worker":
+        if args.processes > 1:
+            pool = WorkerPool(args.processes, ["--backend", backend.name] + (["--once"] if args.once else []))
+            pool.ensure()
+            try:
+                while pool.stats()["alive"]:
+                    time.sleep(POLL_SECONDS)
+                    if not args.once:
+                        pool.ensure()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                pool.stop()
+        else:
+            try:
+                work(backend, once=args.once, parent=args.parent)
+            except KeyboardInterrupt:
+                pass
+        return
+
+    conn = backend.connect()
+    try:
+        cursor = conn.cursor()
+        if args.command == "submit":
+            job_id, created = submit(cursor, args.target, dict(args.param), args.key)
+            conn.commit()
+            print(f"{'Queued' if created else 'Already submitted:'} job {job_id}")
+        elif args.command == "list":
+            for job in recent_jobs(cursor):
+                done = f"{job['progress_done']:,}/{job['progress_total']:,}" if job['progress_total'] else ""
+                print(f"{job['job_id']:>6}  {job['kind']:<22} {job['status']:<10} {done:<20} "
+                      f"{job['error'] or job['message'] or ''}")
+        elif args.command == "cancel":
+            cancelled = cancel(cursor, int(args.target))
+            conn.commit()
+            print(f"Cancelled job {args.target}" if cancelled else f"Job {args.target} is not queued")
+        else:
+            requeued = retry(cursor, int(args.target))
+            conn.commit()
+            print(f"Requeued job {args.target}" if requeued else f"Job {args.target} has not failed or been cancelled")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
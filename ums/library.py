@@ -0,0 +1,292 @@
+import argparse
+import re
+import time
+from datetime import date, timedelta
+
+from ums.summaries import WriteHooks
+
+# Library circulation: checkout, return and loss on the same transaction as
+# the book's status, fines for overdue loans, and title/author search.
+#
+# Every function takes the cursor of the caller's transaction. A checkout
+# claims the copy with a conditional UPDATE (status 'Available' ->
+# 'Checked Out'), so two desks can't lend the same copy.
+#
+# Fines are recomputed from the due date, never incremented, so the overdue
+# job is safe to run as often as wanted. It reads only open checkouts
+# through idx_checkout_open_due (data/migrations/0004) and prices them all
+# in one UPDATE.
+#
+# Search goes through library_search_term, an inverted index of the words of
+# each title and author kept current by BOOK_HOOKS. Every word typed must be
+# a prefix of one of the book's words, and each one is an index range scan.
+#
+#   python -m ums.library overdue          # accrue fines on overdue checkouts
+#   python -m ums.library reindex          # rebuild the search index
+#   python -m ums.library search "clean code"
+
+LOAN_DAYS = 21
+MAX_LOANS = 5
+DAILY_FINE = 0.25
+FINE_CAP = 20.00    # also the charge for a lost book
+SEARCH_LIMIT = 50
+TERM_LENGTH = 64
+INDEX_CHUNK = 5000
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Fine for every overdue open checkout as of a date:
+# params (cap, as_of, daily rate, as_of)
+_ACCRUE = {
+    "mysql": """
+        UPDATE Checkout_Record SET fine_amount = LEAST(%s, DATEDIFF(%s, due_date) * %s)
+        WHERE return_date IS NULL AND due_date < %s
+    """,
+    "sqlite": """
+        UPDATE Checkout_Record SET fine_amount = MIN(%s, ROUND((julianday(%s) - julianday(due_date)) * %s, 2))
+        WHERE return_date IS NULL AND due_date < %s
+    """,
+}
+
+OVERDUE = """
+SELECT c.checkout_id, c.book_id, b.title, b.isbn, c.student_id,
+       CONCAT(p.first_name, ' ', p.last_name) as student_name, c.due_date, c.fine_amount
+FROM Checkout_Record c
+JOIN Library_Book b ON c.book_id = b.book_id
+JOIN Student s ON c.student_id = s.student_id
+JOIN Person p ON s.person_id = p.person_id
+WHERE c.return_date IS NULL AND c.due_date < %s
+ORDER BY c.due_date
+LIMIT %s
+"""
+
+
+class CirculationError(Exception):
+    pass
+
+
+def fine_for(due_date, as_of):
+    return round(min(FINE_CAP, max(0, (as_of - due_date).days) * DAILY_FINE), 2)
+
+
+# --- availability ----------------------------------------------------------
+
+# (book_id, status) for an ISBN, or None; a point lookup on idx_library_book_isbn_status
+def availability(cursor, isbn):
+    cursor.execute("SELECT book_id, status FROM Library_Book WHERE isbn = %s", (isbn.strip(),))
+    return cursor.fetchone()
+
+
+# The open checkout of a book as (checkout_id, student_id, due_date), or None
+def open_checkout(cursor, book_id):
+    cursor.execute("SELECT checkout_id, student_id, due_date FROM Checkout_Record "
+                   "WHERE book_id = %s AND return_date IS NULL", (book_id,))
+    return cursor.fetchone()
+
+
+# --- circulation -----------------------------------------------------------
+
+# Lend a book; returns the due date
+def checkout(cursor, book_id, student_id, today=None, loan_days=LOAN_DAYS):
+    today = today or date.today()
+    cursor.execute("SELECT COUNT(*) FROM Checkout_Record WHERE student_id = %s AND return_date IS NULL",
+                   (student_id,))
+    if cursor.fetchone()[0] >= MAX_LOANS:
+        raise CirculationError(f"Student {student_id} already has {MAX_LOANS} books out")
+    cursor.execute("UPDATE Library_Book SET status = 'Checked Out' WHERE book_id = %s AND status = 'Available'",
+                   (book_id,))
+    if cursor.rowcount != 1:
+        raise CirculationError(f"Book {book_id} is not available")
+    due = today + timedelta(days=loan_days)
+    cursor.execute("INSERT INTO Checkout_Record (book_id, student_id, checkout_date, due_date) "
+                   "VALUES (%s, %s, %s, %s)", (book_id, student_id, today, due))
+    return due
+
+
+# Take a book back; returns the final fine on the checkout
+def return_book(cursor, book_id, today=None):
+    today = today or date.today()
+    current = open_checkout(cursor, book_id)
+    if current is None:
+        raise CirculationError(f"Book {book_id} is not checked out")
+    checkout_id, _, due = current
+    fine = fine_for(due, today)
+    cursor.execute("UPDATE Checkout_Record SET return_date = %s, fine_amount = %s WHERE checkout_id = %s",
+                   (today, fine, checkout_id))
+    cursor.execute("UPDATE Library_Book SET status = 'Available' WHERE book_id = %s", (book_id,))
+    return fine
+
+
+# Write a book off; an open checkout is closed with the lost-book charge.
+# Returns the charge (0 when the book wasn't out).
+def mark_lost(cursor, book_id, today=None):
+    today = today or date.today()
+    current = open_checkout(cursor, book_id)
+    charge = 0
+    if current is not None:
+        charge = FINE_CAP
+        cursor.execute("UPDATE Checkout_Record SET return_date = %s, fine_amount = %s WHERE checkout_id = %s",
+                       (today, charge, current[0]))
+    cursor.execute("UPDATE Library_Book SET status = 'Lost' WHERE book_id = %s", (book_id,))
+    if cursor.rowcount != 1:
+        raise CirculationError(f"Book {book_id} does not exist")
+    return charge
+
+
+# --- overdue processing ----------------------------------------------------
+
+# Price every overdue open checkout as of `as_of` in one statement; returns
+# (overdue checkouts, their total fines)
+def accrue_fines(cursor, backend_name, as_of=None):
+    as_of = as_of or date.today()
+    cursor.execute(_ACCRUE[backend_name], (FINE_CAP, as_of, DAILY_FINE, as_of))
+    cursor.execute("SELECT COUNT(*), COALESCE(SUM(fine_amount), 0) FROM Checkout_Record "
+                   "WHERE return_date IS NULL AND due_date < %s", (as_of,))
+    count, total = cursor.fetchone()
+    return count, float(total)
+
+
+def overdue(cursor, as_of=None, limit=100):
+    cursor.execute(OVERDUE, (as_of or date.today(), limit))
+    return cursor.fetchall()
+
+
+# --- search index ----------------------------------------------------------
+
+def terms(*texts):
+    words = set()
+    for text in texts:
+        words.update(word[:TERM_LENGTH] for word in _WORD.findall((text or "").lower()))
+    return words
+
+
+def unindex_books(cursor, book_ids):
+    if book_ids:
+        cursor.execute(f"DELETE FROM library_search_term WHERE book_id IN ({', '.join(['%s'] * len(book_ids))})",
+                       tuple(book_ids))
+
+
+def index_books(cursor, book_ids):
+    if not book_ids:
+        return
+    cursor.execute(f"SELECT book_id, title, author FROM Library_Book "
+                   f"WHERE book_id IN ({', '.join(['%s'] * len(book_ids))})", tuple(book_ids))
+    rows = [(term, book_id) for book_id, title, author in cursor.fetchall() for term in terms(title, author)]
+    if rows:
+        cursor.executemany("INSERT INTO library_search_term (term, book_id) VALUES (%s, %s)", rows)
+
+
+def book_removed(cursor, book_id):
+    unindex_books(cursor, [book_id])
+
+
+def book_added(cursor, book_id):
+    index_books(cursor, [book_id])
+
+
+def books_changed(cursor, keys):
+    book_ids = list({key[0] for key in keys})
+    unindex_books(cursor, book_ids)
+    index_books(cursor, book_ids)
+
+
+BOOK_HOOKS = WriteHooks(book_removed, book_added, books_changed)
+
+
+# Refill library_search_term from Library_Book; returns the number of terms
+def rebuild_search_index(conn, backend=None):
+    cursor = conn.cursor()
+    count = 0
+    try:
+        cursor.execute("DELETE FROM library_search_term")
+        cursor.execute("SELECT book_id, title, author FROM Library_Book")
+        books = cursor.fetchall()
+        rows = [(term, book_id) for book_id, title, author in books for term in terms(title, author)]
+        for start in range(0, len(rows), INDEX_CHUNK):
+            cursor.executemany("INSERT INTO library_search_term (term, book_id) VALUES (%s, %s)",
+                               rows[start:start + INDEX_CHUNK])
+        count = len(rows)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return count
+
+
+def search_indexed(conn, backend):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT term FROM library_search_term LIMIT 1")
+        cursor.fetchall()
+        return True
+    except backend.Error:
+        conn.rollback()
+        return False
+    finally:
+        cursor.close()
+
+
+# Every word starting with `prefix` sorts below this (term is utf8mb4_bin,
+# see migration 0004)
+def _prefix_end(prefix):
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+# Books whose title/author words start with every word of `text`, as
+# (sql, params) for fetch_data or a cursor
+def search_query(text, limit=SEARCH_LIMIT):
+    words = sorted(terms(text), key=len, reverse=True)  # longest (most selective) first
+    if not words:
+        return None
+    conditions, params = [], []
+    for word in words:
+        conditions.append("b.book_id IN (SELECT book_id FROM library_search_term WHERE term >= %s AND term < %s)")
+        params.extend([word, _prefix_end(word)])
+    sql = (f"SELECT b.book_id, b.title, b.author, b.isbn, b.status FROM Library_Book b "
+           f"WHERE {' AND '.join(conditions)} ORDER BY b.title, b.book_id LIMIT %s")
+    return sql, tuple(params) + (limit,)
+
+
+def search(cursor, text, limit=SEARCH_LIMIT):
+    query = search_query(text, limit)
+    if query is None:
+        return []
+    cursor.execute(*query)
+    return cursor.fetchall()
+
+
+def main(argv=None):
+    from ums.backends import create_backend
+
+    parser = argparse.ArgumentParser(description="Library circulation jobs")
+    parser.add_argument("command", choices=["overdue", "reindex", "search"])
+    parser.add_argument("text", nargs="?", help="search: words to look for")
+    parser.add_argument("--as-of", type=date.fromisoformat, help="overdue: date to price fines at (default today)")
+    parser.add_argument("--backend", help="mysql or sqlite (defaults to UMS_BACKEND)")
+    args = parser.parse_args(argv)
+
+    backend = create_backend(args.backend)
+    conn = backend.connect()
+    started = time.perf_counter()
+    try:
+        if args.command == "reindex":
+            count = rebuild_search_index(conn, backend)
+            print(f"Indexed {count:,} terms in {time.perf_counter() - started:.2f}s")
+        elif args.command == "overdue":
+            cursor = conn.cursor()
+            updated, total = accrue_fines(cursor, backend.name, args.as_of)
+            conn.commit()
+            print(f"{updated:,} overdue checkouts, {total:,.2f} in fines "
+                  f"({time.perf_counter() - started:.2f}s)")
+        else:
+            for row in search(conn.cursor(), args.text or ""):
+                print(row)
+            print(f"({time.perf_counter() - started:.3f}s)")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+from collections import OrderedDict
+
+import streamlit as st
+
+from ums.db import fetch_data, get_query_cache, TTL_LOOKUP
+
+# Type-ahead pickers for foreign keys. Instead of shipping every row of a
+# table to a selectbox, each lookup runs a prefix search (LIKE 'term%' on
+# indexed columns) with a LIMIT, and resolving a stored id back to its
+# label is a single primary-key lookup.
+
+SEARCH_LIMIT = 20
+SESSION_CACHE_SIZE = 64
+
+
+class Lookup:
+    def __init__(self, name, id_column, label_sql, from_sql, search_columns, where_sql=None,
+                 limit=SEARCH_LIMIT):
+        self.name = name
+        self.id_column = id_column
+        self.label_sql = label_sql
+        self.from_sql = from_sql
+        self.search_columns = search_columns
+        self.where_sql = where_sql
+        self.limit = limit
+
+    def _select(self):
+        return f"SELECT {self.id_column} AS value, {self.label_sql} AS label FROM {self.from_sql}"
+
+    # Every word must prefix-match one of the search columns; numbers also match the id
+    def search_query(self, term):
+        conditions = [self.where_sql] if self.where_sql else []
+        params = []
+        for word in term.split():
+            pattern = escape_like(word) + "%"
+            options = [f"{col} LIKE %s ESCAPE '!'" for col in self.search_columns]
+            params.extend([pattern] * len(self.search_columns))
+            if word.isdigit():
+                options.append(f"{self.id_column} = %s")
+                params.append(int(word))
+            conditions.append("(" + " OR ".join(options) + ")")
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        # Ordering on the first (indexed) search column keeps LIMIT cheap
+        sql = f"{self._select()}{where} ORDER BY {self.search_columns[0]}, {self.id_column} LIMIT %s"
+        return sql, tuple(params) + (self.limit,)
+
+    def resolve_query(self, value):
+        conditions = [f"{self.id_column} = %s"]
+        if self.where_sql:
+            conditions.append(self.where_sql)
+        return f"{self._select()} WHERE {' AND '.join(conditions)}", (value,)
+
+
+# `text` for a LIKE pattern that matches it literally (with ESCAPE '!')
+def escape_like(text):
+    return text.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+
+
+DEPARTMENTS = Lookup(
+    "department", "d.dept_id", "d.dept_name", "Department d", ["d.dept_name"])
+COURSES = Lookup(
+    "course", "c.course_id", "c.title", "Course c", ["c.title"])
+STUDENTS = Lookup(
+    "student", "s.student_id", "CONCAT(p.first_name, ' ', p.last_name)",
+    "Student s JOIN Person p ON s.person_id = p.person_id",
+    ["p.last_name", "p.first_name"])
+FACULTY = Lookup(
+    "faculty", "f.faculty_id", "CONCAT(p.first_name, ' ', p.last_name)",
+    "Faculty f JOIN Person p ON f.person_id = p.person_id",
+    ["p.last_name", "p.first_name"])
+SECTIONS = Lookup(
+    "section", "s.section_id", "CONCAT(c.title, ' (', s.semester, ' ', s.year, ')')",
+    "Section s JOIN Course c ON s.course_id = c.course_id",
+    ["c.title"])
+LIBRARY_FACILITIES = Lookup(
+    "library_facility", "f.facility_id", "CONCAT(f.facility_type, ' - ', f.location)",
+    "Facility f", ["f.location"], where_sql="f.facility_type = 'Library'")
+
+
+# Small per-session LRU in front of the shared query cache, dropped after any write
+def _session_cache():
+    generation = get_query_cache().generation()
+    if st.session_state.get("lookup_cache_generation") != generation:
+        st.session_state["lookup_cache"] = OrderedDict()
+        st.session_state["lookup_cache_generation"] = generation
+    return st.session_state["lookup_cache"]
+
+
+def search(lookup, term):
+    term = " ".join(term.split())
+    cache = _session_cache()
+    key = (lookup.name, term.lower())
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+    rows = fetch_data(*lookup.search_query(term), ttl=TTL_LOOKUP)
+    cache[key] = rows
+    while len(cache) > SESSION_CACHE_SIZE:
+        cache.popitem(last=False)
+    return rows
+
+
+def resolve(lookup, value):
+    if value is None:
+        return None
+    rows = fetch_data(*lookup.resolve_query(value), ttl=TTL_LOOKUP)
+    return rows[0] if rows else None
+
+
+# Search box plus a selectbox of the matching candidates; returns the chosen id.
+# Has to live outside st.form, since typing in a form doesn't rerun the script.
+def lookup_select(label, lookup, key, current_value=None):
+    term = st.text_input(f"Search {label.lower()}", key=f"{key}_search",
+                         placeholder="Type a name or id")
+    rows = list(search(lookup, term))
+    if current_value is not None and all(r["value"] != current_value for r in rows):
+        current = resolve(lookup, current_value)
+        if current:
+            rows.insert(0, current)
+
+    if not rows:
+        st.selectbox(label, ["No matches"], disabled=True, key=f"{key}_empty")
+        return None
+
+    labels = {r["value"]: f"{r['label']} (#{r['value']})" for r in rows}
+    values = list(labels)
+    index = values.index(current_value) if current_value in labels else 0
+    if len(rows) >= lookup.limit:
+        st.caption(f"Showing the first {lookup.limit} matches; type more to narrow down")
+    return st.selectbox(label, values, index=index, format_func=labels.get, key=key)
@@ -0,0 +1,127 @@
+import argparse
+import importlib
+import os
+import re
+from datetime import datetime
+
+from ums.backends import create_backend, _skip_string
+
+# Versioned schema migrations. Files in data/migrations are named
+# NNNN_description.sql, written in the MySQL dialect and applied in order;
+# applied versions are recorded in schema_migrations.
+#
+#   python -m ums.migrate            apply pending migrations
+#   python -m ums.migrate --status   list applied and pending migrations
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "migrations")
+
+_FILENAME = re.compile(r"^(\d+)_(\w+)\.sql$")
+
+# Data steps SQL can't express, run right after their migration is recorded:
+# version -> "module:function", called as function(conn, backend)
+POST_MIGRATION = {
+    4: "ums.library:rebuild_search_index",
+    5: "ums.billing:rebuild_ledgers",
+    6: "ums.people:rebuild_search_index",
+}
+
+CREATE_MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INT PRIMARY KEY,
+    name VARCHAR(200) NOT NULL,
+    applied_at DATETIME NOT NULL
+)
+"""
+
+
+def available_migrations(directory=MIGRATIONS_DIR):
+    migrations = []
+    for filename in sorted(os.listdir(directory)):
+        match = _FILENAME.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    return migrations
+
+
+# Split a script on top-level semicolons, dropping -- comments
+def split_statements(script):
+    script = "\n".join(line for line in script.splitlines() if not line.strip().startswith("--"))
+    statements, start, i = [], 0, 0
+    while i < len(script):
+        if script[i] in ("'", '"'):
+            i = _skip_string(script, i)
+            continue
+        if script[i] == ";":
+            statements.append(script[start:i])
+            start = i + 1
+        i += 1
+    statements.append(script[start:])
+    return [s.strip() for s in statements if s.strip()]
+
+
+def applied_versions(conn):
+    cursor = conn.cursor()
+    cursor.execute(CREATE_MIGRATIONS_TABLE)
+    conn.commit()
+    cursor.execute("SELECT version FROM schema_migrations")
+    versions = {row[0] for row in cursor.fetchall()}
+    cursor.close()
+    return versions
+
+
+def apply_migration(conn, backend, version, name, path):
+    with open(path, encoding="utf-8") as f:
+        statements = split_statements(f.read())
+    cursor = conn.cursor()
+    try:
+        for statement in statements:
+            cursor.execute(backend.translate_ddl(statement))
+        cursor.execute(
+            "INSERT INTO schema_migrations (version, name, applied_at) VALUES (%s, %s, %s)",
+            (version, name, datetime.now().replace(microsecond=0)))
+        conn.commit()
+    except backend.Error:
+        # MySQL commits DDL implicitly, so a failed migration may be partly applied
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    if version in POST_MIGRATION:
+        module, function = POST_MIGRATION[version].split(":")
+        getattr(importlib.import_module(module), function)(conn, backend)
+
+
+# Apply every migration newer than what the database has; returns the names applied
+def apply_pending(conn, backend, directory=MIGRATIONS_DIR):
+    done = applied_versions(conn)
+    applied = []
+    for version, name, path in available_migrations(directory):
+        if version not in done:
+            apply_migration(conn, backend, version, name, path)
+            applied.append(f"{version:04d}_{name}")
+    return applied
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply schema migrations from data/migrations")
+    parser.add_argument("--status", action="store_true", help="list migrations without applying them")
+    parser.add_argument("--backend", help="mysql or sqlite (defaults to UMS_BACKEND)")
+    args = parser.parse_args(argv)
+
+    backend = create_backend(args.backend)
+    conn = backend.connect()
+    try:
+        if args.status:
+            done = applied_versions(conn)
+            for version, name, _ in available_migrations():
+                state = "applied" if version in done else "pending"
+                print(f"{version:04d}_{name}: {state}")
+        else:
+            applied = apply_pending(conn, backend)
+            print("\n".join(f"applied {name}" for name in applied) or "Database is up to date")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
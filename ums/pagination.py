@@ -0,0 +1,216 @@
+import re
+
+import pandas as pd
+import streamlit as st
+
+from ums.db import fetch_data
+from ums.export import export_panel
+from ums.lookups import escape_like
+from ums.profiler import fragment
+
+# Server-side paging for the View tabs. The display query is wrapped as a
+# derived table so its column aliases can be sorted and filtered on, and
+# pages are fetched with keyset (seek) predicates instead of OFFSET, so
+# every page costs the same no matter how deep the user has paged.
+#
+# paginated_fragment runs the table as an st.fragment: changing the filter,
+# sort or page reruns only the table, not the tabs beside it.
+
+PAGE_SIZES = [25, 50, 100, 250]
+TTL_COUNT = 120  # the total-count query is cached longer than the pages themselves
+
+# Filter text is matched literally: % and _ typed into a LIKE filter are escaped
+FILTER_OPERATORS = {
+    "contains": ("LIKE %s ESCAPE '!'", lambda v: f"%{escape_like(v)}%"),
+    "starts with": ("LIKE %s ESCAPE '!'", lambda v: f"{escape_like(v)}%"),
+    "equals": ("= %s", lambda v: v),
+    ">=": (">= %s", lambda v: v),
+    "<=": ("<= %s", lambda v: v),
+}
+
+_ORDER_BY = re.compile(r"\s+ORDER\s+BY\s+([^()]*?)\s*$", re.IGNORECASE | re.DOTALL)
+_IDENTIFIER = re.compile(r"^[A-Za-z_]\w*$")
+
+
+# Split a trailing ORDER BY off a query: returns (base_query, first sort column, descending)
+def split_order_by(query):
+    query = query.strip()
+    match = _ORDER_BY.search(query)
+    if not match:
+        return query, None, False
+    first_term = match.group(1).split(",")[0].split()
+    column = first_term[0].split(".")[-1]
+    descending = len(first_term) > 1 and first_term[1].upper() == "DESC"
+    return query[:match.start()], column, descending
+
+
+def _check_identifier(name, allowed):
+    if not _IDENTIFIER.match(name) or name not in allowed:
+        raise ValueError(f"Unknown column: {name}")
+    return name
+
+
+def filter_clause(filters, allowed_columns):
+    conditions, params = [], []
+    for column, operator, value in filters:
+        if value in (None, ""):
+            continue
+        sql_op, transform = FILTER_OPERATORS[operator]
+        conditions.append(f"v.{_check_identifier(column, allowed_columns)} {sql_op}")
+        params.append(transform(value))
+    return conditions, params
+
+
+# Rows after `after` (a (sort_value, key_values) pair) in ORDER BY sort, keys.
+# NULLs sort first ascending in both MySQL and SQLite, so they are handled explicitly.
+def seek_clause(sort_column, descending, key_columns, after):
+    sort_value, key_values = after
+    keys = ", ".join(f"v.{k}" for k in key_columns)
+    placeholders = ", ".join(["%s"] * len(key_columns))
+    if len(key_columns) > 1:
+        keys, placeholders = f"({keys})", f"({placeholders})"
+    cmp = "<" if descending else ">"
+    col = f"v.{sort_column}"
+
+    if sort_column in key_columns and len(key_columns) == 1:
+        return f"{col} {cmp} %s", [sort_value]
+    if sort_value is None:
+        tie = f"({col} IS NULL AND {keys} {cmp} {placeholders})"
+        if descending:
+            return tie, list(key_values)
+        return f"({tie} OR {col} IS NOT NULL)", list(key_values)
+    clause = f"({col} {cmp} %s OR ({col} = %s AND {keys} {cmp} {placeholders})"
+    clause += f" OR {col} IS NULL)" if descending else ")"
+    return clause, [sort_value, sort_value] + list(key_values)
+
+
+def build_page_query(base_query, sort_column, descending, key_columns, allowed_columns,
+                     filters=(), after=None, page_size=25):
+    allowed = set(allowed_columns) | set(key_columns)
+    sort_column = _check_identifier(sort_column, allowed)
+    for key in key_columns:
+        _check_identifier(key, allowed)
+
+    conditions, params = filter_clause(filters, allowed)
+    if after is not None:
+        seek, seek_params = seek_clause(sort_column, descending, key_columns, after)
+        conditions.append(seek)
+        params.extend(seek_params)
+
+    direction = "DESC" if descending else "ASC"
+    order = [f"v.{sort_column} {direction}"]
+    order += [f"v.{k} {direction}" for k in key_columns if k != sort_column]
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    # One extra row tells us whether a next page exists
+    sql = (f"SELECT * FROM ({base_query}) AS v{where} "
+           f"ORDER BY {', '.join(order)} LIMIT %s")
+    return sql, tuple(params) + (page_size + 1,)
+
+
+def build_count_query(base_query, allowed_columns, filters=()):
+    conditions, params = filter_clause(filters, set(allowed_columns))
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    return f"SELECT COUNT(*) AS total FROM ({base_query}) AS v{where}", tuple(params)
+
+
+# Every matching row (no LIMIT), restricted to `columns`, in the view's order
+def build_export_query(base_query, columns, allowed_columns, sort_column=None, descending=False,
+                       key_columns=(), filters=()):
+    allowed = set(allowed_columns) | set(key_columns)
+    select = ", ".join(f"v.{_check_identifier(c, allowed)}" for c in columns)
+    conditions, params = filter_clause(filters, allowed)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    order = ""
+    if sort_column:
+        direction = "DESC" if descending else "ASC"
+        terms = [f"v.{_check_identifier(sort_column, allowed)} {direction}"]
+        terms += [f"v.{_check_identifier(k, allowed)} {direction}" for k in key_columns if k != sort_column]
+        order = f" ORDER BY {', '.join(terms)}"
+    return f"SELECT {select} FROM ({base_query}) AS v{where}{order}", tuple(params)
+
+
+# Render a paged, sortable, filterable table and return the rows on the current page
+def paginated_view(view_key, display_query, columns, key_columns, empty_message="No records found"):
+    base_query, default_sort, default_desc = split_order_by(display_query)
+    key_columns = [k.strip() for k in key_columns]
+    sortable = list(dict.fromkeys(list(columns) + key_columns))
+    state = st.session_state.setdefault(f"page_state_{view_key}", {"cursors": [None], "signature": None})
+
+    col1, col2, col3, col4, col5 = st.columns([2, 1, 2, 2, 1])
+    with col1:
+        filter_column = st.selectbox("Filter column", sortable, key=f"{view_key}_filter_column")
+    with col2:
+        operator = st.selectbox("Match", list(FILTER_OPERATORS), key=f"{view_key}_filter_op")
+    with col3:
+        filter_value = st.text_input("Filter value", key=f"{view_key}_filter_value")
+    with col4:
+        default_index = sortable.index(default_sort) if default_sort in sortable else 0
+        sort_column = st.selectbox("Sort by", sortable, index=default_index, key=f"{view_key}_sort")
+    with col5:
+        descending = st.checkbox("Descending", value=default_desc, key=f"{view_key}_desc")
+    page_size = st.selectbox("Rows per page", PAGE_SIZES, key=f"{view_key}_page_size")
+
+    filters = [(filter_column, operator, filter_value.strip())]
+    signature = (filter_column, operator, filter_value.strip(), sort_column, descending, page_size)
+    if state["signature"] != signature:
+        state["signature"] = signature
+        state["cursors"] = [None]
+
+    count_query, count_params = build_count_query(base_query, sortable, filters)
+    count = fetch_data(count_query, count_params, ttl=TTL_COUNT)
+    total = count[0]["total"] if count else 0
+
+    query, params = build_page_query(base_query, sort_column, descending, key_columns, sortable,
+                                     filters, after=state["cursors"][-1], page_size=page_size)
+    rows = fetch_data(query, params)
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+
+    if rows:
+        st.dataframe(pd.DataFrame(rows))
+    else:
+        st.info(empty_message)
+
+    page_number = len(state["cursors"])
+    pages = max(1, -(-total // page_size))
+    nav1, nav2, nav3, nav4 = st.columns([1, 1, 1, 3])
+    with nav1:
+        if st.button("First", key=f"{view_key}_first", disabled=page_number == 1):
+            state["cursors"] = [None]
+            st.rerun()
+    with nav2:
+        if st.button("Previous", key=f"{view_key}_prev", disabled=page_number == 1):
+            state["cursors"].pop()
+            st.rerun()
+    with nav3:
+        if st.button("Next", key=f"{view_key}_next", disabled=not has_next):
+            last = rows[-1]
+            state["cursors"].append((last.get(sort_column), tuple(last[k] for k in key_columns)))
+            st.rerun()
+    with nav4:
+        st.caption(f"Page {page_number} of {pages} · {total} matching rows")
+
+    export_panel(view_key, sortable, total, lambda selected: build_export_query(
+        base_query, selected, sortable, sort_column, descending, key_columns, filters))
+
+    return rows
+
+
+# paginated_view in a fragment of its own. Returns the rows on the current
+# page; the other tabs choose from them, so a fragment rerun that lands on
+# different rows reruns the whole page.
+def paginated_fragment(view_key, display_query, columns, key_columns, empty_message="No records found"):
+    shown = f"page_rows_{view_key}"
+    st.session_state[shown] = None
+    _view_fragment(view_key, display_query, columns, key_columns, empty_message)
+    return st.session_state[shown]
+
+
+@fragment("View")
+def _view_fragment(view_key, display_query, columns, key_columns, empty_message):
+    shown = f"page_rows_{view_key}"
+    previous = st.session_state.get(shown)
+    rows = paginated_view(view_key, display_query, columns, key_columns, empty_message)
+    st.session_state[shown] = rows
+    if previous is not None and rows != previous:
+        st.rerun()
@@ -0,0 +1,155 @@
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import streamlit as st
+
+from ums.db import POOL_SIZE, database_error, get_query_cache, get_router, session_last_write
+from ums.pool import PoolTimeout
+from ums.profiler import attributed, capture_context, get_profiler
+
+# Parallel fan-out for pages that need several independent reads. Queries go
+# to a shared thread pool, each on its own pooled connection (routed like
+# fetch_data, so replicas are used when configured), so a page waits
+# for its slowest query instead of the sum of all of them. Every query has a
+# deadline; one that misses it is cancelled (dequeued if it has not started,
+# interrupted on the server if it has) and its result comes back empty.
+#
+#   students, faculty = fetch_parallel([Query(STUDENTS_SQL), Query(FACULTY_SQL, ttl=30)])
+#
+# A Query with columnar=True comes back as a pyarrow Table (ums/columnar.py)
+# instead of a list of dicts.
+
+QUERY_WORKERS = int(os.environ.get("UMS_QUERY_WORKERS", str(POOL_SIZE)))
+QUERY_TIMEOUT = float(os.environ.get("UMS_QUERY_TIMEOUT", "10"))
+
+
+class QueryCancelled(Exception):
+    pass
+
+
+# One read for fetch_parallel; query/params/ttl mean the same as for fetch_data
+class Query:
+    def __init__(self, query, params=None, ttl=None, timeout=None, columnar=False):
+        self.query = query
+        self.params = params
+        self.ttl = ttl
+        self.timeout = timeout
+        self.columnar = columnar
+
+    # What a failed or cancelled read returns
+    def empty(self):
+        if self.columnar:
+            from ums.columnar import EMPTY
+            return EMPTY
+        return []
+
+
+# Shared by all sessions; sized to the connection pool so workers don't queue on checkout
+@st.cache_resource(show_spinner=False)
+def get_executor():
+    return ThreadPoolExecutor(max_workers=QUERY_WORKERS, thread_name_prefix="ums-query")
+
+
+# The connection a submitted query is running on, so the waiting thread can
+# interrupt it. The lock keeps a cancel from reaching a connection that has
+# already gone back to the pool.
+class _Running:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conn = None
+        self.cancelled = False
+
+    def attach(self, conn):
+        with self._lock:
+            if self.cancelled:
+                return False
+            self._conn = conn
+            return True
+
+    def detach(self):
+        with self._lock:
+            self._conn = None
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            if self._conn is not None:
+                try:
+                    self._conn.cancel()
+                except Exception:
+                    pass
+
+
+def _run(request, running, context, generation, last_write):
+    with attributed(context):
+        conn, fresh = get_router().reader(last_write)
+        try:
+            if not running.attach(conn):
+                raise QueryCancelled()
+            cursor = conn.cursor(dictionary=not request.columnar)
+            if request.params:
+                cursor.execute(request.query, request.params)
+            else:
+                cursor.execute(request.query)
+            if request.columnar:
+                from ums.columnar import read_table
+                rows = read_table(cursor)
+            else:
+                rows = cursor.fetchall()
+        finally:
+            running.detach()
+            conn.close()
+    if fresh:
+        get_query_cache().put(request.query, rows, request.params, request.ttl, generation,
+                              columnar=request.columnar)
+    return rows
+
+
+# Run `requests` (a list of Query) concurrently and return their rows in the
+# same order. Cached results are served without a round trip. `timeout` is the
+# default per-query limit in seconds (Query.timeout overrides it); a query that
+# fails or runs past its limit is reported on the page and returns no rows.
+def fetch_parallel(requests, timeout=None):
+    cache = get_query_cache()
+    results = [None] * len(requests)
+    generation = cache.generation()
+    context = capture_context()
+    last_write = session_last_write()
+    started = time.monotonic()
+    pending = {}
+
+    for i, request in enumerate(requests):
+        if request.ttl != 0:
+            cached = cache.get(request.query, request.params, columnar=request.columnar)
+            if cached is not None:
+                get_profiler().record_cache_hit(request.query)
+                results[i] = cached if request.columnar else list(cached)
+                continue
+        limit = request.timeout or timeout or QUERY_TIMEOUT
+        running = _Running()
+        future = get_executor().submit(_run, request, running, context, generation, last_write)
+        pending[future] = (i, running, started + limit, limit)
+
+    while pending:
+        next_deadline = min(deadline for _, _, deadline, _ in pending.values())
+        done, _ = wait(pending, timeout=max(0.0, next_deadline - time.monotonic()),
+                       return_when=FIRST_COMPLETED)
+        for future in done:
+            i = pending.pop(future)[0]
+            try:
+                results[i] = future.result()
+            except (database_error(), PoolTimeout) as err:
+                st.error(f"Database query error: {err}")
+                results[i] = requests[i].empty()
+
+        now = time.monotonic()
+        for future, (i, running, deadline, limit) in list(pending.items()):
+            if deadline <= now:
+                del pending[future]
+                future.cancel()
+                running.cancel()
+                st.warning(f"A query ran past {limit:g}s and was cancelled; some data is missing")
+                results[i] = requests[i].empty()
+    return results
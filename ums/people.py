@@ -0,0 +1,372 @@
+import argparse
+import re
+import time
+
+# People search over Person (and through it Student and Faculty): names,
+# email addresses and contact numbers, with prefix and typo-tolerant matching
+# and ranked results.
+#
+# person_search_term (data/migrations/0006) holds one row per distinct term of
+# each person: the lowercase words of the first and last name and of the
+# email's local part, and the phone number's digit groups, all its digits and
+# its last four. Every word typed must match one of a person's terms:
+#
+# - as a prefix ("smi" -> smith). person_search_gram maps each trigram of a
+#   word ("$sm", "smi", ..., "th$") to it, so the words starting with "smi"
+#   are a range within gram "$sm"; a prefix that starts too many words, or
+#   digits, is searched as a range of person_search_term instead;
+# - or, for alphabetic words of 4+ letters, within 1 edit (2 from 6 letters)
+#   of a term: candidates are the words sharing enough trigrams with it, an
+#   index probe per trigram, checked with an edit distance in Python.
+#
+# The word with the fewest postings drives the lookup, best matches first,
+# and the others are checked per candidate through the (term, person_id)
+# key, so no query scans Person. Exact matches rank above prefixes (longer
+# prefixes first) and prefixes above typos; a person's score is the sum over
+# the words typed.
+#
+# The index is updated in the caller's transaction by person_added,
+# person_changed and person_removed (the Students and Faculty pages, the bulk
+# importer).
+#
+#   python -m ums.people search "jon smi"
+#   python -m ums.people reindex        # after writing Person outside the app
+
+SEARCH_LIMIT = 20
+TERM_LENGTH = 64
+INDEX_CHUNK = 5000
+CANDIDATE_ROWS = 2000   # (person, matched terms) rows read per search
+PREFIX_TERMS = 50       # words a typed prefix is expanded to before it is searched as a range
+DRIVER_PROBE = 5000     # postings counted when picking the driving word
+FUZZY_LENGTH = 4        # shortest word matched with typos
+
+_WORD = re.compile(r"[a-z]+|[0-9]+")
+
+PEOPLE = """
+SELECT p.person_id, p.first_name, p.last_name, p.person_type, p.email, p.contact_number,
+       s.student_id, f.faculty_id
+FROM Person p
+LEFT JOIN Student s ON s.person_id = p.person_id
+LEFT JOIN Faculty f ON f.person_id = p.person_id
+WHERE p.person_id IN ({marks})
+"""
+
+
+# --- terms -----------------------------------------------------------------
+
+def words(text):
+    return [word[:TERM_LENGTH] for word in _WORD.findall((text or "").lower())]
+
+
+# Words of a search; only the local part of an email address is indexed
+def query_words(text):
+    return list(dict.fromkeys(word for token in (text or "").split() for word in words(token.split("@")[0])))
+
+
+# Search terms of one person
+def person_terms(first_name, last_name, email, contact_number):
+    result = set(words(first_name)) | set(words(last_name))
+    result.update(words((email or "").split("@")[0]))
+    result.update(words(contact_number))
+    digits = "".join(re.findall(r"[0-9]", contact_number or ""))[:TERM_LENGTH]
+    if digits:
+        result.add(digits)
+        result.add(digits[-4:])
+    return result
+
+
+# Trigrams of a term, padded so that its first and last letters count too
+def grams(term):
+    padded = f"${term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# Typos allowed in a word of this length
+def max_edits(word):
+    if len(word) < FUZZY_LENGTH or not word.isalpha():
+        return 0
+    return 1 if len(word) <= 5 else 2
+
+
+# Optimal string alignment distance (a swap of neighbours is one edit);
+# anything over `limit` comes back as limit + 1
+def edit_distance(a, b, limit):
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if before is not None and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+def _marks(values):
+    return ", ".join(["%s"] * len(values))
+
+
+# --- index maintenance -----------------------------------------------------
+
+def _term_rows(people):
+    return [(term, person_id) for person_id, *fields in people for term in person_terms(*fields)]
+
+
+def _add_terms(cursor, rows):
+    for start in range(0, len(rows), INDEX_CHUNK):
+        cursor.executemany("INSERT INTO person_search_term (term, person_id) VALUES (%s, %s)",
+                           rows[start:start + INDEX_CHUNK])
+    gram_rows = sorted({(gram, term) for term, _ in rows if term.isalpha() for gram in grams(term)})
+    for start in range(0, len(gram_rows), INDEX_CHUNK):
+        cursor.executemany("INSERT IGNORE INTO person_search_gram (gram, term) VALUES (%s, %s)",
+                           gram_rows[start:start + INDEX_CHUNK])
+
+
+def index_people(cursor, person_ids):
+    person_ids = list(person_ids)
+    for start in range(0, len(person_ids), INDEX_CHUNK):
+        chunk = person_ids[start:start + INDEX_CHUNK]
+        cursor.execute(f"SELECT person_id, first_name, last_name, email, contact_number FROM Person "
+                       f"WHERE person_id IN ({_marks(chunk)})", tuple(chunk))
+        _add_terms(cursor, _term_rows(cursor.fetchall()))
+
+
+# Drop the people's terms, and the trigrams of any word nobody else has
+def unindex_people(cursor, person_ids):
+    person_ids = list(person_ids)
+    for start in range(0, len(person_ids), INDEX_CHUNK):
+        chunk = person_ids[start:start + INDEX_CHUNK]
+        cursor.execute(f"SELECT DISTINCT term FROM person_search_term WHERE person_id IN ({_marks(chunk)})",
+                       tuple(chunk))
+        dropped = [row[0] for row in cursor.fetchall() if row[0].isalpha()]
+        cursor.execute(f"DELETE FROM person_search_term WHERE person_id IN ({_marks(chunk)})", tuple(chunk))
+        for term in dropped:
+            cursor.execute("SELECT 1 FROM person_search_term WHERE term = %s LIMIT 1", (term,))
+            if cursor.fetchone() is None:
+                found = sorted(grams(term))
+                cursor.execute(f"DELETE FROM person_search_gram WHERE term = %s AND gram IN ({_marks(found)})",
+                               (term, *found))
+
+
+def person_added(cursor, person_id):
+    index_people(cursor, [person_id])
+
+
+def person_removed(cursor, person_id):
+    unindex_people(cursor, [person_id])
+
+
+def person_changed(cursor, person_id):
+    unindex_people(cursor, [person_id])
+    index_people(cursor, [person_id])
+
+
+# Refill both search tables from Person; returns the number of terms.
+# People are read a chunk at a time by key, so memory stays flat at any size.
+def rebuild_search_index(conn, backend=None):
+    cursor = conn.cursor()
+    count, last_id = 0, 0
+    try:
+        cursor.execute("DELETE FROM person_search_term")
+        cursor.execute("DELETE FROM person_search_gram")
+        while True:
+            cursor.execute("SELECT person_id, first_name, last_name, email, contact_number FROM Person "
+                           "WHERE person_id > %s ORDER BY person_id LIMIT %s", (last_id, INDEX_CHUNK))
+            people = cursor.fetchall()
+            if not people:
+                break
+            rows = _term_rows(people)
+            _add_terms(cursor, rows)
+            count += len(rows)
+            last_id = people[-1][0]
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return count
+
+
+def search_indexed(conn, backend):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT term FROM person_search_term LIMIT 1")
+        cursor.fetchall()
+        return True
+    except backend.Error:
+        conn.rollback()
+        return False
+    finally:
+        cursor.close()
+
+
+# --- search ----------------------------------------------------------------
+
+# Every term starting with `prefix` sorts below this. That holds because the
+# term columns are utf8mb4_bin (migration 0006); MySQL's default collation
+# sorts ':' and '{' before the digits and letters.
+def _prefix_end(prefix):
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+# Indexed terms within max_edits(word) of `word`, as {term: distance}
+def fuzzy_terms(cursor, word):
+    limit = max_edits(word)
+    if not limit:
+        return {}
+    found = sorted(grams(word))
+    # each edit destroys at most 3 of the word's trigrams
+    cursor.execute(f"SELECT term FROM person_search_gram WHERE gram IN ({_marks(found)}) "
+                   f"GROUP BY term HAVING COUNT(*) >= %s", (*found, max(1, len(found) - 3 * limit)))
+    matches = {}
+    for (term,) in cursor.fetchall():
+        distance = edit_distance(word, term, limit)
+        if distance <= limit and not term.startswith(word):
+            matches[term] = distance
+    return matches
+
+
+# The terms `word` matches, scored: 1 for the word itself, 0.5-0.9 for longer
+# words it starts (the closer in length the higher), 0.1-0.3 for typos.
+# Returns None when the word is a number or starts more than PREFIX_TERMS
+# words; it is then matched as a range of terms.
+def matching_terms(cursor, word):
+    if len(word) < 2 or not word.isalpha():
+        return None
+    # every word starting with `word` has the trigram "$" + its first two letters
+    cursor.execute("SELECT term FROM person_search_gram WHERE gram = %s AND term >= %s AND term < %s LIMIT %s",
+                   (f"${word[:2]}", word, _prefix_end(word), PREFIX_TERMS + 1))
+    prefixed = [row[0] for row in cursor.fetchall()]
+    if len(prefixed) > PREFIX_TERMS:
+        return None
+    scores = {term: _prefix_score(word, term) for term in prefixed}
+    for term, distance in fuzzy_terms(cursor, word).items():
+        scores[term] = 0.5 - 0.2 * distance
+    return scores
+
+
+def _prefix_score(word, term):
+    return 1.0 if term == word else 0.5 + 0.4 * len(word) / len(term)
+
+
+# SQL condition on alias {t} for a word's terms (a list, or None for the
+# word's prefix range)
+def _condition(word, terms):
+    if terms is None:
+        return "{t}.term >= %s AND {t}.term < %s", [word, _prefix_end(word)]
+    return f"{{t}}.term IN ({_marks(terms)})", sorted(terms)
+
+
+# Postings of a word, counted up to DRIVER_PROBE
+def _postings(cursor, word, scores):
+    sql, params = _condition(word, scores)
+    cursor.execute(f"SELECT COUNT(*) FROM (SELECT 1 FROM person_search_term t WHERE {sql.format(t='t')} "
+                   f"LIMIT %s) x", (*params, DRIVER_PROBE))
+    return cursor.fetchone()[0]
+
+
+# The driving word's terms, best matches first: the word itself, the words it
+# starts, then typos by number of edits
+def _tiers(word, scores):
+    if scores is None:
+        return [None]
+    tiers = [[term for term in scores if term == word],
+             [term for term in scores if term != word and term.startswith(word)]]
+    typos = {term: score for term, score in scores.items() if not term.startswith(word)}
+    for score in sorted(set(typos.values()), reverse=True):
+        tiers.append([term for term in typos if typos[term] == score])
+    return [tier for tier in tiers if tier]
+
+
+# (person_id, score) of the best matches for every word of `text`
+def rank(cursor, text, limit=SEARCH_LIMIT):
+    matched = []
+    for word in query_words(text):
+        scores = matching_terms(cursor, word)
+        if scores == {}:
+            return []
+        matched.append((word, scores))
+    if not matched:
+        return []
+    if len(matched) > 1:
+        matched.sort(key=lambda m: _postings(cursor, *m))
+
+    # The other words are checked per candidate: with their terms listed that
+    # is a probe of (term, person_id); CROSS JOIN keeps the driver first
+    # (SQLite doesn't reorder it; in MySQL it is a plain JOIN)
+    joins, join_params = [], []
+    for n, (word, scores) in enumerate(matched[1:], 1):
+        alias = f"t{n}"
+        sql, params = _condition(word, scores)
+        joins.append(f"CROSS JOIN person_search_term {alias} ON {alias}.person_id = t0.person_id "
+                     f"AND {sql.format(t=alias)}")
+        join_params.extend(params)
+    columns = ", ".join(f"t{n}.term" for n in range(len(matched)))
+
+    # Read the driver's best tiers until CANDIDATE_ROWS rows have come back
+    word, scores = matched[0]
+    best, read = {}, 0
+    for tier in _tiers(word, scores):
+        sql, params = _condition(word, tier)
+        cursor.execute(f"SELECT t0.person_id, {columns} FROM person_search_term t0 {' '.join(joins)} "
+                       f"WHERE {sql.format(t='t0')} LIMIT %s", (*join_params, *params, CANDIDATE_ROWS - read))
+        rows = cursor.fetchall()
+        for person_id, *terms in rows:
+            score = sum(_prefix_score(w, term) if s is None else s[term]
+                        for (w, s), term in zip(matched, terms))
+            best[person_id] = max(score, best.get(person_id, 0))
+        read += len(rows)
+        if read >= CANDIDATE_ROWS:
+            break
+    return sorted(best.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+
+# Best matches for `text` as dicts (person, student_id/faculty_id, score),
+# highest score first
+def search(cursor, text, limit=SEARCH_LIMIT):
+    ranked = dict(rank(cursor, text, limit))
+    if not ranked:
+        return []
+    cursor.execute(PEOPLE.format(marks=_marks(ranked)), tuple(ranked))
+    names = [d[0] for d in cursor.description]
+    people = []
+    for row in cursor.fetchall():
+        person = dict(zip(names, row))
+        person["score"] = round(ranked[person["person_id"]], 2)
+        people.append(person)
+    people.sort(key=lambda p: (-p["score"], p["last_name"], p["first_name"], p["person_id"]))
+    return people
+
+
+def main(argv=None):
+    from ums.backends import create_backend
+
+    parser = argparse.ArgumentParser(description="People search index")
+    parser.add_argument("command", choices=["reindex", "search"])
+    parser.add_argument("text", nargs="?", help="search: name, email or phone words")
+    parser.add_argument("--limit", type=int, default=SEARCH_LIMIT)
+    parser.add_argument("--backend", help="mysql or sqlite (defaults to UMS_BACKEND)")
+    args = parser.parse_args(argv)
+
+    backend = create_backend(args.backend)
+    conn = backend.connect()
+    started = time.perf_counter()
+    try:
+        if args.command == "reindex":
+            count = rebuild_search_index(conn, backend)
+            print(f"Indexed {count:,} terms in {time.perf_counter() - started:.2f}s")
+        else:
+            for person in search(conn.cursor(), args.text or "", args.limit):
+                print(person)
+            print(f"({time.perf_counter() - started:.3f}s)")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import threading
+import time
+import weakref
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+# A bounded pool of database connections.
+#
+# `connect` opens a new raw connection and `validate` (optional) returns True
+# when a raw connection is still usable. Connections are checked on borrow,
+# evicted after `idle_timeout` seconds unused and recycled after
+# `max_lifetime` seconds regardless of use. `wrap_cursor` (optional) wraps
+# every cursor handed out, e.g. for instrumentation, and `cancel` (optional)
+# interrupts the statement running on a raw connection from another thread.
+class ConnectionPool:
+    def __init__(self, connect, size=5, validate=None, idle_timeout=300,
+                 max_lifetime=3600, checkout_timeout=10, reset=None, wrap_cursor=None, cancel=None):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self._connect = connect
+        self._validate = validate
+        self._reset = reset
+        self._wrap_cursor = wrap_cursor
+        self._cancel = cancel
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.checkout_timeout = checkout_timeout
+
+        self._idle = deque()  # (raw, created_at, last_used)
+        self._open = 0
+        self._lock = threading.Condition()
+
+        self._checkouts = 0
+        self._created = 0
+        self._discarded = {"broken": 0, "idle": 0, "lifetime": 0, "leaked": 0}
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    # Borrow a connection; the returned proxy goes back to the pool on close()
+    def connection(self, timeout=None):
+        timeout = self.checkout_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        with self._lock:
+            while True:
+                self._evict_idle_locked()
+                while self._idle:
+                    raw, created_at, last_used = self._idle.pop()
+                    if self._expired(created_at):
+                        self._discard_locked(raw, "lifetime")
+                        continue
+                    if not self._is_healthy(raw):
+                        self._discard_locked(raw, "broken")
+                        continue
+                    return self._checkout_locked(raw, created_at, started)
+
+                if self._open < self.size:
+                    # Reserve the slot before releasing the lock to connect
+                    self._open += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeout(
+                        f"Timed out after {timeout}s waiting for a database connection "
+                        f"(pool size {self.size})")
+                self._lock.wait(remaining)
+
+        try:
+            raw = self._connect()
+        except Exception:
+            with self._lock:
+                self._open -= 1
+                self._lock.notify()
+            raise
+
+        with self._lock:
+            self._created += 1
+            return self._checkout_locked(raw, time.monotonic(), started)
+
+    def _checkout_locked(self, raw, created_at, started):
+        waited = time.monotonic() - started
+        self._checkouts += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        return PooledConnection(self, raw, created_at)
+
+    def _expired(self, created_at):
+        return self.max_lifetime is not None and time.monotonic() - created_at >= self.max_lifetime
+
+    def _is_healthy(self, raw):
+        if self._validate is None:
+            return True
+        try:
+            return bool(self._validate(raw))
+        except Exception:
+            return False
+
+    def _evict_idle_locked(self):
+        if self.idle_timeout is None:
+            return
+        now = time.monotonic()
+        # Oldest connections sit at the left end of the deque
+        while self._idle and now - self._idle[0][2] >= self.idle_timeout:
+            raw = self._idle.popleft()[0]
+            self._discard_locked(raw, "idle")
+
+    def _discard_locked(self, raw, reason):
+        self._open -= 1
+        self._discarded[reason] += 1
+        _close_quietly(raw)
+        self._lock.notify()
+
+    def _release(self, raw, created_at, broken=False):
+        if not broken and self._reset is not None:
+            try:
+                self._reset(raw)
+            except Exception:
+                broken = True
+
+        with self._lock:
+            if broken:
+                self._discard_locked(raw, "broken")
+            elif self._expired(created_at):
+                self._discard_locked(raw, "lifetime")
+            else:
+                self._idle.append((raw, created_at, time.monotonic()))
+                self._lock.notify()
+
+    def _reclaim(self, raw):
+        # Called when a proxy is garbage collected without being closed
+        with self._lock:
+            self._discard_locked(raw, "leaked")
+
+    def evict_idle(self):
+        with self._lock:
+            self._evict_idle_locked()
+
+    def close(self):
+        with self._lock:
+            while self._idle:
+                self._discard_locked(self._idle.pop()[0], "idle")
+
+    def stats(self):
+        with self._lock:
+            checkouts = self._checkouts
+            return {
+                "size": self.size,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._open - len(self._idle),
+                "checkouts": checkouts,
+                "created": self._created,
+                "discarded": dict(self._discarded),
+                "timeouts": self._timeouts,
+                "wait_avg_ms": (self._wait_total / checkouts * 1000) if checkouts else 0.0,
+                "wait_max_ms": self._wait_max * 1000,
+            }
+
+
+# Wraps a borrowed raw connection. Everything except close()/is_connected()
+# is forwarded, so existing code can keep calling cursor(), commit() etc.
+class PooledConnection:
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._finalizer = weakref.finalize(self, pool._reclaim, raw)
+
+    def __getattr__(self, name):
+        raw = self.__dict__.get("_raw")
+        if raw is None:
+            raise AttributeError(f"Connection already returned to the pool ({name})")
+        return getattr(raw, name)
+
+    @property
+    def raw(self):
+        return self._raw
+
+    def cursor(self, *args, **kwargs):
+        cursor = self.__getattr__("cursor")(*args, **kwargs)
+        wrap = self._pool._wrap_cursor
+        return wrap(cursor) if wrap else cursor
+
+    # Interrupt the running statement; safe to call from another thread
+    def cancel(self):
+        raw = self._raw
+        if raw is None or self._pool._cancel is None:
+            return
+        self._pool._cancel(raw)
+
+    def is_connected(self):
+        if self._raw is None:
+            return False
+        checker = getattr(self._raw, "is_connected", None)
+        return checker() if checker else True
+
+    def close(self):
+        if self._raw is None:
+            return
+        raw, self._raw = self._raw, None
+        self._finalizer.detach()
+        # A failing reset (rollback) marks the connection broken, so no extra ping here
+        self._pool._release(raw, self._created_at)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _close_quietly(raw):
+    try:
+        raw.close()
+    except Exception:
+        pass
@@ -0,0 +1,283 @@
+import argparse
+import os
+import threading
+import time
+
+# Course prerequisite graph with a precomputed transitive closure.
+#
+# The Prerequisite table is loaded once into a PrerequisiteGraph, which orders
+# the courses topologically (rejecting cycles) and stores, for every course,
+# the set of all courses it transitively requires as an integer bitmask. A
+# student's completed courses become a mask of the same shape, so checking
+# eligibility for a course is a single AND, whatever the depth of the chain.
+#
+# PrerequisiteService keeps the graph for the app and rebuilds it after a
+# write to Prerequisite (the query cache's version of the table changes), and
+# every RECHECK_SECONDS compares a fingerprint of the table so writes made by
+# other processes are picked up too.
+#
+#   python -m ums.prerequisites --check                 # load the graph, report cycles
+#   python -m ums.prerequisites --course 9 --dept 1     # cohort eligibility for a course
+
+RECHECK_SECONDS = float(os.environ.get("UMS_PREREQ_RECHECK", "60"))
+STUDENT_FILTER_LIMIT = 500  # larger cohorts are filtered in Python
+
+_EDGES = "SELECT course_id, prereq_course_id FROM Prerequisite"
+_FINGERPRINT = "SELECT COUNT(*), COALESCE(SUM(course_id * 7919 + prereq_course_id), 0) FROM Prerequisite"
+# A course counts as completed once the student has a passing grade in any section of it
+_COMPLETED = """
+SELECT DISTINCT e.student_id, s.course_id
+FROM Enrollment e
+JOIN Grade g ON e.grade_id = g.grade_id
+JOIN Section s ON e.section_id = s.section_id
+WHERE g.points > 0
+"""
+
+
+class PrerequisiteCycle(Exception):
+    def __init__(self, cycle):
+        self.cycle = cycle
+        super().__init__("Prerequisite cycle: " + " -> ".join(str(c) for c in cycle))
+
+
+class PrerequisiteGraph:
+    # `edges` are (course_id, prereq_course_id) pairs
+    def __init__(self, edges):
+        self.direct = {}
+        for course, prereq in edges:
+            self.direct.setdefault(course, set()).add(prereq)
+        courses = set(self.direct)
+        for prereqs in self.direct.values():
+            courses |= prereqs
+        self.courses = sorted(courses)
+        self._bit = {course: i for i, course in enumerate(self.courses)}
+        self._closure = {}
+        for course in self._topological_order():
+            mask = 0
+            for prereq in self.direct.get(course, ()):
+                mask |= (1 << self._bit[prereq]) | self._closure[prereq]
+            self._closure[course] = mask
+
+    # Prerequisites before the courses that need them (Kahn's algorithm);
+    # raises PrerequisiteCycle if some courses can never be ordered
+    def _topological_order(self):
+        waiting = {course: len(self.direct.get(course, ())) for course in self.courses}
+        needed_by = {}
+        for course, prereqs in self.direct.items():
+            for prereq in prereqs:
+                needed_by.setdefault(prereq, []).append(course)
+        ready = [course for course, count in waiting.items() if count == 0]
+        order = []
+        while ready:
+            course = ready.pop()
+            order.append(course)
+            for dependent in needed_by.get(course, ()):
+                waiting[dependent] -= 1
+                if waiting[dependent] == 0:
+                    ready.append(dependent)
+        if len(order) < len(self.courses):
+            raise PrerequisiteCycle(self._find_cycle({c for c, count in waiting.items() if count > 0}))
+        return order
+
+    # Every unordered course still waits on another unordered one, so
+    # following those prerequisites from any of them must loop
+    def _find_cycle(self, stuck):
+        path, seen = [], {}
+        course = min(stuck)
+        while course not in seen:
+            seen[course] = len(path)
+            path.append(course)
+            course = min(p for p in self.direct[course] if p in stuck)
+        return path[seen[course]:] + [course]
+
+    def mask(self, course_ids):
+        mask = 0
+        for course in course_ids:
+            bit = self._bit.get(course)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def _ids(self, mask):
+        ids = []
+        while mask:
+            low = mask & -mask
+            ids.append(self.courses[low.bit_length() - 1])
+            mask ^= low
+        return ids
+
+    # Every course `course_id` transitively requires
+    def required(self, course_id):
+        return self._ids(self._closure.get(course_id, 0))
+
+    # Required courses not in `completed` (a mask from self.mask); [] when eligible
+    def missing(self, course_id, completed):
+        return self._ids(self._closure.get(course_id, 0) & ~completed)
+
+    def eligible(self, course_id, completed):
+        return not self._closure.get(course_id, 0) & ~completed
+
+    # Whether making `course_id` require `prereq_course_id` would close a cycle
+    def would_cycle(self, course_id, prereq_course_id):
+        if course_id == prereq_course_id:
+            return True
+        bit = self._bit.get(course_id)
+        return bit is not None and bool(self._closure.get(prereq_course_id, 0) >> bit & 1)
+
+    def stats(self):
+        return {"courses": len(self.courses), "edges": sum(len(p) for p in self.direct.values()),
+                "deepest_chain": max((bin(m).count("1") for m in self._closure.values()), default=0)}
+
+
+def load_graph(cursor):
+    cursor.execute(_EDGES)
+    return PrerequisiteGraph(cursor.fetchall())
+
+
+def _fingerprint(cursor):
+    cursor.execute(_FINGERPRINT)
+    count, total = cursor.fetchone()
+    return int(count), int(total)
+
+
+# Completed-course masks for `student_ids`, counting only `course_ids` (the
+# courses that matter for the check at hand); students with none get 0.
+# The query starts from the sections of those courses (indexed), so a large
+# cohort is one query whose cost depends on those courses' enrollments rather
+# than on the number of students; small sets add an IN on the students.
+def completed_masks(cursor, graph, student_ids, course_ids):
+    masks = {student_id: 0 for student_id in student_ids}
+    course_ids = list(course_ids)
+    if not course_ids or not masks:
+        return masks
+    courses_sql = f"{_COMPLETED} AND s.course_id IN ({', '.join(['%s'] * len(course_ids))})"
+    if len(masks) > STUDENT_FILTER_LIMIT:
+        cursor.execute(courses_sql, tuple(course_ids))
+    else:
+        cursor.execute(f"{courses_sql} AND e.student_id IN ({', '.join(['%s'] * len(masks))})",
+                       tuple(course_ids) + tuple(masks))
+    for student_id, course_id in cursor.fetchall():
+        if student_id in masks:
+            masks[student_id] |= graph.mask((course_id,))
+    return masks
+
+
+# Missing prerequisites for each (student_id, section_id) pair that is not
+# eligible, as {(student_id, section_id): [course_id, ...]}. Runs one query for
+# the sections' courses and one for the students' completed courses.
+def enrollment_problems(cursor, graph, pairs):
+    pairs = list(dict.fromkeys(pairs))
+    section_ids = list({section_id for _, section_id in pairs})
+    if not section_ids:
+        return {}
+    cursor.execute(f"SELECT section_id, course_id FROM Section WHERE section_id IN "
+                   f"({', '.join(['%s'] * len(section_ids))})", tuple(section_ids))
+    course_of = dict(cursor.fetchall())
+    needed = set()
+    for course_id in set(course_of.values()):
+        needed.update(graph.required(course_id))
+    masks = completed_masks(cursor, graph, {student_id for student_id, _ in pairs}, needed)
+    problems = {}
+    for student_id, section_id in pairs:
+        course_id = course_of.get(section_id)
+        if course_id is not None and not graph.eligible(course_id, masks[student_id]):
+            problems[(student_id, section_id)] = graph.missing(course_id, masks[student_id])
+    return problems
+
+
+# Eligibility of a whole cohort for one course: {student_id: [missing course_id, ...]}
+# for the students who are not eligible
+def cohort_problems(cursor, graph, course_id, student_ids):
+    masks = completed_masks(cursor, graph, student_ids, graph.required(course_id))
+    return {student_id: graph.missing(course_id, mask) for student_id, mask in masks.items()
+            if not graph.eligible(course_id, mask)}
+
+
+# The graph for the app. `connect` returns a connection to read Prerequisite
+# from (closed after use); `version` returns a number that changes whenever
+# this process writes Prerequisite.
+class PrerequisiteService:
+    def __init__(self, connect, version=lambda: 0, recheck_seconds=RECHECK_SECONDS):
+        self._connect = connect
+        self._version = version
+        self.recheck_seconds = recheck_seconds
+        self._lock = threading.Lock()
+        self._graph = None
+        self._built_version = None
+        self._fingerprint = None
+        self._checked_at = 0.0
+        self.loads = 0
+
+    def graph(self):
+        version = self._version()
+        graph = self._graph
+        if graph is not None and version == self._built_version and \
+                time.monotonic() - self._checked_at < self.recheck_seconds:
+            return graph
+        with self._lock:
+            now = time.monotonic()
+            conn = self._connect()
+            try:
+                cursor = conn.cursor()
+                try:
+                    fingerprint = _fingerprint(cursor)
+                    current = self._graph is not None and version == self._built_version
+                    if not current or fingerprint != self._fingerprint:
+                        self._graph = load_graph(cursor)
+                        self._built_version = version
+                        self._fingerprint = fingerprint
+                        self.loads += 1
+                    self._checked_at = now
+                finally:
+                    cursor.close()
+            finally:
+                conn.close()
+            return self._graph
+
+
+def main(argv=None):
+    from ums.backends import create_backend
+
+    parser = argparse.ArgumentParser(description="Check the prerequisite graph and cohort eligibility")
+    parser.add_argument("--check", action="store_true", help="load the graph and report cycles")
+    parser.add_argument("--course", type=int, help="course to check a cohort against")
+    parser.add_argument("--dept", type=int, help="with --course: the department's active students (default all)")
+    parser.add_argument("--backend", help="mysql or sqlite (defaults to UMS_BACKEND)")
+    args = parser.parse_args(argv)
+    if not args.check and args.course is None:
+        parser.error("nothing to do (use --check and/or --course)")
+
+    backend = create_backend(args.backend)
+    conn = backend.connect()
+    try:
+        cursor = conn.cursor()
+        started = time.perf_counter()
+        try:
+            graph = load_graph(cursor)
+        except PrerequisiteCycle as err:
+            print(err)
+            raise SystemExit(1)
+        if args.check:
+            stats = graph.stats()
+            print(f"{stats['courses']:,} courses, {stats['edges']:,} prerequisites, longest requirement set "
+                  f"{stats['deepest_chain']}; loaded in {time.perf_counter() - started:.2f}s; no cycles")
+        if args.course is not None:
+            if args.dept is None:
+                cursor.execute("SELECT student_id FROM Student WHERE status = 'Active'")
+            else:
+                cursor.execute("SELECT student_id FROM Student WHERE dept_id = %s AND status = 'Active'",
+                               (args.dept,))
+            students = [row[0] for row in cursor.fetchall()]
+            started = time.perf_counter()
+            problems = cohort_problems(cursor, graph, args.course, students)
+            print(f"Course {args.course} requires {graph.required(args.course) or 'nothing'}")
+            print(f"{len(students) - len(problems):,} of {len(students):,} students eligible "
+                  f"({time.perf_counter() - started:.2f}s)")
+            for student_id, missing in list(problems.items())[:20]:
+                print(f"  student {student_id}: missing {missing}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,411 @@
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from datetime import datetime
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from ums.cache import normalize_sql, _estimate_size
+
+# Statement instrumentation. Pooled connections hand out ProfiledCursor
+# wrappers that time every execute (including the fetch), count rows and
+# bytes, and attribute the statement to the page/tab and the app line (in
+# test2.py or a page script) that ran it. Aggregates are kept per normalized statement; statements slower
+# than SLOW_QUERY_MS also go to the slow-query log.
+
+SLOW_QUERY_MS = float(os.environ.get("UMS_SLOW_QUERY_MS", "200"))
+SLOW_QUERY_LOG = os.environ.get("UMS_SLOW_QUERY_LOG", "")
+ADMIN_ENABLED = os.environ.get("UMS_ADMIN", "") not in ("", "0")
+
+# Upper bounds (ms) of the latency histogram buckets; the last one is open-ended
+HISTOGRAM_BOUNDS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000]
+SLOW_LOG_SIZE = 200
+RERUN_HISTORY = 50
+
+APP_FILE = "test2.py"
+PAGES_DIR = "app_pages"
+
+slow_log = logging.getLogger("ums.slow_query")
+if SLOW_QUERY_LOG:
+    _handler = logging.FileHandler(SLOW_QUERY_LOG)
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    slow_log.addHandler(_handler)
+    slow_log.setLevel(logging.WARNING)
+
+
+def _bucket(ms):
+    for i, bound in enumerate(HISTOGRAM_BOUNDS):
+        if ms <= bound:
+            return i
+    return len(HISTOGRAM_BOUNDS)
+
+
+def bucket_labels():
+    labels, low = [], 0
+    for bound in HISTOGRAM_BOUNDS:
+        labels.append(f"{low}-{bound} ms")
+        low = bound
+    return labels + [f">{low} ms"]
+
+
+# Process-wide aggregates, shared by all sessions
+class QueryProfiler:
+    def __init__(self, slow_ms=SLOW_QUERY_MS):
+        self.slow_ms = slow_ms
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._slow = deque(maxlen=SLOW_LOG_SIZE)
+
+    def _entry_locked(self, sql):
+        entry = self._stats.get(sql)
+        if entry is None:
+            entry = self._stats[sql] = {
+                "sql": sql, "count": 0, "cache_hits": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0,
+                "rows": 0, "bytes": 0, "histogram": [0] * (len(HISTOGRAM_BOUNDS) + 1), "sites": Counter(),
+            }
+        return entry
+
+    def record(self, sql, params, ms, rows, nbytes, context, error=None):
+        sql = normalize_sql(sql)
+        with self._lock:
+            entry = self._entry_locked(sql)
+            entry["count"] += 1
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+            entry["rows"] += rows
+            entry["bytes"] += nbytes
+            entry["histogram"][_bucket(ms)] += 1
+            entry["sites"][context["where"]] += 1
+            if error:
+                entry["errors"] += 1
+            if ms >= self.slow_ms:
+                self._slow.append({
+                    "time": datetime.now().isoformat(timespec="seconds"), "ms": round(ms, 1), "rows": rows,
+                    "page": context["page"], "where": context["where"], "sql": sql,
+                    "params": repr(params)[:200], "error": error,
+                })
+        if ms >= self.slow_ms:
+            slow_log.warning("%.1f ms rows=%d page=%s at=%s sql=%s params=%r",
+                             ms, rows, context["page"], context["where"], sql, params)
+        _count_in_rerun(sql, ms, cached=False)
+
+    def record_cache_hit(self, sql):
+        sql = normalize_sql(sql)
+        with self._lock:
+            self._entry_locked(sql)["cache_hits"] += 1
+        _count_in_rerun(sql, 0.0, cached=True)
+
+    def top(self, n=10, by="total_ms"):
+        with self._lock:
+            entries = [dict(e, sites=dict(e["sites"]), histogram=list(e["histogram"])) for e in self._stats.values()]
+        return sorted(entries, key=lambda e: e[by], reverse=True)[:n]
+
+    def slow_queries(self):
+        with self._lock:
+            return list(reversed(self._slow))
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._slow.clear()
+
+
+@st.cache_resource(show_spinner=False)
+def get_profiler():
+    return QueryProfiler()
+
+
+# --- calling context -------------------------------------------------------
+
+# Context captured on the script thread for statements a worker thread runs
+# on its behalf (ums.parallel); see capture_context / attributed
+_local = threading.local()
+_rerun_lock = threading.Lock()
+
+
+def _in_script():
+    return get_script_run_ctx() is not None
+
+
+# Nearest app frame (test2.py or a page script), so statements issued inside
+# ums helpers are attributed to the line in the app that asked for them
+def _call_site():
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.endswith(APP_FILE):
+            return f"{APP_FILE}:{frame.f_lineno}"
+        if os.path.basename(os.path.dirname(filename)) == PAGES_DIR:
+            return f"{PAGES_DIR}/{os.path.basename(filename)}:{frame.f_lineno}"
+        frame = frame.f_back
+    return "-"
+
+
+def current_context():
+    borrowed = getattr(_local, "context", None)
+    if borrowed is not None:
+        return {"page": borrowed["page"], "where": borrowed["where"]}
+    page = tab = None
+    if _in_script():
+        page = st.session_state.get("profiler_page")
+        tab = st.session_state.get("profiler_tab")
+    where = _call_site()
+    if tab:
+        where = f"{tab} @ {where}"
+    return {"page": page or "-", "where": where}
+
+
+# The caller's context plus its rerun counters, to hand to another thread
+def capture_context():
+    context = current_context()
+    context["rerun"] = st.session_state.get("profiler_rerun") if _in_script() else None
+    return context
+
+
+# Attribute statements run in the block (on this thread) to a captured context
+@contextmanager
+def attributed(context):
+    previous = getattr(_local, "context", None)
+    _local.context = context
+    try:
+        yield
+    finally:
+        _local.context = previous
+
+
+# Label statements run inside the block with a tab name
+@contextmanager
+def query_scope(tab):
+    if not _in_script():
+        yield
+        return
+    previous = st.session_state.get("profiler_tab")
+    st.session_state["profiler_tab"] = tab
+    try:
+        yield
+    finally:
+        st.session_state["profiler_tab"] = previous
+
+
+# --- per-rerun counts ------------------------------------------------------
+
+# Call once at the top of every script run; archives the previous run's counts.
+# scope is the fragment for a fragment-only rerun, None for the whole app.
+def begin_rerun(page, scope=None):
+    state = st.session_state
+    history = state.setdefault("profiler_reruns", deque(maxlen=RERUN_HISTORY))
+    current = state.get("profiler_rerun")
+    if current is not None:
+        history.append(current)
+    state["profiler_page"] = page
+    state["profiler_tab"] = None
+    state["profiler_rerun"] = {
+        "run": (current["run"] + 1) if current else 1, "page": page, "scope": scope or "app",
+        "queries": 0, "cache_hits": 0, "ms": 0.0, "statements": Counter(),
+    }
+
+
+# st.fragment whose statements are labelled with `tab`. A fragment-only rerun
+# skips the app script, and so begin_rerun; the outermost fragment body
+# starts the rerun's counts instead, so fragment reruns show up as their own
+# (smaller) rows on the profiler page. `run_every` (seconds) reruns it on a
+# timer, for panels that follow something changing.
+def fragment(tab, run_every=None):
+    def decorate(fn):
+        @functools.wraps(fn)
+        def body(*args, **kwargs):
+            ctx = get_script_run_ctx()
+            depth = getattr(_local, "fragment_depth", 0)
+            if ctx is not None and ctx.fragment_ids_this_run and depth == 0:
+                begin_rerun(st.session_state.get("profiler_page") or "-", scope=tab)
+            _local.fragment_depth = depth + 1
+            try:
+                with query_scope(tab):
+                    return fn(*args, **kwargs)
+            finally:
+                _local.fragment_depth = depth
+        return st.fragment(body, run_every=run_every)
+    return decorate
+
+
+def _count_in_rerun(sql, ms, cached):
+    borrowed = getattr(_local, "context", None)
+    if borrowed is not None:
+        current = borrowed["rerun"]
+    elif _in_script():
+        current = st.session_state.get("profiler_rerun")
+    else:
+        return
+    if current is None:
+        return
+    # Parallel fetches update the same rerun from several threads
+    with _rerun_lock:
+        if cached:
+            current["cache_hits"] += 1
+        else:
+            current["queries"] += 1
+            current["ms"] += ms
+            current["statements"][sql] += 1
+
+
+def rerun_history():
+    runs = list(st.session_state.get("profiler_reruns", []))
+    if st.session_state.get("profiler_rerun"):
+        runs.append(st.session_state["profiler_rerun"])
+    return runs
+
+
+# --- cursor wrapper ----------------------------------------------------------
+
+# Forwards everything to the driver cursor. A statement is recorded once its
+# results are consumed (fetchall, exhausted fetchone/fetchmany), on the next
+# execute, on close, or when the wrapper is dropped.
+class ProfiledCursor:
+    def __init__(self, cursor, profiler):
+        self._cursor = cursor
+        self._profiler = profiler
+        self._pending = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    def _run(self, method, sql, params):
+        self._finish()
+        context = current_context()
+        started = time.perf_counter()
+        try:
+            result = method(sql, params) if params is not None else method(sql)
+        except Exception as err:
+            self._profiler.record(sql, params, (time.perf_counter() - started) * 1000, 0, 0, context, str(err))
+            raise
+        self._pending = {"sql": sql, "params": params, "context": context,
+                         "ms": (time.perf_counter() - started) * 1000, "rows": 0, "bytes": 0}
+        if self._cursor.description is None:
+            # Writes and DDL have no result set to fetch
+            self._pending["rows"] = max(self._cursor.rowcount, 0)
+            self._finish()
+        return result
+
+    def execute(self, sql, params=None):
+        return self._run(self._cursor.execute, sql, params)
+
+    def executemany(self, sql, seq_params):
+        return self._run(self._cursor.executemany, sql, seq_params)
+
+    def _fetched(self, started, rows, done):
+        if self._pending is not None:
+            self._pending["ms"] += (time.perf_counter() - started) * 1000
+            self._pending["rows"] += len(rows)
+            self._pending["bytes"] += _estimate_size(rows)
+            if done:
+                self._finish()
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._fetched(started, rows, done=True)
+        return rows
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = self._cursor.fetchmany(size) if size is not None else self._cursor.fetchmany()
+        self._fetched(started, rows, done=not rows)
+        return rows
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._fetched(started, [row] if row is not None else [], done=row is None)
+        return row
+
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            self._profiler.record(pending["sql"], pending["params"], pending["ms"], pending["rows"],
+                                  pending["bytes"], pending["context"])
+
+    def close(self):
+        self._finish()
+        return self._cursor.close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+def wrap_cursor(cursor):
+    return ProfiledCursor(cursor, get_profiler())
+
+
+# --- admin page ------------------------------------------------------------
+
+def render_profiler_page():
+    import pandas as pd
+    import plotly.express as px
+
+    profiler = get_profiler()
+    st.header("Query Profiler")
+    st.caption(f"Slow-query threshold {profiler.slow_ms:g} ms (UMS_SLOW_QUERY_MS)"
+               + (f", logged to {SLOW_QUERY_LOG}" if SLOW_QUERY_LOG else ""))
+    if st.button("Reset statistics"):
+        profiler.reset()
+
+    st.subheader("Queries per rerun (this session)")
+    runs = rerun_history()
+    if runs:
+        df_runs = pd.DataFrame([{"run": r["run"], "page": r["page"], "scope": r.get("scope", "app"),
+                                 "queries": r["queries"],
+                                 "cache hits": r["cache_hits"], "db ms": round(r["ms"], 1),
+                                 "repeated statements": sum(1 for c in r["statements"].values() if c > 1)}
+                                for r in runs])
+        st.bar_chart(df_runs.set_index("run")[["queries", "cache hits"]])
+        st.dataframe(df_runs, hide_index=True)
+        # Same statement several times in one rerun usually means a query inside a loop
+        repeated = [(sql, count) for r in runs[-5:] for sql, count in r["statements"].items() if count > 1]
+        if repeated:
+            st.warning("Statements repeated within a rerun (possible N+1):")
+            st.dataframe(pd.DataFrame(repeated, columns=["statement", "times"]), hide_index=True)
+
+    top_n = st.slider("Top N", 5, 50, 10)
+    order = st.selectbox("Rank by", ["total_ms", "max_ms", "count", "rows", "bytes"])
+    top = profiler.top(top_n, by=order)
+    if not top:
+        st.info("No statements recorded yet")
+        return
+
+    st.subheader("Top offenders")
+    st.dataframe(pd.DataFrame([{
+        "statement": e["sql"][:120], "count": e["count"], "cache hits": e["cache_hits"],
+        "total ms": round(e["total_ms"], 1), "avg ms": round(e["total_ms"] / e["count"], 2) if e["count"] else 0,
+        "max ms": round(e["max_ms"], 1), "rows": e["rows"], "KiB": round(e["bytes"] / 1024, 1),
+        "errors": e["errors"], "called from": ", ".join(e["sites"]),
+    } for e in top]), hide_index=True)
+
+    st.subheader("Latency histogram")
+    choice = st.selectbox("Statement", range(len(top)), format_func=lambda i: top[i]["sql"][:100])
+    fig = px.bar(pd.DataFrame({"latency": bucket_labels(), "statements": top[choice]["histogram"]}),
+                 x="latency", y="statements")
+    st.plotly_chart(fig)
+    st.code(top[choice]["sql"], language="sql")
+
+    st.subheader("Slow queries")
+    slow = profiler.slow_queries()
+    if slow:
+        st.dataframe(pd.DataFrame(slow), hide_index=True)
+    else:
+        st.info("No statements over the threshold")
@@ -0,0 +1,329 @@
+# Read queries used by the app pages, kept in one place so tooling
+# (EXPLAIN checks, benchmarks) can run exactly what the pages run.
+# Written in the MySQL dialect; the SQLite backend translates them.
+
+# Dashboard
+STUDENTS_BY_STATUS = "SELECT status, COUNT(*) as count FROM Student GROUP BY status"
+
+FACULTY_BY_DEPARTMENT = """
+SELECT d.dept_name, COUNT(*) as count
+FROM Faculty f
+JOIN Department d ON f.dept_id = d.dept_id
+GROUP BY d.dept_name
+"""
+
+RECENT_ENROLLMENTS = """
+SELECT p.first_name, p.last_name, c.title as course,
+       s.semester, s.year, e.enrollment_date
+FROM Enrollment e
+JOIN Student st ON e.student_id = st.student_id
+JOIN Person p ON st.person_id = p.person_id
+JOIN Section s ON e.section_id = s.section_id
+JOIN Course c ON s.course_id = c.course_id
+ORDER BY e.enrollment_date DESC
+LIMIT 10
+"""
+
+# Dashboard, served from the summary tables kept by ums/summaries.py
+STUDENTS_BY_STATUS_SUMMARY = """
+SELECT NULLIF(status_key, '') as status, total as count
+FROM summary_student_status
+WHERE total > 0
+"""
+
+FACULTY_BY_DEPARTMENT_SUMMARY = """
+SELECT d.dept_name, s.total as count
+FROM summary_faculty_department s
+JOIN Department d ON s.dept_id = d.dept_id
+WHERE s.total > 0
+"""
+
+RECENT_ENROLLMENTS_SUMMARY = """
+SELECT first_name, last_name, course, semester, year, enrollment_date
+FROM summary_recent_enrollment
+ORDER BY enrollment_date DESC, student_id DESC, section_id DESC
+LIMIT 10
+"""
+
+# Students page
+STUDENT_LIST = """
+SELECT s.student_id, p.first_name, p.last_name, p.email,
+       p.gender, s.enrollment_date, s.status,
+       d.dept_name as department
+FROM Student s
+JOIN Person p ON s.person_id = p.person_id
+LEFT JOIN Department d ON s.dept_id = d.dept_id
+ORDER BY s.student_id
+"""
+
+STUDENT_DETAIL = """
+SELECT s.student_id, p.first_name, p.last_name, p.email, p.gender, p.date_of_birth, p.contact_number,
+       s.enrollment_date, s.status, s.dept_id
+FROM Student s
+JOIN Person p ON s.person_id = p.person_id
+WHERE s.student_id = %s
+"""
+
+STUDENT_DELETE_PREVIEW = """
+SELECT s.student_id, p.first_name, p.last_name, p.email,
+       s.enrollment_date, s.status, d.dept_name as department
+FROM Student s
+JOIN Person p ON s.person_id = p.person_id
+LEFT JOIN Department d ON s.dept_id = d.dept_id
+WHERE s.student_id = %s
+"""
+
+# Faculty page
+FACULTY_LIST = """
+SELECT f.faculty_id, p.first_name, p.last_name, p.email,
+       f.faculty_rank, f.specialization, d.dept_name as department
+FROM Faculty f
+JOIN Person p ON f.person_id = p.person_id
+LEFT JOIN Department d ON f.dept_id = d.dept_id
+ORDER BY p.last_name, p.first_name
+"""
+
+FACULTY_DETAIL = """
+SELECT f.faculty_id, p.first_name, p.last_name, p.email, p.gender, p.date_of_birth, p.contact_number,
+       f.hire_date, f.faculty_rank, f.specialization, f.dept_id
+FROM Faculty f
+JOIN Person p ON f.person_id = p.person_id
+WHERE f.faculty_id = %s
+"""
+
+FACULTY_DELETE_PREVIEW = """
+SELECT f.faculty_id, p.first_name, p.last_name, p.email,
+       f.faculty_rank, f.specialization, d.dept_name as department
+FROM Faculty f
+JOIN Person p ON f.person_id = p.person_id
+LEFT JOIN Department d ON f.dept_id = d.dept_id
+WHERE f.faculty_id = %s
+"""
+
+CLUB_ADVISOR_COUNT = "SELECT COUNT(*) FROM Club WHERE faculty_advisor_id = %s"
+
+# Courses page
+COURSE_LIST = """
+SELECT c.course_id, c.title, c.credits, c.description, d.dept_name as department
+FROM Course c
+JOIN Department d ON c.dept_id = d.dept_id
+ORDER BY c.course_id
+"""
+
+COURSE_RECORD = """
+SELECT title, credits, description, dept_id
+FROM Course
+WHERE course_id = %s
+"""
+
+# Bulk edit grid rows (ums.grid adds the WHERE)
+COURSE_ROWS = "SELECT course_id, title, credits, description, dept_id FROM Course"
+
+# Departments page
+DEPARTMENT_LIST = """
+SELECT d.dept_id, d.dept_name, d.building, d.budget,
+       CONCAT(p.first_name, ' ', p.last_name) as head_name
+FROM Department d
+LEFT JOIN Faculty f ON d.head_faculty_id = f.faculty_id
+LEFT JOIN Person p ON f.person_id = p.person_id
+ORDER BY d.dept_name
+"""
+
+DEPARTMENT_RECORD = """
+SELECT dept_name, building, budget, head_faculty_id
+FROM Department
+WHERE dept_id = %s
+"""
+
+DEPARTMENT_ROWS = "SELECT dept_id, dept_name, building, budget, head_faculty_id FROM Department"
+
+# Enrollments page
+ENROLLMENT_LIST = """
+SELECT e.student_id, e.section_id,
+       CONCAT(p.first_name, ' ', p.last_name) as student_name,
+       c.title as course_title, s.semester, s.year,
+       e.enrollment_date, g.letter_grade as grade
+FROM Enrollment e
+JOIN Student st ON e.student_id = st.student_id
+JOIN Person p ON st.person_id = p.person_id
+JOIN Section s ON e.section_id = s.section_id
+JOIN Course c ON s.course_id = c.course_id
+LEFT JOIN Grade g ON e.grade_id = g.grade_id
+ORDER BY e.enrollment_date DESC
+"""
+
+ENROLLMENT_RECORD = """
+SELECT student_id, section_id, enrollment_date
+FROM Enrollment
+WHERE student_id = %s AND section_id = %s
+"""
+
+ENROLLMENT_ROWS = "SELECT student_id, section_id, enrollment_date FROM Enrollment"
+
+# Sections page
+SECTION_LIST = """
+SELECT s.section_id, c.title as course_title, s.semester, s.year,
+       s.room_number, CONCAT(p.first_name, ' ', p.last_name) as faculty_name
+FROM Section s
+JOIN Course c ON s.course_id = c.course_id
+JOIN Faculty f ON s.faculty_id = f.faculty_id
+JOIN Person p ON f.person_id = p.person_id
+ORDER BY s.year DESC, s.semester
+"""
+
+SECTION_RECORD = """
+SELECT course_id, semester, year, room_number, faculty_id
+FROM Section
+WHERE section_id = %s
+"""
+
+# Terms that have sections, newest first (timetable tools)
+SECTION_TERMS = """
+SELECT DISTINCT year, semester
+FROM Section
+ORDER BY year DESC, semester
+"""
+
+SECTION_STUDENTS = "SELECT student_id FROM Enrollment WHERE section_id = %s"
+
+SECTION_ROWS = "SELECT section_id, course_id, semester, year, room_number, faculty_id FROM Section"
+
+# Library page
+LIBRARY_BOOK_LIST = """
+SELECT b.book_id, b.title, b.author, b.isbn, b.status, f.facility_type as facility
+FROM Library_Book b
+JOIN Facility f ON b.facility_id = f.facility_id
+ORDER BY b.title
+"""
+
+LIBRARY_BOOK_RECORD = """
+SELECT title, author, isbn, facility_id
+FROM Library_Book
+WHERE book_id = %s
+"""
+
+LIBRARY_BOOK_ROWS = "SELECT book_id, title, author, isbn, facility_id FROM Library_Book"
+
+
+# Transcripts page
+STUDENT_RECORD = """
+SELECT gpa, total_credits, standing
+FROM Student_Record
+WHERE student_id = %s
+"""
+
+TRANSCRIPT_LINES = """
+SELECT s.year, s.semester, e.section_id, c.course_id, c.title, c.credits,
+       g.letter_grade as grade, g.points
+FROM Enrollment e
+JOIN Section s ON e.section_id = s.section_id
+JOIN Course c ON s.course_id = c.course_id
+LEFT JOIN Grade g ON e.grade_id = g.grade_id
+WHERE e.student_id = %s
+ORDER BY s.year, CASE s.semester WHEN 'Spring' THEN 0 WHEN 'Summer' THEN 1 ELSE 2 END, c.title
+"""
+
+# Prerequisites page
+PREREQUISITE_LIST = """
+SELECT p.course_id, c.title, p.prereq_course_id, pc.title as prereq_title
+FROM Prerequisite p
+JOIN Course c ON p.course_id = c.course_id
+JOIN Course pc ON p.prereq_course_id = pc.course_id
+ORDER BY p.course_id
+"""
+
+# Active students of a department, for cohort eligibility checks
+COHORT_STUDENTS = "SELECT student_id FROM Student WHERE dept_id = %s AND status = 'Active' ORDER BY student_id"
+
+# Payments (export only)
+PAYMENT_LIST = """
+SELECT pay.payment_id, pay.student_id, CONCAT(p.first_name, ' ', p.last_name) as student_name,
+       pay.amount, pay.payment_date, pay.method, pay.tuition_id
+FROM Payment pay
+JOIN Student st ON pay.student_id = st.student_id
+JOIN Person p ON st.person_id = p.person_id
+ORDER BY pay.payment_id
+"""
+
+
+# List queries shown through the paged View tabs, with their key columns
+PAGED_VIEWS = {
+    "students": (STUDENT_LIST, ["student_id"]),
+    "faculty": (FACULTY_LIST, ["faculty_id"]),
+    "courses": (COURSE_LIST, ["course_id"]),
+    "departments": (DEPARTMENT_LIST, ["dept_id"]),
+    "enrollments": (ENROLLMENT_LIST, ["student_id", "section_id"]),
+    "sections": (SECTION_LIST, ["section_id"]),
+    "library": (LIBRARY_BOOK_LIST, ["book_id"]),
+    "prerequisites": (PREREQUISITE_LIST, ["course_id", "prereq_course_id"]),
+}
+
+
+# Every registered statement as (name, sql, sample params). With
+# migrated=False, the ones reading tables the migrations create are left out
+# (the index benchmark times the bare schema first).
+def registered_queries(migrated=True):
+    from ums.lookups import DEPARTMENTS, COURSES, STUDENTS, FACULTY, SECTIONS, LIBRARY_FACILITIES
+    from ums.pagination import build_count_query, build_page_query, split_order_by
+
+    plain = [
+        ("dashboard.students_by_status", STUDENTS_BY_STATUS, ()),
+        ("dashboard.faculty_by_department", FACULTY_BY_DEPARTMENT, ()),
+        ("dashboard.recent_enrollments", RECENT_ENROLLMENTS, ()),
+        ("students.detail", STUDENT_DETAIL, (1,)),
+        ("students.delete_preview", STUDENT_DELETE_PREVIEW, (1,)),
+        ("faculty.detail", FACULTY_DETAIL, (1,)),
+        ("faculty.delete_preview", FACULTY_DELETE_PREVIEW, (1,)),
+        ("faculty.club_advisor_count", CLUB_ADVISOR_COUNT, (1,)),
+        ("courses.record", COURSE_RECORD, (1,)),
+        ("departments.record", DEPARTMENT_RECORD, (1,)),
+        ("enrollments.record", ENROLLMENT_RECORD, (1, 1)),
+        ("sections.record", SECTION_RECORD, (1,)),
+        ("library.record", LIBRARY_BOOK_RECORD, (1,)),
+        ("transcripts.record", STUDENT_RECORD, (1,)),
+        ("transcripts.lines", TRANSCRIPT_LINES, (1,)),
+        ("prerequisites.cohort", COHORT_STUDENTS, (1,)),
+        ("sections.terms", SECTION_TERMS, ()),
+        ("sections.students", SECTION_STUDENTS, (1,)),
+    ]
+    # Summary tables from migration 0002
+    if migrated:
+        plain += [
+            ("dashboard.students_by_status_summary", STUDENTS_BY_STATUS_SUMMARY, ()),
+            ("dashboard.faculty_by_department_summary", FACULTY_BY_DEPARTMENT_SUMMARY, ()),
+            ("dashboard.recent_enrollments_summary", RECENT_ENROLLMENTS_SUMMARY, ()),
+        ]
+
+    paged = []
+    for name, (query, keys) in PAGED_VIEWS.items():
+        base, sort, descending = split_order_by(query)
+        sort = sort or keys[0]
+        paged.append((f"{name}.first_page", *build_page_query(base, sort, descending, keys, [sort])))
+        after = (1, tuple(1 for _ in keys))
+        paged.append((f"{name}.next_page", *build_page_query(base, sort, descending, keys, [sort], after=after)))
+        paged.append((f"{name}.count", *build_count_query(base, [sort])))
+
+    lookups = []
+    for lookup in (DEPARTMENTS, COURSES, STUDENTS, FACULTY, SECTIONS, LIBRARY_FACILITIES):
+        lookups.append((f"lookup.{lookup.name}.search", *lookup.search_query("a")))
+        lookups.append((f"lookup.{lookup.name}.resolve", *lookup.resolve_query(1)))
+
+    return plain + paged + lookups
+
+
+# Views that can be exported from the command line: (query, columns, key columns)
+EXPORT_VIEWS = {
+    "students": (STUDENT_LIST, ["student_id", "first_name", "last_name", "email", "gender",
+                                "enrollment_date", "status", "department"], ["student_id"]),
+    "faculty": (FACULTY_LIST, ["faculty_id", "first_name", "last_name", "email", "faculty_rank",
+                               "specialization", "department"], ["faculty_id"]),
+    "courses": (COURSE_LIST, ["course_id", "title", "credits", "description", "department"], ["course_id"]),
+    "departments": (DEPARTMENT_LIST, ["dept_id", "dept_name", "building", "budget", "head_name"], ["dept_id"]),
+    "enrollments": (ENROLLMENT_LIST, ["student_id", "section_id", "student_name", "course_title", "semester",
+                                      "year", "enrollment_date", "grade"], ["student_id", "section_id"]),
+    "sections": (SECTION_LIST, ["section_id", "course_title", "semester", "year", "room_number",
+                                "faculty_name"], ["section_id"]),
+    "library": (LIBRARY_BOOK_LIST, ["book_id", "title", "author", "isbn", "status", "facility"], ["book_id"]),
+    "payments": (PAYMENT_LIST, ["payment_id", "student_id", "student_name", "amount", "payment_date",
+                                "method", "tuition_id"], ["payment_id"]),
+}
@@ -0,0 +1,214 @@
+import argparse
+import os
+import sqlite3
+import threading
+import time
+
+# Read/write splitting. fetch_data reads go to read replicas, balanced by the
+# number of connections each has in use; writes and transactional blocks stay
+# on the primary pool. A replica is skipped when it is down, lags more than
+# MAX_LAG seconds, or may not yet have a write the current session made
+# (read-your-writes). Results from a replica that may be missing any write
+# made through this process are not put in the shared query cache.
+#
+# Replicas are listed in UMS_REPLICAS: "host[:port]" entries for MySQL, or
+# database file paths for SQLite stand-ins, which are copies of the primary
+# refreshed with
+#
+#   python -m ums.replicas sync      # copy the primary to every replica file
+#   python -m ums.replicas status    # lag of each replica
+
+REPLICAS = [spec.strip() for spec in os.environ.get("UMS_REPLICAS", "").split(",") if spec.strip()]
+MAX_LAG = float(os.environ.get("UMS_REPLICA_MAX_LAG", "30"))
+STICKY_SECONDS = float(os.environ.get("UMS_STICKY_SECONDS", "5"))
+LAG_CHECK_INTERVAL = float(os.environ.get("UMS_REPLICA_LAG_INTERVAL", "2"))
+REPLICA_CHECKOUT_TIMEOUT = 1.0
+RETRY_DOWN_AFTER = 30.0
+
+
+class Replica:
+    def __init__(self, name, backend, pool):
+        self.name = name
+        self.backend = backend
+        self.pool = pool
+        self.lag = None
+        self.checked_at = 0.0
+        self.down_until = 0.0
+        self.reads = 0
+        self.error = None
+
+
+class ReadRouter:
+    def __init__(self, primary_pool, replicas, max_lag=MAX_LAG, sticky_seconds=STICKY_SECONDS,
+                 lag_check_interval=LAG_CHECK_INTERVAL):
+        self.primary_pool = primary_pool
+        self.replicas = list(replicas)
+        self.max_lag = max_lag
+        self.sticky_seconds = sticky_seconds
+        self.lag_check_interval = lag_check_interval
+        self.last_write = 0.0  # wall clock of the last write committed through this process
+        self._lock = threading.Lock()
+        self._next = 0
+        self._primary_reads = {"no_replicas": 0, "sticky": 0, "lagging": 0, "unavailable": 0}
+
+    def note_write(self):
+        with self._lock:
+            self.last_write = time.time()
+
+    # Current lag of `replica`, measured at most every lag_check_interval seconds
+    def _lag(self, replica, now):
+        if now < replica.down_until:
+            return None
+        if now - replica.checked_at < self.lag_check_interval:
+            return replica.lag
+        replica.checked_at = now
+        try:
+            conn = replica.pool.connection(timeout=REPLICA_CHECKOUT_TIMEOUT)
+            try:
+                replica.lag = replica.backend.replica_lag(conn.raw)
+            finally:
+                conn.close()
+            replica.error = None
+        except Exception as err:
+            self._mark_down(replica, err, now)
+        return replica.lag
+
+    def _mark_down(self, replica, err, now):
+        replica.lag = None
+        replica.error = str(err)
+        replica.down_until = now + RETRY_DOWN_AFTER
+
+    # Rotate the starting point, then prefer the replica with the fewest connections in use
+    def _candidates(self):
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % max(1, len(self.replicas))
+        rotated = self.replicas[start:] + self.replicas[:start]
+        return sorted(rotated, key=lambda r: r.pool.stats()["in_use"])
+
+    # A connection to read from, and whether its data includes every write made
+    # through this process (i.e. whether the result may be cached).
+    # `session_last_write` is the wall-clock time of the caller's last write.
+    def reader(self, session_last_write=None):
+        now = time.time()
+        reason = "no_replicas"
+        if self.replicas:
+            since_write = now - session_last_write if session_last_write else None
+            for replica in self._candidates():
+                lag = self._lag(replica, now)
+                if lag is None:
+                    reason = "unavailable"
+                    continue
+                if lag > self.max_lag:
+                    reason = "lagging"
+                    continue
+                if since_write is not None and since_write < max(self.sticky_seconds, lag + self.lag_check_interval):
+                    reason = "sticky"
+                    continue
+                try:
+                    conn = replica.pool.connection(timeout=REPLICA_CHECKOUT_TIMEOUT)
+                except Exception as err:
+                    self._mark_down(replica, err, now)
+                    reason = "unavailable"
+                    continue
+                replica.reads += 1
+                # Lag is only known to lag_check_interval, so allow for that much more
+                return conn, now - lag - self.lag_check_interval > self.last_write
+        with self._lock:
+            self._primary_reads[reason] += 1
+        return self.primary_pool.connection(), True
+
+    def stats(self):
+        now = time.time()
+        return {
+            "primary_reads": dict(self._primary_reads),
+            "replicas": [{
+                "name": r.name,
+                "reads": r.reads,
+                "lag_s": None if r.lag is None else round(r.lag, 2),
+                "down": now < r.down_until,
+                "error": r.error,
+                "pool": r.pool.stats(),
+            } for r in self.replicas],
+        }
+
+
+# --- stand-in replicas (SQLite) ----------------------------------------------
+
+# Copy the primary database into `path` and stamp the copy with the time the
+# snapshot was started, which is what replica_lag compares against
+def sync_sqlite_replica(primary_path, path):
+    started = time.time()
+    source = sqlite3.connect(primary_path)
+    target = sqlite3.connect(path)
+    try:
+        source.backup(target)
+        # The copy is opened read-only, which WAL mode would not allow without its -shm file
+        target.execute("PRAGMA journal_mode = DELETE")
+        target.execute("CREATE TABLE IF NOT EXISTS ums_replica_state (synced_at REAL NOT NULL)")
+        target.execute("DELETE FROM ums_replica_state")
+        target.execute("INSERT INTO ums_replica_state (synced_at) VALUES (?)", (started,))
+        target.commit()
+    finally:
+        target.close()
+        source.close()
+    return time.time() - started
+
+
+# Sync each stand-in replica in turn; returns (spec, seconds) per replica
+def sync_sqlite_replicas(primary_path, specs):
+    return [(spec, sync_sqlite_replica(primary_path, spec)) for spec in specs]
+
+
+# (spec, description of its lag) per replica of `backend`
+def replica_states(backend, specs):
+    states = []
+    for spec in specs:
+        replica = backend.replica(spec)
+        try:
+            conn = replica.connect()
+            try:
+                lag = replica.replica_lag(conn)
+            finally:
+                conn.close()
+            state = "replication stopped or not synced" if lag is None else f"{lag:.1f}s behind"
+            if lag is not None and lag > MAX_LAG:
+                state += f" (over the {MAX_LAG:g}s limit, reads go to the primary)"
+        except replica.Error as err:
+            state = f"unreachable: {err}"
+        states.append((spec, state))
+    return states
+
+
+def main(argv=None):
+    from ums.backends import create_backend
+
+    parser = argparse.ArgumentParser(description="Manage and inspect read replicas")
+    parser.add_argument("command", choices=["sync", "status"])
+    parser.add_argument("--replicas", help="comma-separated replicas (defaults to UMS_REPLICAS)")
+    parser.add_argument("--backend", help="mysql or sqlite (defaults to UMS_BACKEND)")
+    parser.add_argument("--every", type=float, help="with sync: repeat every N seconds")
+    args = parser.parse_args(argv)
+
+    specs = [s.strip() for s in args.replicas.split(",")] if args.replicas else REPLICAS
+    if not specs:
+        parser.error("no replicas configured (set UMS_REPLICAS or pass --replicas)")
+    backend = create_backend(args.backend)
+
+    if args.command == "sync":
+        if backend.name != "sqlite":
+            parser.error("sync only manages SQLite stand-in replicas; MySQL replicas follow the server's replication")
+        while True:
+            for spec, elapsed in sync_sqlite_replicas(backend.path, specs):
+                print(f"Synced {spec} from {backend.path} in {elapsed * 1000:.0f} ms")
+            if not args.every:
+                break
+            time.sleep(args.every)
+        return
+
+    for spec, state in replica_states(backend, specs):
+        print(f"{spec}: {state}")
+
+
+if __name__ == "__main__":
+    main()
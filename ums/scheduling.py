@@ -0,0 +1,361 @@
+import argparse
+import time
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from datetime import timedelta
+from heapq import heappop, heappush
+
+# Timetable conflicts and room assignment for a term.
+#
+# Meetings (Schedule rows) are indexed per resource and day: a room, a
+# faculty member or a student. Each IntervalIndex key keeps its intervals
+# sorted by start together with the longest interval seen, so "what overlaps
+# [start, end)" is two bisects plus the overlapping items, and every
+# conflicting pair of a term comes from one sort and sweep (O(n log n) plus
+# the pairs reported).
+#
+# assign_rooms() is a best-fit greedy: sections are placed largest first in
+# the smallest free room that holds their enrollment. Sections whose current
+# room still fits are kept where they are.
+#
+#   python -m ums.scheduling conflicts --year 2024 --semester Fall
+#   python -m ums.scheduling assign-rooms --year 2024 --semester Fall --apply
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+ROOM_TYPES = ("Classroom", "Lab", "Auditorium")  # rooms sections can be taught in
+
+# kind is "room", "faculty" or "student"; first/second are section ids and
+# start/end the overlap in minutes after midnight
+Conflict = namedtuple("Conflict", "kind resource day first second start end")
+
+_TERM_SECTIONS = "SELECT section_id, room_number, faculty_id FROM Section WHERE year = %s AND semester = %s"
+_TERM_MEETINGS = """
+SELECT sc.section_id, sc.day_of_week, sc.start_time, sc.end_time
+FROM Schedule sc
+JOIN Section s ON sc.section_id = s.section_id
+WHERE s.year = %s AND s.semester = %s
+"""
+_TERM_ENROLLMENTS = """
+SELECT e.student_id, e.section_id
+FROM Enrollment e
+JOIN Section s ON e.section_id = s.section_id
+WHERE s.year = %s AND s.semester = %s
+"""
+# Room labels follow Section.room_number: "B<building_id>-<room_number>"
+_ROOMS = f"""
+SELECT CONCAT('B', building_id, '-', room_number), capacity
+FROM Room
+WHERE room_type IN ({", ".join(f"'{t}'" for t in ROOM_TYPES)}) AND capacity IS NOT NULL
+"""
+
+
+def _minutes(value):
+    if isinstance(value, timedelta):
+        return int(value.total_seconds()) // 60
+    if isinstance(value, str):
+        hours, minutes = value.split(":")[:2]
+        return int(hours) * 60 + int(minutes)
+    return value.hour * 60 + value.minute
+
+
+def format_minutes(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class IntervalIndex:
+    # `entries` are (key, start, end, item) with start < end
+    def __init__(self, entries=()):
+        grouped = {}
+        for key, start, end, item in entries:
+            grouped.setdefault(key, []).append((start, end, item))
+        self._intervals = {}
+        self._starts = {}
+        self._longest = {}
+        for key, intervals in grouped.items():
+            intervals.sort()
+            self._intervals[key] = intervals
+            self._starts[key] = [start for start, _, _ in intervals]
+            self._longest[key] = max(end - start for start, end, _ in intervals)
+
+    def add(self, key, start, end, item):
+        starts = self._starts.setdefault(key, [])
+        i = bisect_right(starts, start)
+        starts.insert(i, start)
+        self._intervals.setdefault(key, []).insert(i, (start, end, item))
+        self._longest[key] = max(self._longest.get(key, 0), end - start)
+
+    # Items under `key` overlapping [start, end). Anything starting more than the
+    # key's longest interval before `start` has ended by then, so only the
+    # slice between the two bisects is looked at.
+    def overlapping(self, key, start, end):
+        starts = self._starts.get(key)
+        if not starts:
+            return []
+        intervals = self._intervals[key]
+        low = bisect_right(starts, start - self._longest[key])
+        high = bisect_left(starts, end)
+        return [item for s, e, item in intervals[low:high] if e > start]
+
+    # Every overlapping pair as (key, first, second, overlap_start, overlap_end),
+    # sweeping each key's sorted intervals with a heap of the ones still open
+    def conflicts(self):
+        for key, intervals in self._intervals.items():
+            active = []
+            for start, end, item in intervals:
+                while active and active[0][0] <= start:
+                    heappop(active)
+                for other_end, other in active:
+                    if other != item:
+                        yield key, other, item, start, min(end, other_end)
+                heappush(active, (end, item))
+
+
+# One term's sections, meetings and enrollments, with interval indexes per
+# room, faculty member and student
+class Timetable:
+    # sections: {section_id: (room_number, faculty_id)}; meetings: (section_id, day, start, end)
+    # with times in minutes; enrollments: (student_id, section_id)
+    def __init__(self, sections, meetings, enrollments=()):
+        self.sections = sections
+        self.meetings = {}
+        for section_id, day, start, end in meetings:
+            self.meetings.setdefault(section_id, []).append((day, start, end))
+        self.enrollments = list(enrollments)
+        self.rooms = self._index(lambda section_id: self.sections[section_id][0])
+        self.faculty = self._index(lambda section_id: self.sections[section_id][1])
+        self._students = None
+
+    def _index(self, resource):
+        return IntervalIndex(((resource(section_id), day), start, end, section_id)
+                             for section_id, meetings in self.meetings.items() if section_id in self.sections
+                             for day, start, end in meetings if resource(section_id) is not None)
+
+    @property
+    def students(self):
+        if self._students is None:
+            self._students = IntervalIndex(((student_id, day), start, end, section_id)
+                                           for student_id, section_id in self.enrollments
+                                           for day, start, end in self.meetings.get(section_id, ()))
+        return self._students
+
+    def enrolled(self):
+        counts = {}
+        for _, section_id in self.enrollments:
+            counts[section_id] = counts.get(section_id, 0) + 1
+        return counts
+
+    # Every room, faculty and student double booking in the term
+    def conflicts(self, kinds=("room", "faculty", "student")):
+        found = []
+        for kind in kinds:
+            index = {"room": self.rooms, "faculty": self.faculty, "student": self.students}[kind]
+            for (resource, day), first, second, start, end in index.conflicts():
+                found.append(Conflict(kind, resource, day, first, second, start, end))
+        return found
+
+
+def load_term(cursor, year, semester, with_students=True):
+    cursor.execute(_TERM_SECTIONS, (year, semester))
+    sections = {section_id: (room, faculty_id) for section_id, room, faculty_id in cursor.fetchall()}
+    cursor.execute(_TERM_MEETINGS, (year, semester))
+    meetings = [(section_id, day, _minutes(start), _minutes(end)) for section_id, day, start, end in cursor.fetchall()]
+    enrollments = []
+    if with_students:
+        cursor.execute(_TERM_ENROLLMENTS, (year, semester))
+        enrollments = cursor.fetchall()
+    return Timetable(sections, meetings, enrollments)
+
+
+def load_rooms(cursor):
+    cursor.execute(_ROOMS)
+    return [(label, int(capacity)) for label, capacity in cursor.fetchall()]
+
+
+# --- insert-time checks --------------------------------------------------------
+
+# Room and faculty clashes for a section taught in `room` by `faculty_id` in the
+# given term, meeting at `meetings` ((day, start, end) in minutes; defaults to
+# its Schedule rows). Only the term's sections sharing the room or instructor
+# are read.
+def section_conflicts(cursor, section_id, year, semester, room, faculty_id, meetings=None):
+    if meetings is None:
+        cursor.execute("SELECT day_of_week, start_time, end_time FROM Schedule WHERE section_id = %s", (section_id,))
+        meetings = [(day, _minutes(start), _minutes(end)) for day, start, end in cursor.fetchall()]
+    if not meetings:
+        return []
+    cursor.execute("""
+        SELECT s.section_id, s.room_number, s.faculty_id, sc.day_of_week, sc.start_time, sc.end_time
+        FROM Section s
+        JOIN Schedule sc ON sc.section_id = s.section_id
+        WHERE s.year = %s AND s.semester = %s AND (s.room_number = %s OR s.faculty_id = %s)
+    """, (year, semester, room, faculty_id))
+    rooms, faculty = [], []
+    for other, other_room, other_faculty, day, start, end in cursor.fetchall():
+        if other == section_id:
+            continue
+        if room is not None and other_room == room:
+            rooms.append(((room, day), _minutes(start), _minutes(end), other))
+        if other_faculty == faculty_id:
+            faculty.append(((faculty_id, day), _minutes(start), _minutes(end), other))
+    found = []
+    for kind, resource, index in (("room", room, IntervalIndex(rooms)), ("faculty", faculty_id, IntervalIndex(faculty))):
+        for day, start, end in meetings:
+            for other in index.overlapping((resource, day), start, end):
+                found.append(Conflict(kind, resource, day, other, section_id, start, end))
+    return found
+
+
+# Timetable clashes for (student_id, section_id) enrollments about to be made:
+# {(student_id, section_id): [Conflict, ...]} for the pairs that clash with the
+# student's other sections in the same term (or with each other)
+def enrollment_clashes(cursor, pairs):
+    pairs = list(dict.fromkeys(pairs))
+    if not pairs:
+        return {}
+    section_ids = list({section_id for _, section_id in pairs})
+    student_ids = list({student_id for student_id, _ in pairs})
+    cursor.execute(f"""
+        SELECT s.section_id, s.year, s.semester, sc.day_of_week, sc.start_time, sc.end_time
+        FROM Section s
+        LEFT JOIN Schedule sc ON sc.section_id = s.section_id
+        WHERE s.section_id IN ({", ".join(["%s"] * len(section_ids))})
+    """, tuple(section_ids))
+    term_of, meetings = {}, {}
+    for section_id, year, semester, day, start, end in cursor.fetchall():
+        term_of[section_id] = (year, semester)
+        if day is not None:
+            meetings.setdefault(section_id, []).append((day, _minutes(start), _minutes(end)))
+    terms = set(term_of.values())
+    if not terms:
+        return {}
+    term_sql = " OR ".join(["(s.year = %s AND s.semester = %s)"] * len(terms))
+    cursor.execute(f"""
+        SELECT e.student_id, e.section_id, sc.day_of_week, sc.start_time, sc.end_time
+        FROM Enrollment e
+        JOIN Section s ON e.section_id = s.section_id
+        JOIN Schedule sc ON sc.section_id = s.section_id
+        WHERE e.student_id IN ({", ".join(["%s"] * len(student_ids))}) AND ({term_sql})
+    """, tuple(student_ids) + tuple(value for term in terms for value in term))
+    index = IntervalIndex(((student_id, day), _minutes(start), _minutes(end), section_id)
+                          for student_id, section_id, day, start, end in cursor.fetchall())
+    clashes = {}
+    for student_id, section_id in pairs:
+        for day, start, end in meetings.get(section_id, ()):
+            for other in index.overlapping((student_id, day), start, end):
+                if other != section_id:
+                    clashes.setdefault((student_id, section_id), []).append(
+                        Conflict("student", student_id, day, other, section_id, start, end))
+        # Later pairs in the same batch count as the student's sections too
+        for day, start, end in meetings.get(section_id, ()):
+            index.add((student_id, day), start, end, section_id)
+    return clashes
+
+
+# --- room assignment ---------------------------------------------------------
+
+# Rooms for every section of `timetable`. rooms: [(label, capacity)]; demand:
+# {section_id: seats needed}. Returns (assignments, unplaced) where
+# assignments maps section_id -> room for every placed section and unplaced
+# maps section_id -> reason.
+def assign_rooms(timetable, rooms, demand, keep_existing=True):
+    rooms = sorted(rooms, key=lambda room: (room[1], room[0]))
+    capacities = [capacity for _, capacity in rooms]
+    capacity_of = dict(rooms)
+    index = IntervalIndex()
+    assignments, unplaced = {}, {}
+
+    def first_start(section_id):
+        meetings = timetable.meetings.get(section_id, ())
+        return min(((DAYS.index(day) if day in DAYS else 7, start) for day, start, _ in meetings), default=(8, 0))
+
+    def free(room, section_id):
+        return all(not index.overlapping((room, day), start, end)
+                   for day, start, end in timetable.meetings.get(section_id, ()))
+
+    def place(room, section_id):
+        assignments[section_id] = room
+        for day, start, end in timetable.meetings.get(section_id, ()):
+            index.add((room, day), start, end, section_id)
+
+    order = sorted(timetable.sections, key=lambda s: (-demand.get(s, 0), first_start(s), s))
+    pending = []
+    for section_id in order:
+        current = timetable.sections[section_id][0]
+        if keep_existing and capacity_of.get(current, -1) >= demand.get(section_id, 0) and free(current, section_id):
+            place(current, section_id)
+        else:
+            pending.append(section_id)
+
+    for section_id in pending:
+        needed = demand.get(section_id, 0)
+        start = bisect_left(capacities, needed)
+        if start == len(rooms):
+            unplaced[section_id] = f"no room holds {needed} students"
+            continue
+        for room, _ in rooms[start:]:
+            if free(room, section_id):
+                place(room, section_id)
+                break
+        else:
+            unplaced[section_id] = f"every room for {needed} students is taken at its meeting times"
+    return assignments, unplaced
+
+
+# Plan room assignments for a term: (changes, unplaced) where changes are
+# (room, section_id) rows for an UPDATE of the sections whose room changes
+def plan_rooms(cursor, year, semester, keep_existing=True):
+    timetable = load_term(cursor, year, semester)
+    assignments, unplaced = assign_rooms(timetable, load_rooms(cursor), timetable.enrolled(), keep_existing)
+    changes = [(room, section_id) for section_id, room in sorted(assignments.items())
+               if timetable.sections[section_id][0] != room]
+    return changes, unplaced
+
+
+ASSIGN_ROOM = "UPDATE Section SET room_number = %s WHERE section_id = %s"
+
+
+def main(argv=None):
+    from ums.backends import create_backend
+
+    parser = argparse.ArgumentParser(description="Timetable conflicts and room assignment for a term")
+    parser.add_argument("command", choices=["conflicts", "assign-rooms"])
+    parser.add_argument("--year", type=int, required=True)
+    parser.add_argument("--semester", choices=["Spring", "Summer", "Fall"], required=True)
+    parser.add_argument("--reassign", action="store_true", help="assign-rooms: ignore current rooms")
+    parser.add_argument("--apply", action="store_true", help="assign-rooms: write the new rooms")
+    parser.add_argument("--backend", help="mysql or sqlite (defaults to UMS_BACKEND)")
+    args = parser.parse_args(argv)
+
+    backend = create_backend(args.backend)
+    conn = backend.connect()
+    try:
+        cursor = conn.cursor()
+        started = time.perf_counter()
+        if args.command == "conflicts":
+            timetable = load_term(cursor, args.year, args.semester)
+            loaded = time.perf_counter()
+            conflicts = timetable.conflicts()
+            print(f"{len(timetable.sections):,} sections, {len(timetable.enrollments):,} enrollments; "
+                  f"loaded in {loaded - started:.2f}s, checked in {time.perf_counter() - loaded:.2f}s")
+            for kind in ("room", "faculty", "student"):
+                found = [c for c in conflicts if c.kind == kind]
+                print(f"{kind}: {len(found):,} conflicts")
+                for c in found[:10]:
+                    print(f"  {c.resource} {c.day} {format_minutes(c.start)}-{format_minutes(c.end)}: "
+                          f"sections {c.first} and {c.second}")
+            return
+        changes, unplaced = plan_rooms(cursor, args.year, args.semester, keep_existing=not args.reassign)
+        print(f"{len(changes):,} sections change rooms, {len(unplaced):,} could not be placed "
+              f"({time.perf_counter() - started:.2f}s)")
+        for section_id, reason in list(unplaced.items())[:10]:
+            print(f"  section {section_id}: {reason}")
+        if args.apply and changes:
+            cursor.executemany(ASSIGN_ROOM, changes)
+            conn.commit()
+            print("Applied")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+import argparse
+
+from ums.backends import create_backend
+
+# Materialized dashboard aggregates (tables from data/migrations/0002).
+#
+# Write paths call the *_removed hook before changing a row and the *_added
+# hook after, on the same cursor and inside the same transaction, so the
+# summaries commit or roll back together with the data:
+#
+#   student_removed(cursor, student_id)      # before UPDATE / DELETE
+#   cursor.execute("UPDATE Student ...")
+#   student_added(cursor, student_id)        # after INSERT / UPDATE
+#
+# Each hook costs a few primary-key statements regardless of table size.
+# rebuild() recomputes everything from the base tables.
+
+RECENT_LIMIT = 10   # rows the dashboard shows
+RECENT_KEEP = 50    # rows kept, so deletes rarely force a refill
+
+SUMMARY_TABLES = ["summary_student_status", "summary_faculty_department", "summary_recent_enrollment"]
+
+_RECENT_SELECT = """
+SELECT e.student_id, e.section_id, c.course_id, p.first_name, p.last_name, c.title, s.semester, s.year,
+       e.enrollment_date
+FROM Enrollment e
+JOIN Student st ON e.student_id = st.student_id
+JOIN Person p ON st.person_id = p.person_id
+JOIN Section s ON e.section_id = s.section_id
+JOIN Course c ON s.course_id = c.course_id
+"""
+_RECENT_INSERT = """
+INSERT INTO summary_recent_enrollment
+    (student_id, section_id, course_id, first_name, last_name, course, semester, year, enrollment_date)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+_RECENT_ORDER = "enrollment_date DESC, student_id DESC, section_id DESC"
+
+
+def _recent_key(row):
+    # Order key for recent rows: (enrollment_date, student_id, section_id)
+    return (row[8], row[0], row[1])
+
+
+# --- students by status ----------------------------------------------------
+
+def _adjust_status(cursor, student_id, delta):
+    cursor.execute(
+        "INSERT IGNORE INTO summary_student_status (status_key, total) "
+        "SELECT COALESCE(status, ''), 0 FROM Student WHERE student_id = %s", (student_id,))
+    cursor.execute(
+        "UPDATE summary_student_status SET total = total + %s "
+        "WHERE status_key = (SELECT COALESCE(status, '') FROM Student WHERE student_id = %s)",
+        (delta, student_id))
+
+
+def student_removed(cursor, student_id):
+    _adjust_status(cursor, student_id, -1)
+    _remove_recent(cursor, "student_id = %s", "e.student_id = %s", (student_id,))
+
+
+def student_added(cursor, student_id):
+    _adjust_status(cursor, student_id, 1)
+    # Names live on Person, so the student's recent rows are re-read
+    _add_recent(cursor, "e.student_id = %s", (student_id,))
+
+
+# --- faculty by department -------------------------------------------------
+
+def _adjust_department(cursor, faculty_id, delta):
+    cursor.execute(
+        "INSERT IGNORE INTO summary_faculty_department (dept_id, total) "
+        "SELECT dept_id, 0 FROM Faculty WHERE faculty_id = %s AND dept_id IS NOT NULL", (faculty_id,))
+    cursor.execute(
+        "UPDATE summary_faculty_department SET total = total + %s "
+        "WHERE dept_id = (SELECT dept_id FROM Faculty WHERE faculty_id = %s)", (delta, faculty_id))
+
+
+def faculty_removed(cursor, faculty_id):
+    _adjust_department(cursor, faculty_id, -1)
+
+
+def faculty_added(cursor, faculty_id):
+    _adjust_department(cursor, faculty_id, 1)
+
+
+# --- recent enrollments ----------------------------------------------------
+
+# Refill from Enrollment once fewer rows are kept than the dashboard shows
+def _refill_recent(cursor, exclude=None):
+    cursor.execute("SELECT COUNT(*) FROM summary_recent_enrollment")
+    if cursor.fetchone()[0] < RECENT_LIMIT:
+        rebuild_recent(cursor, exclude)
+        return True
+    return False
+
+
+# Removed hooks run before the write, so a refill has to skip the rows being changed
+def _remove_recent(cursor, where, join_where, params):
+    cursor.execute(f"DELETE FROM summary_recent_enrollment WHERE {where}", params)
+    _refill_recent(cursor, exclude=(join_where, params))
+
+
+# Insert matching enrollments that sort above the oldest kept row, then trim.
+# A refill by the matching removed hook left their rows out, and they may
+# sort below what it kept, so a list still short is refilled with them.
+def _add_recent(cursor, where, params):
+    if _refill_recent(cursor):
+        return
+    cursor.execute("SELECT enrollment_date, student_id, section_id FROM summary_recent_enrollment "
+                   "ORDER BY enrollment_date, student_id, section_id LIMIT 1")
+    oldest = cursor.fetchone()
+    cursor.execute(f"{_RECENT_SELECT} WHERE {where}", params)
+    rows = [row for row in cursor.fetchall() if oldest is None or _recent_key(row) >= tuple(oldest)]
+    if not rows:
+        return
+    cursor.executemany(_RECENT_INSERT, rows)
+    cursor.execute(f"SELECT enrollment_date, student_id, section_id FROM summary_recent_enrollment "
+                   f"ORDER BY {_RECENT_ORDER} LIMIT 1 OFFSET %s", (RECENT_KEEP,))
+    cutoff = cursor.fetchone()
+    if cutoff:
+        day, student_id, section_id = cutoff
+        cursor.execute(
+            "DELETE FROM summary_recent_enrollment WHERE enrollment_date < %s OR (enrollment_date = %s AND "
+            "(student_id < %s OR (student_id = %s AND section_id <= %s)))",
+            (day, day, student_id, student_id, section_id))
+
+
+def enrollment_removed(cursor, student_id, section_id):
+    _remove_recent(cursor, "student_id = %s AND section_id = %s", "e.student_id = %s AND e.section_id = %s",
+                   (student_id, section_id))
+
+
+def enrollment_added(cursor, student_id, section_id):
+    _add_recent(cursor, "e.student_id = %s AND e.section_id = %s", (student_id, section_id))
+
+
+# Course and section edits change the denormalized title/term
+def course_removed(cursor, course_id):
+    _remove_recent(cursor, "course_id = %s", "c.course_id = %s", (course_id,))
+
+
+def course_added(cursor, course_id):
+    _add_recent(cursor, "c.course_id = %s", (course_id,))
+
+
+def section_removed(cursor, section_id):
+    _remove_recent(cursor, "section_id = %s", "e.section_id = %s", (section_id,))
+
+
+def section_added(cursor, section_id):
+    _add_recent(cursor, "e.section_id = %s", (section_id,))
+
+
+# Bulk variants for batch writers (imports): one grouped statement per batch
+def _add_grouped(cursor, summary, key_column, key_sql, table, id_column, ids):
+    if not ids:
+        return
+    marks = ", ".join(["%s"] * len(ids))
+    cursor.execute(f"SELECT {key_sql}, COUNT(*) FROM {table} WHERE {id_column} IN ({marks}) "
+                   f"AND {key_sql} IS NOT NULL GROUP BY {key_sql}", tuple(ids))
+    counts = cursor.fetchall()
+    cursor.executemany(f"INSERT IGNORE INTO {summary} ({key_column}, total) VALUES (%s, 0)",
+                       [(key,) for key, _ in counts])
+    cursor.executemany(f"UPDATE {summary} SET total = total + %s WHERE {key_column} = %s",
+                       [(count, key) for key, count in counts])
+
+
+def students_inserted(cursor, student_ids):
+    _add_grouped(cursor, "summary_student_status", "status_key", "COALESCE(status, '')",
+                 "Student", "student_id", student_ids)
+
+
+def faculty_inserted(cursor, faculty_ids):
+    _add_grouped(cursor, "summary_faculty_department", "dept_id", "dept_id", "Faculty", "faculty_id", faculty_ids)
+
+
+def enrollments_inserted(cursor):
+    # The refill is a bounded read of the enrollment_date index
+    rebuild_recent(cursor)
+
+
+# Hook pairs for display_crud_interface, keyed on the entity's key columns.
+# `refresh(cursor, keys)` runs once after a batch of grid edits, with the keys
+# of the changed rows, instead of per-row hooks.
+class WriteHooks:
+    def __init__(self, removed, added, refresh=None):
+        self.removed = removed
+        self.added = added
+        self.refresh = refresh
+
+
+# Several hook sets run in order as one (e.g. these summaries plus ums.transcripts)
+def chain_hooks(*hook_sets):
+    def removed(cursor, *key):
+        for hooks in hook_sets:
+            hooks.removed(cursor, *key)
+
+    def added(cursor, *key):
+        for hooks in hook_sets:
+            hooks.added(cursor, *key)
+
+    def refresh(cursor, keys):
+        for hooks in hook_sets:
+            if hooks.refresh:
+                hooks.refresh(cursor, keys)
+
+    return WriteHooks(removed, added, refresh)
+
+
+# --- rebuild ---------------------------------------------------------------
+
+def rebuild_recent(cursor, exclude=None):
+    where, params = "", ()
+    if exclude:
+        where, params = f"WHERE NOT ({exclude[0]})", tuple(exclude[1])
+    cursor.execute("DELETE FROM summary_recent_enrollment")
+    cursor.execute(f"{_RECENT_SELECT} {where} ORDER BY e.enrollment_date DESC, e.student_id DESC, e.section_id DESC "
+                   f"LIMIT %s", params + (RECENT_KEEP,))
+    rows = cursor.fetchall()
+    if rows:
+        cursor.executemany(_RECENT_INSERT, rows)
+
+
+def _refresh_recent(cursor, keys):
+    rebuild_recent(cursor)
+
+
+ENROLLMENT_HOOKS = WriteHooks(enrollment_removed, enrollment_added, _refresh_recent)
+COURSE_HOOKS = WriteHooks(course_removed, course_added, _refresh_recent)
+SECTION_HOOKS = WriteHooks(section_removed, section_added, _refresh_recent)
+
+
+def rebuild(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM summary_student_status")
+        cursor.execute(
+            "INSERT INTO summary_student_status (status_key, total) "
+            "SELECT COALESCE(status, ''), COUNT(*) FROM Student GROUP BY COALESCE(status, '')")
+        cursor.execute("DELETE FROM summary_faculty_department")
+        cursor.execute(
+            "INSERT INTO summary_faculty_department (dept_id, total) "
+            "SELECT dept_id, COUNT(*) FROM Faculty WHERE dept_id IS NOT NULL GROUP BY dept_id")
+        rebuild_recent(cursor)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def summaries_exist(conn, backend):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT 1 FROM summary_student_status LIMIT 1")
+        cursor.fetchall()
+        return True
+    except backend.Error:
+        conn.rollback()
+        return False
+    finally:
+        cursor.close()
+
+
+# Compare the summaries with a fresh aggregation; returns a list of differences
+def check(conn):
+    from ums import queries
+
+    cursor = conn.cursor()
+    problems = []
+    try:
+        for name, live, summary in [
+            ("students by status", queries.STUDENTS_BY_STATUS, queries.STUDENTS_BY_STATUS_SUMMARY),
+            ("faculty by department", queries.FACULTY_BY_DEPARTMENT, queries.FACULTY_BY_DEPARTMENT_SUMMARY),
+        ]:
+            cursor.execute(live)
+            expected = sorted(cursor.fetchall(), key=str)
+            cursor.execute(summary)
+            actual = sorted(cursor.fetchall(), key=str)
+            if expected != actual:
+                problems.append(f"{name}: expected {expected}, found {actual}")
+        cursor.execute(f"{_RECENT_SELECT} ORDER BY e.enrollment_date DESC, e.student_id DESC, e.section_id DESC "
+                       f"LIMIT %s", (RECENT_LIMIT,))
+        expected = [(r[0], r[1]) for r in cursor.fetchall()]
+        cursor.execute(f"SELECT student_id, section_id FROM summary_recent_enrollment "
+                       f"ORDER BY {_RECENT_ORDER} LIMIT %s", (RECENT_LIMIT,))
+        actual = [tuple(r) for r in cursor.fetchall()]
+        if expected != actual:
+            problems.append(f"recent enrollments: expected {expected}, found {actual}")
+    finally:
+        cursor.close()
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check or rebuild the materialized dashboard aggregates")
+    parser.add_argument("--rebuild", action="store_true", help="recompute every summary from the base tables")
+    parser.add_argument("--backend", help="mysql or sqlite (defaults to UMS_BACKEND)")
+    args = parser.parse_args(argv)
+
+    backend = create_backend(args.backend)
+    conn = backend.connect()
+    try:
+        if args.rebuild:
+            rebuild(conn)
+            print("Rebuilt " + ", ".join(SUMMARY_TABLES))
+        problems = check(conn)
+    finally:
+        conn.close()
+    print("\n".join(problems) or "Summaries match the base tables")
+    if problems:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
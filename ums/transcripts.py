@@ -0,0 +1,355 @@
+import argparse
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from ums.backends import create_backend
+from ums.summaries import WriteHooks
+
+# Credit-weighted GPA, per-term transcripts and Student_Record maintenance.
+#
+# Student_Record keeps quality_points (sum of grade points x credits) next to
+# total_credits (data/migrations/0003), so a grade change is applied as a
+# delta on a single record: the *_removed hooks subtract what the affected
+# enrollments contributed before the write and the *_added hooks add it back
+# afterwards, on the same cursor as the write (see ums/summaries.py).
+#
+# recompute_all() rebuilds every record from a single scan of the graded
+# enrollments, with the joins, per-term and cumulative arithmetic done in
+# numpy, and writes back only the records that differ.
+#
+#   python -m ums.transcripts --recompute   # rebuild Student_Record for everyone
+#   python -m ums.transcripts --check       # compare the records with a recompute
+
+GRADE_POINTS = {"A": 4.0, "A-": 3.7, "B+": 3.3, "B": 3.0, "B-": 2.7, "C+": 2.3, "C": 2.0, "C-": 1.7,
+                "D+": 1.3, "D": 1.0, "F": 0.0}
+TERM_ORDER = {"Spring": 0, "Summer": 1, "Fall": 2}
+STANDINGS = [(90, "Senior"), (60, "Junior"), (30, "Sophomore")]  # minimum credits; below is Freshman
+WRITE_CHUNK = 5000
+ID_CHUNK = 500
+
+_GRADED = """
+FROM Enrollment e
+JOIN Grade g ON e.grade_id = g.grade_id
+JOIN Section s ON e.section_id = s.section_id
+JOIN Course c ON s.course_id = c.course_id
+"""
+
+_GPA_SQL = "CASE WHEN total_credits > 0 THEN ROUND(quality_points * 1.0 / total_credits, 2) END"
+_STANDING_SQL = ("CASE " + " ".join(f"WHEN total_credits >= {credits} THEN '{name}'" for credits, name in STANDINGS)
+                 + " ELSE 'Freshman' END")
+
+_UPSERT = {
+    "mysql": """
+        INSERT INTO Student_Record (student_id, gpa, total_credits, standing, quality_points)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE gpa = VALUES(gpa), total_credits = VALUES(total_credits),
+            standing = VALUES(standing), quality_points = VALUES(quality_points)
+    """,
+    "sqlite": """
+        INSERT INTO Student_Record (student_id, gpa, total_credits, standing, quality_points)
+        VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT (student_id) DO UPDATE SET gpa = excluded.gpa, total_credits = excluded.total_credits,
+            standing = excluded.standing, quality_points = excluded.quality_points
+    """,
+}
+
+
+# --- vectorized arithmetic -----------------------------------------------------
+
+# Rounded half up, like SQL ROUND on the incremental path; NaN where there are no credits.
+# Worked in integer hundredths so ties such as 17.40 / 8 = 2.175 don't round
+# down through float error.
+def gpa_of(quality_points, credits):
+    cents = np.rint(np.asarray(quality_points, dtype=float) * 100).astype(np.int64)
+    credits = np.asarray(credits).astype(np.int64)
+    safe = np.where(credits > 0, credits, 1)
+    return np.where(credits > 0, ((2 * cents + safe) // (2 * safe)) / 100, np.nan)
+
+
+def standing_of(credits):
+    credits = np.asarray(credits)
+    return np.select([credits >= minimum for minimum, _ in STANDINGS], [name for _, name in STANDINGS], "Freshman")
+
+
+# Term and cumulative GPA for a frame of (student_id, year, semester,
+# quality_points, credits) rows, one per student and term
+def term_summaries(terms):
+    terms = terms.assign(
+        term_order=terms["year"].astype(int) * 3 + terms["semester"].map(TERM_ORDER).fillna(0).astype(int))
+    terms = terms.sort_values(["student_id", "term_order"], kind="stable").reset_index(drop=True)
+    terms["term_gpa"] = gpa_of(terms["quality_points"], terms["credits"])
+    by_student = terms.groupby("student_id", sort=False)
+    terms["cumulative_credits"] = by_student["credits"].cumsum()
+    terms["cumulative_gpa"] = gpa_of(by_student["quality_points"].cumsum(), terms["cumulative_credits"])
+    return terms.drop(columns="term_order")
+
+
+# Term summaries for one student's transcript lines (dicts with year, semester, points, credits)
+def term_table(lines):
+    graded = [line for line in lines if line.get("points") is not None]
+    if not graded:
+        return pd.DataFrame(columns=["year", "semester", "credits", "term_gpa", "cumulative_credits", "cumulative_gpa"])
+    frame = pd.DataFrame({
+        "student_id": 0,
+        "year": [line["year"] for line in graded],
+        "semester": [line["semester"] for line in graded],
+        "quality_points": [float(line["points"]) * line["credits"] for line in graded],
+        "credits": [int(line["credits"]) for line in graded],
+    })
+    terms = frame.groupby(["student_id", "year", "semester"], as_index=False)[["quality_points", "credits"]].sum()
+    return term_summaries(terms).drop(columns=["student_id", "quality_points"])
+
+
+# Graded enrollments summed per student and term. The database does one
+# indexed join (Enrollment -> Grade); terms and credits come from the small
+# Section/Course tables and are joined on in numpy.
+def _term_frame(cursor):
+    cursor.execute("SELECT s.section_id, s.year, s.semester, c.credits FROM Section s "
+                   "JOIN Course c ON s.course_id = c.course_id")
+    sections = pd.DataFrame(cursor.fetchall(), columns=["section_id", "year", "semester", "credits"])
+    sections = sections.set_index("section_id")
+    # points * 1.0 comes back as a float rather than a Decimal per row
+    cursor.execute("SELECT e.student_id, e.section_id, g.points * 1.0 FROM Enrollment e "
+                   "JOIN Grade g ON e.grade_id = g.grade_id")
+    graded = np.array(cursor.fetchall(), dtype=float).reshape(-1, 3)
+    term = sections.reindex(graded[:, 1].astype(np.int64))
+    credits = term["credits"].to_numpy(dtype=float)
+    frame = pd.DataFrame({
+        "student_id": graded[:, 0].astype(np.int64),
+        "year": term["year"].to_numpy(),
+        "semester": term["semester"].to_numpy(),
+        "quality_points": graded[:, 2] * credits,
+        "credits": credits,
+    })
+    frame = frame.groupby(["student_id", "year", "semester"], as_index=False, sort=False)[
+        ["quality_points", "credits"]].sum()
+    frame["credits"] = frame["credits"].astype(int)
+    return frame
+
+
+# Student_Record values for every student: (student_id, gpa, total_credits, standing, quality_points)
+def compute_records(cursor):
+    terms = _term_frame(cursor)
+    cursor.execute("SELECT student_id FROM Student")
+    student_ids = [row[0] for row in cursor.fetchall()]
+    totals = terms.groupby("student_id")[["quality_points", "credits"]].sum().reindex(student_ids, fill_value=0)
+    quality_points = totals["quality_points"].to_numpy().round(2)
+    credits = totals["credits"].to_numpy().astype(int)
+    gpa = gpa_of(quality_points, credits)
+    standing = standing_of(credits)
+    return [(sid, None if np.isnan(g) else float(g), int(c), str(s), float(q))
+            for sid, g, c, s, q in zip(student_ids, gpa, credits, standing, quality_points)]
+
+
+def _current_records(cursor):
+    cursor.execute("SELECT student_id, gpa, total_credits, standing, quality_points FROM Student_Record")
+    return {row[0]: row for row in cursor.fetchall()}
+
+
+# Whether a stored Student_Record row matches computed values (GPA to rounding)
+def _matches(row, expected):
+    _, gpa, credits, standing, points = expected
+    if row is None:
+        return False
+    _, found_gpa, found_credits, found_standing, found_points = row
+    if (gpa is None) != (found_gpa is None):
+        return False
+    if gpa is not None and abs(float(found_gpa) - gpa) > 0.0051:
+        return False
+    return found_credits == credits and found_standing == standing and abs(float(found_points) - points) <= 0.005
+
+
+# Rebuild Student_Record for every student; only rows that differ are written.
+# Returns (students, rows written).
+def recompute_all(conn, backend, progress=None):
+    cursor = conn.cursor()
+    try:
+        records = compute_records(cursor)
+        current = _current_records(cursor)
+        changed = [r for r in records if not _matches(current.get(r[0]), r)]
+        for start in range(0, len(changed), WRITE_CHUNK):
+            cursor.executemany(_UPSERT[backend.name], changed[start:start + WRITE_CHUNK])
+            if progress:
+                progress(min(start + WRITE_CHUNK, len(changed)), len(changed))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return len(records), len(changed)
+
+
+# --- incremental maintenance -------------------------------------------------
+
+def _refresh_derived(cursor, student_ids):
+    for start in range(0, len(student_ids), ID_CHUNK):
+        chunk = student_ids[start:start + ID_CHUNK]
+        cursor.execute(f"UPDATE Student_Record SET gpa = {_GPA_SQL}, standing = {_STANDING_SQL} "
+                       f"WHERE student_id IN ({', '.join(['%s'] * len(chunk))})", tuple(chunk))
+
+
+# Add (sign=1) or subtract (sign=-1) what the graded enrollments matching `where` contribute
+def _apply(cursor, where, params, sign):
+    cursor.execute(f"SELECT e.student_id, SUM(g.points * c.credits), SUM(c.credits) {_GRADED} "
+                   f"WHERE {where} GROUP BY e.student_id", params)
+    deltas = [(round(sign * float(points), 2), sign * int(credits), student_id)
+              for student_id, points, credits in cursor.fetchall()]
+    if not deltas:
+        return
+    cursor.executemany("INSERT IGNORE INTO Student_Record (student_id) VALUES (%s)", [(d[2],) for d in deltas])
+    cursor.executemany("UPDATE Student_Record SET quality_points = quality_points + %s, "
+                       "total_credits = total_credits + %s WHERE student_id = %s", deltas)
+    _refresh_derived(cursor, [d[2] for d in deltas])
+
+
+def enrollment_removed(cursor, student_id, section_id):
+    _apply(cursor, "e.student_id = %s AND e.section_id = %s", (student_id, section_id), -1)
+
+
+def enrollment_added(cursor, student_id, section_id):
+    _apply(cursor, "e.student_id = %s AND e.section_id = %s", (student_id, section_id), 1)
+
+
+# Course credits and a section's course weight every grade in them
+def course_removed(cursor, course_id):
+    _apply(cursor, "c.course_id = %s", (course_id,), -1)
+
+
+def course_added(cursor, course_id):
+    _apply(cursor, "c.course_id = %s", (course_id,), 1)
+
+
+def section_removed(cursor, section_id):
+    _apply(cursor, "e.section_id = %s", (section_id,), -1)
+
+
+def section_added(cursor, section_id):
+    _apply(cursor, "e.section_id = %s", (section_id,), 1)
+
+
+# Recompute the given students from their own enrollments (batch edits)
+def recompute_students(cursor, student_ids):
+    student_ids = sorted(set(student_ids))
+    for start in range(0, len(student_ids), ID_CHUNK):
+        chunk = student_ids[start:start + ID_CHUNK]
+        marks = ", ".join(["%s"] * len(chunk))
+        cursor.execute(f"SELECT e.student_id, SUM(g.points * c.credits), SUM(c.credits) {_GRADED} "
+                       f"WHERE e.student_id IN ({marks}) GROUP BY e.student_id", tuple(chunk))
+        totals = {sid: (round(float(points), 2), int(credits)) for sid, points, credits in cursor.fetchall()}
+        cursor.executemany("INSERT IGNORE INTO Student_Record (student_id) VALUES (%s)", [(sid,) for sid in chunk])
+        cursor.executemany("UPDATE Student_Record SET quality_points = %s, total_credits = %s WHERE student_id = %s",
+                           [totals.get(sid, (0, 0)) + (sid,) for sid in chunk])
+        _refresh_derived(cursor, chunk)
+
+
+def _graded_students(cursor, column, ids):
+    marks = ", ".join(["%s"] * len(ids))
+    cursor.execute(f"SELECT DISTINCT e.student_id FROM Enrollment e JOIN Section s ON e.section_id = s.section_id "
+                   f"WHERE {column} IN ({marks}) AND e.grade_id IS NOT NULL", tuple(ids))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def enrollments_changed(cursor, keys):
+    recompute_students(cursor, [key[0] for key in keys])
+
+
+def courses_changed(cursor, keys):
+    recompute_students(cursor, _graded_students(cursor, "s.course_id", [key[0] for key in keys]))
+
+
+def sections_changed(cursor, keys):
+    recompute_students(cursor, _graded_students(cursor, "e.section_id", [key[0] for key in keys]))
+
+
+ENROLLMENT_HOOKS = WriteHooks(enrollment_removed, enrollment_added, enrollments_changed)
+COURSE_HOOKS = WriteHooks(course_removed, course_added, courses_changed)
+SECTION_HOOKS = WriteHooks(section_removed, section_added, sections_changed)
+
+
+# Grade an enrollment: a new Grade row (earlier ones stay for issued transcripts)
+# and the delta applied to the student's record, all on `cursor`
+def record_grade(cursor, student_id, section_id, letter_grade, recorded=None):
+    enrollment_removed(cursor, student_id, section_id)
+    cursor.execute("INSERT INTO Grade (letter_grade, points, date_recorded, section_id) VALUES (%s, %s, %s, %s)",
+                   (letter_grade, GRADE_POINTS[letter_grade], recorded or date.today(), section_id))
+    cursor.execute("UPDATE Enrollment SET grade_id = %s WHERE student_id = %s AND section_id = %s",
+                   (cursor.lastrowid, student_id, section_id))
+    enrollment_added(cursor, student_id, section_id)
+
+
+# Snapshot the student's current grades as an issued Transcript; returns its id
+def issue_transcript(cursor, student_id, issued=None):
+    cursor.execute("INSERT INTO Transcript (student_id, issue_date) VALUES (%s, %s)",
+                   (student_id, issued or date.today()))
+    transcript_id = cursor.lastrowid
+    cursor.execute("INSERT INTO Transcript_Grade (transcript_id, grade_id) "
+                   "SELECT %s, grade_id FROM Enrollment WHERE student_id = %s AND grade_id IS NOT NULL",
+                   (transcript_id, student_id))
+    return transcript_id
+
+
+# --- checks ------------------------------------------------------------------
+
+def records_tracked(conn, backend):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT quality_points FROM Student_Record LIMIT 1")
+        cursor.fetchall()
+        return True
+    except backend.Error:
+        conn.rollback()
+        return False
+    finally:
+        cursor.close()
+
+
+# Compare Student_Record with a fresh computation; returns a list of differences
+def check(conn, limit=20):
+    cursor = conn.cursor()
+    try:
+        expected = compute_records(cursor)
+        actual = _current_records(cursor)
+    finally:
+        cursor.close()
+    problems = []
+    for record in expected:
+        row = actual.get(record[0])
+        if row is None and not record[2]:
+            continue  # no record yet and nothing graded
+        if not _matches(row, record):
+            found = f"gpa={row[1]} credits={row[2]} {row[3]}" if row else "no Student_Record row"
+            problems.append(f"student {record[0]}: expected gpa={record[1]} credits={record[2]} {record[3]}, "
+                            f"found {found}")
+    return problems[:limit] + ([f"... {len(problems) - limit} more"] if len(problems) > limit else [])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recompute or check Student_Record GPA and credits")
+    parser.add_argument("--recompute", action="store_true", help="rebuild every record from the graded enrollments")
+    parser.add_argument("--check", action="store_true", help="compare the records with a fresh computation")
+    parser.add_argument("--backend", help="mysql or sqlite (defaults to UMS_BACKEND)")
+    args = parser.parse_args(argv)
+
+    backend = create_backend(args.backend)
+    conn = backend.connect()
+    try:
+        if args.recompute:
+            started = time.perf_counter()
+            count, written = recompute_all(conn, backend)
+            print(f"Recomputed {count:,} student records ({written:,} changed) in "
+                  f"{time.perf_counter() - started:.2f}s")
+        if args.check or not args.recompute:
+            problems = check(conn)
+            print("\n".join(problems) or "Student records match the graded enrollments")
+            if problems:
+                raise SystemExit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
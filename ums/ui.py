@@ -0,0 +1,258 @@
+import os
+import uuid
+
+import streamlit as st
+
+from ums import jobs, library, people, prerequisites, scheduling
+from ums.db import (database_error, fetch_data, get_connection, get_prerequisites, get_read_connection,
+                    invalidate_tables, TTL_LOOKUP)
+from ums.profiler import fragment
+
+# Helpers the pages in app_pages/ share: running a check or a write on a
+# connection of its own, the validate hooks for display_crud_interface,
+# background jobs, and the sidebar people search.
+
+JOB_REFRESH_SECONDS = 2
+
+# Driver exception class for the configured backend (mysql or sqlite)
+DatabaseError = database_error()
+
+
+# Course titles by id, for messages
+def course_titles(course_ids):
+    course_ids = list(course_ids)
+    if not course_ids:
+        return {}
+    rows = fetch_data(f"SELECT course_id, title FROM Course WHERE course_id IN ({', '.join(['%s'] * len(course_ids))})",
+                      tuple(course_ids), ttl=TTL_LOOKUP)
+    return {r['course_id']: r['title'] for r in rows}
+
+
+# The shared prerequisite graph, or None after reporting why it can't be used
+def prerequisite_graph():
+    try:
+        return get_prerequisites().graph()
+    except prerequisites.PrerequisiteCycle as err:
+        st.error(f"{err}. Remove one of these prerequisites before enrolling students.")
+    except DatabaseError as err:
+        st.error(f"Could not load prerequisites: {err}")
+    return None
+
+
+# Open a read connection and run check(cursor); returns (result, error message)
+def run_check(check, what):
+    conn = get_read_connection()
+    if not conn:
+        return None, f"{what} could not be checked"
+    try:
+        return check(conn.cursor()), None
+    except DatabaseError as err:
+        return None, f"{what} could not be checked: {err}"
+    finally:
+        conn.close()
+
+
+# Run `step(cursor)` in its own transaction and drop the cached reads of
+# `tables` once it commits; returns (result, error)
+def run_write(step, *tables):
+    conn = get_connection()
+    if not conn:
+        return None, "Connection failed"
+    try:
+        result = step(conn.cursor())
+        conn.commit()
+        invalidate_tables(*tables)
+        return result, None
+    except (library.CirculationError, jobs.JobError, DatabaseError) as err:
+        conn.rollback()
+        return None, str(err)
+    finally:
+        conn.close()
+
+
+def describe_clash(conflict):
+    return (f"{conflict.day} {scheduling.format_minutes(conflict.start)}-{scheduling.format_minutes(conflict.end)} "
+            f"with section {conflict.first}")
+
+
+# validate hook for Enrollment writes: the student must have completed (with a
+# passing grade) every course the section's course transitively requires, and
+# the section must not clash with the student's other sections that term
+def enrollment_errors(row, current=None):
+    pair = (row.get('student_id'), row.get('section_id'))
+    if not all(pair) or (current and pair == (current['student_id'], current['section_id'])):
+        return []
+    graph = prerequisite_graph()
+    if graph is None:
+        return ["Prerequisites could not be checked"]
+    problems, error = run_check(lambda c: prerequisites.enrollment_problems(c, graph, [pair]), "Prerequisites")
+    if error:
+        return [error]
+    errors = []
+    if problems:
+        titles = course_titles(problems[pair])
+        errors.append(f"Student {pair[0]} is missing prerequisites for section {pair[1]}: "
+                      f"{', '.join(titles.get(c, f'course {c}') for c in problems[pair])}")
+    clashes, error = run_check(lambda c: scheduling.enrollment_clashes(c, [pair]), "The timetable")
+    if error:
+        return errors + [error]
+    for conflict in clashes.get(pair, []):
+        errors.append(f"Section {pair[1]} clashes with the student's timetable: {describe_clash(conflict)}")
+    return errors
+
+
+# validate hook for Section updates: the section's meetings must not double
+# book its (new) room or instructor. New sections have no meetings yet; those
+# are checked when meetings are added.
+def section_errors(row, current=None):
+    if not current:
+        return []
+    moved = any(row.get(f) != current.get(f) for f in ('year', 'semester'))
+    # Only what changes is checked, so an existing clash doesn't block unrelated edits
+    kinds = {kind for kind, field in (('room', 'room_number'), ('faculty', 'faculty_id'))
+             if moved or row.get(field) != current.get(field)}
+    if not kinds:
+        return []
+    conflicts, error = run_check(lambda c: scheduling.section_conflicts(
+        c, current['section_id'], row['year'], row['semester'], row['room_number'], row['faculty_id']), "The timetable")
+    if error:
+        return [error]
+    return [f"{'Room' if c.kind == 'room' else 'Instructor'} {c.resource} is booked: {describe_clash(c)}"
+            for c in conflicts if c.kind in kinds]
+
+
+# validate hook for Prerequisite inserts: reject rows that would make a cycle
+def prerequisite_cycle_errors(row, current=None):
+    graph = prerequisite_graph()
+    if graph is None:
+        return ["Prerequisites could not be checked"]
+    if not row.get('course_id') or not row.get('prereq_course_id'):
+        return ["Choose both courses"]
+    if graph.would_cycle(row['course_id'], row['prereq_course_id']):
+        titles = course_titles([row['course_id'], row['prereq_course_id']])
+        return [f"{titles.get(row['prereq_course_id'])} already requires {titles.get(row['course_id'])} "
+                "(directly or through other courses), so this would create a cycle"]
+    return []
+
+
+# Queue a background job (ums/jobs.py) for the button or form `name`;
+# job_panel(name) then follows it. Submitting again while that job is
+# unfinished returns it instead of queueing another.
+def submit_job(name, kind, params=None):
+    params = params or {}
+    token_key = f"job_token_{name}"
+
+    def queue(cursor):
+        job_id, created = jobs.submit(cursor, kind, params, f"{name}:{st.session_state[token_key]}:"
+                                      f"{jobs.params_key(params)}")
+        return job_id, created, jobs.get_job(cursor, job_id)["status"]
+
+    for _ in range(2):
+        st.session_state.setdefault(token_key, uuid.uuid4().hex)
+        result, error = run_write(queue, "job")
+        if error:
+            st.error(f"The job could not be queued: {error}")
+            return None
+        job_id, created, status = result
+        if created or status in jobs.ACTIVE:
+            break
+        # The job with this key has finished, so this is a new request
+        st.session_state[token_key] = uuid.uuid4().hex
+    st.session_state[f"job_{name}"] = job_id
+    return job_id
+
+
+# A job read from the primary (replicas may lag behind its progress), or None
+def load_job(job_id):
+    conn = get_connection()
+    if not conn:
+        return None
+    try:
+        return jobs.get_job(conn.cursor(), job_id)
+    except DatabaseError as err:
+        st.error(f"The job could not be read: {err}")
+        return None
+    finally:
+        conn.close()
+
+
+# Once per session, drop the cached reads of the tables a finished job wrote
+# and read from the primary. get_job_watcher does this for every session too,
+# but polls, so the rerun that shows the result could still hit the cache.
+def _job_finished(job):
+    seen = st.session_state.setdefault("jobs_finished", set())
+    if job["job_id"] not in seen:
+        seen.add(job["job_id"])
+        kind = jobs.KINDS.get(job["kind"])
+        if job["status"] == "Succeeded" and kind and kind.tables:
+            invalidate_tables(*kind.tables)
+
+
+def show_job(job):
+    label = f"Job #{job['job_id']} ({job['kind']})"
+    status = job["status"]
+    if status in jobs.ACTIVE:
+        total = job["progress_total"]
+        text = f"{label}: {status.lower()}" + (f" - {job['message']}" if job["message"] else "")
+        st.progress(min(1.0, job["progress_done"] / total) if total else 0.0, text=text)
+        if status == "Queued" and job["error"]:
+            st.caption(f"Attempt {job['attempts']} failed ({job['error']}); "
+                       f"retrying, {job['max_attempts'] - job['attempts']} attempt(s) left")
+    elif status == "Succeeded":
+        st.success(f"{label}: {job['result']['summary']}")
+        path = job["result"].get("path")
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                st.download_button(f"Download {os.path.basename(path)}", f, file_name=os.path.basename(path),
+                                   key=f"job_download_{job['job_id']}")
+    elif status == "Failed":
+        st.error(f"{label} failed after {job['attempts']} attempt(s): {job['error']}")
+    else:
+        st.warning(f"{label} was cancelled")
+
+
+# Refreshed on a timer while the job is queued or running; when it finishes
+# the whole page reruns, so it shows the job's writes
+@fragment("Job progress", run_every=JOB_REFRESH_SECONDS)
+def _live_job(job_id):
+    job = load_job(job_id)
+    if job is None:
+        return
+    if job["status"] not in jobs.ACTIVE:
+        _job_finished(job)
+        st.rerun()
+    show_job(job)
+
+
+# Status of the job last submitted from `name` (see submit_job)
+def job_panel(name):
+    job_id = st.session_state.get(f"job_{name}")
+    if job_id is None:
+        return
+    job = load_job(job_id)
+    if job is None:
+        return
+    if job["status"] in jobs.ACTIVE:
+        _live_job(job_id)
+    else:
+        _job_finished(job)
+        show_job(job)
+
+
+# Sidebar search over everyone in Person by name, email or phone
+# (ums/people.py); typing reruns just this box
+@fragment("People search")
+def people_search():
+    text = st.text_input("Search people", placeholder="Name, email or phone", key="people_search")
+    if not text.strip():
+        return
+    found, error = run_check(lambda c: people.search(c, text), "People search")
+    if error:
+        st.error(error)
+    elif not found:
+        st.caption("No matches")
+    else:
+        st.dataframe([{'name': f"{p['first_name']} {p['last_name']}", 'type': p['person_type'],
+                       'student_id': p['student_id'], 'faculty_id': p['faculty_id'],
+                       'email': p['email'], 'phone': p['contact_number']} for p in found],
+                     hide_index=True)